@@ -0,0 +1,372 @@
+"""
+Check that the cache compiled from the captures in tests/captures is the same as the one in tests/references,
+byte by byte for the .dpl files and the chunks, so a change of Voicebird which changes the cache is found.
+The references are written again after an intended change of the cache, e.g. DPL_VERSION, by:
+
+    python tests/test_cache.py update
+
+The dialogs and packets loaded from the cache are also checked against tests/references/packets.txt, a dump
+of them which does not depend on the cache format. It was made by the voicebird.py before the dialogs were
+scanned in a single pass, so the scanner is checked against the one it replaced rather than against itself.
+It is not written by 'update' but only by the voicebird.py given, e.g. the one of that commit:
+
+    git show f9758c8:voicebird.py > /tmp/voicebird-old.py
+    python tests/test_cache.py dump /tmp/voicebird-old.py
+
+It runs voicebird.py by python 2:
+
+    python -m unittest discover tests
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+import cPickle as pickle
+
+DIR_TESTS = os.path.dirname(os.path.abspath(__file__))
+DIR_CAPTURES = os.path.join(DIR_TESTS, 'captures')
+DIR_REFERENCES = os.path.join(DIR_TESTS, 'references')
+VOICEBIRD_FILE_NAME = os.path.join(os.path.dirname(DIR_TESTS), 'voicebird.py')
+
+MANIFEST_REFERENCE_FILE_NAME = 'manifest.txt'
+PACKETS_REFERENCE_FILE_NAME = 'packets.txt'
+
+# dump the dialogs and packets of the compiled cases by the loader of the voicebird.py given, without its main().
+# Only what the scanner gives out is dumped, not how it is cached: a SIP message is dumped by its method and CSeq,
+# since the rest of it is kept as a template. The ACK and the IVR events are dumped without their delttime, which
+# was not stored before the RTP was sent at its captured time
+DUMP_PACKETS = """
+import hashlib, os, re, sys
+namespace = {'__name__': 'voicebird', '__file__': sys.argv[1]}
+execfile(sys.argv[1], namespace)
+namespace['createLogObj'](os.path.abspath('dump'), True)
+for caseName in sys.argv[2:]:
+    dpl = namespace['loadDialogPacketsListFromCache'](namespace['caseNameToCacheName'](os.path.abspath(caseName)))
+    print '%s: %d dialogs' % (caseName, len(dpl))
+    for dialogIndex in range(len(dpl)):
+        print ' dialog %d: %d packets' % (dialogIndex, len(dpl[dialogIndex]))
+        for packet in dpl[dialogIndex]:
+            if packet.udpType==namespace['UDP_TYPE_SIP']:
+                text = packet.data
+                if not isinstance(text, str):
+                    text = namespace['sipTemplateToText'](text)
+                cseq = re.search(r'^CSeq *: *(.*?) *$', text, re.M | re.I)
+                if cseq:
+                    data = '%s/%s' % (text.split(' ', 1)[0], cseq.group(1).replace(' ', '-'))
+                else:
+                    data = '%d/%r' % (len(text), text[:20])
+            else:
+                data = '%d/%s' % (len(packet.data), hashlib.md5(packet.data).hexdigest())
+
+            if packet.sipType==namespace['SIP_TYPE_ACK'] or packet.udpType>=namespace['UDP_TYPE_RTP_IVR_RECORD_FILE']:
+                delttime = '-'
+            else:
+                delttime = '%.6f' % (packet.delttime)
+
+            print '  %d %d %d %d %d %d %s %s:%d %s:%d %d %d %r %r %s' % (packet.originalPacketIndex, packet.dialogIndex, \\
+                    packet.udpType, packet.sipType, packet.received, packet.isTwin, delttime, packet.sourceIp, packet.sourcePort, \\
+                    packet.destinationIp, packet.destinationPort, packet.rtpTimestamp, packet.dtmf, packet.timestamp, packet.ivrEventStr, data)
+"""
+
+# the fields of a packet in the dump, and its UDP types of voicebird.py
+(DUMP_UDP_TYPE, DUMP_RTP_TIMESTAMP, DUMP_FIELDS_COUNT) = (2, 9, 14)
+(UDP_TYPE_UNKNOW, UDP_TYPE_RTP) = ('-1', '1')
+
+
+class PickledStruct:
+    """
+    [Class]
+    This is a struct used to load the structs of voicebird.py pickled in its __main__, e.g. CaseManifestEntry
+    """
+
+
+def findPickledClass(moduleName, className):
+    if moduleName=='__main__':
+        return PickledStruct
+    #else:
+
+    __import__(moduleName)
+    return getattr(sys.modules[moduleName], className)
+
+
+def readFile(fileName):
+    fileobj = file(fileName, 'rb')
+    try:
+        return fileobj.read()
+    finally:
+        fileobj.close()
+
+
+def writeFile(fileName, data):
+    if not os.path.exists(os.path.dirname(fileName)):
+        os.makedirs(os.path.dirname(fileName))
+
+    fileobj = file(fileName, 'wb')
+    try:
+        fileobj.write(data)
+    finally:
+        fileobj.close()
+
+
+def compileCaptures(workDirName, arguments=[]):
+    """
+    [Function]
+    Copy the captures to the case dir of the work dir and compile them by voicebird.py
+
+    [Argument]
+    workDirName: the work dir, the cache is in its cache dir
+    arguments: more arguments of voicebird.py, e.g. ['-vc']
+
+    [Return]
+    (return code, output of voicebird.py)
+    """
+
+    tempCaseDirName = os.path.join(workDirName, 'case')
+    if not os.path.exists(tempCaseDirName):
+        shutil.copytree(DIR_CAPTURES, tempCaseDirName)
+
+    tempProcess = subprocess.Popen([sys.executable, VOICEBIRD_FILE_NAME, 'compile', '-f', 'case'] + arguments, \
+            cwd=workDirName, stdin=file(os.devnull, 'rb'), stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    tempOutput = tempProcess.communicate()[0]
+    return (tempProcess.returncode, tempOutput)
+
+
+def getCacheFiles(cacheDirName):
+    """
+    [Function]
+    Get the .dpl files and the chunks in the cache dir
+
+    [Argument]
+    cacheDirName: the cache dir
+
+    [Return]
+    dict, key: file name relative to the cache dir with '/', value: content of the file
+    """
+
+    cacheFiles = {}
+    for dirName,subDirNames,fileNames in os.walk(cacheDirName):
+        for fileName in fileNames:
+            if os.path.splitext(fileName)[1] not in ('.dpl', '.chk'):
+                continue
+
+            tempFileName = os.path.join(dirName, fileName)
+            tempRelativeName = tempFileName[len(cacheDirName)+1:].replace(os.sep, '/')
+            cacheFiles[tempRelativeName] = readFile(tempFileName)
+
+    return cacheFiles
+
+
+def getManifestLines(cacheDirName):
+    """
+    [Function]
+    Get the entries of the manifest in the cache dir as text, without the modify time of the captures
+    which is changed by copying them
+
+    [Argument]
+    cacheDirName: the cache dir
+
+    [Return]
+    list of the lines 'name cifVersion snoopFileSize snoopFileHash xmlFileHash', sorted by the name
+    """
+
+    manifestFile = file(os.path.join(cacheDirName, 'manifest.cmf'), 'rb')
+    try:
+        unpickler = pickle.Unpickler(manifestFile)
+        unpickler.find_global = findPickledClass
+        manifest = unpickler.load()
+    finally:
+        manifestFile.close()
+
+    tempLines = []
+    for name in sorted(manifest.keys()):
+        entry = manifest[name]
+        tempLines.append('%s %d %d %s %s' % (name, entry.cifVersion, entry.snoopFileSize, entry.snoopFileHash, entry.xmlFileHash or '-'))
+    return tempLines
+
+
+def isSameDumpLine(referenceLine, line):
+    """
+    [Function]
+    Compare a line of the dump with the one of the reference. A packet with an RTP header extension was left as
+    UDP_TYPE_UNKNOW by the voicebird.py of the reference, since its decoder failed on the extension, so it may be
+    RTP now with its RTP timestamp; all other fields must be the same
+
+    [Argument]
+    referenceLine: the line of the reference
+    line: the line of the dump
+
+    [Return]
+    True or False
+    """
+
+    if line==referenceLine:
+        return True
+    #else:
+
+    tempReferenceFields = referenceLine.split(None, DUMP_FIELDS_COUNT-1)
+    tempFields = line.split(None, DUMP_FIELDS_COUNT-1)
+    if len(tempReferenceFields)!=DUMP_FIELDS_COUNT or len(tempFields)!=DUMP_FIELDS_COUNT:
+        return False
+    #else:
+
+    if tempReferenceFields[DUMP_UDP_TYPE]==UDP_TYPE_UNKNOW and tempReferenceFields[DUMP_RTP_TIMESTAMP]=='0' \
+            and tempFields[DUMP_UDP_TYPE]==UDP_TYPE_RTP:
+        tempReferenceFields[DUMP_UDP_TYPE] = tempFields[DUMP_UDP_TYPE]
+        tempReferenceFields[DUMP_RTP_TIMESTAMP] = tempFields[DUMP_RTP_TIMESTAMP]
+
+    return tempFields==tempReferenceFields
+
+
+def dumpPackets(workDirName, voicebirdFileName):
+    """
+    [Function]
+    Dump the dialogs and packets of the cases compiled in the work dir, loaded by the voicebird.py given
+
+    [Argument]
+    workDirName: the work dir, the cases have been compiled by compileCaptures()
+    voicebirdFileName: the voicebird.py whose loader is used
+
+    [Return]
+    list of the lines of the dump, one for each case, dialog and packet
+    """
+
+    tempCaseNames = ['case/' + fileName for fileName in sorted(os.listdir(DIR_CAPTURES))]
+    tempProcess = subprocess.Popen([sys.executable, '-c', DUMP_PACKETS, voicebirdFileName] + tempCaseNames, \
+            cwd=workDirName, stdin=file(os.devnull, 'rb'), stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    tempOutput = tempProcess.communicate()[0]
+    if tempProcess.returncode!=0:
+        raise RuntimeError('Failed to dump the packets by %s:\n%s' % (voicebirdFileName, tempOutput))
+
+    return tempOutput.splitlines()
+
+
+def updatePacketsReference(voicebirdFileName):
+    """
+    [Function]
+    Compile the captures by the voicebird.py given and write its dump of the packets as the reference
+
+    [Argument]
+    voicebirdFileName: the voicebird.py, e.g. the one of an old commit
+
+    [Return]
+    (N/A)
+    """
+
+    tempWorkDirName = tempfile.mkdtemp(prefix='voicebird-cache-')
+    try:
+        shutil.copytree(DIR_CAPTURES, os.path.join(tempWorkDirName, 'case'))
+        tempProcess = subprocess.Popen([sys.executable, os.path.abspath(voicebirdFileName), 'compile', '-f', 'case'], \
+                cwd=tempWorkDirName, stdin=file(os.devnull, 'rb'), stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        tempOutput = tempProcess.communicate()[0]
+        if tempProcess.returncode!=0:
+            print tempOutput
+            sys.exit(1)
+
+        tempLines = dumpPackets(tempWorkDirName, os.path.abspath(voicebirdFileName))
+        writeFile(os.path.join(DIR_REFERENCES, PACKETS_REFERENCE_FILE_NAME), '\n'.join(tempLines)+'\n')
+    finally:
+        shutil.rmtree(tempWorkDirName)
+
+
+def updateReferences():
+    """
+    [Function]
+    Compile the captures and write the cache as the references
+
+    [Argument]
+    (N/A)
+
+    [Return]
+    (N/A)
+    """
+
+    tempWorkDirName = tempfile.mkdtemp(prefix='voicebird-cache-')
+    try:
+        returnCode,output = compileCaptures(tempWorkDirName)
+        if returnCode!=0:
+            print output
+            sys.exit(1)
+
+        # Note: the dump of the packets is kept, it is not made by this voicebird.py
+        if os.path.exists(DIR_REFERENCES):
+            for fileName in os.listdir(DIR_REFERENCES):
+                if fileName==PACKETS_REFERENCE_FILE_NAME:
+                    continue
+
+                tempFileName = os.path.join(DIR_REFERENCES, fileName)
+                if os.path.isdir(tempFileName):
+                    shutil.rmtree(tempFileName)
+                else:
+                    os.remove(tempFileName)
+
+        tempCacheDirName = os.path.join(tempWorkDirName, 'cache')
+        for name,content in getCacheFiles(tempCacheDirName).iteritems():
+            writeFile(os.path.join(DIR_REFERENCES, *name.split('/')), content)
+        writeFile(os.path.join(DIR_REFERENCES, MANIFEST_REFERENCE_FILE_NAME), '\n'.join(getManifestLines(tempCacheDirName))+'\n')
+    finally:
+        shutil.rmtree(tempWorkDirName)
+
+
+class CacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workDirName = tempfile.mkdtemp(prefix='voicebird-cache-')
+
+
+    def tearDown(self):
+        shutil.rmtree(self.workDirName)
+
+
+    def __compile(self, arguments=[]):
+        returnCode,output = compileCaptures(self.workDirName, arguments)
+        self.assertEqual(returnCode, 0, output)
+        self.assertTrue('%d parsed, 0 cached, 0 failed' % (len(os.listdir(DIR_CAPTURES))) in output, output)
+        return output
+
+
+    def testCacheIsSameAsReferences(self):
+        self.__compile()
+
+        tempCacheDirName = os.path.join(self.workDirName, 'cache')
+        tempCacheFiles = getCacheFiles(tempCacheDirName)
+        tempReferenceFiles = getCacheFiles(DIR_REFERENCES)
+        self.assertEqual(sorted(tempCacheFiles.keys()), sorted(tempReferenceFiles.keys()))
+        for name in sorted(tempReferenceFiles.keys()):
+            self.assertTrue(tempCacheFiles[name]==tempReferenceFiles[name], "'%s' is different from the reference" % (name))
+
+        self.assertEqual(getManifestLines(tempCacheDirName), \
+                readFile(os.path.join(DIR_REFERENCES, MANIFEST_REFERENCE_FILE_NAME)).splitlines())
+
+
+    def testPacketsAreSameAsBeforeSinglePassScan(self):
+        self.__compile()
+
+        tempLines = dumpPackets(self.workDirName, VOICEBIRD_FILE_NAME)
+        tempReferenceLines = readFile(os.path.join(DIR_REFERENCES, PACKETS_REFERENCE_FILE_NAME)).splitlines()
+        for lineIndex in range(min(len(tempLines), len(tempReferenceLines))):
+            self.assertTrue(isSameDumpLine(tempReferenceLines[lineIndex], tempLines[lineIndex]), \
+                    'Line %d of the dump is different:\n%s\n%s' % (lineIndex+1, tempReferenceLines[lineIndex], tempLines[lineIndex]))
+        self.assertEqual(len(tempLines), len(tempReferenceLines))
+
+
+    def testVerifyCacheByReferences(self):
+        # -vc compares the .dpl files compiled again with the ones in the cache, here they are the references
+        for name,content in getCacheFiles(DIR_REFERENCES).iteritems():
+            if name.endswith('.dpl'):
+                writeFile(os.path.join(self.workDirName, 'cache', name), content)
+
+        tempOutput = self.__compile(['-vc'])
+        self.assertTrue('Verified the cache: %d same, 0 different, 0 without the one before compiling' \
+                % (len(os.listdir(DIR_CAPTURES))) in tempOutput, tempOutput)
+
+
+if __name__=='__main__':
+    if sys.argv[1:]==['update']:
+        updateReferences()
+    elif len(sys.argv)==3 and sys.argv[1]=='dump':
+        updatePacketsReference(sys.argv[2])
+    else:
+        unittest.main()
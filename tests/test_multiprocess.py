@@ -0,0 +1,255 @@
+"""
+Smoke test of the stress test run by the worker processes of -mp: the worker processes are forked with their own
+SIP ports, their logs come to the main process, and they say BYE and exit by Ctrl+C of the main process.
+It runs voicebird.py against a fake IVR on 127.0.0.2, by python 2:
+
+    python -m unittest discover tests
+"""
+
+import os
+import re
+import select
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+DIR_TESTS = os.path.dirname(os.path.abspath(__file__))
+VOICEBIRD_FILE_NAME = os.path.join(os.path.dirname(DIR_TESTS), 'voicebird.py')
+
+IVR_HOST = '127.0.0.2'
+SIP_PORT = 5060
+CHANNEL_COUNT = 4
+PROCESSES_COUNT = 2
+TIME_TO_ANSWER_ALL = 60     # (second) all channels are answered in it
+TIME_TO_EXIT = 10           # (second) Voicebird exits in it by Ctrl+C, less than TIME_GRACE_TO_EXIT*2 of all the worker processes
+
+# the pickled Parameters of voicebird.py, the answers of the questions asked at the first run
+PARAMETERS_DAT = """(i__main__
+Parameters
+p1
+(dp2
+S'channelCount'
+p3
+I%d
+sS'calledCount'
+p4
+I1
+sS'destination'
+p5
+S'%s'
+p6
+sS'calling'
+p7
+S'1234'
+p8
+sS'redirectCount'
+p9
+I0
+sS'source'
+p10
+S'127.0.0.1'
+p11
+sS'calledPrefix'
+p12
+S''
+sS'isStressTest'
+p13
+I01
+sS'called'
+p14
+S'8000'
+p15
+sb.""" % (CHANNEL_COUNT, IVR_HOST)
+
+# Voicebird binds the SIP port of all addresses, SO_REUSEADDR lets it share the port with the fake IVR on IVR_HOST
+BOOTSTRAP = """
+import socket, sys
+_socket = socket.socket
+class ReuseSocket(_socket):
+    def __init__(self, *args, **kwargs):
+        _socket.__init__(self, *args, **kwargs)
+        self.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+socket.socket = ReuseSocket
+sys.argv = sys.argv[1:]
+import __main__
+__main__.__file__ = sys.argv[0]
+execfile(sys.argv[0], __main__.__dict__)
+"""
+
+RE_TOP_VIA = re.compile(r'^Via *: *SIP/2\.0/UDP +([^;:\s]+)(?::(\d+))?', re.M | re.I)
+
+
+def getHeader(message, name):
+    tempMatch = re.search(r'^%s *:.*$' % (name), message, re.M | re.I)
+    if tempMatch:
+        return tempMatch.group().strip()
+    else:
+        return ''
+
+
+class FakeIvr(threading.Thread):
+    """
+    [Class]
+    An IVR which answers every INVITE and every BYE. As a strict SIP server, the responses are sent to
+    the host and port of the top Via rather than where the request comes from
+    """
+
+    def __init__(self):
+        threading.Thread.__init__(self, name = 'FakeIvr')
+        self.setDaemon(True)
+
+        self.sipTransport = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sipTransport.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sipTransport.bind((IVR_HOST, SIP_PORT))
+        self.rtpTransport = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.rtpTransport.bind((IVR_HOST, 0))
+
+        self.lock = threading.Lock()
+        self.invitePorts = {}   # key: Call-ID, value: SIP port of the top Via of INVITE
+        self.ackedCallIds = set()
+        self.byePorts = {}      # key: Call-ID, value: SIP port of the top Via of BYE
+        self.isStopped = False
+
+
+    def stop(self):
+        self.isStopped = True
+        self.join()
+        self.sipTransport.close()
+        self.rtpTransport.close()
+
+
+    def run(self):
+        while not self.isStopped:
+            for readable in select.select([self.sipTransport, self.rtpTransport], [], [], 0.1)[0]:
+                tempData = readable.recv(65535)
+                if readable is self.sipTransport:
+                    self.__receiveSip(tempData)
+
+
+    def __receiveSip(self, message):
+        tempVia = RE_TOP_VIA.search(message)
+        if not tempVia:
+            return
+        #else:
+
+        tempAddress = (tempVia.group(1), int(tempVia.group(2) or SIP_PORT))
+        tempCallId = getHeader(message, 'Call-ID')
+
+        self.lock.acquire()
+        try:
+            if message.startswith('INVITE '):
+                self.invitePorts[tempCallId] = tempAddress[1]
+                self.__respond(message, tempAddress, '200 OK', True)
+            elif message.startswith('ACK '):
+                self.ackedCallIds.add(tempCallId)
+            elif message.startswith('BYE '):
+                self.byePorts[tempCallId] = tempAddress[1]
+                self.__respond(message, tempAddress, '200 OK', False)
+        finally:
+            self.lock.release()
+
+
+    def __respond(self, request, address, status, hasSdp):
+        tempTo = getHeader(request, 'To')
+        if 'tag=' not in tempTo:
+            tempTo += ';tag=ivr%d' % (len(self.invitePorts))
+
+        tempBody = ''
+        if hasSdp:
+            tempBody = 'v=0\r\no=- 1 1 IN IP4 %s\r\ns=-\r\nc=IN IP4 %s\r\nt=0 0\r\nm=audio %d RTP/AVP 0 101\r\n' \
+                    'a=rtpmap:0 PCMU/8000\r\na=rtpmap:101 telephone-event/8000\r\n' \
+                    % (IVR_HOST, IVR_HOST, self.rtpTransport.getsockname()[1])
+
+        tempVias = '\r\n'.join([via.strip() for via in re.findall(r'^Via *:.*$', request, re.M | re.I)])
+        tempResponse = 'SIP/2.0 %s\r\n%s\r\n%s\r\n%s\r\n%s\r\n%s\r\nContact: <sip:8000@%s:%d>\r\n' \
+                % (status, tempVias, getHeader(request, 'From'), tempTo, getHeader(request, 'Call-ID'), getHeader(request, 'CSeq'), \
+                IVR_HOST, SIP_PORT)
+        if tempBody:
+            tempResponse += 'Content-Type: application/sdp\r\n'
+        tempResponse += 'Content-Length: %d\r\n\r\n%s' % (len(tempBody), tempBody)
+
+        self.sipTransport.sendto(tempResponse, address)
+
+
+class MultiProcessTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workDirName = tempfile.mkdtemp(prefix='voicebird-mp-')
+        os.makedirs(os.path.join(self.workDirName, 'case'))
+        os.makedirs(os.path.join(self.workDirName, 'config'))
+        shutil.copy(os.path.join(DIR_TESTS, 'captures', 'basic.snoop'), os.path.join(self.workDirName, 'case'))
+        parametersFile = file(os.path.join(self.workDirName, 'config', 'parameters.dat'), 'wb')
+        parametersFile.write(PARAMETERS_DAT)
+        parametersFile.close()
+
+        self.ivr = FakeIvr()
+        self.ivr.start()
+        self.voicebird = None
+
+
+    def tearDown(self):
+        if self.voicebird and self.voicebird.poll() is None:
+            os.killpg(self.voicebird.pid, signal.SIGKILL)
+            self.voicebird.wait()
+        self.ivr.stop()
+        shutil.rmtree(self.workDirName)
+
+
+    def __readLog(self, fileName):
+        logFile = file(os.path.join(self.workDirName, 'log', fileName), 'rb')
+        try:
+            return logFile.read()
+        finally:
+            logFile.close()
+
+
+    def __waitFor(self, isDone, seconds):
+        tempTimeToGiveUp = time.time() + seconds
+        while not isDone():
+            if time.time()>tempTimeToGiveUp or self.voicebird.poll() is not None:
+                return False
+            time.sleep(0.1)
+        return True
+
+
+    def testForkLogAndExit(self):
+        outputFile = file(os.path.join(self.workDirName, 'output.txt'), 'wb')
+        # Note: the own process group, so the worker processes are killed together if the test fails
+        self.voicebird = subprocess.Popen([sys.executable, '-c', BOOTSTRAP, VOICEBIRD_FILE_NAME, '-f', 'case', '-y', '-mp', str(PROCESSES_COUNT)], \
+                cwd=self.workDirName, stdin=file(os.devnull, 'rb'), stdout=outputFile, stderr=subprocess.STDOUT, preexec_fn=os.setpgrp)
+        outputFile.close()
+
+        # 1. every worker process calls from its own SIP port
+        self.assertTrue(self.__waitFor(lambda: len(self.ivr.ackedCallIds)>=CHANNEL_COUNT, TIME_TO_ANSWER_ALL), \
+                'Only %d of %d channels are answered' % (len(self.ivr.ackedCallIds), CHANNEL_COUNT))
+        self.assertEqual(sorted(set(self.ivr.invitePorts.values())), range(SIP_PORT, SIP_PORT+PROCESSES_COUNT))
+
+        # 2. Ctrl+C, the worker processes say BYE from their own SIP ports and exit without waiting the grace period
+        tempStartTime = time.time()
+        os.kill(self.voicebird.pid, signal.SIGINT)
+        self.assertTrue(self.__waitFor(lambda: self.voicebird.poll() is not None, TIME_TO_EXIT), 'Voicebird does not exit by Ctrl+C')
+        self.assertTrue(time.time()-tempStartTime<TIME_TO_EXIT)
+
+        for callId in self.ivr.ackedCallIds:
+            self.assertEqual(self.ivr.byePorts.get(callId), self.ivr.invitePorts[callId])
+
+        # 3. the logs of all worker processes are in the files of the main process
+        tempLog = self.__readLog('log.txt')
+        self.assertTrue('%d channels run in %d worker processes' % (CHANNEL_COUNT, PROCESSES_COUNT) in tempLog)
+        self.assertEqual(tempLog.count('Send INVITE whose from tag is'), len(self.ivr.invitePorts))
+        self.assertFalse('exits without the response of BYE' in tempLog)
+        self.assertFalse('The worker process' in tempLog)
+
+        # Note: the report of the media clock is logged by each channel when it says BYE at exit
+        tempChannelIndexes = set(re.findall(r'^INFO: Channel (\d+), case 1, dialog 1: ', tempLog, re.M))
+        self.assertEqual(sorted([int(channelIndex) for channelIndex in tempChannelIndexes]), range(CHANNEL_COUNT))
+
+
+if __name__=='__main__':
+    unittest.main()
@@ -1,5398 +1,10048 @@
-import os
-import stat
-import shutil
-import sys
-import time
-import socket
-import struct
-import re
-import cPickle as pickle
-import threading
-import Queue
-import select
-import copy
-from xml.dom import minidom
-
-
-####################
-# global consts
-####################
-VOICEBIRD_VERSION = 0.13
-CIF_VERSION = 3
-SUPPORT_PYTHON_VERSIONS = ('2.4', '2.5', '2.6', '2.7')
-
-SNOOP_IDENTIFICATION_PATTERN_SNOOP = (0x73, 0x6E, 0x6F, 0x6F, 0x70, 0x00, 0x00, 0x00)
-SNOOP_VERSION_NUMBER = 2
-SNOOP_DATALINK_TYPE_ETHERNET = 4
-ETHERNET_TYPE_IP = 0x800
-IP_PROTOCOL_UDP = 17
-SIP_PORTS = (5060, 5061)
-PAYLOAD_TYPE_G711 = 0
-PAYLOAD_TYPE_COMFORT_NOISE = 13
-# private payload types for IVR autotest
-PAYLOAD_TYPE_IVR_RECORD_FILE = 126
-PAYLOAD_TYPE_IVR_PROMPT = 127
-
-PROMPT_TYPE_SPEAK       = 1
-PROMPT_TYPE_SYSTEM      = 2
-PROMPT_TYPE_RECORD_TONE = 3
-
-UDP_TYPE_UNKNOW                 = -1
-UDP_TYPE_SIP                    = 0
-UDP_TYPE_RTP                    = 1
-UDP_TYPE_RTP_EVENT              = 2     # RFC 2833
-UDP_TYPE_RTP_IVR_RECORD_FILE    = 3
-UDP_TYPE_RTP_IVR_PROMPT         = 4
-UDP_TYPE_RTP_IVR_SPEAK_PROMPT   = UDP_TYPE_RTP_IVR_PROMPT + PROMPT_TYPE_SPEAK          # in speak.vox
-UDP_TYPE_RTP_IVR_SYSTEM         = UDP_TYPE_RTP_IVR_PROMPT + PROMPT_TYPE_SYSTEM         # in system32.vox
-UDP_TYPE_RTP_IVR_RECORD_TONE    = UDP_TYPE_RTP_IVR_PROMPT + PROMPT_TYPE_RECORD_TONE    # record tone
-
-SHORT_NAME_OF_IVR_EVENT = { UDP_TYPE_RTP_IVR_RECORD_FILE : 'r', \
-                            UDP_TYPE_RTP_IVR_SPEAK_PROMPT : 'p', \
-                            UDP_TYPE_RTP_IVR_SYSTEM : 's', \
-                            UDP_TYPE_RTP_IVR_RECORD_TONE : 't'}
-
-SIP_TYPE_UNKNOW = -1
-SIP_TYPE_INVITE = 0
-SIP_TYPE_ACK    = 1
-SIP_TYPE_BYE    = 2
-
-DEFAULT_SIP_PORT = 5060 # DON'T CHANGE IT EASILY
-MAGIC_SIP_URI = 'cabernet1976@163.com:'+str(DEFAULT_SIP_PORT)
-MAGIC_IP_AND_PORT = '127.0.0.1:'+str(DEFAULT_SIP_PORT)
-
-MIN_UDP_LEN = 1024
-
-# Regular Expression
-RE_INT = re.compile(r'\d+')
-RE_EMAIL = re.compile(r'\+*\w+([-+.]\w+)*@\w+([-.]\w+)*\.\w+([-.]\w+)*')
-RE_SIP_URI = re.compile(r'\+*\w+([-+.]\w+)*@\w+([-.]\w+)*\.\w+([-.]\w+)* *: *\d+\b')
-RE_IP = re.compile(r'\b(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\b')
-RE_IP_AND_PORT = re.compile(r'\b(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\b *: *\d+\b')
-RE_SIP_INVITE = re.compile(r'INVITE .+ SIP/2\.0')
-RE_SIP_RESPONSE = re.compile(r'SIP/2\.0 +\d\d\d.*')
-RE_SIP_RESPONSE_CODE = re.compile(r'\d\d\d')
-RE_SIP_100 = re.compile(r'SIP/2\.0 +100.*')
-RE_SIP_180 = re.compile(r'SIP/2\.0 +180.*')
-RE_SIP_183 = re.compile(r'SIP/2\.0 +183.*')
-RE_SIP_200 = re.compile(r'SIP/2\.0 +200.*')
-RE_SIP_ACK = re.compile(r'ACK .+ SIP/2\.0')
-RE_SIP_BYE = re.compile(r'BYE .+ SIP/2\.0')
-RE_SIP_VIA = re.compile(r'Via *:.*SIP/2\.0/UDP.*')
-RE_SIP_FROM = re.compile(r'From *:.*tag *=.*')
-RE_SIP_FROM_DISPLAY = re.compile(r'".*"')
-RE_SIP_TAG = re.compile(r'tag *= *\w+')
-RE_SIP_TO = re.compile(r'To *: *.*')
-RE_SIP_CALL_ID = re.compile(r'Call-ID *: *.*')
-RE_SIP_CONTACT = re.compile(r'Contact *: *.*')
-RE_SIP_CONTENT_LENGTH = re.compile(r'Content-Length *: *.*')
-RE_SIP_CSEQ = re.compile(r'CSeq *: *\d+.*')
-RE_SIP_ROUTE = re.compile(r'Route *: *.*')
-RE_SIP_RECORD_ROUTE = re.compile(r'Record-Route *: *.*')
-RE_SIP_DIVERSION = re.compile(r'Diversion *: *.*')
-RE_SDP_V = re.compile(r'v=0\b')
-RE_SDP_O = re.compile(r'o=.*')
-RE_SDP_C = re.compile(r'c=.*')
-RE_SDP_M = re.compile(r'm=.*')
-RE_SDP_M_AUDIO = re.compile(r'audio +\d+')
-RE_SDP_RTPMAP = re.compile(r'rtpmap *: *\d+\b')
-RE_SDP_TELEPHONE_EVENT = re.compile(r'a=rtpmap:\d+ +telephone-event.*')
-
-SIP_STATE_IDLE          = 0
-SIP_STATE_WAITING_183   = 1
-SIP_STATE_WAITING_200   = 2
-SIP_STATE_BEFORE_ACK    = 3
-SIP_STATE_AFTER_ACK     = 4
-SIP_STATE_BYEING        = 5
-SIP_STATE_BYED          = SIP_STATE_IDLE
-
-DEFAULT_PARAMETER_PHONE = 'anonymous'
-DEFAULT_PARAMETER_REASON = 'unknown'
-
-LEFT_TO_RIGHT = True
-RIGHT_TO_LEFT = False
-
-TIME_ONE_TICK               = 0.005 # (second)
-TIME_ONE_WINK               = 0.1   # (second)
-
-MAX_TIME_TO_EXIT            = 15    # (second)
-MIN_TIME_TO_EXIT            = 3     # (second)
-
-ONE_UNIT_TIME_WAIT_TO_WORK  = 0.5   # (second)
-
-PRINT_PANDING_LEFT          = 5
-PRINT_IVR_EVENT_PANDING    = 10
-PRINT_CENTER_WIDTH          = 58
-
-SNOOP_FILE_EXT = '.snoop'
-CASE_LIST_FILE_EXT = '.cl'
-CASE_INFORMATION_FILE_EXT = '.cif'
-DIALOG_PACKETS_LIST_FILE_EXT = '.dpl'
-
-ITEM_TYPE_UNKNOWN                   = -1
-ITEM_TYPE_START_WORK                = 0
-ITEM_TYPE_SIP_DATA                  = 1
-ITEM_TYPE_RTP_DATA                  = 2
-ITEM_TYPE_SIGN_TO_KILL_THREAD       = 3
-ITEM_TYPE_START_A_DIALOG            = 4
-ITEM_TYPE_WRITE_TEST_RESULT         = 5
-ITEM_TYPE_WRITE_UNPASSED_CALL_FLOW  = 6
-ITEM_TYPE_WRITE_LOG                 = 7
-ITEM_TYPE_GET_A_CASE_REQ            = 8
-ITEM_TYPE_GET_A_CASE_ACK            = 9
-ITEM_TYPE_HAVE_A_REST               = 10
-
-#Note: the voicebird tag format: [prefix]F[fffff]C[ccccc]D[ddddd]A[timestamp]
-#      fffff is X digitals channel index after 'F'
-#      ccccc is X digitals case index after 'C'
-#      ddddd is X digitals dialog index after 'D'
-#      timestamp after 'A'
-VOICEBIRD_TAG_PREFIX            = '701CEB19D'
-LEN_OF_VOICEBIRD_TAG_PREFIX     = len(VOICEBIRD_TAG_PREFIX)
-LEN_OF_VOICEBIRD_TAG_UNIT       = 5
-
-RESULT_VALUE_UNKNOWN                = -1
-RESULT_VALUE_FAIL                   = 0
-RESULT_VALUE_SIP_ERROR              = 1
-RESULT_VALUE_PASS                   = 2
-RESULT_VALUE_PASS_BUT_UNCOMPLETED   = 3
-RESULT_VALUE_PASS_BUT_DEFECTIVE_CASE= 4
-RESULT_VALUE_IGNORE                 = 5
-RESULT_VALUE_INTERRUPTED            = 6
-
-RESULT_VALUE_STRINGS = {RESULT_VALUE_UNKNOWN : 'UNKNOW', \
-                        RESULT_VALUE_FAIL : 'FAIL', \
-                        RESULT_VALUE_SIP_ERROR : 'FAIL (SIP ERROR)', \
-                        RESULT_VALUE_PASS : 'pass', \
-                        RESULT_VALUE_PASS_BUT_UNCOMPLETED : 'pass (UNCOMPLETED)', \
-                        RESULT_VALUE_PASS_BUT_DEFECTIVE_CASE : 'pass (DEFECTIVE CASE)', \
-                        RESULT_VALUE_IGNORE : 'ignore', \
-                        RESULT_VALUE_INTERRUPTED : 'interrupted'}
-
-DIR_CONFIG                  = 'config'
-CALL_PARAMETERS_CONFIG_FILE = '%s/parameters.dat' % (DIR_CONFIG)
-FUZZY_PROMPTS_FILE          = '%s/fuzzyprompts.cfg' % (DIR_CONFIG)
-BOOK_DB_FILE                = '%s/book.db' % (DIR_CONFIG)
-
-DIR_TEST_RESULT             = 'log'
-TEST_RESULT_FILE            = '%s/testresult' % (DIR_TEST_RESULT)
-TEST_RESULT_FILE_EXT        = '.txt'
-
-DIR_UNPASSED_CALL_FLOW      = 'log'
-UNPASSED_CALL_FLOW_FILE     = '%s/unpassedcallflow' % (DIR_UNPASSED_CALL_FLOW)
-UNPASSED_CALL_FLOW_FILE_EXT = '.txt'
-
-DIR_LOG                     = 'log'
-LOG_FILE                    = '%s/log' % (DIR_LOG)
-LOG_FILE_EXT                = '.txt'
-
-DIR_CASE                    = 'case'
-DIR_CACHE                   = 'cache'
-
-MAX_PROMPT_STR_LEN          = 80
-
-ANNOTATION_CHAR = '#'
-
-BACK_LINE_STR = '%c%c%c' % (27,'[','A')
-
-# each IVR event will be sent so many times
-IVR_EVENT_DUP_TIMES = 8
-
-TEMPLATE_BYE = """BYE sip:[CALLED]@[DESTINATION]:%d SIP/2.0
-Via: SIP/2.0/UDP [SOURCE];branch=z9hG4bKac1580b40000001e496580db00006f7c00000020;rport
-Max-Forwards: 70
-From: <sip:[FROM_CALLING]@[SOURCE]>;tag=[FROM_TAG]
-To: <sip:[CALLED]@[DESTINATION]>;tag=[TO_TAG]
-Call-ID: [FROM_TAG]@[SOURCE]
-CSeq: 2 BYE
-Content-Length: 0""" % (DEFAULT_SIP_PORT)
-
-IVR_8250_SIGN = 'CW UC'
-
-####################
-# global variables
-####################
-# ...
-
-
-class DialogPacket:
-    """
-    [Class]
-    This is a struct used to transfer packet data from file to ChannelWorker
-    """
-
-    originalPacketIndex = -1
-    dialogIndex = -1
-    received = False    # whether this packet is received from destination
-    timestamp = ''
-    delttime = 0.0
-    sourceIp = ''
-    destinationIp = ''
-    sourcePort = 0
-    destinationPort = 0
-    udpType = UDP_TYPE_UNKNOW
-    sipType = SIP_TYPE_UNKNOW
-    data = ''
-    # Note: the following 3 fields can only get from the function SnoopParser.__readRtp()
-    rtpTimestamp = 0
-    dtmf = -1
-    ivrEventStr = ''
-    isTwin = False
-
-    def __str__(self):
-        tempStr = ''
-        tempStr += ' originalPacketIndex: ' + str(self.originalPacketIndex) + '\n'
-        tempStr += ' dialogIndex: ' + str(self.dialogIndex) + '\n'
-        tempStr += ' received: ' + str(self.received) + '\n'
-        tempStr += ' timestamp: ' + self.timestamp + '\n'
-        tempStr += ' delttime: ' + str(self.delttime) + '\n'
-        tempStr += ' sourceIp: ' + self.sourceIp + '\n'
-        tempStr += ' destinationIp: ' + self.destinationIp + '\n'
-        tempStr += ' sourcePort: ' + str(self.sourcePort) + '\n'
-        tempStr += ' destinationPort: ' + str(self.destinationPort) + '\n'
-        tempStr += ' udpType: ' + str(self.udpType) + '\n'
-        tempStr += ' sipType: ' + str(self.sipType) + '\n'
-        tempStr += ' rtpTimestamp: ' + str(self.rtpTimestamp) + '\n'
-        tempStr += ' dtmf: ' + str(self.dtmf) + '\n'
-        tempStr += ' ivrEventStr: ' + self.ivrEventStr + '\n'
-        tempStr += ' isTwin: ' + str(self.isTwin) + '\n'
-        tempStr += ' data: \n' + self.data
-        return tempStr
-
-
-class DialogNumber:
-    """
-    [Class]
-    This is a struct used to save dialog's numbers
-    """
-
-    calledNumber = ''
-    redirectNumber = ''
-    callingNumber = ''
-
-    def __init__(self, calledNumber, redirectNumber, callingNumber):
-        self.calledNumber = calledNumber
-        self.redirectNumber = redirectNumber
-        self.callingNumber = callingNumber
-
-
-    def __init__(self, calledNumber, callingNumber):
-        self.calledNumber = calledNumber
-        self.callingNumber = callingNumber
-
-
-    def __str__(self):
-        tempStr = ''
-        tempStr += ' Called Number: ' + self.calledNumber + '\n'
-        if len(self.redirectNumber)>0:
-            tempStr += ' Redirect Number: ' + self.redirectNumber + '\n'
-        tempStr += ' Calling Number: ' + self.callingNumber
-        return tempStr
-
-
-class CaseInformation:
-    """
-    [Class]
-    This is a struct used to dump original case information to the .cif file
-    """
-
-    cifVersion = 0
-    snoopFileName = ''
-    snoopFileCreateTime = 0
-    snoopFileSize = 0
-    dialogNumbers = []
-
-    def __str__(self):
-        tempStr = ''
-        tempStr += ' CIF Version: ' + self.cifVersion + '\n'
-        tempStr += ' Snoop File Name: ' + self.snoopFileName + '\n'
-        tempStr += ' Snoop File Create Time: ' + str(self.snoopFileCreateTime) + '\n'
-        tempStr += ' Snoop File Size: ' + str(self.snoopFileSize) + '\n'
-        for i in range(len(dialogNumbers)):
-            tempStr += ' -- Dialog %d --\n' % (i+1)
-            tempStr += str(number)
-        return tempStr
-
-
-class CaseData:
-    """
-    [Class]
-    This is a struct used to save all needed data for a test case
-    """
-
-    snoopFileName = ''  # snoop file name
-    cacheName = ''      # cache name which is CaseInformation and DialogPacketsList dump file name exclude ext name
-                        # Note: it is not a special file name
-    caseConfig = None   # object of CaseConfig
-
-
-def tuple2Hex(t):
-    """
-    [Function]
-    transform the items in tuple to hex format
-
-    [Argument]
-    t: a tuple
-
-    [Return]
-    a tuple whose items are hex format
-    """
-
-    if type(t) != type((0,)):
-        return t
-
-    h = []
-    for x in t:
-        h.append(hex(x))
-    return tuple(h)
-
-
-def getDtmfChar(dtmf):
-    """
-    [Function]
-    transform dtmf value to print-able char
-
-    [Argument]
-    dtmf: dtmf value
-
-    [Return]
-    print-able dtmf char
-    """
-
-    if dtmf in range(0, 9+1):
-        return str(dtmf)
-
-    if dtmf==10:
-        return '*'
-
-    if dtmf==11:
-        return '#'
-
-    if dtmf in range(12, 15+1):
-        return chr(ord('A')+dtmf-12)
-
-    if dtmf==16:
-        return 'Flash'
-
-
-class QueueItem:
-    """
-    [Class]
-    This is a struct used to save the data in the queue
-    """
-
-    itemType = ITEM_TYPE_UNKNOWN
-    itemData = ''
-
-    def __init__(self, type, data=''):
-        self.itemType = type
-        self.itemData = data
-
-
-class QueueItemData4TestResult:
-    """
-    [Class]
-    This is a struct used to save queue item data for test result
-    """
-
-    testResultValue = -1
-    content = ''
-
-    def __init__(self, testResultValue, content):
-        self.testResultValue = testResultValue
-        self.content = content
-
-
-class QueueItemData4Resource:
-    """
-    [Class]
-    This is a struct used to save queue item data for ResourceController
-    """
-
-    channelQueue = None
-    gettingCacheName = ''
-    releasingCacheName = ''
-
-    def __init__(self, channelQueue, gettingCacheName, releasingCacheName):
-        self.channelQueue = channelQueue
-        self.gettingCacheName = gettingCacheName
-        self.releasingCacheName = releasingCacheName
-
-
-class InfoCollector(threading.Thread):
-    """
-    [Class]
-    A thread used to collect information
-    """
-
-    logFlag = True
-
-    def __init__(self, logFileName, logQueue, logFlag):
-        """
-        [Function]
-        new a InfoCollector object
-
-        [Argument]
-        (N/A)
-        """
-
-        threading.Thread.__init__(self, name = 'InfoCollector')
-
-        self.logFileName = logFileName
-        self.logQueue = logQueue
-        self.logFlag = logFlag
-
-        self.firstTimePrintStatistic = True
-
-        self.startTime = time.time()
-        self.totalStartedDialogCount = 0
-        self.totalEndedDialogCount = 0
-        self.resultStatisticDict = {RESULT_VALUE_FAIL : 0, \
-                                    RESULT_VALUE_SIP_ERROR : 0, \
-                                    RESULT_VALUE_PASS : 0, \
-                                    RESULT_VALUE_PASS_BUT_UNCOMPLETED : 0, \
-                                    RESULT_VALUE_PASS_BUT_DEFECTIVE_CASE : 0}
-
-        if self.logFlag:
-            self.__prepareLogFile()
-            self.__prepareTestResultFile()
-            self.__prepareUnpassedCallFlowFile()
-
-
-    def __prepareTestResultFile(self):
-        """
-        [Function]
-        prepare test result file
-
-        [Argument]
-        (N/A)
-
-        [Return]
-        (N/A)
-        """
-
-        tempDir = DIR_TEST_RESULT
-        tempFile = TEST_RESULT_FILE
-        tempExt = TEST_RESULT_FILE_EXT
-
-        if not os.path.exists(tempDir):
-            os.makedirs(tempDir)
-
-        if os.path.exists(tempFile+tempExt):
-            tempModificationTime = time.localtime(os.stat(tempFile+tempExt).st_mtime)
-            shutil.move(tempFile+tempExt, tempFile+'.%d%02d%02d%02d%02d%02d' % (tempModificationTime[:6]))
-
-        self.testResultFileObj = file(tempFile+tempExt, 'w')
-
-
-    def __writeToTestResultFile(self, content):
-        """
-        [Function]
-        write something to test result file
-
-        [Argument]
-        content: the writing content
-
-        [Return]
-        (N/A)
-        """
-
-        if self.logFlag:
-            self.testResultFileObj.write(content)
-            self.testResultFileObj.flush()
-
-
-    def __prepareUnpassedCallFlowFile(self):
-        """
-        [Function]
-        prepare unpassed call flows file
-
-        [Argument]
-        (N/A)
-
-        [Return]
-        (N/A)
-        """
-
-        tempDir = DIR_UNPASSED_CALL_FLOW
-        tempFile = UNPASSED_CALL_FLOW_FILE
-        tempExt = UNPASSED_CALL_FLOW_FILE_EXT
-
-        if not os.path.exists(tempDir):
-            os.makedirs(tempDir)
-
-        if os.path.exists(tempFile+tempExt):
-            tempModificationTime = time.localtime(os.stat(tempFile+tempExt).st_mtime)
-            shutil.move(tempFile+tempExt, tempFile+'.%d%02d%02d%02d%02d%02d' % (tempModificationTime[:6]))
-
-        self.unpassedCallFlowFileObj = file(tempFile+tempExt, 'w')
-
-
-    def __writeToUnpassedCallFlowFile(self, content):
-        """
-        [Function]
-        write something to unpassed callflow file
-
-        [Argument]
-        content: the writing content
-
-        [Return]
-        (N/A)
-        """
-
-        if self.logFlag:
-            self.unpassedCallFlowFileObj.write(content)
-            self.unpassedCallFlowFileObj.flush()
-
-
-    def __prepareLogFile(self):
-        """
-        [Function]
-        prepare log file
-
-        [Argument]
-        (N/A)
-
-        [Return]
-        (N/A)
-        """
-
-        tempDir = DIR_LOG
-        tempFile = self.logFileName
-        tempExt = LOG_FILE_EXT
-
-        if not os.path.exists(tempDir):
-            os.makedirs(tempDir)
-
-        if os.path.exists(tempFile+tempExt):
-            tempModificationTime = time.localtime(os.stat(tempFile+tempExt).st_mtime)
-            shutil.move(tempFile+tempExt, tempFile+'.%d%02d%02d%02d%02d%02d' % (tempModificationTime[:6]))
-
-        self.logFileObj = file(tempFile+tempExt, 'w')
-
-
-    def __writeToLogFile(self, content):
-        """
-        [Function]
-        write something to log file
-
-        [Argument]
-        content: the writing content
-
-        [Return]
-        (N/A)
-        """
-
-        if self.logFlag:
-            self.logFileObj.write(content)
-            self.logFileObj.flush()
-
-
-    def __closeFiles(self):
-        """
-        [Function]
-        close test result and log file
-
-        [Argument]
-        (N/A)
-
-        [Return]
-        (N/A)
-        """
-
-        if self.logFlag:
-            self.testResultFileObj.close()
-            self.unpassedCallFlowFileObj.close()
-            self.logFileObj.close()
-
-
-    def __getStatistic(self):
-        """
-        [Function]
-        get statistic
-
-        [Argument]
-        (N/A)
-
-        [Return]
-        (N/A)
-        """
-
-        tempSeconds = time.time() - self.startTime
-        if self.totalEndedDialogCount>0:
-            tempFailPercentage = '%.2f%%' % (float(self.resultStatisticDict[RESULT_VALUE_FAIL]*100)/self.totalEndedDialogCount)
-            tempFailPercentage = tempFailPercentage.rjust(7)
-            tempSipErrorPercentage = '%.2f%%' % (float(self.resultStatisticDict[RESULT_VALUE_SIP_ERROR]*100)/self.totalEndedDialogCount)
-            tempSipErrorPercentage = tempSipErrorPercentage.rjust(7)
-            tempPassPercentage = '%.2f%%' % (float(self.resultStatisticDict[RESULT_VALUE_PASS]*100)/self.totalEndedDialogCount)
-            tempPassPercentage = tempPassPercentage.rjust(7)
-            tempPassButUncompleted = '%.2f%%' % (float(self.resultStatisticDict[RESULT_VALUE_PASS_BUT_UNCOMPLETED]*100)/self.totalEndedDialogCount)
-            tempPassButUncompleted = tempPassButUncompleted.rjust(7)
-            tempPassButDefectiveCase = '%.2f%%' % (float(self.resultStatisticDict[RESULT_VALUE_PASS_BUT_DEFECTIVE_CASE]*100)/self.totalEndedDialogCount)
-            tempPassButDefectiveCase = tempPassButDefectiveCase.rjust(7)
-        else:
-            tempFailPercentage = '0.00%'.rjust(7)
-            tempSipErrorPercentage = '0.00%'.rjust(7)
-            tempPassPercentage = '0.00%'.rjust(7)
-            tempPassButUncompleted = '0.00%'.rjust(7)
-            tempPassButDefectiveCase = '0.00%'.rjust(7)
-
-
-        tempStr  = """%s
-   Started: %d (calls) / %d (seconds) = %.2f (CPS)
-   Ended:   %d (calls)
- -------------------------------------------------------
-  <result>                     <count>   <percentage>
- -------------------------------------------------------
-   FAIL                  : %10d        %s
-   FAIL (SIP ERROR)      : %10d        %s
-   pass                  : %10d        %s
-   pass (UNCOMPLETED)    : %10d        %s
-   pass (DEFECTIVE CASE) : %10d        %s
-
-""" % ( ' '*50, \
-        self.totalStartedDialogCount, tempSeconds, float(self.totalStartedDialogCount)/tempSeconds, \
-        self.totalEndedDialogCount, \
-        self.resultStatisticDict[RESULT_VALUE_FAIL], tempFailPercentage, \
-        self.resultStatisticDict[RESULT_VALUE_SIP_ERROR], tempSipErrorPercentage, \
-        self.resultStatisticDict[RESULT_VALUE_PASS], tempPassPercentage, \
-        self.resultStatisticDict[RESULT_VALUE_PASS_BUT_UNCOMPLETED], tempPassButUncompleted, \
-        self.resultStatisticDict[RESULT_VALUE_PASS_BUT_DEFECTIVE_CASE], tempPassButDefectiveCase \
-       )
-
-        return tempStr
-
-
-    def __printStatisticInScreen(self, statistic):
-        """
-        [Function]
-        print statistic to screen
-
-        [Argument]
-        statistic: the printing statistic content
-
-        [Return]
-        (N/A)
-        """
-
-        global callParameters
-        if callParameters.isStressTest:
-            tempLineCount = statistic.count('\n')
-            if self.firstTimePrintStatistic:
-                # 2 == line count of 'Wait to start ...'
-                sys.stdout.write(BACK_LINE_STR*2)
-                self.firstTimePrintStatistic = False
-            else:
-                sys.stdout.write(BACK_LINE_STR*tempLineCount)
-            sys.stdout.write((' '*60 + '\n')*tempLineCount)
-            sys.stdout.write(BACK_LINE_STR*tempLineCount)
-            sys.stdout.write(statistic)
-
-
-    def run(self):
-        """
-        [Function]
-        run InfoCollector
-
-        [Argument]
-        (N/A)
-
-        [Return]
-        (N/A)
-        """
-
-        while True:
-            tempItem = self.logQueue.get()
-            if tempItem.itemType==ITEM_TYPE_SIGN_TO_KILL_THREAD:
-                if self.totalEndedDialogCount>0:
-                    self.__writeToTestResultFile(self.__getStatistic())
-                self.__closeFiles()
-                return
-            #else:
-
-            if tempItem.itemType==ITEM_TYPE_WRITE_LOG:
-                self.__writeToLogFile(tempItem.itemData+'\n')
-            elif tempItem.itemType==ITEM_TYPE_START_A_DIALOG:
-                self.totalStartedDialogCount += 1
-                self.__printStatisticInScreen(self.__getStatistic())
-            elif tempItem.itemType==ITEM_TYPE_WRITE_TEST_RESULT:
-                self.totalEndedDialogCount += 1
-                self.resultStatisticDict[tempItem.itemData.testResultValue] += 1
-                self.__writeToTestResultFile(tempItem.itemData.content+'\n')
-                self.__printStatisticInScreen(self.__getStatistic())
-            elif tempItem.itemType==ITEM_TYPE_WRITE_UNPASSED_CALL_FLOW:
-                self.__writeToUnpassedCallFlowFile(tempItem.itemData+'\n')
-
-
-LOG_QUEUE = Queue.Queue()
-class Log:
-    """
-    [Class]
-    A well use client class for InfoCollector
-    """
-
-    onlyLog = False
-    logFlag = True
-
-    def __prepareLogFile(self):
-        """
-        [Function]
-        prepare log file
-
-        [Argument]
-        (N/A)
-
-        [Return]
-        (N/A)
-        """
-
-        if not self.logFlag: return
-
-        tempDir = DIR_LOG
-        tempFile = self.logFileName
-        tempExt = LOG_FILE_EXT
-
-        if not os.path.exists(tempDir):
-            os.makedirs(tempDir)
-
-        if os.path.exists(tempFile+tempExt):
-            tempModificationTime = time.localtime(os.stat(tempFile+tempExt).st_mtime)
-            shutil.move(tempFile+tempExt, tempFile+'.%d%02d%02d%02d%02d%02d' % (tempModificationTime[0:6]))
-
-        self.logFileObj = file(tempFile+tempExt, 'w')
-
-
-    def __writeToLogFile(self, content):
-        """
-        [Function]
-        write something to log file
-
-        [Argument]
-        content: the writing content
-
-        [Return]
-        (N/A)
-        """
-
-        if self.logFlag:
-            self.logFileObj.write(content)
-            self.logFileObj.flush()
-
-
-    def __closeLogFile(self):
-        if self.logFlag:
-            self.logFileObj.close()
-
-
-    def __init__(self, logFileName, onlyLog):
-        # PARAMETER -nd: No Debug, means not to write debug log to file
-        if '-nd' in sys.argv:
-            self.logFlag = False
-
-        self.logFileName = logFileName
-        self.onlyLog = onlyLog
-
-        if onlyLog:
-            self.__prepareLogFile()
-        else:
-            global LOG_QUEUE
-            global LOG_PRINTER
-            LOG_PRINTER = InfoCollector(logFileName, LOG_QUEUE, self.logFlag)
-            LOG_PRINTER.setDaemon(True)
-            LOG_PRINTER.start()
-
-
-    def __del__(self):
-        if self.onlyLog:
-            self.__closeLogFile()
-
-
-    def startADialog(self):
-        """
-        [Function]
-        tell that a dialog is starting
-
-        [Argument]
-        (N/A)
-
-        [Return]
-        (N/A)
-        """
-        if self.onlyLog: return
-
-        global LOG_QUEUE
-        LOG_QUEUE.put(QueueItem(ITEM_TYPE_START_A_DIALOG))
-
-
-    def writeTestResult(self, resultValue, content):
-        """
-        [Function]
-        write test result
-
-        [Argument]
-        resultValue: result value
-        content: log content
-
-        [Return]
-        (N/A)
-        """
-        if self.onlyLog: return
-
-        global LOG_QUEUE
-        tempData = QueueItemData4TestResult(resultValue, content)
-        LOG_QUEUE.put(QueueItem(ITEM_TYPE_WRITE_TEST_RESULT, tempData))
-
-
-    def writeUnpassedCallFlow(self, content):
-        """
-        [Function]
-        write unpassed call flow
-
-        [Argument]
-        content: log content
-
-        [Return]
-        (N/A)
-        """
-        if self.onlyLog: return
-
-        global LOG_QUEUE
-        LOG_QUEUE.put(QueueItem(ITEM_TYPE_WRITE_UNPASSED_CALL_FLOW, content))
-
-
-    def writeLog(self, content):
-        """
-        [Function]
-        write log
-
-        [Argument]
-        content: log content
-
-        [Return]
-        (N/A)
-        """
-        if self.onlyLog:
-            self.__writeToLogFile(content+'\n')
-        else:
-            global LOG_QUEUE
-            LOG_QUEUE.put(QueueItem(ITEM_TYPE_WRITE_LOG, str(content)))
-
-
-    def a(self, content):
-        """
-        [Functon]
-        write assert log
-        Note: assert information will be printed in the screen
-
-        [Argument]
-        content: log content
-
-        [Return]
-        (N/A)
-        """
-        self.writeLog('ASSERT: '+str(content))
-        print str(content)
-
-
-    def e(self, content):
-        """
-        [Function]
-        write error log
-
-        [Argument]
-        content: log content
-
-        [Return]
-        (N/A)
-        """
-        self.writeLog('ERROR: '+str(content))
-
-
-    def i(self, content):
-        """
-        [Function]
-        write info(rmation) log
-
-        [Argument]
-        content: log content
-
-        [Return]
-        (N/A)
-        """
-        self.writeLog('INFO: '+str(content))
-
-
-    def w(self, content):
-        """
-        [Function]
-        write warn(ing) log
-
-        [Argument]
-        content: log content
-
-        [Return]
-        (N/A)
-        """
-        self.writeLog('WARN: '+str(content))
-
-
-def createLogObj(logFileName=LOG_FILE, onlyLog=False):
-    global LOG
-    LOG = Log(logFileName, onlyLog)
-
-
-def deleteLogObj():
-    global LOG_QUEUE
-    LOG_QUEUE.put(QueueItem(ITEM_TYPE_SIGN_TO_KILL_THREAD))
-
-
-def setGlobalLogObj(theGlobalLogObj):
-    global LOG
-    LOG = theGlobalLogObj
-
-
-class ResourceItem:
-    """
-    [Class]
-    A struct to save resource information
-    """
-    dialogPacketsList = None
-    timeToLoad = -1
-    linkCounter = 0
-
-    def __init__(self, dpl):
-        self.dialogPacketsList = dpl
-        self.timeToLoad = time.time()
-        self.linkCounter = 1
-
-
-    def addLink(self):
-        self.linkCounter += 1
-
-
-    def deleteLink(self):
-        self.linkCounter -= 1
-        return self.linkCounter
-
-
-    def getDpl(self):
-        return self.dialogPacketsList
-
-
-    def getLinkCount(self):
-        return self.linkCounter
-
-
-class ResourceController(threading.Thread):
-    """
-    [Class]
-    A thread used to manage the resource, specially for DialogPacketsList
-    """
-
-    resourceDict = {}   # key: caseName, value: ResourceItem
-
-    def __init__(self, resourceQueue):
-        threading.Thread.__init__(self, name = 'ResourceController')
-        self.resourceQueue = resourceQueue
-
-
-    def run(self):
-        """
-        [Function]
-        run ResourceController
-
-        [Argument]
-        (N/A)
-
-        [Return]
-        (N/A)
-        """
-
-        while True:
-            tempItem = self.resourceQueue.get()
-            if tempItem.itemType==ITEM_TYPE_SIGN_TO_KILL_THREAD:
-                return
-            #else:
-
-            if tempItem.itemType==ITEM_TYPE_GET_A_CASE_REQ:
-                tempQueueItem = tempItem.itemData
-                tempChannelQueue = tempQueueItem.channelQueue
-                tempGettingCacheName = tempQueueItem.gettingCacheName
-                tempReleasingCacheName = tempQueueItem.releasingCacheName
-
-                try:
-                    tempGettingResourceItem = self.resourceDict[tempGettingCacheName]
-                    tempGettingResourceItem.addLink()
-                    tempDpl = tempGettingResourceItem.getDpl()
-                except KeyError:
-                    tempDpl = loadDialogPacketsListFromCache(tempGettingCacheName)
-                    tempGettingResourceItem = ResourceItem(tempDpl)
-                    self.resourceDict[tempGettingCacheName] = tempGettingResourceItem
-
-                if tempReleasingCacheName!='':
-                    try:
-                        tempReleasingResourceItem = self.resourceDict[tempReleasingCacheName]
-                        if tempReleasingResourceItem.deleteLink()<=0:
-                            self.resourceDict.pop(tempReleasingCacheName)
-                            LOG.i("'%s' is removed from resourceDict" % (tempReleasingCacheName))
-                    except KeyError:
-                        LOG.w("Cannot find this cacheName '%s' in resourceDict to release" % (tempReleasingCacheName))
-
-                tempChannelQueue.put(QueueItem(ITEM_TYPE_GET_A_CASE_ACK, tempDpl))
-
-
-class IvrEventItem:
-    """
-    [Class]
-    A struct used to save IVR event information
-    """
-
-    udpType = UDP_TYPE_UNKNOW
-    ivrEventStr = ''
-
-    def __init__(self, udpType, ivrEventStr='(any)'):
-        self.udpType = udpType
-        self.ivrEventStr = ivrEventStr
-
-    def __str__(self):
-        tempStr = ''
-        tempStr += ' udpType: ' + str(self.udpType)
-        tempStr += ' ivrEventStr: ' + self.ivrEventStr
-
-        return tempStr
-
-
-class ChannelWorker(threading.Thread):
-    """
-    [Class]
-    A thread used to:
-    1. manage SIP state machine
-    2. send/receive RTP packet
-    3. judge the case's result
-    """
-
-    # channel data
-    channelIndex = -1           # Each ChannelWorker thread use an own unique channel index
-    caseIndex = -1              # currently which case is in use, the caseIndex is the index in Distributor's caseList
-    dialogIndex = 0             # currently which dialog in this case is calling
-    sipState = SIP_STATE_IDLE
-    called = ''
-    calling = ''
-    redirect = ''
-    reason = ''
-    fromTag = ''
-    toTag = ''
-    callId = ''
-    sessionDestinationPort = 0
-    baseTimeForRtp = 0.0
-    telephoneEventPt = None
-    ack = ''
-    rtpTransport = 0
-
-    hasStarted = False
-    dialogPacketsList = None
-    packetIndex = 0             # packet index in the dialog
-    passed = True
-
-    cachedCallFlow = ''
-    cachedRtpTimestamp = -1
-    cachedIvrEventStr = ''
-    ignoredIvrEventCount = 0
-
-    expectedMatchingPromptsList = []
-    matchingIndex = 0
-
-    nextInviteInSameCase = False
-
-    is8250 = False
-
-
-    def __init__(self, channelIndex, caseList, sipTransport, channelQueue, resourceQueue):
-        """
-        [Function]
-        new a ChannelWorker object
-
-        [Argument]
-        sipTransport: SIP transport used to send SIP message
-        channelQueue: Distributor use this queue to transfer data to ChannelWorker
-        caseList: case data list
-        """
-
-        threading.Thread.__init__(self, name = 'ChannelWorker')
-
-        self.cachedRtpTimestampFor2833 = 0
-
-        self.channelIndex = channelIndex
-        self.caseList = caseList
-        self.sipTransport = sipTransport
-        self.channelQueue = channelQueue
-        self.resourceQueue = resourceQueue
-
-        # dispersion to use the numbers
-        if callParameters.calledCount>callParameters.channelCount:
-            self.minCalledIndex = int(channelIndex * callParameters.calledCount / callParameters.channelCount)
-            self.maxCalledIndex = int((channelIndex+1) * callParameters.calledCount / callParameters.channelCount) - 1
-        else:
-            self.maxCalledIndex = self.minCalledIndex = channelIndex%callParameters.calledCount
-        #LOG.writeLog('eeee channel: %d, minCalledIndex: %d, maxCalledIndex: %d' % (self.channelIndex, self.minCalledIndex, self.maxCalledIndex))
-        if callParameters.redirectCount>callParameters.channelCount:
-            self.minRedirectIndex = int(channelIndex * callParameters.redirectCount / callParameters.channelCount)
-            self.maxRedirectIndex = int((channelIndex+1) * callParameters.redirectCount / callParameters.channelCount) - 1
-        else:
-            if callParameters.redirectCount<=0:
-                self.maxRedirectIndex = self.minRedirectIndex = 0
-            else:
-                self.maxRedirectIndex = self.minRedirectIndex = channelIndex%callParameters.redirectCount
-
-        self.calledIndex = self.minCalledIndex
-        self.redirectedIndex = self.minRedirectIndex
-
-        # PARAMETER -nf: No call Flow, means not to draw the call flow to the screen
-        self.willDrawCallFlow = (not callParameters.isStressTest) and ('-nf' not in sys.argv)
-
-        self.timeLeftToStartWork = self.channelIndex * ONE_UNIT_TIME_WAIT_TO_WORK
-
-        # create local RTP transport
-        self.rtpTransport = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self.rtpTransport.bind(('', 0))
-        self.rtpTransport.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        #print 'self.rtpTransport.getsockname():', self.rtpTransport.getsockname()
-
-        # PARAMETER -8250: the destination is 8250
-        if '-8250' in sys.argv:
-            self.is8250 = True
-
-
-    def getLocalRtpTransport(self):
-        """
-        [Function]
-        return RTP transport
-
-        [Argument]
-        (N/A)
-
-        [Return]
-        the socket connect of the RTP transport
-        """
-        return self.rtpTransport
-
-
-    def __getResultStr(self, udpType, ivrEventStr):
-        """
-        [Function]
-        get the expected or testing test result string
-
-        [Argument]
-        udpType: UDP type
-        ivrEventStr: IVR event string
-
-        [Return]
-        the print-able test result
-        """
-        return '(%s) %s' % (SHORT_NAME_OF_IVR_EVENT[udpType], ivrEventStr)
-
-
-    def __gotoNextIvrEvent(self):
-        """
-        [Function]
-        move the pointer to the next IVR event in dialogPacketsList
-
-        [Argument]
-        (N/A)
-
-        [Result]
-        return True when getting the next IVR event, otherwise return False
-        """
-
-        while True:
-            if self.packetIndex>=len(self.dialogPacketsList[self.dialogIndex]):
-                return False
-
-            tempPacket = self.dialogPacketsList[self.dialogIndex][self.packetIndex]
-
-            if tempPacket.received:
-                return True
-            else:
-                self.packetIndex += 1
-
-
-    def __matchTwoPrompts(self, prompt1, prompt2):
-        """
-        [Function]
-        match two prompts according to the fuzzy prompts dict
-
-        [Parameter]
-        two prompt names with length 7 (i.e. e1ja348) or 5 (i.e. ja348)
-
-        [Return]
-        if matched return True, otherwise return False
-        """
-
-        if prompt1==prompt2:
-            return True
-
-        try:
-            tempPromptsPair = fuzzyPromptsDict[prompt1]
-        except KeyError:
-            return False
-        else:
-            try:
-                tempPromptsPair.index(prompt2)
-            except ValueError:
-                return False
-            else:
-                return True
-
-
-    def __fuzzyMatchPrompts(self, eventStrInPacket, eventStrReceived):
-        """
-        [Function]
-        match promts in fuzzy
-
-        [Parameter]
-        eventStrInPacket: event string in packet
-        eventStrReceived: event string received
-
-        [Return]
-        matched return True, otherwise return False
-        """
-
-        tempPromptNameInPacket = eventStrInPacket[eventStrInPacket.replace('\\', '/').rfind('/')+1:].lower()
-        tempPromptNameInPacketWithoutLanguage = tempPromptNameInPacket[2:]
-
-        tempPromptNameReceived = eventStrReceived[eventStrReceived.replace('\\', '/').rfind('/')+1:].lower()
-        tempPromptNameReceivedWithoutLanguage = tempPromptNameReceived[2:]
-
-        if self.__matchTwoPrompts(tempPromptNameInPacket, tempPromptNameReceived):
-            return True
-        else:
-            return self.__matchTwoPrompts(tempPromptNameInPacketWithoutLanguage, tempPromptNameReceivedWithoutLanguage)
-
-
-    def __smartJudge(self, receivedPayloadType, receivedExtendedData, expectedUdpType, expectedEventStr):
-        """
-        [Function]
-        compare the packets in dialogPacketsList and received from IVR to judge whether this test step is passed
-
-        [Argument]
-        receivedPayloadType: received RTP's payload type
-        receivedExtendedData: received RTP's extended data
-        expectedUdpType: expected UDP type
-        expectedEventStr: expected IVR event string
-
-        [Return]
-        return a tuple which has 3 items:
-        1st item: whehter the judge result is passed
-        2nd item: the expected result information
-        3rd item: the testing result information
-        4th item: expected prompt content
-        5th item: testing result prompt content
-        """
-
-        tempExpectedResult = self.__getResultStr(expectedUdpType, expectedEventStr)
-
-        tempExpectedPromptStr = ''
-        tempUdpType,tempPromptId = washIvrPromptStr(expectedEventStr, expectedUdpType)
-        tempPromptContent = getPromptContentById(tempPromptId)
-        if tempUdpType==UDP_TYPE_RTP_IVR_SPEAK_PROMPT:
-            if tempPromptId!='sil':     # forget silent indication
-                tempExpectedPromptStr = '%s: %s' % (tempPromptId, tempPromptContent)
-        else:
-            tempExpectedResult = self.__getResultStr(tempUdpType, expectedEventStr)
-
-        if receivedPayloadType==PAYLOAD_TYPE_IVR_RECORD_FILE:
-            # only judge type when it is a Record File
-            tempTestingResult = self.__getResultStr(UDP_TYPE_RTP_IVR_RECORD_FILE, receivedExtendedData)
-            if expectedUdpType == UDP_TYPE_RTP_IVR_RECORD_FILE:
-                return (True, tempExpectedResult, tempTestingResult, tempExpectedPromptStr, '')
-            else:
-                return (False, tempExpectedResult, tempTestingResult, tempExpectedPromptStr, '')
-        elif receivedPayloadType==PAYLOAD_TYPE_IVR_PROMPT:
-            if receivedExtendedData[0] == PROMPT_TYPE_SYSTEM:
-                # only judge type when it is a System Prompt
-                tempTestingResult = self.__getResultStr(UDP_TYPE_RTP_IVR_SYSTEM, receivedExtendedData[1])
-                if expectedUdpType == UDP_TYPE_RTP_IVR_SYSTEM:
-                    return (True, tempExpectedResult, tempTestingResult, tempExpectedPromptStr, '')
-                else:
-                    return (False, tempExpectedResult, tempTestingResult, tempExpectedPromptStr, '')
-            elif receivedExtendedData[0] == PROMPT_TYPE_RECORD_TONE:
-                # record tone need exactly judge
-                tempTestingResult = self.__getResultStr(UDP_TYPE_RTP_IVR_RECORD_TONE, receivedExtendedData[1])
-                if expectedUdpType == UDP_TYPE_RTP_IVR_RECORD_TONE:
-                    return (True, tempExpectedResult, tempTestingResult, tempExpectedPromptStr, '')
-                else:
-                    return (False, tempExpectedResult, tempTestingResult, tempExpectedPromptStr, '')
-            elif receivedExtendedData[0] == PROMPT_TYPE_SPEAK:
-                # speak prompt will do fuzzy match when exactly judge failed
-                tempTestingResult = self.__getResultStr(UDP_TYPE_RTP_IVR_SPEAK_PROMPT, receivedExtendedData[1])
-
-                tempResultPromptStr = ''
-                tempUdpType,tempPromptId = washIvrPromptStr(receivedExtendedData[1])
-                tempPromptContent = getPromptContentById(tempPromptId)
-                if tempUdpType==UDP_TYPE_RTP_IVR_SPEAK_PROMPT:
-                    if tempPromptId!='sil':     # forget silent indication
-                        tempResultPromptStr = '%s: %s' % (tempPromptId, tempPromptContent)
-                else:
-                    tempTestingResult = self.__getResultStr(tempUdpType, receivedExtendedData[1])
-
-                if expectedUdpType == UDP_TYPE_RTP_IVR_SPEAK_PROMPT \
-                        and (expectedEventStr==receivedExtendedData[1] \
-                            or self.__fuzzyMatchPrompts(expectedEventStr, receivedExtendedData[1])):
-                    return (True, tempExpectedResult, tempTestingResult, tempExpectedPromptStr, tempResultPromptStr)
-                else:
-                    return (False, tempExpectedResult, tempTestingResult, tempExpectedPromptStr, tempResultPromptStr)
-            else:
-                LOG.a('Unsupport prompt type %d' % (receivedExtendedData[0]))
-                raise
-        else:
-            LOG.a('Unsupport payload type %d' % receivedPayloadType)
-            raise
-
-
-    def __processForNoPacketLeft(self, receivedPayloadType, receivedExtendedData):
-        """
-        [Function]
-        specially process when no packet left for this dialog in dialogPacketsList
-
-        [Argument]
-        receivedPayloadType: received RTP's payload type
-        receivedExtendedData: received RTP's extended data
-
-        [Return]
-        (N/A)
-        """
-
-        #print 'self.dialogIndex:', self.dialogIndex, ', self.packetIndex:', self.packetIndex
-
-        if receivedPayloadType==PAYLOAD_TYPE_IVR_RECORD_FILE:
-            self.__drawIvrEvent(RESULT_VALUE_FAIL, '(N/A)', '(f) '+receivedExtendedData)
-        elif receivedPayloadType==PAYLOAD_TYPE_IVR_PROMPT:
-            if receivedExtendedData[0] == PROMPT_TYPE_SYSTEM:
-                self.__drawIvrEvent(RESULT_VALUE_FAIL, '(N/A)', '(s) '+receivedExtendedData[1])
-            elif receivedExtendedData[0] == PROMPT_TYPE_RECORD_TONE:
-                self.__drawIvrEvent(RESULT_VALUE_FAIL, '(N/A)', '(r) '+receivedExtendedData[1])
-            elif receivedExtendedData[0] == PROMPT_TYPE_SPEAK:
-                tempUdpType,tempPromptId = washIvrPromptStr(receivedExtendedData[1])
-                if tempUdpType==UDP_TYPE_RTP_IVR_SPEAK_PROMPT:
-                    if tempPromptId!='sil':     # forget silent indication
-                        self.__drawIvrEvent(RESULT_VALUE_FAIL, '(N/A)', '(p) '+receivedExtendedData[1], '', '%s: %s' % (tempPromptId,getPromptContentById(tempPromptId)))
-                        return
-
-                self.__drawIvrEvent(RESULT_VALUE_FAIL, '(N/A)', '(p) '+receivedExtendedData[1])
-            else:
-                LOG.a('Unknown prompt type %d' % (receivedExtendedData[0]))
-                raise
-        else:
-            LOG.a('Unsupport payload type %d' % (receivedPayloadType))
-            raise
-
-
-    def __hasCompleted(self):
-        """
-        [Function]
-        scan the dialogPacketsList to check wheter current dialog is completed
-
-        [Argument]
-        (N/A)
-
-        [Return]
-        return True if current dialog is completed, otherwise return False
-        """
-
-        i = self.packetIndex+1  # Only need to check the packets behind current packet
-        while True:
-            if i>=len(self.dialogPacketsList[self.dialogIndex]):
-                # All packets in this dialog have been done
-                return True
-            packet = self.dialogPacketsList[self.dialogIndex][i]
-            if packet.dialogIndex!=self.dialogIndex:
-                # All packets in this dialog have been done
-                return True
-            elif packet.dialogIndex==self.dialogIndex and packet.received==True:
-                # Still exists message from destination
-                return False
-            else:
-                i += 1
-
-
-    def __drawCallFlowHeader(self, caseInfo, callerCalled):
-        """
-        [Function]
-        draw call flow's header information
-
-        [Argument]
-        caseInfo: the case's information
-        callerCalled: the caller and called
-
-        [Return]
-        (N/A)
-        """
-
-        tempStr = '\n[%s]\n' % (caseInfo)
-        tempStr += ' '*int(PRINT_PANDING_LEFT/2) + callerCalled
-
-        #tempStr += '\n' + str(time.localtime(time.time()))
-
-        if self.willDrawCallFlow:
-            print tempStr
-
-        self.cachedCallFlow = tempStr + '\n'
-
-
-    def __drawCallFlow(self, direction, description):
-        """
-        [Function]
-        draw call flow
-
-        [Argument]
-        direction: LEFT_TO_RIGHT or RIGHT_TO_LEFT
-        description: description about the piece of call flow
-
-        [Return]
-        (N/A)
-        """
-
-        tempStr = ' '*PRINT_PANDING_LEFT + '|' + description.center(PRINT_CENTER_WIDTH) + '|' + '\n'
-        if direction==LEFT_TO_RIGHT:
-            tempStr += ' '*PRINT_PANDING_LEFT + '|' + '-'*(PRINT_CENTER_WIDTH-1) + '>|'
-        else:
-            tempStr += ' '*PRINT_PANDING_LEFT + '|<' + '-'*(PRINT_CENTER_WIDTH-1) + '|'
-
-        #tempStr += '\n' + str(time.localtime(time.time()))
-
-        if self.willDrawCallFlow:
-            print tempStr
-
-        self.cachedCallFlow += tempStr + '\n'
-
-
-    def __drawIvrEvent(self, resultValue, expect, result, expectPrompt='', resultPrompt=''):
-        """
-        [Function]
-        draw special private event from IVR
-
-        [Argument]
-        resultValue: information to indicate pass, fail or something else
-        expect: the expected result description
-        result: the testing result description
-
-        [Return]
-        (N/A)
-        """
-
-        if expect and result:
-            tempStr = ' '*PRINT_PANDING_LEFT + '|' + (' '*PRINT_IVR_EVENT_PANDING + RESULT_VALUE_STRINGS[resultValue]).ljust(PRINT_CENTER_WIDTH) + '|' + '\n'
-
-            tempExpectPromptStr = expectPrompt
-            if len(tempExpectPromptStr)>0:
-                if len(tempExpectPromptStr)>MAX_PROMPT_STR_LEN:
-                    tempExpectPromptStr = tempExpectPromptStr[:MAX_PROMPT_STR_LEN] + '[...]'
-
-            tempResultPromptStr = resultPrompt
-            if len(tempResultPromptStr)>0:
-                if len(tempResultPromptStr)>MAX_PROMPT_STR_LEN:
-                    tempResultPromptStr = tempResultPromptStr[:MAX_PROMPT_STR_LEN] + '[...]'
-
-            tempStr += ' '*PRINT_PANDING_LEFT + '|' + (' '*(PRINT_IVR_EVENT_PANDING+4) + 'Expect: ' + expect).ljust(PRINT_CENTER_WIDTH) + '|  ' + tempExpectPromptStr + '\n'
-            tempStr += ' '*PRINT_PANDING_LEFT + '|' + (' '*(PRINT_IVR_EVENT_PANDING+4) + 'Result: ' + result).ljust(PRINT_CENTER_WIDTH) + '|  ' + tempResultPromptStr + '\n'
-            tempStr += ' '*PRINT_PANDING_LEFT + '|<' + '-'*(PRINT_CENTER_WIDTH-1) + '|'
-
-            if self.willDrawCallFlow:
-                print tempStr
-
-            self.cachedCallFlow += tempStr + '\n'
-
-
-    def __drawCallFlowSummary(self, resultValue=None):
-        """
-        [Function]
-        draw call flow's summary
-
-        [Argument]
-        resultValue: information to indicate pass, fail or something else
-
-        [Return]
-        (N/A)
-        """
-
-        # 1. Get the last test result
-        if resultValue:
-            tempResultValue = resultValue
-        else:
-            tempResultValue = RESULT_VALUE_UNKNOWN
-            if self.passed:
-                if self.__hasCompleted():
-                    tempResultValue = RESULT_VALUE_PASS
-                else:
-                    tempResultValue = RESULT_VALUE_PASS_BUT_UNCOMPLETED
-            else:
-                tempResultValue = RESULT_VALUE_FAIL
-
-        snoopFileName = self.caseList[self.caseIndex].snoopFileName
-        caseIndex = self.caseIndex
-        dialogIndex = self.dialogIndex
-
-        # 2. Draw call flow to the screen
-        tempStr = 'RESULT: ' + RESULT_VALUE_STRINGS[tempResultValue] + '\n'
-        if self.willDrawCallFlow:
-            print tempStr
-
-        self.cachedCallFlow += tempStr + '\n'
-
-        # don't save interrupted callflow to file
-        if tempResultValue==RESULT_VALUE_INTERRUPTED:
-            return
-        #else:
-
-        # 3. Write test result
-        tempStamp = str(self.channelIndex)
-        now = time.localtime(time.time())
-        tempStamp += '.%d%02d%02d%02d%02d%02d' % (now[0:6])
-        tempLogStr = '[%s] Case %d: %s, Dialog: %d. SUMMARY: %s' % \
-                    (tempStamp, caseIndex+1, snoopFileName, dialogIndex+1, RESULT_VALUE_STRINGS[tempResultValue])
-        LOG.writeTestResult(tempResultValue, tempLogStr)
-
-        # 4. Write unpassed call flow to unpassedcallflow.txt
-        if tempResultValue!=RESULT_VALUE_PASS:
-            LOG.writeUnpassedCallFlow('##### %s #####%s' % (tempStamp, self.cachedCallFlow))
-
-
-    def __receiveRtp(self, queueData):
-        """
-        [Function]
-        used to receive RTP message
-
-        [Argument]
-        queueData: the data received
-
-        [Return]
-        return True means NOT to continue dealing with packets in the list, otherwise return False
-        """
-
-        # Note: Distributor has filter the payload type
-        tempPayloadType,tempRtpTimestamp,tempExtendedData = parseRtp(queueData, self.telephoneEventPt)
-        tempIvrEventStr = ''
-        if tempPayloadType==PAYLOAD_TYPE_IVR_RECORD_FILE:
-            tempExtendedDataItems = [tempExtendedData,]
-            tempIvrEventStr = tempExtendedData
-        elif tempPayloadType==PAYLOAD_TYPE_IVR_PROMPT:
-            tempExtendedDataItems = tempExtendedData
-            tempIvrEventStr = str(tempExtendedData)
-        else:
-            LOG.a('Unsupport payload type ' + str(tempPayloadType))
-            raise
-
-        if self.__isDuplicatedIvrEvent(tempRtpTimestamp, tempIvrEventStr):
-            return True
-
-        for item in tempExtendedDataItems:
-            tempGotNextIvrEvent = self.__gotoNextIvrEvent()
-            # Note: don't deal with BYE, for it is the last message from IVR
-            # tempGotNextIvrRtpEvent means whether got a IVR RTP event, but tempGotNextIvrEvent includes RTP and SIP
-            tempGotNextIvrRtpEvent = tempGotNextIvrEvent
-            if tempGotNextIvrEvent:
-                tempPacket = self.dialogPacketsList[self.dialogIndex][self.packetIndex]
-                if tempPacket.udpType==UDP_TYPE_SIP and tempPacket.sipType==SIP_TYPE_BYE:
-                    self.packetIndex -= 1
-                    tempGotNextIvrRtpEvent = False
-
-            if tempGotNextIvrRtpEvent:
-                tempPassed,tempExpect,tempResult,tempExpectPrompt,tempResultPrompt = \
-                        self.__smartJudge(tempPayloadType, item, tempPacket.udpType, tempPacket.ivrEventStr)
-
-                if tempPassed:
-                    self.passed &= True
-                    self.__drawIvrEvent(RESULT_VALUE_PASS, tempExpect, tempResult, tempExpectPrompt, tempResultPrompt)
-                    self.packetIndex += 1
-                else:
-                    self.passed &= False
-                    self.__drawIvrEvent(RESULT_VALUE_FAIL, tempExpect, tempResult, tempExpectPrompt, tempResultPrompt)
-                    self.packetIndex += 1
-            else:
-                self.__processForNoPacketLeft(tempPayloadType, item)
-                self.passed = False
-
-        return False
-
-
-    def __isDuplicatedIvrEvent(self, receivedRtpTimestamp, receivedIvrEventStr):
-        """
-        [Function]
-        check whether this IVR event is duplicated
-
-        [Argument]
-        receivedRtpTimestamp: received RTP's timestamp
-        receivedIvrEventStr: received IVR Event's content
-
-        [Return]
-        return True if duplicated, otherwise return False
-        """
-
-        if receivedRtpTimestamp!=0:
-            # 1. only need checking duplication when autotest=2
-            # 2.1. the ivr event == the cached
-            # 2.2. the timestamp <= the cached
-            # 2.3. don't ignore the event whose timestamp is the same as the previous one
-            if receivedIvrEventStr==self.cachedIvrEventStr \
-                    and receivedRtpTimestamp<=self.cachedRtpTimestamp \
-                        and self.ignoredIvrEventCount<IVR_EVENT_DUP_TIMES:
-                self.ignoredIvrEventCount += 1
-                return True
-            else:
-                self.cachedRtpTimestamp = receivedRtpTimestamp
-                self.cachedIvrEventStr = receivedIvrEventStr
-                self.ignoredIvrEventCount = 0
-                return False
-        else:
-            return False
-
-
-    def run(self):
-        """
-        [Function]
-        run ChannelWorker
-
-        [Argument]
-        (N/A)
-
-        [Return]
-        (N/A)
-        """
-
-        while True:
-            # 1. Get message from Distributor
-
-            try:
-                tempItem = self.channelQueue.get_nowait()
-                #print 'itemType:', tempItem.itemType
-            except KeyboardInterrupt:
-                raise KeyboardInterrupt
-            except:
-                # Sleep then go on to deal with dialogPacketsList
-                time.sleep(TIME_ONE_TICK)
-            else:
-                # Deal with message from Distributor, after that go on to deal with dialogPacketsList
-                if tempItem.itemType==ITEM_TYPE_SIGN_TO_KILL_THREAD:
-                    # send BYE then exit the thread
-                    if self.sipState!=SIP_STATE_IDLE:
-                        self.__sayGoodBye()
-                    self.sipState = SIP_STATE_BYED
-                    return
-                elif tempItem.itemType==ITEM_TYPE_START_WORK:
-                    # postpone starting work
-                    if not self.hasStarted:
-                        if self.timeLeftToStartWork>0:
-                            self.timeLeftToStartWork -= ONE_UNIT_TIME_WAIT_TO_WORK
-                            time.sleep(ONE_UNIT_TIME_WAIT_TO_WORK)
-                            self.channelQueue.put(QueueItem(ITEM_TYPE_START_WORK))
-                        else:
-                            self.hasStarted = True
-                            self.__startDialog()
-                    else:
-                        LOG.e('The channel worker has started work, do not ask start twice')
-                    continue
-                elif tempItem.itemType==ITEM_TYPE_GET_A_CASE_ACK:
-                    self.dialogPacketsList = tempItem.itemData
-                    self.__sendInvite()
-                    continue
-                elif tempItem.itemType==ITEM_TYPE_SIP_DATA:
-                    if self.__receiveSip(tempItem.itemData):
-                        time.sleep(TIME_ONE_TICK)
-                        continue
-                elif tempItem.itemType==ITEM_TYPE_RTP_DATA:
-                    if self.__receiveRtp(tempItem.itemData):
-                        time.sleep(TIME_ONE_TICK)
-                        continue
-
-            # 2. Process dialogPacketList
-
-            # ChannelWorker doesn't work yet
-            if not self.dialogPacketsList:
-                time.sleep(TIME_ONE_WINK)
-                continue
-
-            # go through dialogPacketList only in this state
-            if self.sipState!=SIP_STATE_AFTER_ACK:
-                time.sleep(TIME_ONE_WINK)
-                continue
-
-            # No packet left in dialogPacketsList
-            if self.packetIndex >= len(self.dialogPacketsList[self.dialogIndex]):
-                time.sleep(TIME_ONE_WINK)
-                continue
-
-            packet = self.dialogPacketsList[self.dialogIndex][self.packetIndex]
-            if packet.dialogIndex<self.dialogIndex:
-                # Locate to the position of current dialog
-                self.packetIndex += 1
-                continue
-            if packet.dialogIndex>self.dialogIndex:
-                # Overflow the current dialog
-                time.sleep(TIME_ONE_TICK*5)
-                continue
-
-            # 8250's sip stack send BYE in different port to INVITE's
-            if self.is8250:
-                if packet.udpType==UDP_TYPE_SIP and packet.sipType==SIP_TYPE_BYE:
-                    self.sipState = SIP_STATE_BYED
-
-                    self.__drawCallFlow(RIGHT_TO_LEFT, '(no waiting for 8250 BYE)')
-                    self.__drawCallFlowSummary()
-                    self.__restBeforeNextDialog(TIME_ONE_WINK*5)
-                    self.__startDialog(self.caseIndex, self.dialogIndex+1)
-                    continue
-
-            # This is a received packet, let it be and continue waiting for message from Distributor
-            if packet.received:
-                time.sleep(TIME_ONE_TICK*5)
-                continue
-
-            #print 'packet.udpType', packet.udpType
-            if packet.udpType in (UDP_TYPE_RTP, UDP_TYPE_RTP_EVENT):
-                # This is a RTP packet including 2833 type
-                tempData = packet.data
-                if packet.udpType==UDP_TYPE_RTP_EVENT:
-                    tempData = setTelephoneEventPt(tempData, self.telephoneEventPt)
-
-                #print 'send RTP'
-                self.rtpTransport.sendto(tempData, (callParameters.destination, self.sessionDestinationPort))
-
-                if packet.udpType==UDP_TYPE_RTP_EVENT:
-                    # RTP with same timestamp is duplicated message
-                    if packet.rtpTimestamp!=self.cachedRtpTimestampFor2833:
-                        tempDtmf = 'DTMF '+getDtmfChar(packet.dtmf)
-                        self.__drawCallFlow(LEFT_TO_RIGHT, tempDtmf)
-                        self.cachedRtpTimestampFor2833 = packet.rtpTimestamp
-
-                self.packetIndex += 1
-                time.sleep(TIME_ONE_TICK)
-                continue
-            elif packet.udpType==UDP_TYPE_SIP and packet.sipType==SIP_TYPE_BYE:
-                self.__sendByeByPacket(packet.data)
-                self.sipState = SIP_STATE_BYEING
-
-                self.packetIndex += 1
-                continue
-            #else:
-            #    continue
-
-
-    def __moveCaseDialogTo(self, caseIndex=0, dialogIndex=0):
-        """
-        [Function]
-        Move the channel's case to the indicated position,
-        this function will load the cache file if the caseIndex move to the new postion
-
-        [Argument]
-        caseIndex: move to which case
-        dialogIndex: move to which dialog
-
-        [Return]
-        return True if successfully, otherwise return False
-        """
-
-        if caseIndex<0:
-            LOG.a('case index should not less then 0')
-
-        if caseIndex>len(self.caseList)-1 and callParameters.isStressTest==False:
-            print
-            print 'All test cases are completed, please press Ctrl+C to exit.'
-            return False
-        # else:
-
-        tempReleasingCacheName = ''
-        try:
-            if self.caseIndex>0:
-                tempReleasingCacheName = self.caseList[self.caseIndex].cacheName
-        except:
-            pass
-
-        try:
-            if caseIndex>len(self.caseList)-1:
-                # it is the last case, so go back to the first case
-                if self.caseIndex==0:
-                    # means there is only one case
-                    self.caseIndex = 0
-                    self.dialogIndex = 0
-                    self.packetIndex = 0
-                    self.nextInviteInSameCase = True
-                    return True
-                else:
-                    # there is more than one cases
-                    self.caseIndex = 0
-                    self.dialogIndex = 0
-                    self.packetIndex = 0
-
-                    # it's not current using case, so need to get a new case
-                    tempCaseData = self.caseList[self.caseIndex]
-                    self.resourceQueue.put(QueueItem(ITEM_TYPE_GET_A_CASE_REQ, QueueItemData4Resource(self.channelQueue, tempCaseData.cacheName, tempReleasingCacheName)))
-                    self.nextInviteInSameCase = False
-                    return False
-            else:
-                if caseIndex==self.caseIndex:
-                    if dialogIndex<=len(self.dialogPacketsList)-1:
-                        # it is not the last dialog in the case
-                        if self.dialogIndex!=dialogIndex:
-                            self.dialogIndex = dialogIndex
-                            self.packetIndex = 0
-                        self.nextInviteInSameCase = True
-                        return True
-                    else:
-                        # it is the last dialog in the case, so move to the next case
-                        return self.__moveCaseDialogTo(self.caseIndex+1)
-                else:
-                    tempCaseData = self.caseList[caseIndex]
-
-                    # it's not current using case, so need to load the packets list from the cache file
-                    self.resourceQueue.put(QueueItem(ITEM_TYPE_GET_A_CASE_REQ, QueueItemData4Resource(self.channelQueue, tempCaseData.cacheName, tempReleasingCacheName)))
-                    self.caseIndex = caseIndex
-                    # the dialogIndex is resetted to 0
-                    self.dialogIndex = 0
-                    self.packetIndex = 0
-                    self.nextInviteInSameCase = False
-                    return False
-        finally:
-            self.__resetDialogContext()
-
-
-    def __resetDialogContext(self):
-        """
-        [Function]
-        reset something when begining a dialog
-
-        [Argument]
-        (N/A)
-
-        [Return]
-        (N/A)
-        """
-
-        self.passed = True
-        self.cachedRtpTimestamp = -1
-        self.cachedIvrEventStr = ''
-        self.ignoredIvrEventCount = 0
-
-
-    def __restBeforeNextDialog(self, timeToRest):
-        """
-        [Function]
-        Rest some time and clear the queue before start the next dialog
-
-        [Argument]
-        timeToRest: how long to rest
-
-        [Return]
-        (N/A)
-        """
-
-        time.sleep(timeToRest)
-        self.channelQueue.put(QueueItem(ITEM_TYPE_HAVE_A_REST))
-
-        while True:
-            tempItem = self.channelQueue.get()
-
-            if tempItem.itemType==ITEM_TYPE_SIGN_TO_KILL_THREAD:
-                self.channelQueue.put(QueueItem(ITEM_TYPE_SIGN_TO_KILL_THREAD))
-                return
-            elif tempItem.itemType==ITEM_TYPE_HAVE_A_REST:
-                return
-
-
-    def __startDialog(self, caseIndex=0, dialogIndex=0):
-        """
-        [Function]
-        Start dialog for the channel's case
-
-        [Argument]
-        caseIndex: which case
-        dialogIndex: which dialog
-
-        [Return]
-        (N/A)
-        """
-
-        if self.__moveCaseDialogTo(caseIndex, dialogIndex):
-            self.__sendInvite()
-
-
-    def __sendInvite(self):
-        """
-        [Function]
-        Start dialog by sending SIP Invite message
-
-        [Argument]
-        (N/A)
-
-        [Return]
-        (N/A)
-        """
-
-        if self.sipState!=SIP_STATE_IDLE:
-            LOG.e('the channel is in invalid status %d, when tring to send INVITE' % (self.sipState))
-            return
-
-        #print 'state: idle'
-
-        tempCalled = ''
-        tempRedirect = ''
-        data = ''
-        tempSIP = ''
-        tempSDP = ''
-
-        # get a case from the cases list
-        tempCaseData = self.caseList[self.caseIndex]
-
-        #LOG.writeLog('caseIndex: ' + str(self.caseIndex))
-        #LOG.writeLog('dialogIndex: ' + str(self.dialogIndex))
-        #LOG.writeLog('packetIndex: ' + str(self.packetIndex))
-        #LOG.writeLog('snoopFileName: ' + str(tempCaseData.snoopFileName))
-
-        # search the indicated dialog in the case
-        foundTheDialog = False
-        invitePackage = ''
-
-        for packet in self.dialogPacketsList[self.dialogIndex]:
-            # get the INVITE packet from the packets list at first
-            #   1. this packet is a SIP INVITE
-            #   2. the INVITE is for the indicated dialog
-            if packet.udpType==UDP_TYPE_SIP and packet.sipType==SIP_TYPE_INVITE:
-                foundTheDialog = True
-
-                if not self.nextInviteInSameCase:
-                    # prepare called
-                    if callParameters.calledCount<=1:
-                        if tempCaseData.caseConfig and len(tempCaseData.caseConfig.called)>0:
-                            # use case config's CALLED number
-                            tempCalled = tempCaseData.caseConfig.calledPrefix + tempCaseData.caseConfig.called
-                        else:
-                            # use callParameters' CALLED number
-                            tempCalled = callParameters.calledPrefix + callParameters.called
-                    else:
-                        if self.calledIndex>self.maxCalledIndex:
-                            self.calledIndex = self.minCalledIndex
-                        if tempCaseData.caseConfig and len(tempCaseData.caseConfig.called)>0:
-                            # use case config's CALLED number
-                            tempCalled = tempCaseData.caseConfig.calledPrefix + tempCaseData.caseConfig.called
-                        else:
-                            # use callParameters' CALLED number
-                            tempCalled = callParameters.calledPrefix + str(int(callParameters.called)+self.calledIndex)
-                        self.calledIndex += 1
-                    # save called to channel data
-                    self.called = tempCalled
-
-                    #LOG.writeLog('channel: %d, called: %s' % (self.channelIndex, self.called))
-
-                    # prepare redirect & reason
-                    tempDoRedirect = (callParameters.redirectCount>0)
-                    if callParameters.redirectCount<=1:
-                        if tempCaseData.caseConfig and len(tempCaseData.caseConfig.redirect)>0:
-                            # use case config's REDIRECT number
-                            tempDoRedirect = True
-                            tempRedirect = tempCaseData.caseConfig.calledPrefix + tempCaseData.caseConfig.redirect
-
-                            if len(tempCaseData.caseConfig.reason)>0:
-                                # use case config's REASON number
-                                tempReason = tempCaseData.caseConfig.reason
-                            else:
-                                # use default REASON number
-                                tempReason = DEFAULT_PARAMETER_REASON
-                        else:
-                            # use callParameters' REDIRECT number & REASON
-                            tempRedirect = callParameters.calledPrefix + callParameters.redirect
-                            tempReason = callParameters.reason
-                    else:
-                        if self.redirectIndex>self.maxRedirectIndex:
-                            self.redirectIndex = self.minRedirectIndex
-                        if tempCaseData.caseConfig and len(tempCaseData.caseConfig.redirect)>0:
-                            # use case config's REDIRECT number
-                            tempRedirect = tempCaseData.caseConfig.calledPrefix + tempCaseData.caseConfig.redirect
-
-                            if len(tempCaseData.caseConfig.reason)>0:
-                                # use case config's REASON
-                                tempReason = tempCaseData.caseConfig.reason
-                            else:
-                                # use default REASON
-                                tempReason = DEFAULT_PARAMETER_REASON
-                        else:
-                            # use callParameters' REDIRECT number & REASON
-                            tempRedirect = callParameters.calledPrefix + str(int(callParameters.redirect)+self.redirectIndex)
-                            tempReason = callParameters.reason
-                        self.redirectIndex += 1
-
-                        #print 'redirectIndex:', self.redirectIndex
-                    if tempDoRedirect:
-                        # save redirect & reason to channel data
-                        self.redirect = tempRedirect
-                        self.reason = tempReason
-                    else:
-                        # clear redirect & reason
-                        tempRedirect = ''
-                        tempReason = ''
-                        self.redirect = ''
-                        self.reason = ''
-
-                    # prepare calling
-                    if tempCaseData.caseConfig and len(tempCaseData.caseConfig.calling)>0:
-                        # use case config's CALLING number
-                        tempCalling = tempCaseData.caseConfig.calling
-                    else:
-                        # use callParameters' CALLING number
-                        tempCalling = callParameters.calling
-                    # save calling to channel data
-                    self.calling = tempCalling
-
-                # create from tag
-                tempFromTag = self.__createVoicebirdTag()
-                self.fromTag = tempFromTag
-                # create call ID
-                self.callId = self.fromTag #+ '@' + callParameters.source
-
-                data = packet.data.replace('\r\n', '\n').replace('\n', '\r\n')
-                tempSIP,tempSDP = getSipSdp(data)
-
-                if len(self.redirect)>0:
-                    tempSIP += '\r\n' + 'Diversion: <sip:%s@%s:%d>;reason="%s";counter=1' % \
-                                (self.redirect, callParameters.source, DEFAULT_SIP_PORT, self.reason)
-
-                tempSDP = tempSDP.replace('[SOURCE]', callParameters.source)
-                tempSDP = tempSDP.replace('[AUDIO_PORT]', str(self.rtpTransport.getsockname()[1]))
-                tempSDP = tempSDP.strip() + '\r\n'
-                tempSdpLen = len(tempSDP)
-
-                tempSIP = tempSIP.replace('[DESTINATION]', callParameters.destination) \
-                                 .replace('[CALLED]', self.called) \
-                                 .replace('[SOURCE]', callParameters.source) \
-                                 .replace('[FROM_TAG]', self.fromTag) \
-                                 .replace('[LENGTH]', str(tempSdpLen))
-
-                tempSIP = self.__processSip4PAI(tempSIP)
-                invitePackage = tempSIP+'\r\n\r\n'+tempSDP
-
-                self.__sendSip(invitePackage)
-                self.sipState = SIP_STATE_WAITING_200
-                LOG.writeLog('Send INVITE whose from tag is '+self.fromTag)
-                #print 'state: waiting 200'
-
-                tempCaseInfo = 'CASE (%d/%d): %s, DIALOG: %d/%d' % \
-                                (self.caseIndex+1, len(self.caseList), tempCaseData.snoopFileName, self.dialogIndex+1, len(self.dialogPacketsList))
-                tempCallerCalled = self.calling + self.called.rjust(PRINT_CENTER_WIDTH)
-                self.__drawCallFlowHeader(tempCaseInfo, tempCallerCalled)
-                self.__drawCallFlow(LEFT_TO_RIGHT, 'INVITE')
-
-                # don't break, go on to find the ACK
-                continue
-
-            # if it is a ACK packet for this dialog, just save it for future using
-            #   1. need to search ACK for this dialog
-            #   2. in the same dialog
-            #   3. it is a SIP ACK
-            if foundTheDialog and packet.udpType==UDP_TYPE_SIP \
-                              and packet.sipType==SIP_TYPE_ACK:
-                self.ack = packet.data
-                #print 'GET ACK:'
-                #print packet.data
-
-                # as soon as geting the ACK, break the dialog search
-                break
-
-        # if cannot find any dialog in the case, just move to the next case
-        if not foundTheDialog:
-            if self.dialogIndex<=0:
-                LOG.a("There is no SIP INVITE found in the case '%s'" % (tempCaseData.snoopFileName))
-                if len(self.caseList)==1:
-                    raise
-            self.__startDialog(self.caseIndex+1)
-
-
-    def __processSip4PAI(self, sipStr):
-        """
-        [Function]
-        Process SIP content for P-Asserted-Identity
-
-        [Argument]
-        SIP content string
-
-        [Return]
-        return processed SIP content
-        """
-
-        tempSIP = sipStr.strip()
-        # PARAMETER -pai: P-Asserted-Identity
-        if '-pai' in sys.argv:
-            # replace calling number to be anonymous
-            tempSIP = tempSIP.replace('[CALLING]', 'Anonymous')
-            tempSIP = tempSIP.replace('[FROM_CALLING]', 'Anonymous')
-            
-            # replace From display name to be anonymous
-            tempSIP = tempSIP.replace('[FROM_DISPLAY]', '"Anonymous"')
-
-            tempSIP.strip()
-            tempSipList = tempSIP.split('\r\n')
-
-            # Note: Don't delete Contact field even P-Asserted-Identity
-            #
-            #tempNewSipList = []
-            #
-            # delete Contact
-            #for line in tempSipList:
-            #    if not line.startswith('Contact:'):
-            #        tempNewSipList.append(line)
-
-            # add two head fields
-            tempSipList.append('P-Asserted-Identity: "%s"<sip:%s@%s>' % (self.calling, self.calling, callParameters.source))
-            tempSipList.append('Privacy: id')
-            tempSIP = '\r\n'.join(tempSipList).strip()   # Note: there is no \r\n in the end
-        else:
-            tempSIP = tempSIP.replace('[CALLING]', self.calling)
-            tempSIP = tempSIP.replace('[FROM_CALLING]', self.calling)
-
-        # PARAMETER -fdn: From Display Name
-        if '-fdn' in sys.argv:
-            strDisplayName = '"%s"' % (sys.argv[sys.argv.index('-fdn')+1])
-            tempSIP = tempSIP.replace('[FROM_DISPLAY]', '"'+strDisplayName+'"')
-        # PARAMETER -cfdn: Clear From Display Name
-        elif '-cfdn' in sys.argv:
-            tempSIP = tempSIP.replace('[FROM_DISPLAY]', '')
-        else:
-        	strDisplayName = '"%s"' % (self.calling)
-        	tempSIP = tempSIP.replace('[FROM_DISPLAY]', '"'+strDisplayName+'"')
-
-        #print tempSIP
-        #print '-'*40
-
-        return tempSIP
-
-
-    def __createVoicebirdTag(self):
-        """
-        [Function]
-        Create voicebird format (From) Tag
-
-        [Argument]
-        (N/A)
-
-        [Return]
-        return voicebird format tag
-        """
-
-        tempTag = VOICEBIRD_TAG_PREFIX
-        tempTag += 'F' + str(self.channelIndex).zfill(LEN_OF_VOICEBIRD_TAG_UNIT)
-        tempTag += 'C' + str(self.caseIndex).zfill(LEN_OF_VOICEBIRD_TAG_UNIT)
-        tempTag += 'D' + str(self.dialogIndex).zfill(LEN_OF_VOICEBIRD_TAG_UNIT)
-        tempTag += 'A' + str(int(time.time()*1000))
-        return tempTag
-
-
-    def __receive100(self, data, fromTag, callId):
-        """
-        [Function]
-        Receive 100, and then only print information
-
-        [Argument]
-        data: SIP message data
-        fromTag: From Tag
-        callId: Call-ID
-
-        [Return]
-        If this message is SIP response 100 for this dialog, return True. Otherwise return False
-        """
-
-        reResponse = RE_SIP_100.search(data)
-        if reResponse:
-            if fromTag==self.fromTag and callId==self.callId:
-                self.__drawCallFlow(RIGHT_TO_LEFT, '100 Trying')
-                if data.find(IVR_8250_SIGN)>-1:
-                    self.is8250 = True
-                return True
-            else:
-                LOG.w("The 100 can not match. Waiting From tag '%s', Call-ID '%s', but received From tag '%s', Call-ID '%s'" % (self.fromTag, self.callId, fromTag, callId))
-
-        #print data
-        #print '-'*70
-        return False
-
-
-    def __receive180(self, data, fromTag, callId):
-        """
-        [Function]
-        Receive 180, and then only print information
-
-        [Argument]
-        data: SIP message data
-        fromTag: From Tag
-        callId: Call-ID
-
-        [Return]
-        If this message is SIP response 180 for this dialog, return True. Otherwise return False
-        """
-
-        reResponse = RE_SIP_180.search(data)
-        if reResponse:
-            if fromTag==self.fromTag and callId==self.callId:
-                self.__drawCallFlow(RIGHT_TO_LEFT, '180 Ring')
-                return True
-            else:
-                LOG.w("The 180 can not match. Waiting From tag '%s', Call-ID '%s', but received From tag '%s', Call-ID '%s'" % (self.fromTag, self.callId, fromTag, callId))
-
-        #print data
-        #print '-'*70
-        return False
-
-
-    def __receive183(self, data, fromTag, callId):
-        """
-        [Function]
-        Receive 183
-
-        [Argument]
-        data: SIP message data
-        fromTag: From Tag
-        callId: Call-ID
-
-        [Return]
-        If this message is SIP response 183 for this dialog, return True. Otherwise return False
-        """
-
-        reResponse = RE_SIP_183.search(data)
-        if reResponse:
-            if fromTag==self.fromTag and callId==self.callId:
-                self.__drawCallFlow(RIGHT_TO_LEFT, '183 Session Progress')
-                return True
-            else:
-                LOG.w("The 183 can not match. Waiting From tag '%s', Call-ID '%s', but received From tag '%s', Call-ID '%s'" % (self.fromTag, self.callId, fromTag, callId))
-                return False
-
-        #print data
-        #print '-'*70
-        return False
-
-
-    def __receiveErrorResponse(self, data, fromTag, callId):
-        """
-        [Function]
-        Receive error response
-
-        [Argument]
-        data: SIP message data
-        fromTag: From Tag
-        callId: Call-ID
-
-        [Return]
-        (isThisMsgErrorResponse, inThisDialog)
-        """
-
-        reResponse = RE_SIP_RESPONSE.search(data)
-        if reResponse:
-            if fromTag==self.fromTag and callId==self.callId:
-                self.toTag = getToTag(data)
-                tempResponseCode = getResponseCode(data)
-                self.__drawCallFlow(RIGHT_TO_LEFT, tempResponseCode)
-                return (True, True)
-            else:
-                tempLogStr = """
--- This error response cannot match its dialog --
-+Channel Information:
- From Tag: %s
- To Tag: %s
- Call-ID: %s
-+Error Response Message:
-%s
-""" % (self.fromTag, self.toTag, self.callId, data)
-                LOG.w(tempLogStr)
-                return (True, False)
-        else:
-            return (False, False)
-
-
-    def __receive200(self, data, fromTag, callId):
-        """
-        [Function]
-        Receive 200
-
-        [Argument]
-        data: SIP message data
-        fromTag: From Tag
-        callId: Call-ID
-
-        [Return]
-        If this message is SIP response 200 for this dialog, return True. Otherwise return False
-        """
-
-        #print '200 OK data:'
-        #print data
-
-        reResponse = RE_SIP_200.search(data)
-        if reResponse:
-            if self.sipState==SIP_STATE_BYEING:
-                if fromTag==self.fromTag and callId==self.callId:
-                    #self.__drawCallFlow(RIGHT_TO_LEFT, '200 OK')
-                    return True
-                else:
-                    LOG.w("The 200 can not match. Waiting From tag '%s', Call-ID '%s', but received From tag '%s', Call-ID '%s'" % (self.fromTag, self.callId, fromTag, callId))
-                    return False
-            else:
-                try:
-                    # PARAMETER -w: Wait time, how long to wait after 183/200 then send RTP
-                    tempWaitTimeThenRtp = int(sys.argv[sys.argv.index('-w')+1])
-                    self.baseTimeForRtp = time.time() + tempWaitTimeThenRtp
-                except:
-                    self.baseTimeForRtp = time.time()
-
-                if fromTag==self.fromTag and callId==self.callId:
-                    self.__drawCallFlow(RIGHT_TO_LEFT, '200 OK')
-                    self.toTag = getToTag(data)
-                    self.sessionDestinationPort = getSdpMediaPort(data)
-                    self.telephoneEventPt = getTelephoneEventPtFromSdp(data)
-                    LOG.startADialog()
-                    return True
-                else:
-                    LOG.w("The 200 can not match. Waiting From tag '%s', Call-ID '%s', but received From tag '%s', Call-ID '%s'" % (self.fromTag, self.callId, fromTag, callId))
-                    return False
-
-        return False
-
-
-    def __receiveBye(self, data, fromTag, callId):
-        """
-        [Function]
-        Receive Bye, then create the Ack message data
-
-        [Argument]
-        data: SIP message data
-        fromTag: From Tag
-        callId: Call-ID
-
-        [Return]
-        (isThisMsgBye, inThisDialog, byeResponse)
-        """
-
-        reBye = RE_SIP_BYE.search(data)
-        if reBye:
-            tempToTag = getToTag(data)
-
-            if fromTag==self.toTag and tempToTag==self.fromTag and callId==self.callId:
-                tempViasList = getViasList(data)
-                tempVias = '\r\n'.join(tempViasList).strip()
-
-                tempCallIdStr = getCallIdStr(data).strip()
-                tempCSeqStr = getCSeqStr(data).strip()
-                tempFromStr = getFromStr(data).strip()
-                tempToStr = getToStr(data).strip()
-
-                tempByeResponse = 'SIP/2.0 200 OK\r\n'
-                tempByeResponse += tempVias + '\r\n'
-                tempByeResponse += tempToStr + '\r\n'
-                tempByeResponse += tempFromStr + '\r\n'
-                tempByeResponse += tempCallIdStr + '\r\n'
-                tempByeResponse += tempCSeqStr + '\r\n'
-                tempByeResponse += 'Content-Length:0\r\n\r\n'
-                #print 'Bye ACK:'
-                #print tempByeResponse
-
-                self.__drawCallFlow(RIGHT_TO_LEFT, 'BYE')
-                LOG.writeLog('Receive BYE whose from tag is %s, to tag is %s' % (fromTag, tempToTag))
-                return (True, True, tempByeResponse)
-            else:
-                tempLogStr = """
--- This BYE cannot match its dialog --
-+Received
- From Tag: %s
- To Tag: %s
- Call-ID: %s
-+Channel's
- To Tag: %s
- From Tag: %s
- Call-ID: %s
-""" % (fromTag, tempToTag, callId, self.toTag, self.fromTag, self.callId)
-                LOG.w(tempLogStr)
-                return (True, False, None)
-        else:
-            return (False, False, None)
-
-
-    def __sendSip(self, data):
-        """
-        [Function]
-        Send SIP message
-
-        [Argument]
-        data: message data
-
-        [Return]
-        (N/A)
-        """
-        self.sipTransport.send(data)
-
-
-    def __sendAck(self):
-        """
-        [Function]
-        Send Ack after receiveing 200
-
-        [Argument]
-        (N/A)
-
-        [Return]
-        (N/A)
-        """
-
-        if len(self.ack)<4:
-            LOG.a('ACK is not ready, please check your test case')
-            return
-
-        tempSIP = self.ack.replace('\r\n', '\n').replace('\n', '\r\n')
-        tempSIP = tempSIP.replace('[DESTINATION]', callParameters.destination) \
-                         .replace('[CALLED]', self.called) \
-                         .replace('[SOURCE]', callParameters.source) \
-                         .replace('[FROM_TAG]', self.fromTag) \
-                         .replace('[TO_TAG]', self.toTag) \
-                         .replace('[REDIRECT]', self.redirect) \
-                         .replace('[REASON]', self.reason)
-
-        tempSIP = self.__processSip4PAI(tempSIP)
-        self.__sendSip(tempSIP+'\r\n\r\n')
-        self.__drawCallFlow(LEFT_TO_RIGHT, 'ACK')
-
-
-    def __sendByeByPacket(self, packetData):
-        """
-        [Function]
-        Send BYE according to the packet data
-
-        [Argument]
-        packetData: packet data
-
-        [Return]
-        (N/A)
-        """
-
-        tempSIP = packetData.replace('\r\n', '\n').replace('\n', '\r\n')
-        tempSIP = tempSIP.replace('[DESTINATION]', callParameters.destination) \
-                         .replace('[CALLED]', self.called) \
-                         .replace('[SOURCE]', callParameters.source) \
-                         .replace('[FROM_TAG]', self.fromTag) \
-                         .replace('[TO_TAG]', self.toTag) \
-                         .replace('[REDIRECT]', self.redirect) \
-                         .replace('[REASON]', callParameters.reason)
-
-        tempSIP = self.__processSip4PAI(tempSIP)
-        self.__sendSip(tempSIP+'\r\n\r\n')
-        LOG.writeLog('Send BYE whose from tag is '+self.fromTag)
-        self.__drawCallFlow(LEFT_TO_RIGHT, 'BYE')
-        self.__drawCallFlowSummary()
-
-
-    def __sayGoodBye(self):
-        """
-        [Function]
-        Send BYE according to the template
-        Note: this function only used when exit
-
-        [Argument]
-        (N/A)
-
-        [Return]
-        (N/A)
-        """
-
-        templateBye = TEMPLATE_BYE.strip().replace('\n', '\r\n')
-        tempSIP = templateBye.replace('[DESTINATION]', callParameters.destination) \
-                             .replace('[CALLED]', self.called) \
-                             .replace('[SOURCE]', callParameters.source) \
-                             .replace('[FROM_TAG]', self.fromTag) \
-                             .replace('[TO_TAG]', self.toTag) \
-                             .replace('[REDIRECT]', self.redirect) \
-                             .replace('[REASON]', self.reason)
-
-        tempSIP = self.__processSip4PAI(tempSIP)
-        self.__sendSip(tempSIP+'\r\n\r\n')
-        self.__drawCallFlow(LEFT_TO_RIGHT, 'BYE')
-        self.__drawCallFlowSummary(RESULT_VALUE_INTERRUPTED)
-
-
-    def __sendByeResponse(self, byeResponse):
-        """
-        [Function]
-        Response the Bye when called side hands up
-
-        [Argument]
-        byeResponse: the ACK data for response Bye
-
-        [Return]
-        (N/A)
-        """
-
-        self.__sendSip(byeResponse)
-        self.__drawCallFlow(LEFT_TO_RIGHT, '200 OK')
-
-
-    def __receiveSip(self, data):
-        """
-        [Function]
-        used to receive SIP message and manage the SIP state
-
-        [Argument]
-        data: the data received
-
-        [Return]
-        return True if it is a SIP message (then stop to dealing with the behind packets in list), otherwise return False
-        """
-
-        #print data
-        #print '-'*70
-
-        tempFromTag = getFromTag(data)
-        tempCallId = getCallId(data)
-
-        # BYE from destination
-        tempIsMsgBye,tempInTheSameDialog,tempByeResponse = self.__receiveBye(data, tempFromTag, tempCallId)
-        if tempIsMsgBye:
-            if tempInTheSameDialog:
-                self.__sendByeResponse(tempByeResponse)
-                self.sipState = SIP_STATE_BYED
-
-                if self.__gotoNextIvrEvent():
-                    tempPacket = self.dialogPacketsList[self.dialogIndex][self.packetIndex]
-                    if tempPacket.udpType==UDP_TYPE_SIP and tempPacket.sipType==SIP_TYPE_BYE:
-                        #self.passed &= True
-                        self.__drawCallFlowSummary()
-                    else:
-                        if self.passed:
-                            self.__drawCallFlowSummary(RESULT_VALUE_PASS_BUT_UNCOMPLETED)
-                        else:
-                            self.passed &= False
-                            self.__drawCallFlowSummary()
-                else:
-                    if self.passed:
-                        tempResultValue = RESULT_VALUE_PASS_BUT_DEFECTIVE_CASE
-                    else:
-                        tempResultValue = RESULT_VALUE_FAIL
-                    self.__drawCallFlowSummary(tempResultValue)
-                self.__restBeforeNextDialog(TIME_ONE_WINK)
-                self.__startDialog(self.caseIndex, self.dialogIndex+1)
-            return True
-        #else:
-
-        if self.__receive100(data, tempFromTag, tempCallId):
-            return True
-
-        if self.__receive180(data, tempFromTag, tempCallId):
-            return True
-
-        if self.__receive183(data, tempFromTag, tempCallId):
-            return True
-
-        if self.__receive200(data, tempFromTag, tempCallId):
-            if self.sipState==SIP_STATE_WAITING_200:
-                self.__sendAck()
-                self.sipState = SIP_STATE_AFTER_ACK
-                #print 'state: after ack'
-            elif self.sipState==SIP_STATE_BYEING:
-                self.sipState = SIP_STATE_BYED
-
-                self.__restBeforeNextDialog(TIME_ONE_WINK*3)
-                self.__startDialog(self.caseIndex, self.dialogIndex+1)
-            else:
-                LOG.i('receive 200 OK in invalid SIP status %d'  % (self.sipState))
-            return True
-
-        tempIsErrorResponse,tempInTheSameDialog = self.__receiveErrorResponse(data, tempFromTag, tempCallId)
-        if tempIsErrorResponse:
-            if tempInTheSameDialog:
-                self.__sendAck()
-                self.sipState = SIP_STATE_BYED
-
-                self.passed &= False
-                self.__drawCallFlowSummary(RESULT_VALUE_SIP_ERROR)
-                self.__startDialog(self.caseIndex, self.dialogIndex+1)
-            return True
-
-        return False
-
-
-class Parameters:
-    """
-    [Class]
-    This is a struct used to dump the parameters to a file
-    """
-
-    destination = ''
-    calledPrefix = ''
-    calledCount = 1
-    called = ''
-    source = ''
-    calling = ''
-    redirectCount = 0
-    redirect = ''
-    reason = ''
-    isStressTest = False
-    channelCount = 1
-
-    def __str__(self):
-        tempStr = ''
-        tempStr += ' destination: ' + self.destination + '\n'
-        tempStr += ' calledPrefix: ' + self.calledPrefix + '\n'
-        tempStr += ' calledCount: ' + str(self.calledCount) + '\n'
-        tempStr += ' called: ' + self.called + '\n'
-        tempStr += ' source: ' + self.source + '\n'
-        tempStr += ' calling: ' + self.calling + '\n'
-        tempStr += ' redirectCount: ' + str(self.redirectCount) + '\n'
-        tempStr += ' redirect: ' + self.redirect + '\n'
-        tempStr += ' reason: ' + self.reason + '\n'
-        tempStr += ' isStressTest: ' + str(self.isStressTest) + '\n'
-        tempStr += ' channelCount: ' + str(self.channelCount)
-        return tempStr
-
-
-class CaseConfig:
-    """
-    [Class]
-    This is a struct used to save Case Configuration
-    """
-
-    calledPrefix = ''
-    called = ''
-    calling = ''
-    redirect = ''
-    reason = ''
-
-    def __str__(self):
-        tempStr = ''
-        tempStr += ' calledPrefix: ' + self.calledPrefix + '\n'
-        tempStr += ' called: ' + self.called + '\n'
-        tempStr += ' calling: ' + self.calling + '\n'
-        tempStr += ' redirect: ' + self.redirect + '\n'
-        tempStr += ' reason: ' + self.reason
-        return tempStr
-
-
-class Distributor:
-    """
-    [Class]
-    Used to receive SIP/RTP messages and then distributor messages to ChannelWorker
-    """
-
-    channelQueueList = []           # value: ChannelQueue
-    channelQueueDictByUdpPort = {}  # key: UDP port, value: ChannelQueue
-                                    # channelQueueDictByUdpPort is used to match the received RTP message to the channel according to the RTP message's IP port
-    resourceQueue = None
-
-    def __init__(self, caseList):
-        """
-        [Function]
-        new a Distributor object
-
-        [Argument]
-        caseList: list of CaseData
-        """
-
-        self.caseList = caseList
-        try:
-            callParameters.destination = socket.gethostbyname(callParameters.destination)
-        except:
-            LOG.a('The destination host address is invalid, please try to setup the call parameter again')
-            sys.exit(1)
-            return
-
-        if callParameters.calling=='':
-            callParameters.calling = DEFAULT_PARAMETER_PHONE
-
-        if callParameters.redirect=='':
-            callParameters.redirect = callParameters.called
-
-        if callParameters.reason=='':
-            callParameters.reason = DEFAULT_PARAMETER_REASON
-
-        self.sipTransport = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        try:
-            self.sipTransport.bind(('', DEFAULT_SIP_PORT))
-        except:
-            print 'The SIP port %d has been used by another program, please confirm and try again later.' % (DEFAULT_SIP_PORT)
-            sys.exit(1)
-            return
-
-        # it's very important to setsockopt
-        self.sipTransport.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self.sipTransport.connect((callParameters.destination, DEFAULT_SIP_PORT))
-
-        self.readableChannels = [self.sipTransport,]
-
-        self.resourceQueue = Queue.Queue()
-        tempResourceController = ResourceController(self.resourceQueue)
-        tempResourceController.setDaemon(True)
-        tempResourceController.start()
-
-        for channelIndex in range(callParameters.channelCount):
-            # create Queue object
-            tempChannelQueue = Queue.Queue()
-
-            # create ChannelWorker object, which is a thread
-            tempChannelWorker = ChannelWorker(channelIndex, self.caseList, self.sipTransport, tempChannelQueue, self.resourceQueue)
-            tempRtpTransport = tempChannelWorker.getLocalRtpTransport()
-
-            # add to the calls list
-            self.channelQueueList.append(tempChannelQueue)
-
-            self.readableChannels.append(tempRtpTransport)
-            self.channelQueueDictByUdpPort[tempRtpTransport.getsockname()[1]] = tempChannelQueue
-
-            # start ChannelWorker
-            tempChannelWorker.setDaemon(True)
-            tempChannelWorker.start()
-
-
-    def __del__(self):
-        """
-        [Function]
-        Kill all threads in this function
-
-        [Argument]
-        (N/A)
-        """
-
-        # Bye all
-        for tempChannelQueue in self.channelQueueList:
-            # Stop ChannelWorker thread
-            tempChannelQueue.put(QueueItem(ITEM_TYPE_SIGN_TO_KILL_THREAD))
-
-        if self.resourceQueue:
-            self.resourceQueue.put(QueueItem(ITEM_TYPE_SIGN_TO_KILL_THREAD))
-
-        # give some time to stop threads
-        timeToExit = TIME_ONE_WINK*len(self.channelQueueList)*5
-        print
-        print 'Wait a minute to exit ...'
-
-        if timeToExit > MAX_TIME_TO_EXIT:
-            timeToExit = MAX_TIME_TO_EXIT
-
-        if timeToExit < MIN_TIME_TO_EXIT:
-            timeToExit = MIN_TIME_TO_EXIT
-
-        time.sleep(timeToExit)
-        deleteLogObj()
-        time.sleep(TIME_ONE_WINK*3)
-
-
-    def doSelect(self):
-        """
-        [Function]
-        distribute messages to ChannelWorker
-
-        [Argument]
-        (N/A)
-
-        [Return]
-        (N/A)
-        """
-
-        if callParameters.isStressTest or 'nf' in sys.argv:
-            # Note: the line count of this information is used by __printStatisticInScreen
-            print 'Wait to start ...'
-            print
-
-        for channelQueue in self.channelQueueList:
-            # give a sign to ChannelWorker to start dialog
-            channelQueue.put(QueueItem(ITEM_TYPE_START_WORK))
-
-        while True:
-            Rs, Ws, Es = select.select(self.readableChannels, [], [], TIME_ONE_WINK)
-            if len(Rs)>0:
-                for readable in Rs:
-                    if readable!=self.sipTransport:
-                        # 1. deal with RTP message before SIP
-                        try:
-                            tempData = readable.recv(MIN_UDP_LEN)
-                        except KeyboardInterrupt:
-                            raise KeyboardInterrupt
-                        except:
-                            LOG.w('Cannot receive the RTP data')
-                        else:
-                            #if tempData.startswith('BYE'):
-                            #    print 'receive BYE:\n%s' % (tempData)
-
-                            #print 'receive RTP'
-                            tempPayloadType = quicklyGetPt(tempData)
-
-                            if tempPayloadType not in (PAYLOAD_TYPE_IVR_RECORD_FILE, PAYLOAD_TYPE_IVR_PROMPT):
-                                #LOG.i('A RTP package with pt %d is ignored' % (tempPayloadType))
-                                continue
-                            #else:
-
-                            tempPort = readable.getsockname()[1]
-                            tempChannelQueue = self.channelQueueDictByUdpPort[tempPort]
-                            if not tempChannelQueue:
-                                LOG.w('Cannot find the rtp queue according to the UDP port %d' % (tempPort))
-                            else:
-                                tempChannelQueue.put(QueueItem(ITEM_TYPE_RTP_DATA, tempData))
-                    else:
-                        # 2. deal with SIP message
-                        try:
-                            tempData = self.sipTransport.recv(MIN_UDP_LEN*2)
-                        except KeyboardInterrupt:
-                            raise KeyboardInterrupt
-                        except:
-                            LOG.w('Cannot receive the SIP data')
-                        else:
-                            #print 'receive SIP:\n', tempData
-                            self.__distributeSipMsg(tempData)
-
-
-    def __distributeSipMsg(self, data):
-        """
-        [Function]
-        Distribute SIP message to ChannelWorker
-
-        [Argument]
-        data: the received data
-
-        [Return]
-        return True if it is distributed successfully, otherwise return False
-        """
-
-        try:
-            tempVoicebirdTagPrefixPos = data.index(VOICEBIRD_TAG_PREFIX)
-            tempChannelIndex = int(data[tempVoicebirdTagPrefixPos+LEN_OF_VOICEBIRD_TAG_PREFIX+1 : tempVoicebirdTagPrefixPos+LEN_OF_VOICEBIRD_TAG_PREFIX+1+LEN_OF_VOICEBIRD_TAG_UNIT])
-        except KeyboardInterrupt:
-            raise KeyboardInterrupt
-        except:
-            return False
-
-        if tempChannelIndex<len(self.channelQueueList):
-            self.channelQueueList[tempChannelIndex].put(QueueItem(ITEM_TYPE_SIP_DATA, data))
-            return True
-        else:
-            return False
-
-
-class SnoopParser:
-    """
-    [Class]
-    Read snoop file(s) then create the packet list for later usage
-    """
-
-    # global in the object
-    caseList = []
-    packetsList = []        # in fact it's for template using to save all packets
-    dialogPacketsList = []
-    dialogIndex = -1        # Note: init it to be -1 not 0
-    fileIndex = 0
-
-    # global in every file, it is very useful to match to Ethreal's packet no.
-    packetIndex = 0
-
-    telephoneEventPtInSdp = -1
-
-    dialogNumbers = []
-    firstDialogCallingNumber = ''
-
-    def __init__(self, files):
-        """
-        [Function]
-        New a object of SnoopParser
-
-        [Argument]
-        files: a list parameter to carry snoop files
-        """
-
-        if len(files)<1:
-            LOG.a('No snoop file')
-            raise
-
-        #print files
-
-        fileName = ''
-        for fileIndex in range(len(files)):
-            fileName = files[fileIndex]
-            tempDplFileName = caseNameToCacheName(fileName)+DIALOG_PACKETS_LIST_FILE_EXT
-
-            # PARAMETER -fp: Force to Parser snoop file
-            if '-fp' in sys.argv:
-                LOG.writeLog("Force to parse the case '%s'" % (fileName))
-            else:
-                if os.path.exists(tempDplFileName):
-                    tempCifVersion,tempOriginalFileCreateTime,tempOriginalFileSize = self.__getSnoopFileInfo(fileName)
-                    if tempCifVersion!=CIF_VERSION:
-                        LOG.writeLog("The case '%s' cache CIF version is %d" % (fileName, tempCifVersion))
-                    elif tempOriginalFileCreateTime:
-                        tempNewSnoopFileStatus = os.stat(fileName)
-                        if tempOriginalFileCreateTime==tempNewSnoopFileStatus.st_ctime \
-                                and tempOriginalFileSize==tempNewSnoopFileStatus.st_size:
-                            LOG.writeLog("The case '%s' is unchanged" % (fileName))
-
-                            # add the case to the list
-                            tempCaseData = CaseData()
-                            tempCaseData.snoopFileName = fileName
-                            tempCaseData.cacheName = caseNameToCacheName(fileName)
-                            tempCaseData.caseConfig = self.__getCaseConfig(fileName)
-                            self.caseList.append(tempCaseData)
-
-                            # PARAMETER -vp: View the Packet list, means to print the packet list's information
-                            if '-vp' in sys.argv:
-                                tempDialogPacketsList = loadDialogPacketsListFromCache(tempCaseData.cacheName)
-                                self.__printDialogPacketsList(len(self.caseList)-1, fileName, tempDialogPacketsList)
-
-                            continue
-                        else:
-                            LOG.writeLog("The case '%s' is changed" % (fileName))
-                    else:
-                        LOG.writeLog("New case '%s'" % (fileName))
-                else:
-                    LOG.writeLog("Find that the cache file '%s' has been removed by somebody" % (tempDplFileName))
-
-            fileobj = file(fileName, 'rb')
-
-            if not self.__checkFileHeader(fileobj):
-                LOG.a("'%s' is NOT a snoop file, you may 'Save As' it to a snoop file by Ethreal (Wireshark)" % (fileName))
-                if len(files)==1:
-                    fileobj.close()
-                    raise
-            else:
-                # PARAMETER -vf: View the File, means to print the snoop file's content
-                if '-vf' in sys.argv:
-                    print '-- file (%d) -- %s' % (fileIndex, fileName)
-
-                self.packetIndex = 0    # init packet index to 0, for it's global in each file
-                self.__readPackets(fileName, fileobj)
-
-            fileobj.close()
-
-
-    def getCaseList(self):
-        """
-        [Function]
-        Get all test case data list
-
-        [Argument]
-        (N/A)
-
-        [Return]
-        Return a list of CaseData
-        """
-        return self.caseList
-
-
-    def __printDialogPacketsList(self, caseIndex, snoopFileName, dialogPacketsList):
-        """
-        [Function]
-        Print the DialogPacketsList
-
-        [Argument]
-        caseIndex: case index
-        snoopFileName: snoop file name
-        dialogPacketsList: dialog packets list
-
-        [Return]
-        (N/A)
-        """
-
-        dialogCount = len(dialogPacketsList)
-        print '-- CASE %d, Snoop File: %s --' % (caseIndex, snoopFileName)
-        print 'There is/are', dialogCount, 'dialog(s)'
-        print
-
-        for dialogIndex in range(dialogCount):
-            packetIndex = 0
-            for packet in dialogPacketsList[dialogIndex]:
-                print '-'*50, 'CASE', caseIndex, '- dialog', dialogIndex, ', packet', packetIndex, '--'
-                print str(packet)
-                print
-                packetIndex += 1
-
-
-    def __getSnoopFileInfo(self, fileName):
-        """
-        [Function]
-        get snoop file's information in CaseInformation
-
-        [Argument]
-        fileName:snoop file name
-
-        [Return]
-        (CaseInformation.cifVersion, CaseInformation.snoopFileCreateTime, CaseInformation.snoopFileSize)
-        """
-
-        caseInformation = loadCaseInfoFromCase(fileName)
-        if caseInformation:
-            return (caseInformation.cifVersion, caseInformation.snoopFileCreateTime, caseInformation.snoopFileSize)
-        else:
-            return (0, None, None)
-
-
-    def __checkFileHeader(self, fileobj):
-        """
-        [Function]
-        Check whether it is a snoop file
-
-        [Argument]
-        fileobj: file object of snoop file
-
-        [Return]
-        If it is a snoop file, return True. Otherwise return False
-
-        [See Also]
-        ########################################################
-        # RFC 1761
-        # http://www.faqs.org/rfcs/rfc1761.html
-        ########################################################
-        """
-
-        tmpBuffer = fileobj.read(8+4+4)
-        if not tmpBuffer:
-            LOG.a('EOF in __checkFileHeader')
-            raise
-        iStart = 0
-        iEnd = 0
-
-        # 1. Identification Pattern: 8 octet
-        iEnd = iStart+8
-        identificationPattern = struct.unpack('B'*8, tmpBuffer[iStart:iEnd])
-        if identificationPattern != SNOOP_IDENTIFICATION_PATTERN_SNOOP:
-            return False
-        if '-vf' in sys.argv:
-            print 'Identification Pattern:', tuple2Hex(identificationPattern)
-        iStart = iEnd
-
-        # 2. Version Number: 4 octet
-        iEnd = iStart+4
-        versionNumber = struct.unpack('!I', tmpBuffer[iStart:iEnd])[0]
-        if versionNumber != SNOOP_VERSION_NUMBER:
-            return False
-        if '-vf' in sys.argv:
-            print 'Version Number:', versionNumber
-        iStart = iEnd
-
-        # 3. Datalink Type: 4 octet
-        iEnd = iStart+4
-        datalinkType = struct.unpack('!I', tmpBuffer[iStart:iEnd])[0]
-        if datalinkType != SNOOP_DATALINK_TYPE_ETHERNET:
-            return False
-        if '-vf' in sys.argv:
-            print 'Datalink Type:', datalinkType
-        iStart = iEnd
-
-        return True
-
-
-    def __readPacketRecord(self, fileobj):
-        """
-        [Function]
-        Read every packet record in the file
-
-        [Argument]
-        fileobj: file object of snoop file
-
-        [Return]
-        If EOF return False, otherwise return True
-
-        [See Also]
-        ########################################################
-        # RFC 1761
-        # http://www.faqs.org/rfcs/rfc1761.html
-        ########################################################
-        """
-
-        # Packet Record format: as six 32-bit (4-octet) integer values
-        PACKET_RECORD_HEADER_LEN = 6*4
-        tmpBuffer = fileobj.read(PACKET_RECORD_HEADER_LEN)
-        if not tmpBuffer:
-            if '-vf' in sys.argv:
-                print 'EOF in __readPacketRecord'
-            return False
-
-        iStart = 0
-        iEnd = 0
-
-        self.packetIndex += 1
-        if '-vf' in sys.argv:
-            print '-vf --', self.packetIndex, '-'*70
-
-        # 1. Original Length: 4 octet
-        iEnd = iStart+4
-        originalLength = struct.unpack('!I', tmpBuffer[iStart:iEnd])[0]
-        if '-vf' in sys.argv:
-            print 'Original Length:', originalLength
-        iStart = iEnd
-
-        # 2. Included Length: 4 octet
-        iEnd = iStart+4
-        includedLength = struct.unpack('!I', tmpBuffer[iStart:iEnd])[0]
-        if '-vf' in sys.argv:
-            print 'Included Length:', includedLength
-        iStart = iEnd
-
-        # 3. Packet Record Length: 4 octet
-        iEnd = iStart+4
-        packetRecordLength = struct.unpack('!I', tmpBuffer[iStart:iEnd])[0]
-        if '-vf' in sys.argv:
-            print 'Packet Record Length:', packetRecordLength
-        iStart = iEnd
-
-        # 4. Cumulative Drops: 4 octet
-        iEnd = iStart+4
-        cumulativeDrops = struct.unpack('!I', tmpBuffer[iStart:iEnd])[0]
-        if '-vf' in sys.argv:
-            print 'Cumulative Drops:', cumulativeDrops
-        iStart = iEnd
-
-        # 5. Timestamp Seconds: 4 octet
-        iEnd = iStart+4
-        timestampSeconds = struct.unpack('!I', tmpBuffer[iStart:iEnd])[0]
-        if '-vf' in sys.argv:
-            print 'Timestamp Seconds:', timestampSeconds
-        iStart = iEnd
-
-        # 6. Timestamp Microseconds: 4 octet
-        iEnd = iStart+4
-        timestampMicroseconds = struct.unpack('!I', tmpBuffer[iStart:iEnd])[0]
-        if '-vf' in sys.argv:
-            print 'Timestamp Microseconds:', timestampMicroseconds
-        iStart = iEnd
-
-        # prepare UDP Packet
-        self.dialogPacket = DialogPacket()
-        #self.dialogPacket.fileName = os.path.split(filename)[1]
-        self.dialogPacket.originalPacketIndex = self.packetIndex
-        self.dialogPacket.timestamp = '%d.%06d' % (timestampSeconds, timestampMicroseconds)
-
-        # 7. Packet Data
-        packetDataLen = packetRecordLength-PACKET_RECORD_HEADER_LEN
-        tmpBuffer = fileobj.read(packetDataLen)
-
-        self.__readEthernetII(tmpBuffer)
-
-        if '-vf' in sys.argv:
-            print
-        return True
-
-
-    def __readEthernetII(self, ep):
-        """
-        [Function]
-        Read packet's EthernetII head
-
-        [Argument]
-        ep: the EthernetII data
-
-        [Return]
-        (N/A)
-
-        [See Also]
-        ########################################################
-        # http://www.firewall.cx/ethernet-frames-ethernet-ii.php
-        ########################################################
-        """
-
-        if '-vf' in sys.argv:
-            print '-- EthernetII --'
-
-        iStart = 0
-        iEnd = 0
-
-        # 1. Destination: 6 octet
-        iEnd = iStart+6
-        destination = struct.unpack('B'*6, ep[iStart:iEnd])
-        if '-vf' in sys.argv:
-            print 'Destination:', tuple2Hex(destination)
-        iStart = iEnd
-
-        # 2. Source: 6 octet
-        iEnd = iStart+6
-        source = struct.unpack('B'*6, ep[iStart:iEnd])
-        if '-vf' in sys.argv:
-            print 'Source:', tuple2Hex(source)
-        iStart = iEnd
-
-        # 3. Type: 2 octet
-        iEnd = iStart+2
-        packetType = struct.unpack('!H', ep[iStart:iEnd])[0]
-        if '-vf' in sys.argv:
-            print 'Type: 0x%04x' % (packetType)
-        iStart = iEnd
-
-        if packetType==ETHERNET_TYPE_IP:
-            self.__readIp(ep[iStart:])
-        else:
-            if '-vf' in sys.argv:
-                print 'NOT IP'
-
-
-    def __readIp(self, ipp):
-        """
-        [Function]
-        Read packet's IP head
-
-        [Argument]
-        ipp: IP packet data
-
-        [Return]
-        (N/A)
-
-        [See Also]
-        ########################################################
-        # http://www.networksorcery.com/enp/protocol/ip.htm
-        ########################################################
-        """
-
-        if '-vf' in sys.argv:
-            print '-- IP (Internet Protocol) --'
-
-        iFixIpHeaderLen = 0
-
-        iStart = 0
-        iEnd = 0
-
-        # 1. Version: 4 bits
-        # 2. Header Length: 4 bits
-        # = 1 octet
-        iFixIpHeaderLen += 1
-        iEnd = iStart+1
-        vhl = struct.unpack('B', ipp[iStart:iEnd])[0]
-        version = vhl >> 4
-        if '-vf' in sys.argv:
-            print 'Version:', version
-
-        headerLength = vhl & 0xf
-        if '-vf' in sys.argv:
-            print 'Header Length:', headerLength
-        iStart = iEnd
-
-        # 3. Type of Service: 1 octet
-        iFixIpHeaderLen += 1
-        iEnd = iStart+1
-        typeOfService = struct.unpack('B', ipp[iStart:iEnd])[0]
-        if '-vf' in sys.argv:
-            print 'Type of Service:', typeOfService
-        iStart = iEnd
-
-        # 4. Total length: 2 octet
-        iFixIpHeaderLen += 2
-        iEnd = iStart+2
-        totalLength = struct.unpack('!H', ipp[iStart:iEnd])[0]
-        if '-vf' in sys.argv:
-            print 'Total length:', totalLength
-        iStart = iEnd
-
-        # 5. Identification: 2 octet
-        iFixIpHeaderLen += 2
-        iEnd = iStart+2
-        identification = struct.unpack('!H', ipp[iStart:iEnd])[0]
-        if '-vf' in sys.argv:
-            print 'Identification:', identification
-        iStart = iEnd
-
-        # 6. Flags: 3 bits
-        # 7. Fragment Offset: 13 bits
-        # = 2 octet
-        iFixIpHeaderLen += 2
-        iEnd = iStart+2
-        ffo = struct.unpack('B'*2, ipp[iStart:iEnd])[0]
-
-        flags = ffo >> 13
-        if '-vf' in sys.argv:
-            print 'Flags:', flags
-
-        fragmentOffset = ffo & 0x1fff
-        if '-vf' in sys.argv:
-            print 'Fragment Offset:', fragmentOffset
-        iStart = iEnd
-
-        # 8. Time to Live: 1 octet
-        iFixIpHeaderLen += 1
-        iEnd = iStart+1
-        ttl = struct.unpack('B', ipp[iStart:iEnd])[0]
-        if '-vf' in sys.argv:
-            print 'Time to Live:', ttl
-        iStart = iEnd
-
-        # 8. Protocol: 1 octet
-        iFixIpHeaderLen += 1
-        iEnd = iStart+1
-        protocol = struct.unpack('B', ipp[iStart:iEnd])[0]
-        if '-vf' in sys.argv:
-            print 'Protocol:', protocol
-        iStart = iEnd
-
-        # 9. Header checksum: 2 octet
-        iFixIpHeaderLen += 2
-        iEnd = iStart+2
-        headerChecksum = struct.unpack('!H', ipp[iStart:iEnd])[0]
-        if '-vf' in sys.argv:
-            print 'Header checksum: 0x%x' % (headerChecksum)
-        iStart = iEnd
-
-        # 10. Source IP address: 4 octet
-        iFixIpHeaderLen += 4
-        iEnd = iStart+4
-        sourceIpAddress = struct.unpack('B'*4, ipp[iStart:iEnd])
-        if '-vf' in sys.argv:
-            print 'Source IP address:', sourceIpAddress
-        iStart = iEnd
-
-        # 11. Destination IP address: 4 octet
-        iFixIpHeaderLen += 4
-        iEnd = iStart+4
-        destinationIpAddress = struct.unpack('B'*4, ipp[iStart:iEnd])
-        if '-vf' in sys.argv:
-            print 'Destination IP address:', destinationIpAddress
-        iStart = iEnd
-
-        # 12. Options
-        iOptionsLen = int(headerLength)*4 - iFixIpHeaderLen
-        if '-vf' in sys.argv:
-            print 'Options Len:', iOptionsLen
-        if iOptionsLen>0:
-            iEnd = iStart+iOptionsLen
-            options = struct.unpack('B'*iOptionsLen, ipp[iStart:iEnd])
-            if '-vf' in sys.argv:
-                print 'Options:', options
-            iStart = iEnd
-
-        if protocol!=IP_PROTOCOL_UDP:
-            if '-vf' in sys.argv:
-                print 'NOT UDP'
-        else:
-            # prepare UDP Packet
-            self.dialogPacket.sourceIp = '%s.%s.%s.%s' % (sourceIpAddress[:])
-            self.dialogPacket.destinationIp = '%s.%s.%s.%s' % (destinationIpAddress[:])
-            self.__readUdp(ipp[iStart:])
-
-
-    def __readUdp(self, udp):
-        """
-        [Function]
-        Read packet's UDP head
-
-        [Argument]
-        upd: UDP packet data
-
-        [Return]
-        (N/A)
-
-        [See Also]
-        ########################################################
-        # http://www.networksorcery.com/enp/protocol/udp.htm
-        ########################################################
-        """
-
-        if '-vf' in sys.argv:
-            print '-- UDP (User Datagram Protocol) --'
-
-        iStart = 0
-        iEnd = 0
-
-        # 1. Source Port: 2 octet
-        iEnd = iStart+2
-        sourcePort = struct.unpack('!H', udp[iStart:iEnd])[0]
-        if '-vf' in sys.argv:
-            print 'Source Port:', sourcePort
-        iStart = iEnd
-
-        # 2. Destination Port: 2 octet
-        iEnd = iStart+2
-        destinationPort = struct.unpack('!H', udp[iStart:iEnd])[0]
-        if '-vf' in sys.argv:
-            print 'Destination Port:', destinationPort
-        iStart = iEnd
-
-        # prepare UDP Packet
-        self.dialogPacket.sourcePort = sourcePort
-        self.dialogPacket.destinationPort = destinationPort
-
-        # 3. Length: 2 octet
-        iEnd = iStart+2
-        length = struct.unpack('!H', udp[iStart:iEnd])[0]
-        if '-vf' in sys.argv:
-            print 'Length:', length
-        iStart = iEnd
-
-        # 4. Checksum: 2 octet
-        iEnd = iStart+2
-        checksum = struct.unpack('!H', udp[iStart:iEnd])[0]
-        if '-vf' in sys.argv:
-            print 'Checksum: 0x%x' % (checksum)
-        iStart = iEnd
-
-        # 5. Encapsulated Data
-        encapsulatedDataLen = length-8
-        iEnd = iStart+encapsulatedDataLen
-
-        # prepare UDP Packet
-        self.dialogPacket.data = udp[iStart:iEnd]
-
-        if sourcePort in SIP_PORTS or destinationPort in SIP_PORTS:
-            # prepare UDP Packet
-            self.dialogPacket.udpType = UDP_TYPE_SIP
-            self.__readSip(self.dialogPacket.data)
-        else:
-            # prepare UDP Packet
-            self.dialogPacket.udpType = UDP_TYPE_UNKNOW
-
-        # add to Packets List
-        self.packetsList.append(self.dialogPacket)
-
-
-    def __readSip(self, sip):
-        """
-        [Function]
-        Read SIP content
-        Note: this function only print the content of SIP packet
-
-        [Argument]
-        sip: the SIP packet data
-
-        [Return]
-        (N/A)
-
-        [See Also]
-        ########################################################
-        # RFC 3261
-        ########################################################
-        """
-
-        if '-vf' in sys.argv:
-            print '-- SIP (Session Initiation Protocol) --'
-            print sip
-
-
-    def __readRtp(self, rtp, packetIndex):
-        return parseRtp(rtp, self.telephoneEventPtInSdp, packetIndex)
-
-
-    def __readPackets(self, fileName, fileobj):
-        """
-        [Function]
-        Read every packets in the file until EOF
-
-        [Argument]
-        fileName: snoop file name
-        fileobj: file object of snoop file
-
-        [Return]
-        (N/A)
-        """
-
-        while True:
-            if not self.__readPacketRecord(fileobj):
-                # deal with the packets when EOF
-
-                self.__scanDialogPacketsList(fileName)
-
-                # add the case to the list
-                tempCaseData = CaseData()
-                tempCaseData.snoopFileName = fileName
-                tempCaseData.cacheName,tempDialogPacketsList = self.__dumpCaseToCache(fileName)
-                tempCaseData.caseConfig = self.__getCaseConfig(fileName)
-                self.caseList.append(tempCaseData)
-
-                if '-vp' in sys.argv:
-                    self.__printDialogPacketsList(len(self.caseList)-1, fileName, tempDialogPacketsList)
-                break
-            # else: continue reading the snoop file
-
-
-    def __getCaseConfig(self, snoopFileName):
-        """
-        [Function]
-        Get Case Config from SnoopFile's xml, e.g. the Snoop File Name is abc.snoop, then the Case Config File will be abc.xml
-
-        [Argument]
-        snoopFileName: snoop file name
-
-        [Return]
-        If has .xml file return CaseConfig, otherwise return None
-        """
-
-        xmlFileName = os.path.splitext(snoopFileName)[0]+'.xml'
-        if not os.path.exists(xmlFileName):
-            LOG.writeLog("There is no '%s'" % (xmlFileName))
-            return None
-
-        tempDom = minidom.parse(xmlFileName)
-        tempRoot = tempDom.documentElement
-        caseConfig = CaseConfig()
-
-        tempCalledPrefix = tempRoot.getElementsByTagName('calledPrefix')
-        if len(tempCalledPrefix)>0 and tempCalledPrefix[0].firstChild:
-            caseConfig.calledPrefix = tempCalledPrefix[0].firstChild.data.strip()
-
-        tempCalled = tempRoot.getElementsByTagName('called')
-        if len(tempCalled)>0 and tempCalled[0].firstChild:
-            caseConfig.called = tempCalled[0].firstChild.data.strip()
-
-        tempCalling = tempRoot.getElementsByTagName('calling')
-        if len(tempCalling)>0 and tempCalling[0].firstChild:
-            caseConfig.calling = tempCalling[0].firstChild.data.strip()
-
-        tempRedirect = tempRoot.getElementsByTagName('redirect')
-        if len(tempRedirect)>0 and tempRedirect[0].firstChild:
-            caseConfig.redirect = tempRedirect[0].firstChild.data.strip()
-
-        tempReason = tempRoot.getElementsByTagName('reason')
-        if len(tempReason)>0 and tempReason[0].firstChild:
-            caseConfig.reason = tempReason[0].firstChild.data.strip()
-
-        LOG.writeLog("-- The content of '%s' is as below --\n%s" % (xmlFileName, str(caseConfig)))
-        return caseConfig
-
-
-    def __dumpCaseToCache(self, snoopFileName):
-        """
-        [Function]
-        Dump all packets of the case in the snoop file to a .dpl file (dialogPacketsList)
-
-        [Argument]
-        snoopFileName: snoop file name
-
-        [Return]
-        return (cacheName, dialogPacketsList)
-        """
-
-        caseInformation = CaseInformation()
-        caseInformation.cifVersion = CIF_VERSION
-        caseInformation.snoopFileName = snoopFileName
-        tempFileStatus = os.stat(snoopFileName)
-        caseInformation.snoopFileCreateTime = tempFileStatus.st_ctime
-        caseInformation.snoopFileSize = tempFileStatus.st_size
-
-        caseInformation.dialogNumbers = self.dialogNumbers
-
-        cacheName = caseNameToCacheName(snoopFileName)
-        cifFileName = cacheName + CASE_INFORMATION_FILE_EXT
-        dplFileName = cacheName + DIALOG_PACKETS_LIST_FILE_EXT
-
-        cacheDirName = os.path.split(cifFileName)[0]
-        if not os.path.exists(cacheDirName):
-            os.makedirs(cacheDirName)
-
-        cifFile = file(cifFileName, 'wb')
-        dplFile = file(dplFileName, 'wb')
-        pickle.dump(caseInformation, cifFile)
-
-        pickle.dump(self.dialogPacketsList, dplFile, 2)
-        cifFile.close()
-        dplFile.close()
-
-        return (cacheName, self.dialogPacketsList)
-
-
-    def __isDuplicatedIvrEvent(self, currentRtpTimestamp, currentIvrEventStr):
-        """
-        [Function]
-        check whether this IVR event is duplicated
-
-        [Argument]
-        currentRtpTimestamp: current RTP's timestamp
-        currentIvrEventStr: current IVR Event's content
-
-        [Return]
-        return True if duplicated, otherwise return False
-        """
-
-        if currentRtpTimestamp!=0:
-            # 1. only need checking duplication when autotest=2
-            # 2.1. the ivr event == the cached
-            # 2.2. the timestamp <= the cached
-            # 2.3. don't ignore the event whose timestamp is the same as the previous one
-            if currentIvrEventStr==self.cachedIvrEventStr \
-                    and currentRtpTimestamp<=self.cachedRtpTimestamp \
-                        and self.ignoredIvrEventCount<IVR_EVENT_DUP_TIMES:
-                self.ignoredIvrEventCount += 1
-                return True
-            else:
-                self.cachedRtpTimestamp = currentRtpTimestamp
-                self.cachedIvrEventStr = currentIvrEventStr
-                self.ignoredIvrEventCount = 0
-                return False
-        else:
-            return False
-
-
-    def __scanDialogPacketsList(self, fileName):
-        """
-        [Function]
-        Scan all packets to filter the useful ones (SIP & RTP),
-        after scan, the useful dialog packet will be removed from the DialogPacketsList
-
-        [Argument]
-        fileName: name of this case's snoop file
-
-        [Return]
-        (N/A)
-        """
-
-        sipState = SIP_STATE_IDLE
-        fromTag = ''
-        toTag = ''
-        callId = ''
-        sessionSourcePort = 0
-        sessionDestinationPort = 0
-
-        # 1. scan packets list and indicate the useful packets
-
-        # clear up something before scan the new case
-        del self.dialogPacketsList[:]
-        del self.dialogNumbers[:]
-        self.cachedRtpTimestamp = -1
-        self.cachedIvrEventStr = ''
-        self.ignoredIvrEventCount = 0
-        self.dialogIndex = -1
-
-        tempData = ''
-        i = 0
-        for packet in self.packetsList:
-            if sipState==SIP_STATE_IDLE:
-                if packet.udpType==UDP_TYPE_SIP:
-                    tempData = packet.data
-                    reInvite = RE_SIP_INVITE.search(tempData)
-                    if reInvite:
-                        fromTag = getFromTag(tempData)
-                        callId = getCallId(tempData)
-                        sessionSourcePort = getSdpMediaPort(tempData)
-
-                        self.dialogNumbers.append(DialogNumber(getCalledNumberFromRequestHead(reInvite), getCallingNumberFromContact(tempData)))
-
-                        tempData = self.__templateInvite(tempData, reInvite)
-                        tempData = self.__templateVia(tempData)
-                        tempData = self.__templateFrom(tempData)
-                        tempData = self.__templateTo(tempData)
-                        tempData = self.__templateCallId(tempData)
-                        tempData = self.__templateContact(tempData)
-                        tempData = self.__templateCseqForInvite(tempData)
-                        # needn't Record-Route
-                        tempData = self.__deleteRecordRoute(tempData)
-                        tempData = self.__templateContentLength(tempData)
-                        tempData = self.__templateSdpM(tempData)
-                        #tempData = self.__templateSdpO(tempData)
-                        #tempData = self.__templateSdpC(tempData)
-                        tempData = self.__templateSdpSourceIpAddress(tempData)
-
-                        # Note: INVITE will begin a new dialog
-                        self.dialogIndex += 1
-                        self.packetsList[i].dialogIndex = self.dialogIndex
-                        #print 'self.packetsList[%d].dialogIndex: %d' % (i, self.packetsList[i].dialogIndex)
-                        self.packetsList[i].sipType = SIP_TYPE_INVITE
-                        self.packetsList[i].data = tempData
-
-                        # reset the cached RTP timestamp for the new dialog
-                        self.cachedRtpTimestamp = -1
-                        self.cachedIvrEventStr = ''
-                        self.ignoredIvrEventCount = 0
-
-                        sipState = SIP_STATE_WAITING_183
-
-                i += 1
-                continue
-
-            if sipState==SIP_STATE_WAITING_183:
-                if packet.udpType==UDP_TYPE_SIP:
-                    tempData = packet.data
-                    reResponse = RE_SIP_183.search(tempData)
-                    if reResponse:
-                        tempFromTag = getFromTag(tempData)
-                        tempCallId = getCallId(tempData)
-
-                        if tempFromTag==fromTag and tempCallId==callId:
-                            toTag = getToTag(tempData)
-                        else:
-                            LOG.w("There is a 183 whose Call-ID (%s) does not equals INVITE's (%s)" %(tempCallId, callId))
-                            i += 1
-                            continue
-
-                        sessionDestinationPort = getSdpMediaPort(tempData)
-                        self.baseTimeTo183 = packet.timestamp
-                        self.telephoneEventPtInSdp = getTelephoneEventPtFromSdp(tempData)
-                        sipState = SIP_STATE_WAITING_200
-
-                i += 1
-                continue
-
-            if sipState>=SIP_STATE_WAITING_200:
-                if packet.udpType==UDP_TYPE_UNKNOW:
-                    #print 'packet.sourcePort:', packet.sourcePort, 'packet.destinationPort:', packet.destinationPort
-                    if packet.sourcePort==sessionSourcePort and packet.destinationPort==sessionDestinationPort:
-                        self.packetsList[i].dialogIndex = self.dialogIndex
-                        self.packetsList[i].received = False
-                        self.packetsList[i].delttime = float(self.packetsList[i].timestamp) - float(self.baseTimeTo183)
-
-                        tempPayloadType = 0
-                        try:
-                            tempPayloadType,tempRtpTimestamp,tempExtendedData = self.__readRtp(packet.data, self.packetsList[i].originalPacketIndex)
-                        except:
-                            i += 1
-                            continue
-
-                        self.packetsList[i].rtpTimestamp = tempRtpTimestamp
-                        if tempPayloadType==self.telephoneEventPtInSdp:
-                            self.packetsList[i].udpType = UDP_TYPE_RTP_EVENT
-                            self.packetsList[i].dtmf = tempExtendedData
-                        else:
-                            self.packetsList[i].udpType = UDP_TYPE_RTP
-                    elif packet.sourcePort==sessionDestinationPort and packet.destinationPort==sessionSourcePort:
-                        tempPayloadType = 0
-                        try:
-                            tempPayloadType,tempRtpTimestamp,tempExtendedData = self.__readRtp(packet.data, self.packetsList[i].originalPacketIndex)
-                        except:
-                            i += 1
-                            continue
-
-                        self.packetsList[i].rtpTimestamp = tempRtpTimestamp
-
-                        # only IVR Event type RTP need to save the following fields
-                        if tempPayloadType==PAYLOAD_TYPE_IVR_RECORD_FILE:
-                            tempIvrEventStr = tempExtendedData
-                            if self.__isDuplicatedIvrEvent(tempRtpTimestamp, tempIvrEventStr):
-                                i += 1
-                                continue
-
-                            self.packetsList[i].dialogIndex = self.dialogIndex
-                            self.packetsList[i].received = True
-                            self.packetsList[i].udpType = UDP_TYPE_RTP_IVR_RECORD_FILE
-                            self.packetsList[i].ivrEventStr = tempIvrEventStr
-                            # clear the data of received packet
-                            self.packetsList[i].data = ''
-                        elif tempPayloadType==PAYLOAD_TYPE_IVR_PROMPT:
-                            tempIvrEventStr = str(tempExtendedData)
-                            if self.__isDuplicatedIvrEvent(tempRtpTimestamp, tempIvrEventStr):
-                                i += 1
-                                continue
-
-                            # Remove the original packet from packetsList, and then add the new ones to list
-                            tempParentPacket = self.packetsList.pop(i)
-                            tempParentPacket.dialogIndex = self.dialogIndex
-                            tempParentPacket.received = True
-                            # clear the data of received packet
-                            tempParentPacket.data = ''
-                            if len(tempExtendedData)>1:
-                                tempParentPacket.isTwin = True
-
-                            #print 'len(tempExtendedData):', len(tempExtendedData)
-
-                            tempPromptIndex = len(tempExtendedData)
-                            while tempPromptIndex>0:
-                                tempPromptIndex -= 1
-
-                                tempNewPrompt = copy.copy(tempParentPacket)
-
-                                tempNewPrompt.udpType = tempExtendedData[tempPromptIndex][0] + UDP_TYPE_RTP_IVR_PROMPT
-                                tempNewPrompt.ivrEventStr = tempExtendedData[tempPromptIndex][1]
-
-                                self.packetsList.insert(i, tempNewPrompt)
-
-                    i += 1
-                    continue
-
-            if sipState==SIP_STATE_WAITING_200:
-                if packet.udpType==UDP_TYPE_SIP:
-                    tempData = packet.data
-                    reResponse = RE_SIP_200.search(tempData)
-                    if reResponse:
-                        tempFromTag = getFromTag(tempData)
-                        tempToTag = getToTag(tempData)
-                        tempCallId = getCallId(tempData)
-
-                        if tempFromTag==fromTag and tempToTag==toTag and tempCallId==callId:
-                            sipState = SIP_STATE_BEFORE_ACK
-                        else:
-                            i += 1
-                            continue
-
-                i += 1
-                continue
-
-            if sipState==SIP_STATE_BEFORE_ACK:
-                if packet.udpType==UDP_TYPE_SIP:
-                    tempData = packet.data
-                    reAck = RE_SIP_ACK.search(tempData)
-                    if reAck:
-                        tempFromTag = getFromTag(tempData)
-                        tempToTag = getToTag(tempData)
-                        tempCallId = getCallId(tempData)
-
-                        if tempFromTag==fromTag and tempToTag==toTag and tempCallId==callId:
-                            tempData = self.__templateAck(tempData, reAck)
-                            tempData = self.__templateVia(tempData)
-                            tempData = self.__templateFrom(tempData)
-                            tempData = self.__templateTo(tempData)
-                            tempData = self.__templateCallId(tempData)
-                            tempData = self.__templateContact(tempData)
-                            tempData = self.__templateCseqForAck(tempData)
-
-                            self.packetsList[i].dialogIndex = self.dialogIndex
-                            self.packetsList[i].sipType = SIP_TYPE_ACK
-                            self.packetsList[i].data = tempData
-
-                            sipState = SIP_STATE_AFTER_ACK
-                        else:
-                            i += 1
-                            continue
-
-                i += 1
-                continue
-
-            if sipState==SIP_STATE_AFTER_ACK:
-                if packet.udpType==UDP_TYPE_SIP:
-                    tempData = packet.data
-                    reBye = RE_SIP_BYE.search(tempData)
-                    if reBye:
-                        tempFromTag = getFromTag(tempData)
-                        tempToTag = getToTag(tempData)
-                        tempCallId = getCallId(tempData)
-
-                        if tempFromTag==fromTag and tempToTag==toTag and tempCallId==callId:
-                            # source says BYE
-                            tempData = self.__templateBye(tempData, reBye)
-                            tempData = self.__templateVia(tempData)
-                            tempData = self.__templateFrom(tempData)
-                            tempData = self.__templateTo(tempData)
-                            tempData = self.__templateCallId(tempData)
-                            tempData = self.__templateCseqForBye(tempData)
-                            # needn't Route field
-                            tempData = self.__deleteRoute(tempData)
-                            # delete Diversion filed, and add later if need
-                            tempData = self.__deleteDiversion(tempData)
-
-                            self.packetsList[i].received = False
-                            self.packetsList[i].dialogIndex = self.dialogIndex
-                            self.packetsList[i].delttime = float(self.packetsList[i].timestamp) - float(self.baseTimeTo183)
-                            self.packetsList[i].sipType = SIP_TYPE_BYE
-                            self.packetsList[i].data = tempData
-
-                            sipState = SIP_STATE_BYED
-                        elif tempFromTag==toTag and tempToTag==fromTag and tempCallId==callId:
-                            # destination says BYE
-                            self.packetsList[i].received = True
-                            self.packetsList[i].dialogIndex = self.dialogIndex
-                            self.packetsList[i].sipType = SIP_TYPE_BYE
-                            # clear the data of received packet
-                            self.packetsList[i].data = ''
-
-                            sipState = SIP_STATE_BYED
-                        else:
-                            i += 1
-                            continue
-
-                i += 1
-                continue
-
-            i += 1
-            continue
-
-        # 2. put all usable package to dialogPacktsList
-
-        if self.dialogIndex < 0:
-            LOG.a("There is no dialog found in '%s'" % (fileName))
-            raise
-        #else:
-
-        tempDialogIndex = 0
-        tempPacketsInADialog = []
-        i = 0
-        while True:
-            if i >= len(self.packetsList):
-                self.dialogPacketsList.append(tempPacketsInADialog[:])
-                break
-
-            if self.packetsList[i].dialogIndex==tempDialogIndex:
-                tempPacketsInADialog.append(self.packetsList[i])
-            elif self.packetsList[i].dialogIndex==tempDialogIndex+1:
-                self.dialogPacketsList.append(tempPacketsInADialog[:])
-                tempDialogIndex += 1
-                # don't forget to add this dialog's first packet
-                tempPacketsInADialog = [self.packetsList[i]]
-            elif self.packetsList[i].dialogIndex<0:
-                pass
-            else:
-                LOG.a("Invalid dialog index %d when process '%s' dialg index %d" % (self.packetsList[i].dialogIndex, fileName, tempDialogIndex))
-                raise
-
-            i += 1
-
-        # clear it up after all items in packetsList have been put into dialogPacketsList
-        del self.packetsList[:]
-
-
-    def __printDialogPacksList(self):
-        """
-        [Function]
-        Print packet list for debug
-
-        [Argument]
-        (N/A)
-
-        [Return]
-        (N/A)
-        """
-
-        print 'There are', len(self.dialogPacketsList), 'dialogs in this list'
-
-        tempDialogIndex = 0
-        tempPacketIndex = 0
-        for dialog in self.dialogPacketsList:
-            print '-'*70, '-vp -- dialog:', str(tempDialogIndex), '--'
-
-            for packet in dialog:
-                print '-'*70, '-vp --', i, '--'
-                print str(packet)
-                print
-                tempPacketIndex += 1
-
-            tempDialogIndex += 1
-
-
-    def __templateInvite(self, data, reInvite):
-        try:
-            temp = RE_SIP_URI.sub(MAGIC_SIP_URI, reInvite.group())
-            return data[0:reInvite.start()] + RE_EMAIL.sub('[CALLED]@[DESTINATION]', temp) + data[reInvite.end():]
-        except:
-            LOG.e('__templateInvite except:\n%s' % (data))
-            return data
-
-
-    def __templateAck(self, data, reAck):
-        try:
-            temp = RE_IP_AND_PORT.sub(MAGIC_IP_AND_PORT, reAck.group())
-            return data[0:reAck.start()] + RE_IP.sub('[DESTINATION]', temp) + data[reAck.end():]
-        except:
-            LOG.e('__templateAck except:\n%s' % (data))
-            return data
-
-
-    def __templateBye(self, data, reBye):
-        try:
-            temp = RE_IP_AND_PORT.sub(MAGIC_IP_AND_PORT, reBye.group())
-            return data[0:reBye.start()] + RE_IP.sub('[DESTINATION]', temp) + data[reBye.end():]
-        except:
-            LOG.e('__templateBye except:\n%s' % (data))
-            return data
-
-
-    def __templateFromDisplay(self, fromStr):
-        if RE_SIP_FROM_DISPLAY.search(fromStr):
-            return RE_SIP_FROM_DISPLAY.sub('[FROM_DISPLAY]', fromStr)
-        else:
-            return fromStr
-
-
-    def __templateFrom(self, data):
-        reFrom = RE_SIP_FROM.search(data)
-        #print 'reFrom:', reFrom.group()
-
-        if RE_EMAIL.search(reFrom.group()):
-            try:
-                #print RE_EMAIL.search(reFrom.group()).group()
-                return data[0:reFrom.start()] + self.__templateFromDisplay(RE_SIP_TAG.sub('tag=[FROM_TAG]', RE_EMAIL.sub('[FROM_CALLING]@[SOURCE]', reFrom.group()))) + data[reFrom.end():]
-            except:
-                LOG.e('__templateFrom except 1:\n%s' % (data))
-                return data
-        elif RE_IP.search(reFrom.group()):
-            try:
-                return data[0:reFrom.start()] + self.__templateFromDisplay(RE_SIP_TAG.sub('tag=[FROM_TAG]', RE_IP.sub('[FROM_CALLING]@[SOURCE]', reFrom.group()))) + data[reFrom.end():]
-            except:
-                LOG.e('__templateFrom except 2:\n%s' % (data))
-                return data
-        else:
-            LOG.e('cannot parse reFrom with RE_EMAIL and RE_IP: %s' % (reFrom.group()))
-            return data
-
-
-    def __templateVia(self, data):
-        reAllVia = RE_SIP_VIA.finditer(data)
-        vs = []
-        first = True
-        theFirstSpan = ()
-        theFirstVia = ''
-        for v in reAllVia:
-            if first:
-                theFirstSpan = v.span()
-                theFirstVia = data[theFirstSpan[0]:theFirstSpan[1]+1]
-                first = False
-            else:
-                vs.insert(0, v.span())
-
-        tempData = data
-        for span in vs:
-            # remove VIAs to leave the first one
-            tempData = tempData[0:span[0]] + tempData[span[1]+1:]
-
-        try:
-            temp = RE_IP_AND_PORT.sub(MAGIC_IP_AND_PORT, theFirstVia)
-            return tempData[0:theFirstSpan[0]] + RE_IP.sub('[SOURCE]', temp) + tempData[theFirstSpan[1]+1:]
-        except:
-            LOG.e('__templateVia except:\n%s' % (data))
-            return data
-
-
-    def __templateContact(self, data):
-        reContact = RE_SIP_CONTACT.search(data)
-
-        try:
-            if RE_EMAIL.search(reContact.group()):
-                try:
-                    temp = RE_SIP_URI.sub(MAGIC_SIP_URI, reContact.group())
-                    return data[0:reContact.start()] + RE_EMAIL.sub('[CALLING]@[SOURCE]', temp) + data[reContact.end():]
-                except:
-                    LOG.e('__templateContact except 1:\n%s' % (data))
-                    return data
-            elif RE_IP.search(reContact.group()):
-                try:
-                    temp = RE_SIP_URI.sub(MAGIC_SIP_URI, reContact.group())
-                    return data[0:reContact.start()] + RE_IP.sub('[CALLING]@[SOURCE]', temp) + data[reContact.end():]
-                except:
-                    LOG.e('__templateContact except 2:\n%s' % (data))
-                    return data
-            else:
-                LOG.e('cannot parse reContact with RE_EMAIL and RE_IP: %s' % (reContact.group()))
-                return data
-        except:
-            LOG.e('__templateContact except 3:\n%s' % (data))
-            return data
-
-
-    def __templateCseqForInvite(self, data):
-        reCseq = RE_SIP_CSEQ.search(data)
-        try:
-            # Note: reCseq.end()-1 is used to hold \r
-            return data[0:reCseq.start()] + 'CSeq: 1 INVITE' + data[reCseq.end()-1:]
-        except:
-            LOG.e('__templateCseqForInvite except:\n%s' % (data))
-            return data
-
-
-    def __templateCseqForAck(self, data):
-        reCseq = RE_SIP_CSEQ.search(data)
-        try:
-            # Note: reCseq.end()-1 is used to hold \r
-            return data[0:reCseq.start()] + 'CSeq: 1 ACK' + data[reCseq.end()-1:]
-        except:
-            LOG.e('__templateCseqForAck except:\n%s' % (data))
-            return data
-
-
-    def __templateCseqForBye(self, data):
-        reCseq = RE_SIP_CSEQ.search(data)
-        try:
-            # Note: reCseq.end()-1 is used to hold \r
-            return data[0:reCseq.start()] + 'CSeq: 2 BYE' + data[reCseq.end()-1:]
-        except:
-            LOG.e('__templateCseqForBye except:\n%s' % (data))
-            return data
-
-
-    def __templateTo(self, data):
-        reTo = RE_SIP_TO.search(data)
-
-        if RE_EMAIL.search(reTo.group()):
-            try:
-                temp = RE_SIP_URI.sub(MAGIC_SIP_URI, reTo.group())
-                return data[0:reTo.start()] + RE_SIP_TAG.sub('tag=[TO_TAG]', RE_EMAIL.sub('[CALLED]@[DESTINATION]', temp)) + data[reTo.end():]
-            except:
-                LOG.e('__templateTo except:\n%s' % (data))
-                return data
-        elif RE_IP.search(reTo.group()):
-            try:
-                temp = RE_SIP_URI.sub(MAGIC_SIP_URI, reTo.group())
-                return data[0:reTo.start()] + RE_SIP_TAG.sub('tag=[TO_TAG]', RE_IP.sub('[CALLED]@[DESTINATION]', temp)) + data[reTo.end():]
-            except:
-                LOG.e('__templateTo except:\n%s' % (data))
-                return data
-
-
-    def __templateCallId(self, data):
-        reCallId = RE_SIP_CALL_ID.search(data)
-        strCallId = reCallId.group()
-
-        if RE_EMAIL.search(strCallId):
-            try:
-                return data[0:reCallId.start()] + RE_EMAIL.sub('[FROM_TAG]@[SOURCE]', reCallId.group()) + data[reCallId.end():]
-            except:
-                LOG.e('__templateCallId except 1:\n%s' % (data))
-                return data
-        else:
-            try:
-                return data[0:reCallId.start()] + 'Call-ID: [FROM_TAG]@[SOURCE]' + data[reCallId.end():]
-            except:
-                LOG.e('__templateCallId except 2:\n%s' % (data))
-                return data
-
-
-    def __templateContentLength(self, data):
-        reContentLength = RE_SIP_CONTENT_LENGTH.search(data)
-        try:
-            return data[0:reContentLength.start()] + 'Content-Length: [LENGTH]' + data[reContentLength.end():]
-        except:
-            LOG.e('__templateContentLength except:\n%s' % (data))
-            return data
-
-
-    def __deleteRoute(self, data):
-        reRoute = RE_SIP_ROUTE.search(data)
-        try:
-            tempStart = reRoute.start()
-            if data[tempStart-1] == '\n':
-                if data[tempStart-2] == '\r':
-                    tempStart = tempStart-2
-                else:
-                    tempStart = tempStart-1
-            return data[0:tempStart] + data[reRoute.end():]
-        except:
-            return data
-
-
-    def __deleteDiversion(self, data):
-        reDiversion = RE_SIP_DIVERSION.search(data)
-        try:
-            tempStart = reDiversion.start()
-            if data[tempStart-1] == '\n':
-                if data[tempStart-2] == '\r':
-                    tempStart = tempStart-2
-                else:
-                    tempStart = tempStart-1
-            return data[0:tempStart] + data[reDiversion.end():]
-        except:
-            return data
-
-
-    def __deleteRecordRoute(self, data):
-        reRecordRoute = RE_SIP_RECORD_ROUTE.search(data)
-        try:
-            tempStart = reRecordRoute.start()
-            if data[tempStart-1] == '\n':
-                if data[tempStart-2] == '\r':
-                    tempStart = tempStart-2
-                else:
-                    tempStart = tempStart-1
-            return data[0:tempStart] + data[reRecordRoute.end():]
-        except:
-            return data
-
-
-    def __templateSdpSourceIpAddress(self, data):
-        reV = RE_SDP_V.search(data)
-
-        strSdp = ''
-        posSdp = 0
-        try:
-            psSdp = reV.start()
-            strSdp = data[reV.start():]
-        except:
-            return data
-
-        try:
-            return data[0:psSdp] + RE_IP.sub('[SOURCE]', strSdp)
-        except:
-            return data
-
-    def __templateSdpO(self, data):
-        reO = RE_SDP_O.search(data)
-        try:
-            return data[0:reO.start()] + RE_IP.sub('[SOURCE]', reO.group()) + data[reO.end():]
-        except:
-            LOG.e('__templateSdpO except:\n%s' % (data))
-            return data
-
-
-    def __templateSdpM(self, data):
-        reM = RE_SDP_M.search(data)
-        try:
-            return data[0:reM.start()] + RE_SDP_M_AUDIO.sub('audio [AUDIO_PORT]', reM.group()) + data[reM.end():]
-        except:
-            LOG.e('__templateSdpM except:\n%s' % (data))
-            return data
-
-
-def washIvrPromptStr(ivrPromptStr, udpType=UDP_TYPE_RTP_IVR_SPEAK_PROMPT, completely=True):
-    """
-    [Function]
-    wash IVR prompt string to make it only file name
-
-    [Argument]
-    ivrPromptStr: IVR prompt string
-    udpType: the udp type of this packet, default is UDP_TYPE_RTP_IVR_SPEAK_PROMPT
-    completely: need transfer the prompt string to lower? default is True
-
-    [Return]
-    (udpType, the-washed-IVR-prompt-string)
-    """
-
-    tempIvrPromptStr = ivrPromptStr.replace('\\', '/')
-    try:
-        tempIvrPromptStr = tempIvrPromptStr[tempIvrPromptStr.rindex('/')+1:]
-    except ValueError:
-        LOG.w("There is no '\\' or '/' in IVR prompt string")
-
-    if completely:
-        tempIvrPromptStr = tempIvrPromptStr.lower()
-
-    if udpType!=UDP_TYPE_RTP_IVR_SPEAK_PROMPT:
-        return (udpType, tempIvrPromptStr)
-    #else:
-
-    # There is a bug in IVR autotest !!!
-    if len(tempIvrPromptStr)>8 and (tempIvrPromptStr.find('!')>=0 \
-            or tempIvrPromptStr.find('@')>=0 \
-            or tempIvrPromptStr.find('#')>=0 \
-            or tempIvrPromptStr.find('$')>=0 \
-            or tempIvrPromptStr.find('%')>=0 \
-            or tempIvrPromptStr.find('^')>=0 \
-            or tempIvrPromptStr.find('&')>=0 \
-            or tempIvrPromptStr.find('*')>=0 \
-            or tempIvrPromptStr.find('(')>=0 \
-            or tempIvrPromptStr.find(')')>=0 \
-            or tempIvrPromptStr.find('-')>=0 \
-            or tempIvrPromptStr.find('+')>=0 \
-            or tempIvrPromptStr.find('=')>=0):
-        LOG.w("This string '%s' seems a record file" % (tempIvrPromptStr))
-        return (UDP_TYPE_RTP_IVR_RECORD_FILE, tempIvrPromptStr)
-    if len(tempIvrPromptStr)>5 and tempIvrPromptStr[1].isdigit():
-        tempIvrPromptStr = tempIvrPromptStr[2:]
-    else:
-        LOG.w("This string '%s' seems not a prompt" % (tempIvrPromptStr))
-
-    return (UDP_TYPE_RTP_IVR_SPEAK_PROMPT, tempIvrPromptStr)
-
-
-def getResponseCode(data):
-    reResponse = RE_SIP_RESPONSE.search(data)
-    strResponse = reResponse.group()
-    reResponseCode = RE_SIP_RESPONSE_CODE.search(strResponse)
-    strResponseCode = reResponseCode.group()
-    return strResponseCode
-
-
-def getToTag(data):
-    reTo = RE_SIP_TO.search(data)
-    strTo = reTo.group()
-    reTag = RE_SIP_TAG.search(strTo)
-
-    try:
-        strTag = reTag.group()
-        return strTag[strTag.index('=')+1:].strip()
-    except:
-        return ''
-
-
-def getSdpMediaPort(data):
-    strM = RE_SDP_M.search(data).group()
-    strAudio = RE_SDP_M_AUDIO.search(strM).group()
-    return int(RE_INT.search(strAudio).group())
-
-
-def getTelephoneEventStr(data):
-    return RE_SDP_TELEPHONE_EVENT.search(data).group()
-
-
-def getTelephoneEventPtFromSdp(data):
-    strTelephoneEvent = RE_SDP_TELEPHONE_EVENT.search(data).group()
-    strRtpmap = RE_SDP_RTPMAP.search(strTelephoneEvent).group()
-    return int(RE_INT.search(strRtpmap).group())
-
-
-def getFmtpForTelephoneEvent(data, telephoneEventPt):
-    re_fmtp_telephone_event = re.compile(r'a=fmtp:%d.*' % (telephoneEventPt))
-    return re_fmtp_telephone_event.search(data).group()
-
-
-def getFromTag(data):
-    reFrom = RE_SIP_FROM.search(data)
-    strFrom = reFrom.group()
-    reTag = RE_SIP_TAG.search(strFrom)
-    strTag = reTag.group()
-
-    return strTag[strTag.index('=')+1:].strip()
-
-
-def getCallId(data):
-    reCallId = RE_SIP_CALL_ID.search(data)
-    strCallId = reCallId.group()
-
-    try:
-        tempAtPos = strCallId.index('@')
-        return strCallId[strCallId.index(':')+1:tempAtPos].strip()
-    except ValueError:
-        return strCallId[strCallId.index(':')+1:].strip()
-
-
-def getCallIdStr(data):
-    return RE_SIP_CALL_ID.search(data).group()
-
-
-def getCSeqStr(data):
-    return RE_SIP_CSEQ.search(data).group()
-
-
-def getFromStr(data):
-    return RE_SIP_FROM.search(data).group()
-
-
-def getToStr(data):
-    return RE_SIP_TO.search(data).group()
-
-
-def getSipSdp(data):
-    reV = RE_SDP_V.search(data)
-    try:
-        return data[0:reV.start()].strip(), data[reV.start():].strip()
-    except:
-        return data, ''
-
-
-def getViasList(data):
-    return RE_SIP_VIA.findall(data)
-
-
-def getCalledNumberFromRequestHead(reInvite):
-    reSipUri = RE_EMAIL.search(reInvite.group())
-    strSipUri = reSipUri.group()
-
-    try:
-        tempAtPos = strSipUri.index('@')
-        return strSipUri[:tempAtPos].strip()
-    except ValueError:
-        return strSipUri.strip()
-
-
-def getCalledNumberFromRequestHead2(data):
-    reInvite = RE_SIP_INVITE.search(data)
-    reSipUri = RE_EMAIL.search(reInvite.group())
-    strSipUri = reSipUri.group()
-
-    try:
-        tempAtPos = strSipUri.index('@')
-        return strSipUri[:tempAtPos].strip()
-    except ValueError:
-        return strSipUri.strip()
-
-
-def getCallingNumberFromContactOrFrom(data):
-    strNumber = getCallingNumberFromContact(data)
-    if strNumber=='':
-        return getCallingNumberFromFrom(data)
-    else:
-        return strNumber
-
-
-def getCallingNumberFromContact(data):
-    reContact = RE_SIP_CONTACT.search(data)
-    reSipUri = RE_EMAIL.search(reContact.group())
-    strSipUri = ''
-    try:
-        strSipUri = reSipUri.group()
-    except AttributeError:
-        return ''
-
-    try:
-        tempAtPos = strSipUri.index('@')
-        return strSipUri[:tempAtPos].strip()
-    except ValueError:
-        return strSipUri.strip()
-
-
-def getCallingNumberFromFrom(data):
-    reFrom = RE_SIP_FROM.search(data)
-    reSipUri = RE_EMAIL.search(reFrom.group())
-    strSipUri = ''
-    try:
-        strSipUri = reSipUri.group()
-    except AttributeError:
-        return ''
-
-    try:
-        tempAtPos = strSipUri.index('@')
-        return strSipUri[:tempAtPos].strip()
-    except ValueError:
-        return strSipUri.strip()
-
-
-def getIpAddressFromRequestHead(data):
-    reInvite = RE_SIP_INVITE.search(data)
-
-    try:
-        reIpAddress = RE_IP.search(reInvite.group())
-        return reIpAddress.group().strip()
-    except ValueError:
-        reSipUri = RE_EMAIL.search(reInvite.group())
-        strSipUri = reSipUri.group()
-        tempAtPos = strSipUri.index('@')
-        return strSipUri[tempAtPos+1:].strip()
-
-
-def getContactStr(data):
-    return RE_SIP_CONTACT.search(data).group()
-
-
-def setTelephoneEventPt(data, pt):
-    mp = data[1]
-    tempMp = chr(ord(mp)&0x80 + pt)
-    return data[0]+tempMp+data[2:]
-
-
-def quicklyGetPt(rtp):
-    """
-    please refer to parseRtp
-    """
-
-    try:
-        mp = struct.unpack('B', rtp[1:2])[0]
-        return int(mp & 0x7f)
-    except:
-        return -1
-
-
-def quicklyGetTimestamp(rtp):
-    """
-    please refer to parseRtp
-    """
-
-    try:
-        timestamp = struct.unpack('!I', rtp[4:8])[0]
-        return int(timestamp)
-    except:
-        return -1
-
-
-def parseRtp(rtp, telephoneEventPtInSdp=None, packetIndex=None):
-    """
-    [Function]
-    Parse RTP content
-
-    [Argument]
-    rtp: the RTP packet data
-    telephoneEventPtInSdp: 2833's payload type in SDP
-    packetIndex: packet index, used for debug to print the packet index
-
-    [Return]
-    payloadType, rtpTimestamp, extendedData
-    Note:
-    1. if payload is 2833, extendedData will be event
-    2. if payload is IVR private record file event, extendedData will be Record File
-    3. if payload is IVR private prompt, extendedData will be a tuple (promptType, prompt)
-    3. otherwise extendedData will be None
-
-    [See Also]
-    ########################################################
-    # RFC 3550
-    # http://www.rfc-editor.org/rfc/rfc3550.txt
-    ########################################################
-    """
-
-    if '-vf' in sys.argv:
-        print
-        print '-'*50, ' RTP --',
-        if packetIndex:
-            print str(packetIndex), '--'
-
-    iStart = 0
-    iEnd = 0
-
-    # 1. version (V): 2 bits
-    # 2. padding (P): 1 bit
-    # 3. extension (X): 1 bit
-    # 4. CSRC count (CC): 4 bits
-    # = 1 octet
-    iEnd = iStart+1
-    vpec = struct.unpack('B', rtp[iStart:iEnd])[0]
-
-    version = vpec >> 6
-    if '-vf' in sys.argv:
-        print 'version:', version
-
-    padding = (vpec >> 5) & 0x1
-    if '-vf' in sys.argv:
-        print 'padding:', padding
-
-    extension = (vpec >> 4) & 0x1
-    if '-vf' in sys.argv:
-        print 'extension:', extension
-
-    cc = vpec & 0xf
-    if '-vf' in sys.argv:
-        print 'CSRC count:', cc
-    iStart = iEnd
-
-    # 5. marker (M): 1 bit
-    # 6. payload type (PT): 7 bits
-    # = 1 octet
-    iEnd = iStart+1
-    mp = struct.unpack('B', rtp[iStart:iEnd])[0]
-
-    marker = mp >> 7
-    if '-vf' in sys.argv:
-        print 'marker:', marker
-
-    pt = mp & 0x7f
-    if '-vf' in sys.argv:
-        print 'payload type (PT):', pt
-    iStart = iEnd
-
-    # 7. sequence number: 16 bits (2 octet)
-    iEnd = iStart+2
-    sequenceNumber = struct.unpack('!H', rtp[iStart:iEnd])[0]
-    if '-vf' in sys.argv:
-        print 'sequence number:', sequenceNumber
-    iStart = iEnd
-
-    # 8. timestamp: 32 bits (4 octet)
-    iEnd = iStart+4
-    timestamp = struct.unpack('!I', rtp[iStart:iEnd])[0]
-    if '-vf' in sys.argv:
-        print 'timestamp:', timestamp
-    iStart = iEnd
-
-    # 9. SSRC: 32 bits (4 octet)
-    iEnd = iStart+4
-    ssrc = struct.unpack('!I', rtp[iStart:iEnd])[0]
-    if '-vf' in sys.argv:
-        print 'SSRC:', ssrc
-    iStart = iEnd
-
-    # 10. CSRC list: 0 to 15 items, 32 bits each
-    if cc>15:
-        if '-vf' in sys.argv:
-            print 'CSRC count overflow'
-        raise 'CSRC count overflow'
-
-    if cc>0:
-        csrcIndex = 0
-        while csrcIndex < cc-1:
-            iEnd = iStart+4
-            csrc = struct.unpack('!I', rtp[iStart:iEnd])[0]
-            if '-vf' in sys.argv:
-                print 'CSRC - ', csrcIndex, ':', csrc
-            csrcIndex += 1
-            iStart = iEnd
-
-    # 11. RTP Header Extension
-    if extension==1:
-        if '-vf' in sys.argv:
-            print 'RTP Header Extension -'
-
-        # 11.1. defined by profile: 2 octet
-        iEnd = iStart+2
-        dbp = struct.unpack('B'*2, rtp[iStart:iEnd])
-        if '-vf' in sys.argv:
-            print 'defined by profile:', dbp
-        iStart = iEnd
-
-        # 11.2. length: 2 octet
-        iEnd = iStart+2
-        length = struct.unpack('!H', rtp[iStart:iEnd])[0]
-        if '-vf' in sys.argv:
-            print 'length:', length
-        iStart = iEnd
-
-        extensionIndex = 0
-        while extensioinIndex < length:
-            iEnd = iStart+4
-            extensionData = struct.unpack('B'*4, rtp[iStart:iEnd])
-            if '-vf' in sys.argv:
-                print 'extension -', extensionIndex, ':', extensionData
-            extensionIndex += 1
-            iStart = iEnd
-
-    # 12. payload
-    payload = rtp[iStart:]
-
-    if pt==telephoneEventPtInSdp:
-        tempEvent = parse2833Event(payload)
-        return (pt, timestamp, tempEvent)
-    elif pt==PAYLOAD_TYPE_G711:
-        if '-vf' in sys.argv:
-            print 'G.711 payload:'
-            print tuple2Hex(struct.unpack('B'*len(payload), payload))
-        return (pt, timestamp, None)
-    elif pt==PAYLOAD_TYPE_IVR_RECORD_FILE:
-        tempRecordFile = parseRecordFileEvent(payload)
-        return (pt, timestamp, tempRecordFile)
-    elif pt==PAYLOAD_TYPE_IVR_PROMPT:
-        tempPromptList = parsePromptEvent(payload)
-        return (pt, timestamp, tempPromptList)
-    elif pt==PAYLOAD_TYPE_COMFORT_NOISE:
-        return (pt, timestamp, None)
-    else:
-        LOG.i('Unknow payloadtype %d' % (pt))
-        return (pt, timestamp, None)
-
-
-def parse2833Event(payload):
-    """
-    [Function]
-    Parse 2833 RTP event's content
-
-    [Argument]
-    payload: the payload content data
-
-    [Return]
-    2833 event
-
-    [See Also]
-    ########################################################
-    # RFC 2833
-    # http://www.faqs.org/rfcs/rfc2833.html
-    ########################################################
-    """
-
-    if '-vf' in sys.argv:
-        print '-- RFC2833 --'
-
-    iStart = 0
-    iEnd = 0
-
-    # 1. event: 1 octet
-    iEnd = iStart+1
-    event = struct.unpack('B', payload[iStart:iEnd])[0]
-    if '-vf' in sys.argv:
-        print 'event:', event
-    iStart = iEnd
-
-    # 2. End of Event: 1 bit
-    # 3. Reserved: 1 bit
-    # 4. Volume: 6 bits
-    # = 1 octet
-    iEnd = iStart+1
-    erv = struct.unpack('B', payload[iStart:iEnd])[0]
-
-    eoe = erv >> 7
-    if '-vf' in sys.argv:
-        print 'End of Event:', eoe
-
-    reserved = (erv >> 6) & 0x1
-    if '-vf' in sys.argv:
-        print 'Reserved:', reserved
-
-    volume = erv & 0x3f
-    if '-vf' in sys.argv:
-        print 'Volume:', volume
-    iStart = iEnd
-
-    # 5. duration: 2 octet
-    iEnd = iStart+2
-    duration = struct.unpack('!H', payload[iStart:iEnd])[0]
-    if '-vf' in sys.argv:
-        print 'duration:', duration
-    iStart = iEnd
-
-    return event
-
-
-def parseRecordFileEvent(payload):
-    """
-    [Function]
-    Parse IVR's private Record File Event
-
-    [Argument]
-    payload: the payload content data
-
-    [Return]
-    Record File
-    """
-
-    tempRecordFile = str(payload[1:])
-    tempEndPos = tempRecordFile.find('\0')
-    tempRecordFile = tempRecordFile[0:tempEndPos]
-    if '-vf' in sys.argv:
-        print 'Record File:', tempRecordFile
-
-    return tempRecordFile
-
-
-def parsePromptEvent(payload):
-    """
-    [Function]
-    Parse IVR's private Prompt Event
-
-    [Argument]
-    payload: the payload content data
-
-    [Return]
-    a list of tuple (promptType, prompt)
-    """
-
-    tempList = []
-    tempPromptCount = struct.unpack('B', payload[0])[0]
-    #print 'tempPromptCount: %d' % (tempPromptCount)
-
-    tempPayloadList = payload[1:].strip().split('\0')
-    # remove all empty line in the list
-    while True:
-        try:
-            tempPayloadList.remove('')
-        except ValueError:
-            break
-
-    if len(tempPayloadList)<tempPromptCount:
-        LOG.a('Lack prompt(s) in the payload')
-        raise
-
-    tempPrompt = ''
-    tempPromptIndex = 0
-
-    while tempPromptIndex<tempPromptCount:
-        tempPrompt = tempPayloadList[tempPromptIndex]
-        tempPromptIndex += 1
-
-        if '-vf' in sys.argv:
-            print 'Prompt:', tempPrompt
-
-        if tempPrompt.find('speak.vox')>-1:
-            tempList.append((PROMPT_TYPE_SPEAK, tempPrompt))
-        elif tempPrompt.find('system32.vox')>-1:
-            tempList.append((PROMPT_TYPE_SYSTEM, tempPrompt))
-        elif tempPrompt.find('rectone')>-1:
-            tempList.append((PROMPT_TYPE_RECORD_TONE, tempPrompt))
-        else:
-            LOG.e('Unknow Prompt Type: %s' % (tempPrompt))
-
-    return tempList
-
-
-def caseNameToCacheName(fileName):
-    """
-    [Function]
-    Change case name to cache name, e.g. /home/anthony/simulators/sip/voicebird/case/auto.snoop => /home/anthony/simulators/sip/voicebird/cache/auto
-
-    [Argument]
-    fileName: the file name which in the dir case
-
-    [Return]
-    return cache name in the dir cache
-    """
-
-    absPathOfDirCase = os.path.abspath(DIR_CASE)
-    absPathOfDirCache = os.path.abspath(DIR_CACHE)
-
-    #print 'absPathOfDirCase:', absPathOfDirCase
-    #print 'absPathOfDirCache:', absPathOfDirCache
-    #print 'fileName:', fileName
-
-    cacheName = os.path.splitext(absPathOfDirCache + fileName.replace(absPathOfDirCase, ''))[0]
-
-    #print 'cacheName:', cacheName
-
-    return cacheName
-
-
-def cacheNameToCaseName(fileName):
-    """
-    [Function]
-    Change cache name to case name, e.g. /home/anthony/simulators/sip/voicebird/cache/auto.sfi => /home/anthony/simulators/sip/voicebird/case/auto
-
-    [Argument]
-    fileName: the file name which in the dir cache
-
-    [Return]
-    return case name in the dir cache
-    """
-
-    absPathOfDirCase = os.path.abspath(DIR_CASE)
-    absPathOfDirCache = os.path.abspath(DIR_CACHE)
-
-    caseName = os.path.splitext(absPathOfDirCase + fileName.replace(absPathOfDirCache, ''))[0]
-    return caseName
-
-
-def loadCaseInfoFromCase(snoopFileName):
-    return loadCaseInfoFromCache(caseNameToCacheName(snoopFileName))
-
-
-def loadCaseInfoFromCache(cacheName):
-    """
-    [Function]
-    Load CaseInformation from cache
-
-    [Argument]
-    cacheName: cache name, e.g. /home/anthony/simulators/sip/voicebird/cache/auto
-
-    [Return]
-    return CaseInformation if exist, otherwise return None
-    """
-
-    cifFileName = cacheName+CASE_INFORMATION_FILE_EXT
-
-    if os.path.exists(cifFileName):
-        cifFile = file(cifFileName, 'rb')
-        sfi = pickle.load(cifFile)
-        cifFile.close()
-        return sfi
-    else:
-        return None
-
-
-def getDialogNumbersFromCache(cacheName):
-    cif = loadCaseInfoFromCache(cacheName)
-
-    return cif.dialogNumbers
-
-
-def loadDialogPacketsListFromCache(cacheName):
-    """
-    [Function]
-    Load DialogPacketsList from cache
-
-    [Argument]
-    cacheName: cache name, e.g. /home/anthony/simulators/sip/voicebird/cache/auto
-
-    [Return]
-    return DialogPacketsList
-    """
-
-    dplFileName = cacheName+DIALOG_PACKETS_LIST_FILE_EXT
-
-    dplFile = file(dplFileName, 'rb')
-    dpl = pickle.load(dplFile)
-    dplFile.close()
-
-    LOG.i("'%s' has %d dialogs" % (dplFileName, len(dpl)))
-
-    return dpl
-
-
-fuzzyPromptsDict = {}
-def getFuzzyPrompts():
-    """
-    [Function]
-    get fuzzy prompts from fuzzy prompts config file
-
-    [Argument]
-    (N/A)
-
-    [Return]
-    (N/A)
-    """
-
-    if not os.path.exists(FUZZY_PROMPTS_FILE):
-        LOG.i("There is no '%s'" % (FUZZY_PROMPTS_FILE))
-        return
-
-    fileobj = file(FUZZY_PROMPTS_FILE, 'r')
-
-    try:
-        while True:
-            tempPair = fileobj.readline()
-            # EOF
-            if not tempPair:
-                break
-            # else:
-
-            tempPair = tempPair.strip().lower()
-            if tempPair.startswith(ANNOTATION_CHAR) or len(tempPair)==0:
-                continue
-
-            tempElements = tempPair.split(':')
-            for element in tempElements:
-                fuzzyPromptsDict[element] = tempElements
-
-        if len(fuzzyPromptsDict)>0:
-            LOG.writeLog('-- Fuzzy Prompts Dict --\n' + str(fuzzyPromptsDict))
-        else:
-            LOG.i('There is no fuzzy prompts defined')
-    finally:
-        fileobj.close()
-
-
-callParameters = None
-def getParameters():
-    """
-    [Function]
-    Get parameters from command input
-
-    [Argument]
-    (N/A)
-
-    [Return]
-    (N/A)
-    """
-
-    global callParameters
-
-    useDefault = False
-    # PARAMETER -y: Yes, means all to say yes for the questions
-    gotYes = ('-y' in sys.argv) and os.path.exists(CALL_PARAMETERS_CONFIG_FILE)
-
-    try:
-        parameterFile = file(CALL_PARAMETERS_CONFIG_FILE, 'rb')
-        parameters = pickle.load(parameterFile)
-
-        while not gotYes:
-            yesOrNo = raw_input('Do you want to use the old Call Parameters? [Y/N, default N]: ').strip().upper()
-            if yesOrNo=='':
-                yesOrNo = 'N'
-
-            if yesOrNo=='Y':
-                useDefault = True
-                break
-            elif yesOrNo=='N':
-                useDefault = False
-                break
-        else:
-            useDefault = True
-
-        parameterFile.close()
-    except KeyboardInterrupt:
-        raise KeyboardInterrupt
-    except:
-        # there is no config file found
-        parameters = Parameters()
-        print 'Please setup the following Call Parameters.'
-
-    if useDefault:
-        callParameters = parameters
-        return
-    #else:
-
-    while True:
-        tempDestination = raw_input('[ Mandatory ] The DESTINATION machine IP address or machine name [%s]: ' % (parameters.destination))
-        if tempDestination=='':
-            tempDestination = parameters.destination
-
-        tempDestination = tempDestination.strip()
-        try:
-            if tempDestination=='':
-                raise 'Empty destination'
-            socket.gethostbyname(tempDestination)
-        except KeyboardInterrupt:
-            raise KeyboardInterrupt
-        except:
-            print 'DESTINATION is invalid, please try again'
-        else:
-            break
-
-    tempCalledPrefix = raw_input("[ Optional  ] The called/redirect's PREFIX [%s]: " % (parameters.calledPrefix))
-    if tempCalledPrefix=='':
-        tempCalledPrefix = parameters.calledPrefix
-    tempCalledPrefix = tempCalledPrefix.strip()
-
-    while True:
-        tempCalledCount = raw_input('[ Mandatory ] How many called number? [%d]: ' % (parameters.calledCount))
-        if tempCalledCount=='':
-            tempCalledCount = str(parameters.calledCount)
-
-        tempCalledCount = tempCalledCount.strip()
-        if tempCalledCount.isdigit():
-            tempCalledCount = int(tempCalledCount)
-            if tempCalledCount<1:
-                print 'The min count is 1, please try again'
-                continue
-            else:
-                break
-        else:
-            print 'The COUNT must be a digit, please try again'
-            continue
-
-    while True:
-        tempCalled = raw_input('[ Mandatory ] The CALLED phone number [%s]: ' % (parameters.called))
-        if tempCalled=='':
-            tempCalled = parameters.called
-
-        tempCalled = tempCalled.strip()
-
-        if tempCalledCount<=1:
-            if tempCalled=='':
-                print 'CALLED is invalid, please try again'
-                contiue
-            else:
-                break
-        else:
-            if not tempCalled.isdigit():
-                print 'The called count is bigger than 1, so please make sure the begin called number is a digit'
-                continue
-            else:
-                break
-
-    while True:
-        tempSource = raw_input('[ Mandatory ] The SOURCE machine IP address [%s]: ' % (parameters.source))
-        if tempSource=='':
-            tempSource = parameters.source
-
-        tempSource = tempSource.strip()
-        try:
-            if RE_IP.search(tempSource).group()!=tempSource:
-                raise 'Invalid source'
-
-            socket.gethostbyname(tempSource)
-        except KeyboardInterrupt:
-            raise KeyboardInterrupt
-        except:
-            print 'SOURCE is invalid, please try again'
-        else:
-            break
-
-    tempCalling = raw_input('[ Optional  ] The CALLING phone number [%s]: ' % (parameters.calling))
-    if tempCalling=='':
-        tempCalling = parameters.calling
-    tempCalling = tempCalling.strip()
-
-    while True:
-        tempRedirectCount = raw_input('[ Mandatory ] How many redirect number? [%d]: ' % (parameters.redirectCount))
-        if tempRedirectCount=='':
-            tempRedirectCount = str(parameters.redirectCount)
-
-        tempRedirectCount = tempRedirectCount.strip()
-        if tempRedirectCount.isdigit():
-            tempRedirectCount = int(tempRedirectCount)
-            if tempRedirectCount<0:
-                print 'The min count is 0, please try again'
-                continue
-            else:
-                break
-        else:
-            print 'The COUNT must be a digit, please try again'
-            continue
-
-    if tempRedirectCount>0:
-        while True:
-            tempRedirect = raw_input('[ Mandatory ] The REDIRECT number [%s]: ' % (parameters.redirect))
-            if tempRedirect=='':
-                tempRedirect = parameters.redirect
-            tempRedirect = tempRedirect.strip()
-
-            if tempRedirectCount==1:
-                break
-            else:
-                if not tempRedirect.isdigit():
-                    print 'The redirect count is bigger than 1, so please make sure the begin redirect number is a digit'
-                    continue
-
-        if parameters.reason.strip()!='':
-            tempReason = raw_input('[ Mandatory ] The redirect REASON [unknown, user-busy, no-answer, unavailable, unconditional, out-of-service. DEFAULT: %s]: ' % (parameters.reason))
-        else:
-            tempReason = raw_input('[ Mandatory ] The redirect REASON [unknown, user-busy, no-answer, unavailable, unconditional, out-of-service]: ')
-        if tempReason=='':
-            tempReason = parameters.reason
-        tempReason = tempReason.strip()
-
-    while True:
-        if parameters.isStressTest:
-            defaultIsStressTest = 'Y'
-        else:
-            defaultIsStressTest = 'N'
-        tempIsStressTest = raw_input('[ Mandatory ] Do you want to do stress test? [%s]: ' % (defaultIsStressTest))
-        if tempIsStressTest=='':
-            tempIsStressTest = defaultIsStressTest
-
-        tempIsStressTest = tempIsStressTest.strip().upper()
-        if tempIsStressTest=='Y':
-            tempIsStressTest = True
-            break
-        elif tempIsStressTest=='N':
-            tempIsStressTest = False
-            break
-
-    tempChannelCount = 1
-    while tempIsStressTest:
-        tempChannelCount = raw_input('[ Mandatory ] How many channels? [%d]: ' % (parameters.channelCount))
-        if tempChannelCount=='':
-            tempChannelCount = str(parameters.channelCount)
-
-        tempChannelCount = tempChannelCount.strip()
-        if tempChannelCount.isdigit():
-            tempChannelCount = int(tempChannelCount)
-            if tempChannelCount<1:
-                print 'The min Channel Count is 1, please try again'
-                continue
-            else:
-                break
-        else:
-            print 'The Channel Count must be a digit, please try again'
-            continue
-
-    parameters.destination = tempDestination
-    parameters.calledPrefix = tempCalledPrefix
-    parameters.calledCount = tempCalledCount
-    parameters.called = tempCalled
-    parameters.source = tempSource
-    parameters.calling = tempCalling
-
-    parameters.redirectCount = tempRedirectCount
-    if tempRedirectCount>0:
-        parameters.redirect = tempRedirect
-        parameters.reason = tempReason
-
-    parameters.isStressTest = tempIsStressTest
-    parameters.channelCount = tempChannelCount
-
-    if not os.path.exists(DIR_CONFIG):
-        os.makedirs(DIR_CONFIG)
-    parameterFile = file(CALL_PARAMETERS_CONFIG_FILE, 'wb')
-    pickle.dump(parameters, parameterFile)
-    parameterFile.close()
-
-    callParameters = parameters
-
-
-def getSnoopFilesFromDir(dir):
-    """
-    [Function]
-    get all snoop files from a dir and its sub-dir (sub...sub-dir) with special ext
-
-    [Argument]
-    dir: the directory
-
-    [Return]
-    return a list includes all snoop files
-    """
-
-    tempAbsdir = os.path.abspath(dir)
-    tempAllFiles = os.listdir(dir)
-    tempSnoopFiles = []
-    for f in tempAllFiles:
-        tempName = tempAbsdir+'/'+f
-        if os.path.isfile(tempName):
-            if os.path.splitext(tempName)[1].lower()==SNOOP_FILE_EXT:
-                tempSnoopFiles.append(tempName)
-        elif os.path.isdir(tempName):
-            tempSnoopFiles += getSnoopFilesFromDir(tempName)
-
-    #print tempSnoopFiles
-    return tempSnoopFiles
-
-
-promptBookDict = None
-def loadPromptBookDict():
-    global promptBookDict
-
-    if not os.path.exists(BOOK_DB_FILE):
-        return None
-    #else:
-
-    bookDbFile = file(BOOK_DB_FILE, 'rb')
-    promptBookDict = pickle.load(bookDbFile)
-    bookDbFile.close()
-
-
-def getPromptContentById(promptId):
-    global promptBookDict
-
-    if not promptBookDict:
-        return ''
-    #else:
-
-    tempPromptId = promptId.lower()
-    if promptBookDict.has_key(tempPromptId):
-        return promptBookDict[tempPromptId]
-    else:
-        return ''
-
-
-def getSnoopFilesFromList(testCaseListFile):
-    """
-    [Function]
-    get all snoop files according to the test case list file
-
-    [Argument]
-    testCaseListFile: the test case list file with special ext
-
-    [Return]
-    return a list includes all snoop files listed in the test case list file
-    """
-
-    try:
-        dir = os.path.split(testCaseListFile)[0]
-        if dir=='':
-            dir = os.path.abspath(testCaseListFile)
-
-        fileobj = file(testCaseListFile, 'r')
-
-        snoopFilesList = []
-        while True:
-            tempName = fileobj.readline()
-            # EOF
-            if not tempName:
-                break
-            # else:
-
-            tempName = tempName.strip()
-
-            if tempName.startswith(ANNOTATION_CHAR) or len(tempName)==0:
-                continue
-
-            tempName = dir+'/'+tempName
-            if os.path.exists(tempName):
-                if os.path.isfile(tempName):
-                    tempExtName = os.path.splitext(tempName)[1].lower()
-                    if tempExtName==SNOOP_FILE_EXT:
-                        snoopFilesList.append(tempName)
-                    elif tempExtName==CASE_LIST_FILE_EXT:
-                        snoopFilesList += getSnoopFilesFromList(tempName)
-                elif os.path.isdir(tempName):
-                    snoopFilesList += getSnoopFilesFromDir(tempName)
-            else:
-                print "'%s' doesn't exist" % (tempName)
-
-        #print snoopFilesList
-        return snoopFilesList
-    finally:
-        fileobj.close()
-
-
-def getSnoopFiles():
-    gotFileDir = True
-    try:
-        # PARAMETER -f: File, means to enter file or dir
-        tempName = sys.argv[sys.argv.index('-f')+1]
-    except ValueError:
-        tempName = DIR_CASE
-
-    while True:
-        if not gotFileDir:
-            tempName = raw_input('Enter the snoop-file/directory/case-list-file(.cl): ').strip()
-
-        if not os.path.exists(tempName):
-            print "'"+tempName+"' is a invalid file or dir, please try again"
-            gotFileDir = False
-            continue
-
-        tempName = os.path.abspath(tempName)
-        tempAbspathOfDirCase = os.path.abspath(DIR_CASE)
-        if not tempName.startswith(tempAbspathOfDirCase):
-            print "The file or dir must in '%s', please take another one" % (tempAbspathOfDirCase)
-            gotFileDir = False
-            continue
-
-        if os.path.isfile(tempName):
-            tempExtName = os.path.splitext(tempName)[1].lower()
-            # 1. it's a normal snoop file
-            if tempExtName==SNOOP_FILE_EXT:
-                tempFiles = [tempName]
-                break
-            elif tempExtName==CASE_LIST_FILE_EXT:
-            # 2. it's a test case list file
-                tempFiles = getSnoopFilesFromList(tempName)
-                if len(tempFiles)<1:
-                    print 'There is no snoop file found according to the case list file', tempName
-                    gotFileDir = False
-                    continue
-                else:
-                    break
-        elif os.path.isdir(tempName):
-            # 3. it's a directory
-            tempFiles = getSnoopFilesFromDir(tempName)
-            if len(tempFiles)<1:
-                print 'There is no snoop file in', tempName
-                print "Please make sure the snoop file with the ext '%s'" % (SNOOP_FILE_EXT)
-                gotFileDir = False
-                continue
-            else:
-                break
-
-        # else:
-        print 'Please make sure your enter is snoop file or dir includes snoop file(s) or case list file with ext', CASE_LIST_FILE_EXT
-        gotFileDir = False
-        continue
-
-    return tempFiles
-
-
-def checkPythonVersion():
-    if sys.version[:3] not in SUPPORT_PYTHON_VERSIONS:
-        print """ERROR!
-  The python's version of this machine is %d.%d
-  But this tool can only run in python version %s
-""" % (sys.version_info[0], sys.version_info[1], ' or '.join(SUPPORT_PYTHON_VERSIONS))
-        return False
-    else:
-        return True
-
-
-def main():
-    print 'Voicebird: version %.2f. Author: Anthony Xu (cabernet1976@163.com)' % (VOICEBIRD_VERSION)
-    print
-
-    if not checkPythonVersion():
-        return
-
-    # PARAMETER -h: Help
-    if '-h' in sys.argv:
-        print \
-"""OPTIONAL PARAMETERS:
-    -h
-        get help information
-
-    -f [SNOOP_FILE or DIR or CASE_LIST_FILE]
-        tell Voicebird to read which snoop file, dir or case list file (.cl). Voicebird will read
-        all cases in sub-dir case/ by default without this parameter
-
-    -y
-        with this parameter, Voicebird will bypass asking to set up the Call Parameter and use the
-        saved Call Parameters in config file
-
-    -nf
-        no call flow will be drawed in the screen when function testing. Note: Voicebird will not
-        draw call flow when stress testing
-
-    -nd
-        no debug information will be write to log file. Voicebird will write log file by default
-        without this parameter
-
-    -vf -vp
-        print snoop file's content in the screen, please use like that
-        'python voicebird.pyc -f case/1.snoop -vf -vp > content.txt'
-
-    -fp
-        Force to Parse every case snoop file, without this parameter (default) system will first
-        choice to use the cached
-
-    -pai
-        P-Asserted-Identity
-
-    -fdn [FROM_DISPLAY_NAME]
-        set From's display name of INVITE message
-
-    -cfdn
-        Clear From's display name of INVITE message
-
-CALL PARAMETERS:
-    1.  If there is no command line parameter -y, Voicebird will display a Command Line UI to ask
-        setting the Call Parameters
-
-    2.  The case can use its own call parameters with a xml file
-
-TIPS:
-    Exit by Ctrl+C at anytime"""
-        return
-
-    try:
-        # 1.
-        createLogObj()
-
-        # 2.
-        tempFiles = getSnoopFiles()
-        snoopParser = SnoopParser(tempFiles)
-        caseList = snoopParser.getCaseList()
-
-        if '-vf' in sys.argv or '-vp' in sys.argv:
-            return
-        #else
-
-        # 3.
-        getParameters()
-        getFuzzyPrompts()
-        loadPromptBookDict()
-
-        LOG.writeLog('-- Call Parameters are as below --\n' + str(callParameters))
-
-        if '-y' not in sys.argv:
-            yesOrNo = raw_input('All data is ready, run? [Y/N, default Y]: ').strip().upper()
-            if yesOrNo=='':
-                yesOrNo = 'Y'
-
-            if yesOrNo=='N':
-                return
-
-            while yesOrNo!='Y':
-                yesOrNo = raw_input('Run? [Y/N, default Y]: ').strip().upper()
-                if yesOrNo=='':
-                    yesOrNo = 'Y'
-
-                if yesOrNo=='N':
-                    return
-
-        # 4.
-        distributor = Distributor(caseList)
-        distributor.doSelect()
-    except KeyboardInterrupt:
-        sys.exit(0)
-
-
-if __name__=='__main__':
-    main()
+import os
+import stat
+import shutil
+import sys
+import time
+import socket
+import struct
+import mmap
+import re
+import cPickle as pickle
+import threading
+import Queue
+import select
+import traceback
+import signal
+import errno
+import copy
+import collections
+import heapq
+import hashlib
+import fnmatch
+import zlib
+import bz2
+try:
+    import multiprocessing
+except ImportError:
+    # Note: multiprocessing is new in python 2.6, without it the cases are parsed one by one
+    multiprocessing = None
+try:
+    from os import scandir
+except ImportError:
+    try:
+        from scandir import scandir
+    except ImportError:
+        # Note: scandir is new in python 3.5, it is from the scandir package for python 2 if installed.
+        # Without it the dirs are listed by os.listdir and stat for each entry
+        scandir = None
+try:
+    # Note: lzma is not in the standard library of python 2, it is from backports.lzma if installed.
+    # The lzma of pyliblzma has another API, it is not used
+    from backports import lzma
+except ImportError:
+    try:
+        import lzma
+    except ImportError:
+        lzma = None
+if not hasattr(lzma, 'FORMAT_XZ'):
+    lzma = None
+
+
+####################
+# global consts
+####################
+VOICEBIRD_VERSION = 0.13
+CIF_VERSION = 11
+SUPPORT_PYTHON_VERSIONS = ('2.5', '2.6', '2.7')
+
+SNOOP_IDENTIFICATION_PATTERN_SNOOP = (0x73, 0x6E, 0x6F, 0x6F, 0x70, 0x00, 0x00, 0x00)
+SNOOP_VERSION_NUMBER = 2
+SNOOP_DATALINK_TYPE_ETHERNET = 4
+SNOOP_FILE_HEADER_LEN = 8+4+4
+SNOOP_PACKET_RECORD_HEADER_LEN = 6*4
+PCAP_MAGIC_NUMBER = 0xA1B2C3D4              # timestamp in microseconds
+PCAP_MAGIC_NUMBER_NANOSECOND = 0xA1B23C4D   # timestamp in nanoseconds
+PCAP_FILE_HEADER_LEN = 4+2+2+4+4+4+4
+PCAP_PACKET_RECORD_HEADER_LEN = 4*4
+PCAPNG_BLOCK_TYPE_SECTION_HEADER = 0x0A0D0D0A
+PCAPNG_BLOCK_TYPE_INTERFACE_DESCRIPTION = 1
+PCAPNG_BLOCK_TYPE_PACKET = 2                # obsolete, but still written by some old tools
+PCAPNG_BLOCK_TYPE_SIMPLE_PACKET = 3
+PCAPNG_BLOCK_TYPE_ENHANCED_PACKET = 6
+PCAPNG_BYTE_ORDER_MAGIC = 0x1A2B3C4D
+PCAPNG_BLOCK_HEADER_LEN = 4+4
+PCAPNG_SECTION_HEADER_LEN = 4+4+4+2+2+8
+PCAPNG_OPTION_END = 0
+PCAPNG_OPTION_IF_TSRESOL = 9
+PCAPNG_DEFAULT_TSRESOL = 6                  # 10^-6 second
+LINKTYPE_ETHERNET = 1
+LINKTYPE_LINUX_SLL = 113                    # "Linux cooked capture" of 'tcpdump -i any'
+LINUX_SLL_HEADER_LEN = 2+2+2+8+2
+CAPTURE_FORMAT_SNOOP = 0
+CAPTURE_FORMAT_PCAP = 1
+CAPTURE_FORMAT_PCAPNG = 2
+ETHERNET_HEADER_LEN = 6+6+2
+ETHERNET_TYPE_IP = 0x800
+IP_FIXED_HEADER_LEN = 20
+IP_PROTOCOL_UDP = 17
+UDP_HEADER_LEN = 8
+RTP_HEADER_LEN = 12
+SIP_PORTS = (5060, 5061)
+PAYLOAD_TYPE_G711 = 0
+PAYLOAD_TYPE_COMFORT_NOISE = 13
+# private payload types for IVR autotest
+PAYLOAD_TYPE_IVR_RECORD_FILE = 126
+PAYLOAD_TYPE_IVR_PROMPT = 127
+
+PROMPT_TYPE_SPEAK       = 1
+PROMPT_TYPE_SYSTEM      = 2
+PROMPT_TYPE_RECORD_TONE = 3
+
+UDP_TYPE_UNKNOW                 = -1
+UDP_TYPE_SIP                    = 0
+UDP_TYPE_RTP                    = 1
+UDP_TYPE_RTP_EVENT              = 2     # RFC 2833
+UDP_TYPE_RTP_IVR_RECORD_FILE    = 3
+UDP_TYPE_RTP_IVR_PROMPT         = 4
+UDP_TYPE_RTP_IVR_SPEAK_PROMPT   = UDP_TYPE_RTP_IVR_PROMPT + PROMPT_TYPE_SPEAK          # in speak.vox
+UDP_TYPE_RTP_IVR_SYSTEM         = UDP_TYPE_RTP_IVR_PROMPT + PROMPT_TYPE_SYSTEM         # in system32.vox
+UDP_TYPE_RTP_IVR_RECORD_TONE    = UDP_TYPE_RTP_IVR_PROMPT + PROMPT_TYPE_RECORD_TONE    # record tone
+
+SHORT_NAME_OF_IVR_EVENT = { UDP_TYPE_RTP_IVR_RECORD_FILE : 'r', \
+                            UDP_TYPE_RTP_IVR_SPEAK_PROMPT : 'p', \
+                            UDP_TYPE_RTP_IVR_SYSTEM : 's', \
+                            UDP_TYPE_RTP_IVR_RECORD_TONE : 't'}
+
+SIP_TYPE_UNKNOW = -1
+SIP_TYPE_INVITE = 0
+SIP_TYPE_ACK    = 1
+SIP_TYPE_BYE    = 2
+
+DEFAULT_SIP_PORT = 5060 # DON'T CHANGE IT EASILY
+MAGIC_SIP_URI = 'cabernet1976@163.com:'+str(DEFAULT_SIP_PORT)
+MAGIC_IP_AND_PORT = '127.0.0.1:'+str(DEFAULT_SIP_PORT)
+
+MIN_UDP_LEN = 1024
+
+# Regular Expression
+RE_INT = re.compile(r'\d+')
+RE_EMAIL = re.compile(r'\+*\w+([-+.]\w+)*@\w+([-.]\w+)*\.\w+([-.]\w+)*')
+RE_SIP_URI = re.compile(r'\+*\w+([-+.]\w+)*@\w+([-.]\w+)*\.\w+([-.]\w+)* *: *\d+\b')
+RE_SOURCE_SIP_PORT = re.compile(r'^:%d\b' % (DEFAULT_SIP_PORT))    # the port after [SOURCE] in Via and Contact
+# the headers (and their compact forms) whose [SOURCE] is where the IVR sends the responses and the requests to
+SIP_HEADERS_OF_SOURCE_PORT = ('via', 'v', 'contact', 'm')
+RE_IP = re.compile(r'\b(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\b')
+RE_IP_AND_PORT = re.compile(r'\b(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\b *: *\d+\b')
+RE_SIP_INVITE = re.compile(r'INVITE .+ SIP/2\.0')
+RE_SIP_RESPONSE = re.compile(r'SIP/2\.0 +\d\d\d.*')
+RE_SIP_RESPONSE_CODE = re.compile(r'\d\d\d')
+RE_SIP_100 = re.compile(r'SIP/2\.0 +100.*')
+RE_SIP_180 = re.compile(r'SIP/2\.0 +180.*')
+RE_SIP_183 = re.compile(r'SIP/2\.0 +183.*')
+RE_SIP_200 = re.compile(r'SIP/2\.0 +200.*')
+RE_SIP_ACK = re.compile(r'ACK .+ SIP/2\.0')
+RE_SIP_START_LINE = re.compile(r'SIP/2\.0 +(\d\d\d)|(\w+) +[^\r\n]+ SIP/2\.0')    # group 1: response code, group 2: method
+RE_SIP_BYE = re.compile(r'BYE .+ SIP/2\.0')
+RE_SIP_VIA = re.compile(r'Via *:.*SIP/2\.0/UDP.*')
+RE_SIP_FROM = re.compile(r'From *:.*tag *=.*')
+RE_SIP_FROM_DISPLAY = re.compile(r'".*"')
+RE_SIP_TAG = re.compile(r'tag *= *\w+')
+RE_SIP_TO = re.compile(r'To *: *.*')
+RE_SIP_CALL_ID = re.compile(r'Call-ID *: *.*')
+RE_SIP_CONTACT = re.compile(r'Contact *: *.*')
+RE_SIP_CONTENT_LENGTH = re.compile(r'Content-Length *: *.*')
+RE_SIP_CSEQ = re.compile(r'CSeq *: *\d+.*')
+RE_SIP_ROUTE = re.compile(r'Route *: *.*')
+RE_SIP_RECORD_ROUTE = re.compile(r'Record-Route *: *.*')
+RE_SIP_DIVERSION = re.compile(r'Diversion *: *.*')
+RE_SDP_V = re.compile(r'v=0\b')
+RE_SDP_O = re.compile(r'o=.*')
+RE_SDP_C = re.compile(r'c=.*')
+RE_SDP_M = re.compile(r'm=.*')
+RE_SDP_M_AUDIO = re.compile(r'audio +\d+')
+RE_SDP_RTPMAP = re.compile(r'rtpmap *: *\d+\b')
+RE_SDP_TELEPHONE_EVENT = re.compile(r'a=rtpmap:\d+ +telephone-event.*')
+
+# Precompiled structs, used with unpack_from() at offsets of the mapped snoop file
+STRUCT_SNOOP_FILE_HEADER = struct.Struct('!8sII')                   # identification pattern, version number, datalink type
+STRUCT_SNOOP_PACKET_RECORD_HEADER = struct.Struct('!IIIIII')        # original length, included length, packet record length, cumulative drops, timestamp seconds, timestamp microseconds
+STRUCT_ETHERNET_HEADER = struct.Struct('!6s6sH')                    # destination, source, type
+STRUCT_IP_HEADER = struct.Struct('!BBHHHBBH4s4s')                   # vhl, type of service, total length, identification, flags & fragment offset, ttl, protocol, header checksum, source, destination
+STRUCT_UDP_HEADER = struct.Struct('!HHHH')                          # source port, destination port, length, checksum
+STRUCT_RTP_HEADER = struct.Struct('!BBHII')                         # version & padding & extension & CSRC count, marker & payload type, sequence number, timestamp, SSRC
+STRUCT_RTP_EXTENSION_HEADER = struct.Struct('!HH')                  # defined by profile, length (count of 32 bits words)
+STRUCT_2833_EVENT = struct.Struct('!BBH')                           # event, end of event & reserved & volume, duration
+STRUCT_DPL_HEADER = struct.Struct('<8sHHI')                         # magic, version, reserved, dialogs count
+STRUCT_DPL_DIALOG = struct.Struct('<20sII')                         # SHA-1 digest of the dialog chunk, packets count, length of the dialog chunk
+STRUCT_CHUNK_HEADER = struct.Struct('<4sHHII')                      # magic, version, codec of the content after the header, packets count, runs count (0 in a run chunk)
+STRUCT_DPL_PACKET = struct.Struct('<IibbBBdIiHH4s4sIBHIiI')         # originalPacketIndex, dialogIndex, udpType, sipType, received, isTwin, delttime, rtpTimestamp, dtmf,
+                                                                    # sourcePort, destinationPort, sourceIp, destinationIp, offset in blob, length of timestamp, ivrEventStr, data
+                                                                    # (of the RTP header in blob if the payload is in a run), index of the run chunk (-1: data is in blob), index of the payload in the run
+STRUCT_LINUX_SLL_HEADER = struct.Struct('!HHH8sH')                  # packet type, ARPHRD type, address length, address, protocol
+# the following structs only peek some fields of the headers
+STRUCT_IP_PEEK = struct.Struct('!HB8xB')                            # type (of EthernetII or Linux cooked capture), vhl, protocol
+STRUCT_UDP_PORTS = struct.Struct('!HH')                             # source port, destination port
+# pcap and pcapng are written in the byte order of the capturing host, so there are structs for both byte orders
+STRUCTS_PCAP_FILE_HEADER = {'<': struct.Struct('<IHHiIII'), '>': struct.Struct('>IHHiIII')}         # magic number, major version, minor version, thiszone, sigfigs, snaplen, network
+STRUCTS_PCAP_PACKET_RECORD_HEADER = {'<': struct.Struct('<IIII'), '>': struct.Struct('>IIII')}      # timestamp seconds, timestamp microseconds (nanoseconds), included length, original length
+STRUCTS_PCAPNG_BLOCK_HEADER = {'<': struct.Struct('<II'), '>': struct.Struct('>II')}                # block type, block total length
+STRUCTS_PCAPNG_SECTION_HEADER = {'<': struct.Struct('<IHHq'), '>': struct.Struct('>IHHq')}          # byte order magic, major version, minor version, section length
+STRUCTS_PCAPNG_INTERFACE_DESCRIPTION = {'<': struct.Struct('<HHI'), '>': struct.Struct('>HHI')}     # link type, reserved, snaplen
+STRUCTS_PCAPNG_OPTION_HEADER = {'<': struct.Struct('<HH'), '>': struct.Struct('>HH')}               # option code, option length
+STRUCTS_PCAPNG_ENHANCED_PACKET = {'<': struct.Struct('<IIIII'), '>': struct.Struct('>IIIII')}       # interface id, timestamp high, timestamp low, captured length, original length
+STRUCTS_PCAPNG_PACKET = {'<': struct.Struct('<HHIIII'), '>': struct.Struct('>HHIIII')}              # interface id, drops count, timestamp high, timestamp low, captured length, original length
+STRUCTS_PCAPNG_SIMPLE_PACKET = {'<': struct.Struct('<I'), '>': struct.Struct('>I')}                 # original length
+# the fixed fields at the start of the block body, key: block type
+PCAPNG_BLOCK_FIXED_STRUCTS = {PCAPNG_BLOCK_TYPE_SECTION_HEADER: STRUCTS_PCAPNG_SECTION_HEADER, \
+                              PCAPNG_BLOCK_TYPE_INTERFACE_DESCRIPTION: STRUCTS_PCAPNG_INTERFACE_DESCRIPTION, \
+                              PCAPNG_BLOCK_TYPE_ENHANCED_PACKET: STRUCTS_PCAPNG_ENHANCED_PACKET, \
+                              PCAPNG_BLOCK_TYPE_PACKET: STRUCTS_PCAPNG_PACKET, \
+                              PCAPNG_BLOCK_TYPE_SIMPLE_PACKET: STRUCTS_PCAPNG_SIMPLE_PACKET}
+
+SIP_STATE_IDLE          = 0
+SIP_STATE_WAITING_183   = 1
+SIP_STATE_WAITING_200   = 2
+SIP_STATE_BEFORE_ACK    = 3
+SIP_STATE_AFTER_ACK     = 4
+SIP_STATE_BYEING        = 5
+SIP_STATE_BYED          = SIP_STATE_IDLE
+
+DEFAULT_PARAMETER_PHONE = 'anonymous'
+DEFAULT_PARAMETER_REASON = 'unknown'
+
+LEFT_TO_RIGHT = True
+RIGHT_TO_LEFT = False
+
+TIME_ONE_TICK               = 0.005 # (second)
+TIME_ONE_WINK               = 0.1   # (second)
+TIME_RTP_LATE               = 0.002 # (second) a packet sent later than its deadline by more than it is counted as late
+CLOCK_MONOTONIC             = 1     # clock id of clock_gettime() on Linux
+MAX_POLLS_TO_DRAIN          = 64    # the event loop of -ev polls the sockets again without waiting at most so many times
+SIP_RECEIVE_BUFFER_SIZE     = 4194304   # (byte) SO_RCVBUF of the SIP socket with -ev, Linux limits it by net.core.rmem_max
+MAX_LOG_ITEMS_IN_A_FRAME    = 256   # a worker process of -mp sends at most so many log items to the main process at one time
+PIPE_READ_SIZE              = 65536 # (byte)
+
+MAX_TIME_TO_EXIT            = 15    # (second)
+TIME_GRACE_TO_EXIT          = 3     # (second) a channel waits for the response of its BYE at most so long to exit
+TIME_TO_WAIT_SIP_RESPONSE   = 32    # (second) a channel waits for the final response of INVITE or BYE at most so long,
+                                    # as the timer B and F of RFC 3261
+
+TIMER_WHEEL_SLOT_COUNT      = 256   # slots of each level of TimerWheel
+TIMER_WHEEL_LEVEL_COUNT     = 4     # levels of TimerWheel, they hold the timers in 256**4 ticks at most
+
+ONE_UNIT_TIME_WAIT_TO_WORK  = 0.5   # (second)
+
+PRINT_PANDING_LEFT          = 5
+PRINT_IVR_EVENT_PANDING    = 10
+PRINT_CENTER_WIDTH          = 58
+
+SNOOP_FILE_EXT = '.snoop'
+PCAP_FILE_EXT = '.pcap'
+PCAPNG_FILE_EXT = '.pcapng'
+CAP_FILE_EXT = '.cap'
+# Note: the ext is only used to find the case files, the file format is decided by its magic number
+CAPTURE_FILE_EXTS = (SNOOP_FILE_EXT, PCAP_FILE_EXT, PCAPNG_FILE_EXT, CAP_FILE_EXT)
+CASE_LIST_FILE_EXT = '.cl'
+CASE_INFORMATION_FILE_EXT = '.cif'
+DIALOG_PACKETS_LIST_FILE_EXT = '.dpl'
+CACHE_MANIFEST_FILE_NAME = 'manifest.cmf'   # one in each cache dir
+
+# the binary .dpl layout: header, dialog table. Each dialog is a chunk in the content-addressed store DIR_CHUNKS
+# shared by all cases, named by its SHA-1 digest, so the same dialog is stored once however many cases use it.
+# dialog chunk layout: header, digests of the run chunks, packet table, strings blob
+# run chunk layout: header, lengths of the payloads, payloads of the packets. A run is the RTP packets sent one after another,
+# so the audio between two DTMF digits is shared by the cases which differ only in the digits. The RTP headers are in the
+# blob of the dialog chunk, as the sequence number, timestamp and SSRC are different in every call.
+# All integers are little endian
+DPL_MAGIC = 'VBDPL\x00\x00\x00'
+DPL_VERSION = 4
+CHUNK_MAGIC_DIALOG = 'VBDC'
+CHUNK_MAGIC_RUN = 'VBRC'
+CHUNK_FILE_EXT = '.chk'
+CHUNK_DIGEST_SIZE = 20      # SHA-1
+
+# the run chunks can be compressed by -z, the digest is always of the content without compressing,
+# so the same run has the same digest whatever the codec is
+CHUNK_CODEC_NONE    = 0
+CHUNK_CODEC_ZLIB    = 1
+CHUNK_CODEC_BZ2     = 2
+CHUNK_CODEC_LZMA    = 3
+CHUNK_CODEC_NAMES = {'none': CHUNK_CODEC_NONE, 'zlib': CHUNK_CODEC_ZLIB, 'bz2': CHUNK_CODEC_BZ2, 'lzma': CHUNK_CODEC_LZMA}
+CHUNK_CODEC_DEFAULT_LEVELS = {CHUNK_CODEC_NONE: 0, CHUNK_CODEC_ZLIB: 6, CHUNK_CODEC_BZ2: 9, CHUNK_CODEC_LZMA: 6}
+CHUNK_CODEC_MAX_LEVEL = 9
+# (codec, level) compared by -bzc, the fastest and the default level of each codec
+CHUNK_CODEC_BENCHMARKS = ((CHUNK_CODEC_NONE, 0), (CHUNK_CODEC_ZLIB, 1), (CHUNK_CODEC_ZLIB, 6), (CHUNK_CODEC_BZ2, 1), \
+        (CHUNK_CODEC_BZ2, 9), (CHUNK_CODEC_LZMA, 0), (CHUNK_CODEC_LZMA, 6))
+# advice of posix_fadvise() to drop the pages of a file from the page cache, used by -bzc
+POSIX_FADV_DONTNEED = 4
+
+FILE_HASH_BLOCK_SIZE = 1024*1024
+
+# the command given as the first argument, e.g. 'python voicebird.pyc compile -f case/'
+COMMAND_COMPILE = 'compile'
+
+# stages to compile a case, in the order they are reported by the compile command
+COMPILE_STAGES = ('read', 'decode', 'scan', 'write', 'hash', 'config')
+
+ITEM_TYPE_UNKNOWN                   = -1
+ITEM_TYPE_START_WORK                = 0
+ITEM_TYPE_SIP_DATA                  = 1
+ITEM_TYPE_RTP_DATA                  = 2
+ITEM_TYPE_SIGN_TO_KILL_THREAD       = 3
+ITEM_TYPE_START_A_DIALOG            = 4
+ITEM_TYPE_WRITE_TEST_RESULT         = 5
+ITEM_TYPE_WRITE_UNPASSED_CALL_FLOW  = 6
+ITEM_TYPE_WRITE_LOG                 = 7
+ITEM_TYPE_GET_A_CASE_REQ            = 8
+ITEM_TYPE_GET_A_CASE_ACK            = 9
+ITEM_TYPE_PREFETCH_A_DIALOG         = 11
+ITEM_TYPE_TIMER                     = 12
+
+TIMER_TYPE_START_WORK       = 0
+TIMER_TYPE_REST             = 1
+TIMER_TYPE_SIP_RESPONSE     = 2
+TIMER_TYPE_EXIT             = 3
+
+#Note: the voicebird tag format: [prefix]F[fffff]C[ccccc]D[ddddd]A[timestamp]
+#      fffff is X digitals channel index after 'F'
+#      ccccc is X digitals case index after 'C'
+#      ddddd is X digitals dialog index after 'D'
+#      timestamp after 'A'
+VOICEBIRD_TAG_PREFIX            = '701CEB19D'
+LEN_OF_VOICEBIRD_TAG_PREFIX     = len(VOICEBIRD_TAG_PREFIX)
+LEN_OF_VOICEBIRD_TAG_UNIT       = 5
+
+RESULT_VALUE_UNKNOWN                = -1
+RESULT_VALUE_FAIL                   = 0
+RESULT_VALUE_SIP_ERROR              = 1
+RESULT_VALUE_PASS                   = 2
+RESULT_VALUE_PASS_BUT_UNCOMPLETED   = 3
+RESULT_VALUE_PASS_BUT_DEFECTIVE_CASE= 4
+RESULT_VALUE_IGNORE                 = 5
+RESULT_VALUE_INTERRUPTED            = 6
+
+RESULT_VALUE_STRINGS = {RESULT_VALUE_UNKNOWN : 'UNKNOW', \
+                        RESULT_VALUE_FAIL : 'FAIL', \
+                        RESULT_VALUE_SIP_ERROR : 'FAIL (SIP ERROR)', \
+                        RESULT_VALUE_PASS : 'pass', \
+                        RESULT_VALUE_PASS_BUT_UNCOMPLETED : 'pass (UNCOMPLETED)', \
+                        RESULT_VALUE_PASS_BUT_DEFECTIVE_CASE : 'pass (DEFECTIVE CASE)', \
+                        RESULT_VALUE_IGNORE : 'ignore', \
+                        RESULT_VALUE_INTERRUPTED : 'interrupted'}
+
+DIR_CONFIG                  = 'config'
+CALL_PARAMETERS_CONFIG_FILE = '%s/parameters.dat' % (DIR_CONFIG)
+FUZZY_PROMPTS_FILE          = '%s/fuzzyprompts.cfg' % (DIR_CONFIG)
+BOOK_DB_FILE                = '%s/book.db' % (DIR_CONFIG)
+
+DIR_TEST_RESULT             = 'log'
+TEST_RESULT_FILE            = '%s/testresult' % (DIR_TEST_RESULT)
+TEST_RESULT_FILE_EXT        = '.txt'
+
+DIR_UNPASSED_CALL_FLOW      = 'log'
+UNPASSED_CALL_FLOW_FILE     = '%s/unpassedcallflow' % (DIR_UNPASSED_CALL_FLOW)
+UNPASSED_CALL_FLOW_FILE_EXT = '.txt'
+
+DIR_LOG                     = 'log'
+LOG_FILE                    = '%s/log' % (DIR_LOG)
+LOG_FILE_EXT                = '.txt'
+
+DIR_CASE                    = 'case'
+DIR_CACHE                   = 'cache'
+DIR_CHUNKS                  = 'cache/chunks'
+LISTING_CACHE_FILE          = '%s/listing.lcf' % (DIR_CACHE)
+LISTING_CACHE_MIN_AGE       = 2     # (second) a dir changed in so many seconds is listed again by the next run
+
+MAX_PROMPT_STR_LEN          = 80
+
+ANNOTATION_CHAR = '#'
+
+BACK_LINE_STR = '%c%c%c' % (27,'[','A')
+
+# each IVR event will be sent so many times
+IVR_EVENT_DUP_TIMES = 8
+
+TEMPLATE_BYE = """BYE sip:[CALLED]@[DESTINATION]:%d SIP/2.0
+Via: SIP/2.0/UDP [SOURCE];branch=z9hG4bKac1580b40000001e496580db00006f7c00000020;rport
+Max-Forwards: 70
+From: <sip:[FROM_CALLING]@[SOURCE]>;tag=[FROM_TAG]
+To: <sip:[CALLED]@[DESTINATION]>;tag=[TO_TAG]
+Call-ID: [FROM_TAG]@[SOURCE]
+CSeq: 2 BYE
+Content-Length: 0""" % (DEFAULT_SIP_PORT)
+
+IVR_8250_SIGN = 'CW UC'
+
+# The SIP messages in cache are templates, a slot is SIP_TEMPLATE_SLOT_MARK followed by chr(SIP_TEMPLATE_SLOT_BASE+slot)
+SIP_TEMPLATE_SLOT_MARK = '\x00'
+SIP_TEMPLATE_SLOT_BASE = ord('A')
+SIP_TEMPLATE_SLOTS = ('[DESTINATION]', '[CALLED]', '[SOURCE]', '[FROM_TAG]', '[TO_TAG]', '[REDIRECT]', '[REASON]', \
+                      '[CALLING]', '[FROM_CALLING]', '[FROM_DISPLAY]', '[LENGTH]', '[AUDIO_PORT]', '[EXTRA_HEADERS]')
+SLOT_DESTINATION    = 0
+SLOT_CALLED         = 1
+SLOT_SOURCE         = 2
+SLOT_FROM_TAG       = 3
+SLOT_TO_TAG         = 4
+SLOT_REDIRECT       = 5
+SLOT_REASON         = 6
+SLOT_CALLING        = 7
+SLOT_FROM_CALLING   = 8
+SLOT_FROM_DISPLAY   = 9
+SLOT_LENGTH         = 10
+SLOT_AUDIO_PORT     = 11
+SLOT_EXTRA_HEADERS  = 12    # the header lines added when sending, it is at the end of the headers
+
+####################
+# global variables
+####################
+# the SIP port of this process, each worker process of -mp has its own
+localSipPort = DEFAULT_SIP_PORT
+# the chunks put or found in the chunk store by this process, key: digest, value: CHUNK_CODEC_XXX of the chunk file
+knownChunkCodecs = {}
+
+
+class DialogPacket:
+    """
+    [Class]
+    This is a struct used to transfer packet data from file to ChannelWorker
+    """
+
+    originalPacketIndex = -1
+    dialogIndex = -1
+    received = False    # whether this packet is received from destination
+    timestamp = ''
+    delttime = 0.0
+    sourceIp = ''
+    destinationIp = ''
+    sourcePort = 0
+    destinationPort = 0
+    udpType = UDP_TYPE_UNKNOW
+    sipType = SIP_TYPE_UNKNOW
+    data = ''
+    # Note: the following 3 fields can only get from the function decodeRtp()
+    rtpTimestamp = 0
+    dtmf = -1
+    ivrEventStr = ''
+    isTwin = False
+
+    def __str__(self):
+        tempStr = ''
+        tempStr += ' originalPacketIndex: ' + str(self.originalPacketIndex) + '\n'
+        tempStr += ' dialogIndex: ' + str(self.dialogIndex) + '\n'
+        tempStr += ' received: ' + str(self.received) + '\n'
+        tempStr += ' timestamp: ' + self.timestamp + '\n'
+        tempStr += ' delttime: ' + str(self.delttime) + '\n'
+        tempStr += ' sourceIp: ' + self.sourceIp + '\n'
+        tempStr += ' destinationIp: ' + self.destinationIp + '\n'
+        tempStr += ' sourcePort: ' + str(self.sourcePort) + '\n'
+        tempStr += ' destinationPort: ' + str(self.destinationPort) + '\n'
+        tempStr += ' udpType: ' + str(self.udpType) + '\n'
+        tempStr += ' sipType: ' + str(self.sipType) + '\n'
+        tempStr += ' rtpTimestamp: ' + str(self.rtpTimestamp) + '\n'
+        tempStr += ' dtmf: ' + str(self.dtmf) + '\n'
+        tempStr += ' ivrEventStr: ' + self.ivrEventStr + '\n'
+        tempStr += ' isTwin: ' + str(self.isTwin) + '\n'
+        if self.udpType==UDP_TYPE_SIP:
+            tempStr += ' data: \n' + sipTemplateToText(self.data)
+        else:
+            tempStr += ' data: \n' + self.data
+        return tempStr
+
+
+class CachedDialogPacket(object):
+    """
+    [Class]
+    This is a struct of the packet loaded from the binary .dpl file, it has the same fields as DialogPacket
+    but without a __dict__ for each packet
+    """
+
+    __slots__ = ('originalPacketIndex', 'dialogIndex', 'received', 'timestamp', 'delttime', 'sourceIp', 'destinationIp', \
+                 'sourcePort', 'destinationPort', 'udpType', 'sipType', 'data', 'rtpTimestamp', 'dtmf', 'ivrEventStr', 'isTwin', \
+                 'sipTemplate')     # SipTemplate of the SIP message to be sent, otherwise None
+
+    __str__ = DialogPacket.__str__.im_func
+
+
+class SipTemplate(object):
+    """
+    [Class]
+    A SIP message template split into the literal segments and the slots, so a message is rendered by one join.
+    The SDP is after the slot SLOT_EXTRA_HEADERS and the empty line, its length is counted for SLOT_LENGTH
+    """
+
+    __slots__ = ('segments', 'slotPositions', 'sdpLiteralLength', 'sdpSlots')
+
+    def __init__(self, data):
+        tempParts = data.split(SIP_TEMPLATE_SLOT_MARK)
+        self.segments = [tempParts[0]]
+        self.slotPositions = []     # (index in segments, slot)
+        self.sdpLiteralLength = 0
+        self.sdpSlots = []
+
+        tempIsInSdp = False
+        tempHeaderName = ''     # name of the header which the current segment is in
+        for part in tempParts[1:]:
+            tempSlot = ord(part[0]) - SIP_TEMPLATE_SLOT_BASE
+            self.slotPositions.append((len(self.segments), tempSlot))
+            if self.segments[-1].rfind('\n')>=0:
+                tempHeaderName = self.segments[-1][self.segments[-1].rfind('\n')+1:].split(':')[0].strip().lower()
+            self.segments.append(SIP_TEMPLATE_SLOTS[tempSlot])
+
+            tempLiteral = part[1:]
+            if tempSlot==SLOT_SOURCE and localSipPort!=DEFAULT_SIP_PORT and not tempIsInSdp:
+                # Note: the responses and the requests of the IVR come to the SIP port of the worker process of -mp,
+                # it is added to Via and Contact if they have no port, e.g. the Via of TEMPLATE_BYE
+                if RE_SOURCE_SIP_PORT.match(tempLiteral):
+                    tempLiteral = RE_SOURCE_SIP_PORT.sub(':%d' % (localSipPort), tempLiteral, 1)
+                elif tempHeaderName in SIP_HEADERS_OF_SOURCE_PORT and not tempLiteral.startswith(':'):
+                    tempLiteral = ':%d' % (localSipPort) + tempLiteral
+            self.segments.append(tempLiteral)
+
+            if tempIsInSdp:
+                self.sdpSlots.append(tempSlot)
+                self.sdpLiteralLength += len(part)-1
+            elif tempSlot==SLOT_EXTRA_HEADERS:
+                # Note: the empty line '\r\n\r\n' is not in SDP
+                tempIsInSdp = True
+                self.sdpLiteralLength = len(part)-1-4
+
+
+    def render(self, values):
+        """
+        [Function]
+        Fill the slots to get the SIP message
+
+        [Argument]
+        values: list of the value of each slot, the value of SLOT_LENGTH is set by the SDP length
+
+        [Return]
+        the SIP message
+        """
+
+        tempSdpLength = self.sdpLiteralLength
+        for slot in self.sdpSlots:
+            tempSdpLength += len(values[slot])
+        values[SLOT_LENGTH] = str(tempSdpLength)
+
+        tempSegments = self.segments[:]
+        for index,slot in self.slotPositions:
+            tempSegments[index] = values[slot]
+        return ''.join(tempSegments)
+
+
+class DialogNumber:
+    """
+    [Class]
+    This is a struct used to save dialog's numbers
+    """
+
+    calledNumber = ''
+    redirectNumber = ''
+    callingNumber = ''
+
+    def __init__(self, calledNumber, redirectNumber, callingNumber):
+        self.calledNumber = calledNumber
+        self.redirectNumber = redirectNumber
+        self.callingNumber = callingNumber
+
+
+    def __init__(self, calledNumber, callingNumber):
+        self.calledNumber = calledNumber
+        self.callingNumber = callingNumber
+
+
+    def __str__(self):
+        tempStr = ''
+        tempStr += ' Called Number: ' + self.calledNumber + '\n'
+        if len(self.redirectNumber)>0:
+            tempStr += ' Redirect Number: ' + self.redirectNumber + '\n'
+        tempStr += ' Calling Number: ' + self.callingNumber
+        return tempStr
+
+
+class CaseInformation:
+    """
+    [Class]
+    This is a struct used to dump original case information to the .cif file
+    """
+
+    cifVersion = 0
+    snoopFileName = ''
+    snoopFileCreateTime = 0
+    snoopFileSize = 0
+    dialogNumbers = []
+
+    def __str__(self):
+        tempStr = ''
+        tempStr += ' CIF Version: ' + self.cifVersion + '\n'
+        tempStr += ' Snoop File Name: ' + self.snoopFileName + '\n'
+        tempStr += ' Snoop File Create Time: ' + str(self.snoopFileCreateTime) + '\n'
+        tempStr += ' Snoop File Size: ' + str(self.snoopFileSize) + '\n'
+        for i in range(len(dialogNumbers)):
+            tempStr += ' -- Dialog %d --\n' % (i+1)
+            tempStr += str(number)
+        return tempStr
+
+
+class CaseManifestEntry:
+    """
+    [Class]
+    This is a struct used to dump a case's information to the manifest file of its cache dir
+    """
+
+    cifVersion = 0
+    snoopFileSize = 0
+    snoopFileModifyTime = 0
+    snoopFileHash = ''      # content hash, compared only when the size or modify time is changed
+    xmlFileStamp = None     # (size, modify time) of the case's .xml, None if there is no .xml
+    xmlFileHash = ''        # content hash of the .xml, compared only when xmlFileStamp is changed
+    caseConfig = None       # object of CaseConfig parsed from the .xml
+
+
+class CaseData:
+    """
+    [Class]
+    This is a struct used to save all needed data for a test case
+    """
+
+    snoopFileName = ''  # snoop file name
+    cacheName = ''      # cache name which is CaseInformation and DialogPacketsList dump file name exclude ext name
+                        # Note: it is not a special file name
+    caseConfig = None   # object of CaseConfig
+
+
+def tuple2Hex(t):
+    """
+    [Function]
+    transform the items in tuple to hex format
+
+    [Argument]
+    t: a tuple
+
+    [Return]
+    a tuple whose items are hex format
+    """
+
+    if type(t) != type((0,)):
+        return t
+
+    h = []
+    for x in t:
+        h.append(hex(x))
+    return tuple(h)
+
+
+def getDtmfChar(dtmf):
+    """
+    [Function]
+    transform dtmf value to print-able char
+
+    [Argument]
+    dtmf: dtmf value
+
+    [Return]
+    print-able dtmf char
+    """
+
+    if dtmf in range(0, 9+1):
+        return str(dtmf)
+
+    if dtmf==10:
+        return '*'
+
+    if dtmf==11:
+        return '#'
+
+    if dtmf in range(12, 15+1):
+        return chr(ord('A')+dtmf-12)
+
+    if dtmf==16:
+        return 'Flash'
+
+
+class QueueItem:
+    """
+    [Class]
+    This is a struct used to save the data in the queue
+    """
+
+    itemType = ITEM_TYPE_UNKNOWN
+    itemData = ''
+
+    def __init__(self, type, data=''):
+        self.itemType = type
+        self.itemData = data
+
+
+class QueueItemData4TestResult:
+    """
+    [Class]
+    This is a struct used to save queue item data for test result
+    """
+
+    testResultValue = -1
+    content = ''
+
+    def __init__(self, testResultValue, content):
+        self.testResultValue = testResultValue
+        self.content = content
+
+
+class QueueItemData4Resource:
+    """
+    [Class]
+    This is a struct used to save queue item data for ResourceController
+    """
+
+    channelQueue = None
+    gettingCacheName = ''
+    releasingCacheName = ''
+
+    def __init__(self, channelQueue, gettingCacheName, releasingCacheName):
+        self.channelQueue = channelQueue
+        self.gettingCacheName = gettingCacheName
+        self.releasingCacheName = releasingCacheName
+
+
+class InfoCollector(threading.Thread):
+    """
+    [Class]
+    A thread used to collect information
+    """
+
+    logFlag = True
+
+    def __init__(self, logFileName, logQueue, logFlag):
+        """
+        [Function]
+        new a InfoCollector object
+
+        [Argument]
+        (N/A)
+        """
+
+        threading.Thread.__init__(self, name = 'InfoCollector')
+
+        self.logFileName = logFileName
+        self.logQueue = logQueue
+        self.logFlag = logFlag
+
+        self.firstTimePrintStatistic = True
+
+        self.startTime = time.time()
+        self.totalStartedDialogCount = 0
+        self.totalEndedDialogCount = 0
+        self.resultStatisticDict = {RESULT_VALUE_FAIL : 0, \
+                                    RESULT_VALUE_SIP_ERROR : 0, \
+                                    RESULT_VALUE_PASS : 0, \
+                                    RESULT_VALUE_PASS_BUT_UNCOMPLETED : 0, \
+                                    RESULT_VALUE_PASS_BUT_DEFECTIVE_CASE : 0}
+
+        if self.logFlag:
+            self.__prepareLogFile()
+            self.__prepareTestResultFile()
+            self.__prepareUnpassedCallFlowFile()
+
+
+    def __prepareTestResultFile(self):
+        """
+        [Function]
+        prepare test result file
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        (N/A)
+        """
+
+        tempDir = DIR_TEST_RESULT
+        tempFile = TEST_RESULT_FILE
+        tempExt = TEST_RESULT_FILE_EXT
+
+        if not os.path.exists(tempDir):
+            os.makedirs(tempDir)
+
+        if os.path.exists(tempFile+tempExt):
+            tempModificationTime = time.localtime(os.stat(tempFile+tempExt).st_mtime)
+            shutil.move(tempFile+tempExt, tempFile+'.%d%02d%02d%02d%02d%02d' % (tempModificationTime[:6]))
+
+        self.testResultFileObj = file(tempFile+tempExt, 'w')
+
+
+    def __writeToTestResultFile(self, content):
+        """
+        [Function]
+        write something to test result file
+
+        [Argument]
+        content: the writing content
+
+        [Return]
+        (N/A)
+        """
+
+        if self.logFlag:
+            self.testResultFileObj.write(content)
+            self.testResultFileObj.flush()
+
+
+    def __prepareUnpassedCallFlowFile(self):
+        """
+        [Function]
+        prepare unpassed call flows file
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        (N/A)
+        """
+
+        tempDir = DIR_UNPASSED_CALL_FLOW
+        tempFile = UNPASSED_CALL_FLOW_FILE
+        tempExt = UNPASSED_CALL_FLOW_FILE_EXT
+
+        if not os.path.exists(tempDir):
+            os.makedirs(tempDir)
+
+        if os.path.exists(tempFile+tempExt):
+            tempModificationTime = time.localtime(os.stat(tempFile+tempExt).st_mtime)
+            shutil.move(tempFile+tempExt, tempFile+'.%d%02d%02d%02d%02d%02d' % (tempModificationTime[:6]))
+
+        self.unpassedCallFlowFileObj = file(tempFile+tempExt, 'w')
+
+
+    def __writeToUnpassedCallFlowFile(self, content):
+        """
+        [Function]
+        write something to unpassed callflow file
+
+        [Argument]
+        content: the writing content
+
+        [Return]
+        (N/A)
+        """
+
+        if self.logFlag:
+            self.unpassedCallFlowFileObj.write(content)
+            self.unpassedCallFlowFileObj.flush()
+
+
+    def __prepareLogFile(self):
+        """
+        [Function]
+        prepare log file
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        (N/A)
+        """
+
+        tempDir = DIR_LOG
+        tempFile = self.logFileName
+        tempExt = LOG_FILE_EXT
+
+        if not os.path.exists(tempDir):
+            os.makedirs(tempDir)
+
+        if os.path.exists(tempFile+tempExt):
+            tempModificationTime = time.localtime(os.stat(tempFile+tempExt).st_mtime)
+            shutil.move(tempFile+tempExt, tempFile+'.%d%02d%02d%02d%02d%02d' % (tempModificationTime[:6]))
+
+        self.logFileObj = file(tempFile+tempExt, 'w')
+
+
+    def __writeToLogFile(self, content):
+        """
+        [Function]
+        write something to log file
+
+        [Argument]
+        content: the writing content
+
+        [Return]
+        (N/A)
+        """
+
+        if self.logFlag:
+            self.logFileObj.write(content)
+            self.logFileObj.flush()
+
+
+    def __closeFiles(self):
+        """
+        [Function]
+        close test result and log file
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        (N/A)
+        """
+
+        if self.logFlag:
+            self.testResultFileObj.close()
+            self.unpassedCallFlowFileObj.close()
+            self.logFileObj.close()
+
+
+    def __getStatistic(self):
+        """
+        [Function]
+        get statistic
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        (N/A)
+        """
+
+        tempSeconds = time.time() - self.startTime
+        if self.totalEndedDialogCount>0:
+            tempFailPercentage = '%.2f%%' % (float(self.resultStatisticDict[RESULT_VALUE_FAIL]*100)/self.totalEndedDialogCount)
+            tempFailPercentage = tempFailPercentage.rjust(7)
+            tempSipErrorPercentage = '%.2f%%' % (float(self.resultStatisticDict[RESULT_VALUE_SIP_ERROR]*100)/self.totalEndedDialogCount)
+            tempSipErrorPercentage = tempSipErrorPercentage.rjust(7)
+            tempPassPercentage = '%.2f%%' % (float(self.resultStatisticDict[RESULT_VALUE_PASS]*100)/self.totalEndedDialogCount)
+            tempPassPercentage = tempPassPercentage.rjust(7)
+            tempPassButUncompleted = '%.2f%%' % (float(self.resultStatisticDict[RESULT_VALUE_PASS_BUT_UNCOMPLETED]*100)/self.totalEndedDialogCount)
+            tempPassButUncompleted = tempPassButUncompleted.rjust(7)
+            tempPassButDefectiveCase = '%.2f%%' % (float(self.resultStatisticDict[RESULT_VALUE_PASS_BUT_DEFECTIVE_CASE]*100)/self.totalEndedDialogCount)
+            tempPassButDefectiveCase = tempPassButDefectiveCase.rjust(7)
+        else:
+            tempFailPercentage = '0.00%'.rjust(7)
+            tempSipErrorPercentage = '0.00%'.rjust(7)
+            tempPassPercentage = '0.00%'.rjust(7)
+            tempPassButUncompleted = '0.00%'.rjust(7)
+            tempPassButDefectiveCase = '0.00%'.rjust(7)
+
+
+        tempStr  = """%s
+   Started: %d (calls) / %d (seconds) = %.2f (CPS)
+   Ended:   %d (calls)
+ -------------------------------------------------------
+  <result>                     <count>   <percentage>
+ -------------------------------------------------------
+   FAIL                  : %10d        %s
+   FAIL (SIP ERROR)      : %10d        %s
+   pass                  : %10d        %s
+   pass (UNCOMPLETED)    : %10d        %s
+   pass (DEFECTIVE CASE) : %10d        %s
+
+""" % ( ' '*50, \
+        self.totalStartedDialogCount, tempSeconds, float(self.totalStartedDialogCount)/tempSeconds, \
+        self.totalEndedDialogCount, \
+        self.resultStatisticDict[RESULT_VALUE_FAIL], tempFailPercentage, \
+        self.resultStatisticDict[RESULT_VALUE_SIP_ERROR], tempSipErrorPercentage, \
+        self.resultStatisticDict[RESULT_VALUE_PASS], tempPassPercentage, \
+        self.resultStatisticDict[RESULT_VALUE_PASS_BUT_UNCOMPLETED], tempPassButUncompleted, \
+        self.resultStatisticDict[RESULT_VALUE_PASS_BUT_DEFECTIVE_CASE], tempPassButDefectiveCase \
+       )
+
+        return tempStr
+
+
+    def __printStatisticInScreen(self, statistic):
+        """
+        [Function]
+        print statistic to screen
+
+        [Argument]
+        statistic: the printing statistic content
+
+        [Return]
+        (N/A)
+        """
+
+        global callParameters
+        if callParameters.isStressTest:
+            tempLineCount = statistic.count('\n')
+            if self.firstTimePrintStatistic:
+                # 2 == line count of 'Wait to start ...'
+                sys.stdout.write(BACK_LINE_STR*2)
+                self.firstTimePrintStatistic = False
+            else:
+                sys.stdout.write(BACK_LINE_STR*tempLineCount)
+            sys.stdout.write((' '*60 + '\n')*tempLineCount)
+            sys.stdout.write(BACK_LINE_STR*tempLineCount)
+            sys.stdout.write(statistic)
+
+
+    def run(self):
+        """
+        [Function]
+        run InfoCollector
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        (N/A)
+        """
+
+        while True:
+            tempItem = self.logQueue.get()
+            if tempItem.itemType==ITEM_TYPE_SIGN_TO_KILL_THREAD:
+                if self.totalEndedDialogCount>0:
+                    self.__writeToTestResultFile(self.__getStatistic())
+                self.__closeFiles()
+                return
+            #else:
+
+            if tempItem.itemType==ITEM_TYPE_WRITE_LOG:
+                self.__writeToLogFile(tempItem.itemData+'\n')
+            elif tempItem.itemType==ITEM_TYPE_START_A_DIALOG:
+                self.totalStartedDialogCount += 1
+                self.__printStatisticInScreen(self.__getStatistic())
+            elif tempItem.itemType==ITEM_TYPE_WRITE_TEST_RESULT:
+                self.totalEndedDialogCount += 1
+                self.resultStatisticDict[tempItem.itemData.testResultValue] += 1
+                self.__writeToTestResultFile(tempItem.itemData.content+'\n')
+                self.__printStatisticInScreen(self.__getStatistic())
+            elif tempItem.itemType==ITEM_TYPE_WRITE_UNPASSED_CALL_FLOW:
+                self.__writeToUnpassedCallFlowFile(tempItem.itemData+'\n')
+
+
+LOG_QUEUE = Queue.Queue()
+class Log:
+    """
+    [Class]
+    A well use client class for InfoCollector
+    """
+
+    onlyLog = False
+    logFlag = True
+    assertCount = 0     # count of the assert logs, a failure reported by a() is followed by a bare raise
+
+    def __prepareLogFile(self):
+        """
+        [Function]
+        prepare log file
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        (N/A)
+        """
+
+        if not self.logFlag: return
+
+        tempDir = DIR_LOG
+        tempFile = self.logFileName
+        tempExt = LOG_FILE_EXT
+
+        if not os.path.exists(tempDir):
+            os.makedirs(tempDir)
+
+        if os.path.exists(tempFile+tempExt):
+            tempModificationTime = time.localtime(os.stat(tempFile+tempExt).st_mtime)
+            shutil.move(tempFile+tempExt, tempFile+'.%d%02d%02d%02d%02d%02d' % (tempModificationTime[0:6]))
+
+        self.logFileObj = file(tempFile+tempExt, 'w')
+
+
+    def __writeToLogFile(self, content):
+        """
+        [Function]
+        write something to log file
+
+        [Argument]
+        content: the writing content
+
+        [Return]
+        (N/A)
+        """
+
+        if self.logFlag:
+            self.logFileObj.write(content)
+            self.logFileObj.flush()
+
+
+    def __closeLogFile(self):
+        if self.logFlag:
+            self.logFileObj.close()
+
+
+    def __init__(self, logFileName, onlyLog):
+        # PARAMETER -nd: No Debug, means not to write debug log to file
+        if '-nd' in sys.argv:
+            self.logFlag = False
+
+        self.logFileName = logFileName
+        self.onlyLog = onlyLog
+
+        if onlyLog:
+            self.__prepareLogFile()
+        else:
+            global LOG_QUEUE
+            global LOG_PRINTER
+            LOG_PRINTER = InfoCollector(logFileName, LOG_QUEUE, self.logFlag)
+            LOG_PRINTER.setDaemon(True)
+            LOG_PRINTER.start()
+
+
+    def __del__(self):
+        if self.onlyLog:
+            self.__closeLogFile()
+
+
+    def startADialog(self):
+        """
+        [Function]
+        tell that a dialog is starting
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        (N/A)
+        """
+        if self.onlyLog: return
+
+        global LOG_QUEUE
+        LOG_QUEUE.put(QueueItem(ITEM_TYPE_START_A_DIALOG))
+
+
+    def writeTestResult(self, resultValue, content):
+        """
+        [Function]
+        write test result
+
+        [Argument]
+        resultValue: result value
+        content: log content
+
+        [Return]
+        (N/A)
+        """
+        if self.onlyLog: return
+
+        global LOG_QUEUE
+        tempData = QueueItemData4TestResult(resultValue, content)
+        LOG_QUEUE.put(QueueItem(ITEM_TYPE_WRITE_TEST_RESULT, tempData))
+
+
+    def writeUnpassedCallFlow(self, content):
+        """
+        [Function]
+        write unpassed call flow
+
+        [Argument]
+        content: log content
+
+        [Return]
+        (N/A)
+        """
+        if self.onlyLog: return
+
+        global LOG_QUEUE
+        LOG_QUEUE.put(QueueItem(ITEM_TYPE_WRITE_UNPASSED_CALL_FLOW, content))
+
+
+    def writeLog(self, content):
+        """
+        [Function]
+        write log
+
+        [Argument]
+        content: log content
+
+        [Return]
+        (N/A)
+        """
+        if self.onlyLog:
+            self.__writeToLogFile(content+'\n')
+        else:
+            global LOG_QUEUE
+            LOG_QUEUE.put(QueueItem(ITEM_TYPE_WRITE_LOG, str(content)))
+
+
+    def a(self, content):
+        """
+        [Functon]
+        write assert log
+        Note: assert information will be printed in the screen
+
+        [Argument]
+        content: log content
+
+        [Return]
+        (N/A)
+        """
+        self.assertCount += 1
+        self.writeLog('ASSERT: '+str(content))
+        print str(content)
+
+
+    def e(self, content):
+        """
+        [Function]
+        write error log
+
+        [Argument]
+        content: log content
+
+        [Return]
+        (N/A)
+        """
+        self.writeLog('ERROR: '+str(content))
+
+
+    def i(self, content):
+        """
+        [Function]
+        write info(rmation) log
+
+        [Argument]
+        content: log content
+
+        [Return]
+        (N/A)
+        """
+        self.writeLog('INFO: '+str(content))
+
+
+    def w(self, content):
+        """
+        [Function]
+        write warn(ing) log
+
+        [Argument]
+        content: log content
+
+        [Return]
+        (N/A)
+        """
+        self.writeLog('WARN: '+str(content))
+
+
+def createLogObj(logFileName=LOG_FILE, onlyLog=False):
+    global LOG
+    LOG = Log(logFileName, onlyLog)
+
+
+def deleteLogObj():
+    global LOG_QUEUE
+    LOG_QUEUE.put(QueueItem(ITEM_TYPE_SIGN_TO_KILL_THREAD))
+
+
+def setGlobalLogObj(theGlobalLogObj):
+    global LOG
+    LOG = theGlobalLogObj
+
+
+class LogBuffer(Log):
+    """
+    [Class]
+    A Log which keeps the log contents in memory, it is used in the worker process of SnoopParser
+    whose contents will be written to the global Log by the main process
+    """
+
+    def __init__(self):
+        self.contents = []
+
+
+    def __del__(self):
+        pass
+
+
+    def writeLog(self, content):
+        """
+        [Function]
+        keep the log content in memory
+
+        [Argument]
+        content: log content
+
+        [Return]
+        (N/A)
+        """
+        self.contents.append(str(content))
+
+
+class LogForwarder(threading.Thread):
+    """
+    [Class]
+    A thread of the worker process of -mp, it takes the place of InfoCollector and sends the log items to the main
+    process by a pipe, so InfoCollector of the main process counts the dialogs of all worker processes and writes
+    all results and logs to its files
+    """
+
+    def __init__(self, logQueue, writeFd):
+        """
+        [Function]
+        new a LogForwarder object
+
+        [Argument]
+        logQueue: LOG_QUEUE of the worker process
+        writeFd: the write end of the pipe to the main process
+        """
+
+        threading.Thread.__init__(self, name = 'LogForwarder')
+
+        self.logQueue = logQueue
+        self.writeFd = writeFd
+        self.isPipeBroken = False
+
+
+    def run(self):
+        """
+        [Function]
+        run LogForwarder, send the items in the queue by frames of the pickled item list with the length ahead,
+        until the item to kill the thread
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        (N/A)
+        """
+
+        while True:
+            tempItems = [self.logQueue.get()]
+            try:
+                while len(tempItems)<MAX_LOG_ITEMS_IN_A_FRAME and tempItems[-1].itemType!=ITEM_TYPE_SIGN_TO_KILL_THREAD:
+                    tempItems.append(self.logQueue.get_nowait())
+            except Queue.Empty:
+                pass
+
+            tempIsKilled = (tempItems[-1].itemType==ITEM_TYPE_SIGN_TO_KILL_THREAD)
+            if tempIsKilled:
+                tempItems.pop()
+
+            if tempItems:
+                tempData = pickle.dumps(tempItems, 2)
+                self.__write(struct.pack('<I', len(tempData)) + tempData)
+
+            if tempIsKilled:
+                os.close(self.writeFd)
+                return
+
+
+    def __write(self, data):
+        """
+        [Function]
+        Write all data to the pipe. If the main process has exited, the worker process is stopped as by Ctrl+C
+
+        [Argument]
+        data: the writing data
+
+        [Return]
+        (N/A)
+        """
+
+        if self.isPipeBroken:
+            return
+
+        while data:
+            try:
+                data = data[os.write(self.writeFd, data):]
+            except OSError:
+                if sys.exc_info()[1].errno==errno.EINTR:
+                    continue
+                #else:
+
+                self.isPipeBroken = True
+                os.kill(os.getpid(), signal.SIGTERM)
+                return
+
+
+class ResourceItem:
+    """
+    [Class]
+    A struct to save resource information
+    """
+    dialogPacketsList = None
+    timeToLoad = -1
+    linkCounter = 0
+
+    def __init__(self, dpl):
+        self.dialogPacketsList = dpl
+        self.timeToLoad = time.time()
+        self.linkCounter = 1
+
+
+    def addLink(self):
+        self.linkCounter += 1
+
+
+    def deleteLink(self):
+        self.linkCounter -= 1
+        return self.linkCounter
+
+
+    def getDpl(self):
+        return self.dialogPacketsList
+
+
+    def getLinkCount(self):
+        return self.linkCounter
+
+
+class ResourceController(threading.Thread):
+    """
+    [Class]
+    A thread used to manage the resource, specially for DialogPacketsList.
+    Note: it is a thread with -ev too, so loading the cache never stalls the event loop sending RTP
+    """
+
+    resourceDict = {}   # key: caseName, value: ResourceItem whose dialogs are loaded by each ChannelWorker
+    reactorWaker = None # ReactorWaker of the event loop of -ev, woken up when a case is given to a channel
+
+    def __init__(self, resourceQueue, reactorWaker=None):
+        threading.Thread.__init__(self, name = 'ResourceController')
+        self.resourceQueue = resourceQueue
+        self.reactorWaker = reactorWaker
+
+
+    def run(self):
+        """
+        [Function]
+        run ResourceController as a thread, for both engines
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        (N/A)
+        """
+
+        while True:
+            if not self.handleItem(self.resourceQueue.get()):
+                return
+
+
+    def handleItem(self, item):
+        """
+        [Function]
+        Deal with a request from ChannelWorker
+
+        [Argument]
+        item: QueueItem
+
+        [Return]
+        return False if it is killed, otherwise return True
+        """
+
+        if item.itemType==ITEM_TYPE_SIGN_TO_KILL_THREAD:
+            return False
+        #else:
+
+        if item.itemType==ITEM_TYPE_GET_A_CASE_REQ:
+            tempQueueItem = item.itemData
+            tempChannelQueue = tempQueueItem.channelQueue
+            tempGettingCacheName = tempQueueItem.gettingCacheName
+            tempReleasingCacheName = tempQueueItem.releasingCacheName
+
+            try:
+                tempGettingResourceItem = self.resourceDict[tempGettingCacheName]
+                tempGettingResourceItem.addLink()
+                tempDpl = tempGettingResourceItem.getDpl()
+            except KeyError:
+                tempDpl = LazyDialogPacketsList(tempGettingCacheName)
+                tempGettingResourceItem = ResourceItem(tempDpl)
+                self.resourceDict[tempGettingCacheName] = tempGettingResourceItem
+
+            if tempReleasingCacheName!='':
+                try:
+                    tempReleasingResourceItem = self.resourceDict[tempReleasingCacheName]
+                    if tempReleasingResourceItem.deleteLink()<=0:
+                        self.resourceDict.pop(tempReleasingCacheName)
+                        LOG.i("'%s' is removed from resourceDict" % (tempReleasingCacheName))
+                except KeyError:
+                    LOG.w("Cannot find this cacheName '%s' in resourceDict to release" % (tempReleasingCacheName))
+
+            tempChannelQueue.put(QueueItem(ITEM_TYPE_GET_A_CASE_ACK, tempDpl))
+            if self.reactorWaker:
+                self.reactorWaker.wakeUp()
+        elif item.itemType==ITEM_TYPE_PREFETCH_A_DIALOG:
+            tempDpl,tempDialogIndex = item.itemData
+            tempDpl.prefetchDialog(tempDialogIndex)
+
+        return True
+
+
+class IvrEventItem:
+    """
+    [Class]
+    A struct used to save IVR event information
+    """
+
+    udpType = UDP_TYPE_UNKNOW
+    ivrEventStr = ''
+
+    def __init__(self, udpType, ivrEventStr='(any)'):
+        self.udpType = udpType
+        self.ivrEventStr = ivrEventStr
+
+    def __str__(self):
+        tempStr = ''
+        tempStr += ' udpType: ' + str(self.udpType)
+        tempStr += ' ivrEventStr: ' + self.ivrEventStr
+
+        return tempStr
+
+
+class MediaClock:
+    """
+    [Class]
+    The clock of a dialog to send the packets at their captured offset from the answer (200 OK), the deadlines
+    are taken by a monotonic clock, so they are not moved by setting the system time. The clock pauses while
+    an IVR event comes later than captured, the packets after the event keep their captured gap to it
+    """
+
+    # the function of the monotonic clock, got by getMonotonicClock() at the first MediaClock
+    getTime = None
+
+    def __init__(self, startTime, answerDelttime):
+        """
+        [Function]
+        new a MediaClock object
+
+        [Argument]
+        startTime: time of the monotonic clock to send the packets captured at the answer
+        answerDelttime: delttime of the answer in the capture, from the 183
+        """
+
+        self.startTime = startTime
+        self.answerDelttime = answerDelttime
+        self.pausedTime = 0.0
+
+        self.sentCount = 0
+        self.lateCount = 0
+        self.totalLateness = 0.0
+        self.maxLateness = 0.0
+        self.lastDeadline = startTime
+        self.lastSentTime = startTime
+
+
+    def getDeadline(self, delttime):
+        """
+        [Function]
+        Get the time to send a packet, the packets captured before the answer are sent at the start
+
+        [Argument]
+        delttime: delttime of the packet in the capture, from the 183
+
+        [Return]
+        time of the monotonic clock
+        """
+        return self.startTime + self.pausedTime + max(delttime-self.answerDelttime, 0.0)
+
+
+    def markSent(self, deadline):
+        """
+        [Function]
+        Count a packet sent now for its deadline
+
+        [Argument]
+        deadline: the time it should be sent, given by getDeadline()
+
+        [Return]
+        (N/A)
+        """
+
+        tempNow = MediaClock.getTime()
+        tempLateness = max(tempNow-deadline, 0.0)
+
+        self.sentCount += 1
+        self.totalLateness += tempLateness
+        if tempLateness>self.maxLateness:
+            self.maxLateness = tempLateness
+        if tempLateness>TIME_RTP_LATE:
+            self.lateCount += 1
+        self.lastDeadline = deadline
+        self.lastSentTime = tempNow
+
+
+    def pauseForEvent(self, delttime):
+        """
+        [Function]
+        Pause the clock by how much an IVR event is received later than its captured offset
+
+        [Argument]
+        delttime: delttime of the IVR event in the capture, from the 183
+
+        [Return]
+        (N/A)
+        """
+
+        tempLateness = MediaClock.getTime() - self.getDeadline(delttime)
+        if tempLateness>0:
+            self.pausedTime += tempLateness
+
+
+    def getReportStr(self):
+        """
+        [Function]
+        Get the report of the sent packets, the achieved time to send them against the target
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        the report string
+        """
+
+        if self.sentCount==0:
+            return 'no packet is sent'
+        #else:
+
+        return '%d packets are sent in %.3f seconds for the target %.3f (paused %.3f for IVR), ' \
+                'late %.1f ms on average and %.1f ms at most, %d later than %.1f ms' \
+                % (self.sentCount, self.lastSentTime-self.startTime, self.lastDeadline-self.startTime, self.pausedTime, \
+                self.totalLateness/self.sentCount*1000, self.maxLateness*1000, self.lateCount, TIME_RTP_LATE*1000)
+
+
+class WheelTimer:
+    """
+    [Class]
+    This is a struct used to save a timer of TimerWheel
+    """
+
+    timerType = TIMER_TYPE_START_WORK
+    channelQueue = None     # the queue to put the timer to when it expires
+    tick = 0                # the tick of TimerWheel it expires at
+    slot = None             # the slot of TimerWheel holding it, None if it has expired or been cancelled
+
+    def __init__(self, timerType, channelQueue):
+        self.timerType = timerType
+        self.channelQueue = channelQueue
+
+
+class TimerWheel(threading.Thread):
+    """
+    [Class]
+    The timers of all channels, in the hierarchical wheels of slots (like the timer wheels of Linux), so adding
+    or cancelling a timer takes the same time however many are pending. A timer is put to its channel queue as
+    an item when it expires, then the channel handles it as a message. It runs as a thread without -ev, and is
+    advanced by the event loop with -ev
+    """
+
+    def __init__(self, tick):
+        """
+        [Function]
+        new a TimerWheel object
+
+        [Argument]
+        tick: seconds of a slot of the lowest level
+        """
+
+        threading.Thread.__init__(self, name = 'TimerWheel')
+
+        if MediaClock.getTime is None:
+            MediaClock.getTime = staticmethod(getMonotonicClock())
+
+        self.tick = tick
+        self.currentTick = int(MediaClock.getTime()/tick)
+        self.timerCount = 0
+
+        # wheels[level][index] is a set of WheelTimer, a slot of level l covers SLOT_COUNT**l ticks
+        self.wheels = [[set() for i in range(TIMER_WHEEL_SLOT_COUNT)] for level in range(TIMER_WHEEL_LEVEL_COUNT)]
+
+        self.lock = threading.Lock()
+        self.wakeUpEvent = threading.Event()
+
+
+    def run(self):
+        """
+        [Function]
+        run TimerWheel as a thread, it is the engine without -ev
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        (N/A)
+        """
+
+        while True:
+            if self.timerCount==0:
+                # sleep until a timer is added
+                self.wakeUpEvent.wait()
+                self.wakeUpEvent.clear()
+            else:
+                time.sleep(self.tick)
+            self.advance(MediaClock.getTime())
+
+
+    def add(self, timeout, timerType, channelQueue):
+        """
+        [Function]
+        Add a timer, it expires in the first tick after the timeout, never earlier
+
+        [Argument]
+        timeout: seconds from now
+        timerType: TIMER_TYPE_*
+        channelQueue: the queue to put the timer to when it expires
+
+        [Return]
+        the WheelTimer
+        """
+
+        tempTimer = WheelTimer(timerType, channelQueue)
+
+        self.lock.acquire()
+        tempTimer.tick = max(int((MediaClock.getTime()+timeout)/self.tick)+1, self.currentTick+1)
+        self.__place(tempTimer)
+        self.timerCount += 1
+        if self.timerCount==1:
+            self.wakeUpEvent.set()
+        self.lock.release()
+
+        return tempTimer
+
+
+    def cancel(self, timer):
+        """
+        [Function]
+        Cancel a timer, nothing is done if it has expired
+
+        [Argument]
+        timer: WheelTimer given by add()
+
+        [Return]
+        (N/A)
+        """
+
+        self.lock.acquire()
+        if timer.slot is not None:
+            timer.slot.discard(timer)
+            timer.slot = None
+            self.timerCount -= 1
+        self.lock.release()
+
+
+    def advance(self, now):
+        """
+        [Function]
+        Turn the wheels to the time, and put the expired timers to their channel queues
+
+        [Argument]
+        now: time of the monotonic clock
+
+        [Return]
+        (N/A)
+        """
+
+        tempExpiredTimers = []
+        tempTargetTick = int(now/self.tick)
+
+        self.lock.acquire()
+        while self.currentTick<tempTargetTick:
+            if self.timerCount==0:
+                # nothing to expire on the way
+                self.currentTick = tempTargetTick
+                break
+            #else:
+
+            self.currentTick += 1
+
+            # a slot of the higher level is moved to the lower levels when the lower level turns a round
+            tempSpan = 1
+            for level in range(1, TIMER_WHEEL_LEVEL_COUNT):
+                tempSpan *= TIMER_WHEEL_SLOT_COUNT
+                if self.currentTick%tempSpan!=0:
+                    break
+                #else:
+
+                tempIndex = (self.currentTick/tempSpan) % TIMER_WHEEL_SLOT_COUNT
+                tempSlot = self.wheels[level][tempIndex]
+                self.wheels[level][tempIndex] = set()
+                for timer in tempSlot:
+                    self.__place(timer)
+
+            tempIndex = self.currentTick % TIMER_WHEEL_SLOT_COUNT
+            tempSlot = self.wheels[0][tempIndex]
+            if tempSlot:
+                self.wheels[0][tempIndex] = set()
+                for timer in tempSlot:
+                    timer.slot = None
+                tempExpiredTimers.extend(tempSlot)
+                self.timerCount -= len(tempSlot)
+        self.lock.release()
+
+        for timer in tempExpiredTimers:
+            timer.channelQueue.put(QueueItem(ITEM_TYPE_TIMER, timer))
+
+
+    def __place(self, timer):
+        """
+        [Function]
+        Put a timer to the slot of its tick, in the lowest level which covers it from the current tick
+
+        [Argument]
+        timer: WheelTimer
+
+        [Return]
+        (N/A)
+        """
+
+        tempDelta = timer.tick - self.currentTick
+        tempLevel = 0
+        tempSpan = 1
+        while tempDelta>=tempSpan*TIMER_WHEEL_SLOT_COUNT and tempLevel<TIMER_WHEEL_LEVEL_COUNT-1:
+            tempLevel += 1
+            tempSpan *= TIMER_WHEEL_SLOT_COUNT
+
+        if tempDelta>=tempSpan*TIMER_WHEEL_SLOT_COUNT:
+            # Note: the longest timeout the wheels hold
+            timer.tick = self.currentTick + tempSpan*TIMER_WHEEL_SLOT_COUNT - 1
+
+        timer.slot = self.wheels[tempLevel][(timer.tick/tempSpan) % TIMER_WHEEL_SLOT_COUNT]
+        timer.slot.add(timer)
+
+
+class ChannelWorker(threading.Thread):
+    """
+    [Class]
+    A thread used to:
+    1. manage SIP state machine
+    2. send/receive RTP packet
+    3. judge the case's result
+    """
+
+    # channel data
+    channelIndex = -1           # Each ChannelWorker thread use an own unique channel index
+    caseIndex = -1              # currently which case is in use, the caseIndex is the index in Distributor's caseList
+    dialogIndex = 0             # currently which dialog in this case is calling
+    sipState = SIP_STATE_IDLE
+    called = ''
+    calling = ''
+    redirect = ''
+    reason = ''
+    fromTag = ''
+    toTag = ''
+    callId = ''
+    sessionDestinationPort = 0
+    baseTimeForRtp = 0.0
+    telephoneEventPt = None
+    ack = None                  # SipTemplate of the ACK
+    answerDelttime = 0.0        # delttime of the ACK, the time of the answer in the capture
+    mediaClock = None           # MediaClock of the dialog after ACK
+    timer = None                # WheelTimer to start work, end the rest, wait for a SIP response or exit, one at a time
+    dialogAfterRest = (0, 0)    # (caseIndex, dialogIndex) to start after the rest
+    isExiting = False           # it is killed and waits for the response of its BYE to exit
+    rtpTransport = 0
+
+    hasStarted = False
+    dialogPacketsList = None
+    dialogPackets = None        # packets list of the dialog in dialogPacketsList[dialogIndex]
+    heldDialog = None           # (dialogPacketsList, dialogIndex) of dialogPackets
+    packetIndex = 0             # packet index in the dialog
+    passed = True
+
+    cachedCallFlow = ''
+    cachedRtpTimestamp = -1
+    cachedIvrEventStr = ''
+    ignoredIvrEventCount = 0
+
+    expectedMatchingPromptsList = []
+    matchingIndex = 0
+
+    nextInviteInSameCase = False
+
+    is8250 = False
+
+
+    def __init__(self, channelIndex, caseList, sipTransport, channelQueue, resourceQueue, timerWheel):
+        """
+        [Function]
+        new a ChannelWorker object
+
+        [Argument]
+        sipTransport: SIP transport used to send SIP message
+        channelQueue: Distributor use this queue to transfer data to ChannelWorker
+        caseList: case data list
+        timerWheel: TimerWheel shared by all channels
+        """
+
+        threading.Thread.__init__(self, name = 'ChannelWorker')
+
+        self.cachedRtpTimestampFor2833 = 0
+
+        if MediaClock.getTime is None:
+            MediaClock.getTime = staticmethod(getMonotonicClock())
+
+        self.channelIndex = channelIndex
+        self.caseList = caseList
+        self.sipTransport = sipTransport
+        self.channelQueue = channelQueue
+        self.resourceQueue = resourceQueue
+        self.timerWheel = timerWheel
+
+        # dispersion to use the numbers
+        if callParameters.calledCount>callParameters.channelCount:
+            self.minCalledIndex = int(channelIndex * callParameters.calledCount / callParameters.channelCount)
+            self.maxCalledIndex = int((channelIndex+1) * callParameters.calledCount / callParameters.channelCount) - 1
+        else:
+            self.maxCalledIndex = self.minCalledIndex = channelIndex%callParameters.calledCount
+        #LOG.writeLog('eeee channel: %d, minCalledIndex: %d, maxCalledIndex: %d' % (self.channelIndex, self.minCalledIndex, self.maxCalledIndex))
+        if callParameters.redirectCount>callParameters.channelCount:
+            self.minRedirectIndex = int(channelIndex * callParameters.redirectCount / callParameters.channelCount)
+            self.maxRedirectIndex = int((channelIndex+1) * callParameters.redirectCount / callParameters.channelCount) - 1
+        else:
+            if callParameters.redirectCount<=0:
+                self.maxRedirectIndex = self.minRedirectIndex = 0
+            else:
+                self.maxRedirectIndex = self.minRedirectIndex = channelIndex%callParameters.redirectCount
+
+        self.calledIndex = self.minCalledIndex
+        self.redirectedIndex = self.minRedirectIndex
+
+        # PARAMETER -nf: No call Flow, means not to draw the call flow to the screen
+        self.willDrawCallFlow = (not callParameters.isStressTest) and ('-nf' not in sys.argv)
+
+        self.timeLeftToStartWork = self.channelIndex * ONE_UNIT_TIME_WAIT_TO_WORK
+
+        # create local RTP transport
+        self.rtpTransport = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.rtpTransport.bind(('', 0))
+        self.rtpTransport.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        #print 'self.rtpTransport.getsockname():', self.rtpTransport.getsockname()
+
+        # PARAMETER -8250: the destination is 8250
+        if '-8250' in sys.argv:
+            self.is8250 = True
+
+        # PARAMETER -pf: PreFetch, load the next dialog of the case when a dialog begins
+        self.willPrefetch = ('-pf' in sys.argv)
+
+        # handlers of the received SIP messages, key: method of a request, or code of a response
+        self.sipHandlers = {'BYE': self.__receiveBye, 100: self.__receive100, 180: self.__receive180, \
+                            183: self.__receive183, 200: self.__receive200}
+
+
+    def getLocalRtpTransport(self):
+        """
+        [Function]
+        return RTP transport
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        the socket connect of the RTP transport
+        """
+        return self.rtpTransport
+
+
+    def __getResultStr(self, udpType, ivrEventStr):
+        """
+        [Function]
+        get the expected or testing test result string
+
+        [Argument]
+        udpType: UDP type
+        ivrEventStr: IVR event string
+
+        [Return]
+        the print-able test result
+        """
+        return '(%s) %s' % (SHORT_NAME_OF_IVR_EVENT[udpType], ivrEventStr)
+
+
+    def __gotoNextIvrEvent(self):
+        """
+        [Function]
+        move the pointer to the next IVR event in dialogPacketsList
+
+        [Argument]
+        (N/A)
+
+        [Result]
+        return True when getting the next IVR event, otherwise return False
+        """
+
+        while True:
+            if self.packetIndex>=len(self.dialogPackets):
+                return False
+
+            tempPacket = self.dialogPackets[self.packetIndex]
+
+            if tempPacket.received:
+                return True
+            else:
+                self.packetIndex += 1
+
+
+    def __matchTwoPrompts(self, prompt1, prompt2):
+        """
+        [Function]
+        match two prompts according to the fuzzy prompts dict
+
+        [Parameter]
+        two prompt names with length 7 (i.e. e1ja348) or 5 (i.e. ja348)
+
+        [Return]
+        if matched return True, otherwise return False
+        """
+
+        if prompt1==prompt2:
+            return True
+
+        try:
+            tempPromptsPair = fuzzyPromptsDict[prompt1]
+        except KeyError:
+            return False
+        else:
+            try:
+                tempPromptsPair.index(prompt2)
+            except ValueError:
+                return False
+            else:
+                return True
+
+
+    def __fuzzyMatchPrompts(self, eventStrInPacket, eventStrReceived):
+        """
+        [Function]
+        match promts in fuzzy
+
+        [Parameter]
+        eventStrInPacket: event string in packet
+        eventStrReceived: event string received
+
+        [Return]
+        matched return True, otherwise return False
+        """
+
+        tempPromptNameInPacket = eventStrInPacket[eventStrInPacket.replace('\\', '/').rfind('/')+1:].lower()
+        tempPromptNameInPacketWithoutLanguage = tempPromptNameInPacket[2:]
+
+        tempPromptNameReceived = eventStrReceived[eventStrReceived.replace('\\', '/').rfind('/')+1:].lower()
+        tempPromptNameReceivedWithoutLanguage = tempPromptNameReceived[2:]
+
+        if self.__matchTwoPrompts(tempPromptNameInPacket, tempPromptNameReceived):
+            return True
+        else:
+            return self.__matchTwoPrompts(tempPromptNameInPacketWithoutLanguage, tempPromptNameReceivedWithoutLanguage)
+
+
+    def __smartJudge(self, receivedPayloadType, receivedExtendedData, expectedUdpType, expectedEventStr):
+        """
+        [Function]
+        compare the packets in dialogPacketsList and received from IVR to judge whether this test step is passed
+
+        [Argument]
+        receivedPayloadType: received RTP's payload type
+        receivedExtendedData: received RTP's extended data
+        expectedUdpType: expected UDP type
+        expectedEventStr: expected IVR event string
+
+        [Return]
+        return a tuple which has 3 items:
+        1st item: whehter the judge result is passed
+        2nd item: the expected result information
+        3rd item: the testing result information
+        4th item: expected prompt content
+        5th item: testing result prompt content
+        """
+
+        tempExpectedResult = self.__getResultStr(expectedUdpType, expectedEventStr)
+
+        tempExpectedPromptStr = ''
+        tempUdpType,tempPromptId = washIvrPromptStr(expectedEventStr, expectedUdpType)
+        tempPromptContent = getPromptContentById(tempPromptId)
+        if tempUdpType==UDP_TYPE_RTP_IVR_SPEAK_PROMPT:
+            if tempPromptId!='sil':     # forget silent indication
+                tempExpectedPromptStr = '%s: %s' % (tempPromptId, tempPromptContent)
+        else:
+            tempExpectedResult = self.__getResultStr(tempUdpType, expectedEventStr)
+
+        if receivedPayloadType==PAYLOAD_TYPE_IVR_RECORD_FILE:
+            # only judge type when it is a Record File
+            tempTestingResult = self.__getResultStr(UDP_TYPE_RTP_IVR_RECORD_FILE, receivedExtendedData)
+            if expectedUdpType == UDP_TYPE_RTP_IVR_RECORD_FILE:
+                return (True, tempExpectedResult, tempTestingResult, tempExpectedPromptStr, '')
+            else:
+                return (False, tempExpectedResult, tempTestingResult, tempExpectedPromptStr, '')
+        elif receivedPayloadType==PAYLOAD_TYPE_IVR_PROMPT:
+            if receivedExtendedData[0] == PROMPT_TYPE_SYSTEM:
+                # only judge type when it is a System Prompt
+                tempTestingResult = self.__getResultStr(UDP_TYPE_RTP_IVR_SYSTEM, receivedExtendedData[1])
+                if expectedUdpType == UDP_TYPE_RTP_IVR_SYSTEM:
+                    return (True, tempExpectedResult, tempTestingResult, tempExpectedPromptStr, '')
+                else:
+                    return (False, tempExpectedResult, tempTestingResult, tempExpectedPromptStr, '')
+            elif receivedExtendedData[0] == PROMPT_TYPE_RECORD_TONE:
+                # record tone need exactly judge
+                tempTestingResult = self.__getResultStr(UDP_TYPE_RTP_IVR_RECORD_TONE, receivedExtendedData[1])
+                if expectedUdpType == UDP_TYPE_RTP_IVR_RECORD_TONE:
+                    return (True, tempExpectedResult, tempTestingResult, tempExpectedPromptStr, '')
+                else:
+                    return (False, tempExpectedResult, tempTestingResult, tempExpectedPromptStr, '')
+            elif receivedExtendedData[0] == PROMPT_TYPE_SPEAK:
+                # speak prompt will do fuzzy match when exactly judge failed
+                tempTestingResult = self.__getResultStr(UDP_TYPE_RTP_IVR_SPEAK_PROMPT, receivedExtendedData[1])
+
+                tempResultPromptStr = ''
+                tempUdpType,tempPromptId = washIvrPromptStr(receivedExtendedData[1])
+                tempPromptContent = getPromptContentById(tempPromptId)
+                if tempUdpType==UDP_TYPE_RTP_IVR_SPEAK_PROMPT:
+                    if tempPromptId!='sil':     # forget silent indication
+                        tempResultPromptStr = '%s: %s' % (tempPromptId, tempPromptContent)
+                else:
+                    tempTestingResult = self.__getResultStr(tempUdpType, receivedExtendedData[1])
+
+                if expectedUdpType == UDP_TYPE_RTP_IVR_SPEAK_PROMPT \
+                        and (expectedEventStr==receivedExtendedData[1] \
+                            or self.__fuzzyMatchPrompts(expectedEventStr, receivedExtendedData[1])):
+                    return (True, tempExpectedResult, tempTestingResult, tempExpectedPromptStr, tempResultPromptStr)
+                else:
+                    return (False, tempExpectedResult, tempTestingResult, tempExpectedPromptStr, tempResultPromptStr)
+            else:
+                LOG.a('Unsupport prompt type %d' % (receivedExtendedData[0]))
+                raise
+        else:
+            LOG.a('Unsupport payload type %d' % receivedPayloadType)
+            raise
+
+
+    def __processForNoPacketLeft(self, receivedPayloadType, receivedExtendedData):
+        """
+        [Function]
+        specially process when no packet left for this dialog in dialogPacketsList
+
+        [Argument]
+        receivedPayloadType: received RTP's payload type
+        receivedExtendedData: received RTP's extended data
+
+        [Return]
+        (N/A)
+        """
+
+        #print 'self.dialogIndex:', self.dialogIndex, ', self.packetIndex:', self.packetIndex
+
+        if receivedPayloadType==PAYLOAD_TYPE_IVR_RECORD_FILE:
+            self.__drawIvrEvent(RESULT_VALUE_FAIL, '(N/A)', '(f) '+receivedExtendedData)
+        elif receivedPayloadType==PAYLOAD_TYPE_IVR_PROMPT:
+            if receivedExtendedData[0] == PROMPT_TYPE_SYSTEM:
+                self.__drawIvrEvent(RESULT_VALUE_FAIL, '(N/A)', '(s) '+receivedExtendedData[1])
+            elif receivedExtendedData[0] == PROMPT_TYPE_RECORD_TONE:
+                self.__drawIvrEvent(RESULT_VALUE_FAIL, '(N/A)', '(r) '+receivedExtendedData[1])
+            elif receivedExtendedData[0] == PROMPT_TYPE_SPEAK:
+                tempUdpType,tempPromptId = washIvrPromptStr(receivedExtendedData[1])
+                if tempUdpType==UDP_TYPE_RTP_IVR_SPEAK_PROMPT:
+                    if tempPromptId!='sil':     # forget silent indication
+                        self.__drawIvrEvent(RESULT_VALUE_FAIL, '(N/A)', '(p) '+receivedExtendedData[1], '', '%s: %s' % (tempPromptId,getPromptContentById(tempPromptId)))
+                        return
+
+                self.__drawIvrEvent(RESULT_VALUE_FAIL, '(N/A)', '(p) '+receivedExtendedData[1])
+            else:
+                LOG.a('Unknown prompt type %d' % (receivedExtendedData[0]))
+                raise
+        else:
+            LOG.a('Unsupport payload type %d' % (receivedPayloadType))
+            raise
+
+
+    def __hasCompleted(self):
+        """
+        [Function]
+        scan the dialogPacketsList to check wheter current dialog is completed
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        return True if current dialog is completed, otherwise return False
+        """
+
+        i = self.packetIndex+1  # Only need to check the packets behind current packet
+        while True:
+            if i>=len(self.dialogPackets):
+                # All packets in this dialog have been done
+                return True
+            packet = self.dialogPackets[i]
+            if packet.dialogIndex!=self.dialogIndex:
+                # All packets in this dialog have been done
+                return True
+            elif packet.dialogIndex==self.dialogIndex and packet.received==True:
+                # Still exists message from destination
+                return False
+            else:
+                i += 1
+
+
+    def __drawCallFlowHeader(self, caseInfo, callerCalled):
+        """
+        [Function]
+        draw call flow's header information
+
+        [Argument]
+        caseInfo: the case's information
+        callerCalled: the caller and called
+
+        [Return]
+        (N/A)
+        """
+
+        tempStr = '\n[%s]\n' % (caseInfo)
+        tempStr += ' '*int(PRINT_PANDING_LEFT/2) + callerCalled
+
+        #tempStr += '\n' + str(time.localtime(time.time()))
+
+        if self.willDrawCallFlow:
+            print tempStr
+
+        self.cachedCallFlow = tempStr + '\n'
+
+
+    def __drawCallFlow(self, direction, description):
+        """
+        [Function]
+        draw call flow
+
+        [Argument]
+        direction: LEFT_TO_RIGHT or RIGHT_TO_LEFT
+        description: description about the piece of call flow
+
+        [Return]
+        (N/A)
+        """
+
+        tempStr = ' '*PRINT_PANDING_LEFT + '|' + description.center(PRINT_CENTER_WIDTH) + '|' + '\n'
+        if direction==LEFT_TO_RIGHT:
+            tempStr += ' '*PRINT_PANDING_LEFT + '|' + '-'*(PRINT_CENTER_WIDTH-1) + '>|'
+        else:
+            tempStr += ' '*PRINT_PANDING_LEFT + '|<' + '-'*(PRINT_CENTER_WIDTH-1) + '|'
+
+        #tempStr += '\n' + str(time.localtime(time.time()))
+
+        if self.willDrawCallFlow:
+            print tempStr
+
+        self.cachedCallFlow += tempStr + '\n'
+
+
+    def __drawIvrEvent(self, resultValue, expect, result, expectPrompt='', resultPrompt=''):
+        """
+        [Function]
+        draw special private event from IVR
+
+        [Argument]
+        resultValue: information to indicate pass, fail or something else
+        expect: the expected result description
+        result: the testing result description
+
+        [Return]
+        (N/A)
+        """
+
+        if expect and result:
+            tempStr = ' '*PRINT_PANDING_LEFT + '|' + (' '*PRINT_IVR_EVENT_PANDING + RESULT_VALUE_STRINGS[resultValue]).ljust(PRINT_CENTER_WIDTH) + '|' + '\n'
+
+            tempExpectPromptStr = expectPrompt
+            if len(tempExpectPromptStr)>0:
+                if len(tempExpectPromptStr)>MAX_PROMPT_STR_LEN:
+                    tempExpectPromptStr = tempExpectPromptStr[:MAX_PROMPT_STR_LEN] + '[...]'
+
+            tempResultPromptStr = resultPrompt
+            if len(tempResultPromptStr)>0:
+                if len(tempResultPromptStr)>MAX_PROMPT_STR_LEN:
+                    tempResultPromptStr = tempResultPromptStr[:MAX_PROMPT_STR_LEN] + '[...]'
+
+            tempStr += ' '*PRINT_PANDING_LEFT + '|' + (' '*(PRINT_IVR_EVENT_PANDING+4) + 'Expect: ' + expect).ljust(PRINT_CENTER_WIDTH) + '|  ' + tempExpectPromptStr + '\n'
+            tempStr += ' '*PRINT_PANDING_LEFT + '|' + (' '*(PRINT_IVR_EVENT_PANDING+4) + 'Result: ' + result).ljust(PRINT_CENTER_WIDTH) + '|  ' + tempResultPromptStr + '\n'
+            tempStr += ' '*PRINT_PANDING_LEFT + '|<' + '-'*(PRINT_CENTER_WIDTH-1) + '|'
+
+            if self.willDrawCallFlow:
+                print tempStr
+
+            self.cachedCallFlow += tempStr + '\n'
+
+
+    def __drawCallFlowSummary(self, resultValue=None):
+        """
+        [Function]
+        draw call flow's summary
+
+        [Argument]
+        resultValue: information to indicate pass, fail or something else
+
+        [Return]
+        (N/A)
+        """
+
+        # 1. Get the last test result
+        if resultValue:
+            tempResultValue = resultValue
+        else:
+            tempResultValue = RESULT_VALUE_UNKNOWN
+            if self.passed:
+                if self.__hasCompleted():
+                    tempResultValue = RESULT_VALUE_PASS
+                else:
+                    tempResultValue = RESULT_VALUE_PASS_BUT_UNCOMPLETED
+            else:
+                tempResultValue = RESULT_VALUE_FAIL
+
+        snoopFileName = self.caseList[self.caseIndex].snoopFileName
+        caseIndex = self.caseIndex
+        dialogIndex = self.dialogIndex
+
+        # achieved time to send the RTP against the target of the media clock
+        if self.mediaClock:
+            LOG.i('Channel %d, case %d, dialog %d: %s' % (self.channelIndex, caseIndex+1, dialogIndex+1, self.mediaClock.getReportStr()))
+
+        # 2. Draw call flow to the screen
+        tempStr = 'RESULT: ' + RESULT_VALUE_STRINGS[tempResultValue] + '\n'
+        if self.willDrawCallFlow:
+            print tempStr
+
+        self.cachedCallFlow += tempStr + '\n'
+
+        # don't save interrupted callflow to file
+        if tempResultValue==RESULT_VALUE_INTERRUPTED:
+            return
+        #else:
+
+        # 3. Write test result
+        tempStamp = str(self.channelIndex)
+        now = time.localtime(time.time())
+        tempStamp += '.%d%02d%02d%02d%02d%02d' % (now[0:6])
+        tempLogStr = '[%s] Case %d: %s, Dialog: %d. SUMMARY: %s' % \
+                    (tempStamp, caseIndex+1, snoopFileName, dialogIndex+1, RESULT_VALUE_STRINGS[tempResultValue])
+        LOG.writeTestResult(tempResultValue, tempLogStr)
+
+        # 4. Write unpassed call flow to unpassedcallflow.txt
+        if tempResultValue!=RESULT_VALUE_PASS:
+            LOG.writeUnpassedCallFlow('##### %s #####%s' % (tempStamp, self.cachedCallFlow))
+
+
+    def __receiveRtp(self, queueData):
+        """
+        [Function]
+        used to receive RTP message
+
+        [Argument]
+        queueData: the data received
+
+        [Return]
+        return True means NOT to continue dealing with packets in the list, otherwise return False
+        """
+
+        # Note: Distributor has filter the payload type
+        tempPayloadType,tempRtpTimestamp,tempExtendedData = decodeRtp(queueData, self.telephoneEventPt)
+        tempIvrEventStr = ''
+        if tempPayloadType==PAYLOAD_TYPE_IVR_RECORD_FILE:
+            tempExtendedDataItems = [tempExtendedData,]
+            tempIvrEventStr = tempExtendedData
+        elif tempPayloadType==PAYLOAD_TYPE_IVR_PROMPT:
+            tempExtendedDataItems = tempExtendedData
+            tempIvrEventStr = str(tempExtendedData)
+        else:
+            LOG.a('Unsupport payload type ' + str(tempPayloadType))
+            raise
+
+        if self.__isDuplicatedIvrEvent(tempRtpTimestamp, tempIvrEventStr):
+            return True
+
+        for item in tempExtendedDataItems:
+            tempGotNextIvrEvent = self.__gotoNextIvrEvent()
+            # Note: don't deal with BYE, for it is the last message from IVR
+            # tempGotNextIvrRtpEvent means whether got a IVR RTP event, but tempGotNextIvrEvent includes RTP and SIP
+            tempGotNextIvrRtpEvent = tempGotNextIvrEvent
+            if tempGotNextIvrEvent:
+                tempPacket = self.dialogPackets[self.packetIndex]
+                if tempPacket.udpType==UDP_TYPE_SIP and tempPacket.sipType==SIP_TYPE_BYE:
+                    self.packetIndex -= 1
+                    tempGotNextIvrRtpEvent = False
+
+            if tempGotNextIvrRtpEvent:
+                if self.mediaClock:
+                    self.mediaClock.pauseForEvent(tempPacket.delttime)
+
+                tempPassed,tempExpect,tempResult,tempExpectPrompt,tempResultPrompt = \
+                        self.__smartJudge(tempPayloadType, item, tempPacket.udpType, tempPacket.ivrEventStr)
+
+                if tempPassed:
+                    self.passed &= True
+                    self.__drawIvrEvent(RESULT_VALUE_PASS, tempExpect, tempResult, tempExpectPrompt, tempResultPrompt)
+                    self.packetIndex += 1
+                else:
+                    self.passed &= False
+                    self.__drawIvrEvent(RESULT_VALUE_FAIL, tempExpect, tempResult, tempExpectPrompt, tempResultPrompt)
+                    self.packetIndex += 1
+            else:
+                self.__processForNoPacketLeft(tempPayloadType, item)
+                self.passed = False
+
+        return False
+
+
+    def __isDuplicatedIvrEvent(self, receivedRtpTimestamp, receivedIvrEventStr):
+        """
+        [Function]
+        check whether this IVR event is duplicated
+
+        [Argument]
+        receivedRtpTimestamp: received RTP's timestamp
+        receivedIvrEventStr: received IVR Event's content
+
+        [Return]
+        return True if duplicated, otherwise return False
+        """
+
+        if receivedRtpTimestamp!=0:
+            # 1. only need checking duplication when autotest=2
+            # 2.1. the ivr event == the cached
+            # 2.2. the timestamp <= the cached
+            # 2.3. don't ignore the event whose timestamp is the same as the previous one
+            if receivedIvrEventStr==self.cachedIvrEventStr \
+                    and receivedRtpTimestamp<=self.cachedRtpTimestamp \
+                        and self.ignoredIvrEventCount<IVR_EVENT_DUP_TIMES:
+                self.ignoredIvrEventCount += 1
+                return True
+            else:
+                self.cachedRtpTimestamp = receivedRtpTimestamp
+                self.cachedIvrEventStr = receivedIvrEventStr
+                self.ignoredIvrEventCount = 0
+                return False
+        else:
+            return False
+
+
+    def run(self):
+        """
+        [Function]
+        run ChannelWorker as a thread, it is the engine without -ev
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        (N/A)
+        """
+
+        tempWakeUpTime = None
+        while True:
+            # 1. Wait for a message from Distributor until the time to process again,
+            #    or until a message comes if process() has nothing to do before it
+            try:
+                if tempWakeUpTime is None:
+                    tempItem = self.channelQueue.get()
+                else:
+                    tempItem = self.channelQueue.get(True, max(tempWakeUpTime-MediaClock.getTime(), 0.0))
+                #print 'itemType:', tempItem.itemType
+            except KeyboardInterrupt:
+                raise KeyboardInterrupt
+            except Queue.Empty:
+                pass
+            else:
+                # Deal with message from Distributor, after that go on to deal with dialogPacketsList
+                if not self.handleItem(tempItem):
+                    return
+
+            # 2. Process dialogPacketList
+            tempWakeUpTime = self.process()
+
+
+    def handleItem(self, item):
+        """
+        [Function]
+        Deal with an item from Distributor or ResourceController, it is called by both engines
+
+        [Argument]
+        item: QueueItem
+
+        [Return]
+        return False if the channel is killed, otherwise return True
+        """
+
+        if item.itemType==ITEM_TYPE_SIGN_TO_KILL_THREAD:
+            # send BYE then exit the thread when the response of it comes or the grace period is over.
+            # Note: only the confirmed dialog is said BYE, the one before the answer, during the rest
+            # or whose BYE has been sent exits at once
+            self.isExiting = True
+            if self.sipState==SIP_STATE_AFTER_ACK:
+                self.__sayGoodBye()
+                self.sipState = SIP_STATE_BYEING
+                self.__setTimer(TIME_GRACE_TO_EXIT, TIMER_TYPE_EXIT)
+                return True
+            #else:
+
+            self.__cancelTimer()
+            return False
+        elif item.itemType==ITEM_TYPE_TIMER:
+            # the timer which has been cancelled or replaced is ignored
+            if item.itemData is self.timer:
+                self.timer = None
+                return self.__handleTimer(item.itemData.timerType)
+        elif self.isExiting:
+            # only the response of BYE is waited for
+            if item.itemType==ITEM_TYPE_SIP_DATA:
+                self.__receiveSip(item.itemData)
+            if self.sipState==SIP_STATE_BYED:
+                self.__cancelTimer()
+                return False
+        elif item.itemType==ITEM_TYPE_START_WORK:
+            # postpone starting work, the channels start one by one
+            if not self.hasStarted and self.timer is None:
+                self.__setTimer(self.timeLeftToStartWork, TIMER_TYPE_START_WORK)
+            else:
+                LOG.e('The channel worker has started work, do not ask start twice')
+        elif item.itemType==ITEM_TYPE_GET_A_CASE_ACK:
+            self.dialogPacketsList = item.itemData
+            self.__sendInvite()
+        elif self.timer is not None and self.timer.timerType==TIMER_TYPE_REST:
+            # the messages during the rest before the next dialog are dropped
+            pass
+        elif item.itemType==ITEM_TYPE_SIP_DATA:
+            self.__receiveSip(item.itemData)
+        elif item.itemType==ITEM_TYPE_RTP_DATA:
+            # Note: a stray RTP packet may arrive before the first dialog begins
+            if self.dialogPackets is not None:
+                self.__receiveRtp(item.itemData)
+
+        return True
+
+
+    def process(self):
+        """
+        [Function]
+        Send the packets in dialogPacketsList whose deadlines are due. It is called by both engines
+        after every item, and at the time it returns
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        time of the media clock to call it again, None means nothing to do until the next item
+        """
+
+        while True:
+            tempNow = MediaClock.getTime()
+
+            # ChannelWorker doesn't work yet
+            if not self.dialogPacketsList:
+                return None
+
+            # go through dialogPacketList only in this state
+            if self.sipState!=SIP_STATE_AFTER_ACK:
+                return None
+
+            # No packet left in dialogPacketsList
+            if self.packetIndex >= len(self.dialogPackets):
+                return None
+
+            packet = self.dialogPackets[self.packetIndex]
+            if packet.dialogIndex<self.dialogIndex:
+                # Locate to the position of current dialog
+                self.packetIndex += 1
+                continue
+            if packet.dialogIndex>self.dialogIndex:
+                # Overflow the current dialog
+                return None
+
+            # 8250's sip stack send BYE in different port to INVITE's
+            if self.is8250:
+                if packet.udpType==UDP_TYPE_SIP and packet.sipType==SIP_TYPE_BYE:
+                    self.sipState = SIP_STATE_BYED
+
+                    self.__drawCallFlow(RIGHT_TO_LEFT, '(no waiting for 8250 BYE)')
+                    self.__drawCallFlowSummary()
+                    self.__restBeforeNextDialog(TIME_ONE_WINK*5, self.caseIndex, self.dialogIndex+1)
+                    continue
+
+            # This is a received packet, let it be and continue waiting for message from Distributor
+            if packet.received:
+                return None
+
+            # INVITE and ACK have been sent by the SIP state machine
+            if packet.udpType==UDP_TYPE_SIP and packet.sipType in (SIP_TYPE_INVITE, SIP_TYPE_ACK):
+                self.packetIndex += 1
+                continue
+
+            # send the packet at its captured offset from the answer by the media clock
+            tempDeadline = self.mediaClock.getDeadline(packet.delttime)
+            if tempNow<tempDeadline:
+                return tempDeadline
+
+            #print 'packet.udpType', packet.udpType
+            if packet.udpType in (UDP_TYPE_RTP, UDP_TYPE_RTP_EVENT):
+                # This is a RTP packet including 2833 type
+                tempData = packet.data
+                if packet.udpType==UDP_TYPE_RTP_EVENT:
+                    tempData = setTelephoneEventPt(tempData, self.telephoneEventPt)
+
+                #print 'send RTP'
+                self.rtpTransport.sendto(tempData, (callParameters.destination, self.sessionDestinationPort))
+                self.mediaClock.markSent(tempDeadline)
+
+                if packet.udpType==UDP_TYPE_RTP_EVENT:
+                    # RTP with same timestamp is duplicated message
+                    if packet.rtpTimestamp!=self.cachedRtpTimestampFor2833:
+                        tempDtmf = 'DTMF '+getDtmfChar(packet.dtmf)
+                        self.__drawCallFlow(LEFT_TO_RIGHT, tempDtmf)
+                        self.cachedRtpTimestampFor2833 = packet.rtpTimestamp
+
+                self.packetIndex += 1
+                continue
+            elif packet.udpType==UDP_TYPE_SIP and packet.sipType==SIP_TYPE_BYE:
+                self.__sendByeByPacket(packet.sipTemplate)
+                self.sipState = SIP_STATE_BYEING
+
+                self.packetIndex += 1
+                continue
+            else:
+                return None
+
+
+    def __moveCaseDialogTo(self, caseIndex=0, dialogIndex=0):
+        """
+        [Function]
+        Move the channel's case to the indicated position,
+        this function will load the cache file if the caseIndex move to the new postion
+
+        [Argument]
+        caseIndex: move to which case
+        dialogIndex: move to which dialog
+
+        [Return]
+        return True if successfully, otherwise return False
+        """
+
+        if caseIndex<0:
+            LOG.a('case index should not less then 0')
+
+        if caseIndex>len(self.caseList)-1 and callParameters.isStressTest==False:
+            print
+            print 'All test cases are completed, please press Ctrl+C to exit.'
+            return False
+        # else:
+
+        tempReleasingCacheName = ''
+        try:
+            if self.caseIndex>0:
+                tempReleasingCacheName = self.caseList[self.caseIndex].cacheName
+        except:
+            pass
+
+        try:
+            if caseIndex>len(self.caseList)-1:
+                # it is the last case, so go back to the first case
+                if self.caseIndex==0:
+                    # means there is only one case
+                    self.caseIndex = 0
+                    self.dialogIndex = 0
+                    self.packetIndex = 0
+                    self.nextInviteInSameCase = True
+                    return True
+                else:
+                    # there is more than one cases
+                    self.caseIndex = 0
+                    self.dialogIndex = 0
+                    self.packetIndex = 0
+
+                    # it's not current using case, so need to get a new case
+                    tempCaseData = self.caseList[self.caseIndex]
+                    self.resourceQueue.put(QueueItem(ITEM_TYPE_GET_A_CASE_REQ, QueueItemData4Resource(self.channelQueue, tempCaseData.cacheName, tempReleasingCacheName)))
+                    self.nextInviteInSameCase = False
+                    return False
+            else:
+                if caseIndex==self.caseIndex:
+                    if dialogIndex<=len(self.dialogPacketsList)-1:
+                        # it is not the last dialog in the case
+                        if self.dialogIndex!=dialogIndex:
+                            self.dialogIndex = dialogIndex
+                            self.packetIndex = 0
+                        self.nextInviteInSameCase = True
+                        return True
+                    else:
+                        # it is the last dialog in the case, so move to the next case
+                        return self.__moveCaseDialogTo(self.caseIndex+1)
+                else:
+                    tempCaseData = self.caseList[caseIndex]
+
+                    # it's not current using case, so need to load the packets list from the cache file
+                    self.resourceQueue.put(QueueItem(ITEM_TYPE_GET_A_CASE_REQ, QueueItemData4Resource(self.channelQueue, tempCaseData.cacheName, tempReleasingCacheName)))
+                    self.caseIndex = caseIndex
+                    # the dialogIndex is resetted to 0
+                    self.dialogIndex = 0
+                    self.packetIndex = 0
+                    self.nextInviteInSameCase = False
+                    return False
+        finally:
+            self.__resetDialogContext()
+
+
+    def __holdCurrentDialog(self):
+        """
+        [Function]
+        Load the packets of the dialog which is going to INVITE, and release the former one
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        (N/A)
+        """
+
+        if self.heldDialog!=(self.dialogPacketsList, self.dialogIndex):
+            if self.heldDialog:
+                self.heldDialog[0].releaseDialog(self.heldDialog[1])
+
+            self.dialogPackets = self.dialogPacketsList.getDialog(self.dialogIndex)
+            self.heldDialog = (self.dialogPacketsList, self.dialogIndex)
+
+        if self.willPrefetch:
+            self.resourceQueue.put(QueueItem(ITEM_TYPE_PREFETCH_A_DIALOG, (self.dialogPacketsList, self.dialogIndex+1)))
+
+
+    def __resetDialogContext(self):
+        """
+        [Function]
+        reset something when begining a dialog
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        (N/A)
+        """
+
+        self.passed = True
+        self.cachedRtpTimestamp = -1
+        self.cachedIvrEventStr = ''
+        self.ignoredIvrEventCount = 0
+        self.mediaClock = None
+
+
+    def __restBeforeNextDialog(self, timeToRest, caseIndex, dialogIndex):
+        """
+        [Function]
+        Rest some time before start the next dialog, the messages received during the rest are dropped.
+        The channel is not blocked, the timer of the rest starts the dialog when it expires
+
+        [Argument]
+        timeToRest: how long to rest
+        caseIndex: which case to start after the rest
+        dialogIndex: which dialog to start after the rest
+
+        [Return]
+        (N/A)
+        """
+
+        self.__setTimer(timeToRest, TIMER_TYPE_REST)
+        self.dialogAfterRest = (caseIndex, dialogIndex)
+
+
+    def __setTimer(self, timeout, timerType):
+        """
+        [Function]
+        Set the timer of the channel by TimerWheel, the one set before is cancelled
+
+        [Argument]
+        timeout: seconds from now
+        timerType: TIMER_TYPE_*
+
+        [Return]
+        (N/A)
+        """
+
+        self.__cancelTimer()
+        self.timer = self.timerWheel.add(timeout, timerType, self.channelQueue)
+
+
+    def __cancelTimer(self):
+        """
+        [Function]
+        Cancel the timer of the channel if it is set
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        (N/A)
+        """
+
+        if self.timer is not None:
+            self.timerWheel.cancel(self.timer)
+            self.timer = None
+
+
+    def __handleTimer(self, timerType):
+        """
+        [Function]
+        Deal with the timer of the channel when it expires
+
+        [Argument]
+        timerType: TIMER_TYPE_*
+
+        [Return]
+        return False if the channel exits, otherwise return True
+        """
+
+        if timerType==TIMER_TYPE_START_WORK:
+            self.hasStarted = True
+            self.__startDialog()
+        elif timerType==TIMER_TYPE_REST:
+            self.__startDialog(*self.dialogAfterRest)
+        elif timerType==TIMER_TYPE_SIP_RESPONSE:
+            self.__receiveNoResponse()
+        elif timerType==TIMER_TYPE_EXIT:
+            LOG.w('Channel %d exits without the response of BYE in %d seconds' % (self.channelIndex, TIME_GRACE_TO_EXIT))
+            self.sipState = SIP_STATE_BYED
+            return False
+
+        return True
+
+
+    def __startDialog(self, caseIndex=0, dialogIndex=0):
+        """
+        [Function]
+        Start dialog for the channel's case
+
+        [Argument]
+        caseIndex: which case
+        dialogIndex: which dialog
+
+        [Return]
+        (N/A)
+        """
+
+        # no dialog begins when exiting
+        if self.isExiting:
+            return
+        #else:
+
+        if self.__moveCaseDialogTo(caseIndex, dialogIndex):
+            self.__sendInvite()
+
+
+    def __sendInvite(self):
+        """
+        [Function]
+        Start dialog by sending SIP Invite message
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        (N/A)
+        """
+
+        if self.sipState!=SIP_STATE_IDLE:
+            LOG.e('the channel is in invalid status %d, when tring to send INVITE' % (self.sipState))
+            return
+
+        self.__holdCurrentDialog()
+
+        #print 'state: idle'
+
+        tempCalled = ''
+        tempRedirect = ''
+        data = ''
+        tempSIP = ''
+        tempSDP = ''
+
+        # get a case from the cases list
+        tempCaseData = self.caseList[self.caseIndex]
+
+        #LOG.writeLog('caseIndex: ' + str(self.caseIndex))
+        #LOG.writeLog('dialogIndex: ' + str(self.dialogIndex))
+        #LOG.writeLog('packetIndex: ' + str(self.packetIndex))
+        #LOG.writeLog('snoopFileName: ' + str(tempCaseData.snoopFileName))
+
+        # search the indicated dialog in the case
+        foundTheDialog = False
+        invitePackage = ''
+
+        for packet in self.dialogPackets:
+            # get the INVITE packet from the packets list at first
+            #   1. this packet is a SIP INVITE
+            #   2. the INVITE is for the indicated dialog
+            if packet.udpType==UDP_TYPE_SIP and packet.sipType==SIP_TYPE_INVITE:
+                foundTheDialog = True
+
+                if not self.nextInviteInSameCase:
+                    # prepare called
+                    if callParameters.calledCount<=1:
+                        if tempCaseData.caseConfig and len(tempCaseData.caseConfig.called)>0:
+                            # use case config's CALLED number
+                            tempCalled = tempCaseData.caseConfig.calledPrefix + tempCaseData.caseConfig.called
+                        else:
+                            # use callParameters' CALLED number
+                            tempCalled = callParameters.calledPrefix + callParameters.called
+                    else:
+                        if self.calledIndex>self.maxCalledIndex:
+                            self.calledIndex = self.minCalledIndex
+                        if tempCaseData.caseConfig and len(tempCaseData.caseConfig.called)>0:
+                            # use case config's CALLED number
+                            tempCalled = tempCaseData.caseConfig.calledPrefix + tempCaseData.caseConfig.called
+                        else:
+                            # use callParameters' CALLED number
+                            tempCalled = callParameters.calledPrefix + str(int(callParameters.called)+self.calledIndex)
+                        self.calledIndex += 1
+                    # save called to channel data
+                    self.called = tempCalled
+
+                    #LOG.writeLog('channel: %d, called: %s' % (self.channelIndex, self.called))
+
+                    # prepare redirect & reason
+                    tempDoRedirect = (callParameters.redirectCount>0)
+                    if callParameters.redirectCount<=1:
+                        if tempCaseData.caseConfig and len(tempCaseData.caseConfig.redirect)>0:
+                            # use case config's REDIRECT number
+                            tempDoRedirect = True
+                            tempRedirect = tempCaseData.caseConfig.calledPrefix + tempCaseData.caseConfig.redirect
+
+                            if len(tempCaseData.caseConfig.reason)>0:
+                                # use case config's REASON number
+                                tempReason = tempCaseData.caseConfig.reason
+                            else:
+                                # use default REASON number
+                                tempReason = DEFAULT_PARAMETER_REASON
+                        else:
+                            # use callParameters' REDIRECT number & REASON
+                            tempRedirect = callParameters.calledPrefix + callParameters.redirect
+                            tempReason = callParameters.reason
+                    else:
+                        if self.redirectIndex>self.maxRedirectIndex:
+                            self.redirectIndex = self.minRedirectIndex
+                        if tempCaseData.caseConfig and len(tempCaseData.caseConfig.redirect)>0:
+                            # use case config's REDIRECT number
+                            tempRedirect = tempCaseData.caseConfig.calledPrefix + tempCaseData.caseConfig.redirect
+
+                            if len(tempCaseData.caseConfig.reason)>0:
+                                # use case config's REASON
+                                tempReason = tempCaseData.caseConfig.reason
+                            else:
+                                # use default REASON
+                                tempReason = DEFAULT_PARAMETER_REASON
+                        else:
+                            # use callParameters' REDIRECT number & REASON
+                            tempRedirect = callParameters.calledPrefix + str(int(callParameters.redirect)+self.redirectIndex)
+                            tempReason = callParameters.reason
+                        self.redirectIndex += 1
+
+                        #print 'redirectIndex:', self.redirectIndex
+                    if tempDoRedirect:
+                        # save redirect & reason to channel data
+                        self.redirect = tempRedirect
+                        self.reason = tempReason
+                    else:
+                        # clear redirect & reason
+                        tempRedirect = ''
+                        tempReason = ''
+                        self.redirect = ''
+                        self.reason = ''
+
+                    # prepare calling
+                    if tempCaseData.caseConfig and len(tempCaseData.caseConfig.calling)>0:
+                        # use case config's CALLING number
+                        tempCalling = tempCaseData.caseConfig.calling
+                    else:
+                        # use callParameters' CALLING number
+                        tempCalling = callParameters.calling
+                    # save calling to channel data
+                    self.calling = tempCalling
+
+                # create from tag
+                tempFromTag = self.__createVoicebirdTag()
+                self.fromTag = tempFromTag
+                # create call ID
+                self.callId = self.fromTag #+ '@' + callParameters.source
+
+                tempExtraHeaders = ''
+                if len(self.redirect)>0:
+                    tempExtraHeaders = '\r\n' + 'Diversion: <sip:%s@%s:%d>;reason="%s";counter=1' % \
+                                        (self.redirect, callParameters.source, localSipPort, self.reason)
+
+                tempValues = self.__getSipSlotValues(self.reason, tempExtraHeaders)
+                tempValues[SLOT_AUDIO_PORT] = str(self.rtpTransport.getsockname()[1])
+                invitePackage = packet.sipTemplate.render(tempValues)
+
+                self.__sendSip(invitePackage)
+                self.sipState = SIP_STATE_WAITING_200
+                self.__setTimer(TIME_TO_WAIT_SIP_RESPONSE, TIMER_TYPE_SIP_RESPONSE)
+                LOG.writeLog('Send INVITE whose from tag is '+self.fromTag)
+                #print 'state: waiting 200'
+
+                tempCaseInfo = 'CASE (%d/%d): %s, DIALOG: %d/%d' % \
+                                (self.caseIndex+1, len(self.caseList), tempCaseData.snoopFileName, self.dialogIndex+1, len(self.dialogPacketsList))
+                tempCallerCalled = self.calling + self.called.rjust(PRINT_CENTER_WIDTH)
+                self.__drawCallFlowHeader(tempCaseInfo, tempCallerCalled)
+                self.__drawCallFlow(LEFT_TO_RIGHT, 'INVITE')
+
+                # don't break, go on to find the ACK
+                continue
+
+            # if it is a ACK packet for this dialog, just save it for future using
+            #   1. need to search ACK for this dialog
+            #   2. in the same dialog
+            #   3. it is a SIP ACK
+            if foundTheDialog and packet.udpType==UDP_TYPE_SIP \
+                              and packet.sipType==SIP_TYPE_ACK:
+                self.ack = packet.sipTemplate
+                self.answerDelttime = packet.delttime
+                #print 'GET ACK:'
+                #print packet.data
+
+                # as soon as geting the ACK, break the dialog search
+                break
+
+        # if cannot find any dialog in the case, just move to the next case
+        if not foundTheDialog:
+            if self.dialogIndex<=0:
+                LOG.a("There is no SIP INVITE found in the case '%s'" % (tempCaseData.snoopFileName))
+                if len(self.caseList)==1:
+                    raise
+            self.__startDialog(self.caseIndex+1)
+
+
+    def __getSipSlotValues(self, reason, extraHeaders=''):
+        """
+        [Function]
+        Get the values of the SIP template slots for this call, including P-Asserted-Identity
+
+        [Argument]
+        reason: value of [REASON]
+        extraHeaders: header lines added to the end of the headers, each line starts with \\r\\n
+
+        [Return]
+        list of the slot values for SipTemplate.render(), the slots not for the call keep their names
+
+        [See Also]
+        SipTemplate
+        """
+
+        tempValues = list(SIP_TEMPLATE_SLOTS)
+        tempValues[SLOT_DESTINATION] = callParameters.destination
+        tempValues[SLOT_CALLED] = self.called
+        tempValues[SLOT_SOURCE] = callParameters.source
+        tempValues[SLOT_FROM_TAG] = self.fromTag
+        tempValues[SLOT_TO_TAG] = self.toTag
+        tempValues[SLOT_REDIRECT] = self.redirect
+        tempValues[SLOT_REASON] = reason
+
+        # PARAMETER -pai: P-Asserted-Identity
+        if '-pai' in sys.argv:
+            # replace calling number to be anonymous
+            tempValues[SLOT_CALLING] = 'Anonymous'
+            tempValues[SLOT_FROM_CALLING] = 'Anonymous'
+
+            # replace From display name to be anonymous
+            tempValues[SLOT_FROM_DISPLAY] = '"Anonymous"'
+
+            # Note: Don't delete Contact field even P-Asserted-Identity
+
+            # add two head fields
+            extraHeaders += '\r\n' + 'P-Asserted-Identity: "%s"<sip:%s@%s>' % (self.calling, self.calling, callParameters.source)
+            extraHeaders += '\r\n' + 'Privacy: id'
+        else:
+            tempValues[SLOT_CALLING] = self.calling
+            tempValues[SLOT_FROM_CALLING] = self.calling
+
+            # PARAMETER -fdn: From Display Name
+            if '-fdn' in sys.argv:
+                strDisplayName = '"%s"' % (sys.argv[sys.argv.index('-fdn')+1])
+                tempValues[SLOT_FROM_DISPLAY] = '"'+strDisplayName+'"'
+            # PARAMETER -cfdn: Clear From Display Name
+            elif '-cfdn' in sys.argv:
+                tempValues[SLOT_FROM_DISPLAY] = ''
+            else:
+                strDisplayName = '"%s"' % (self.calling)
+                tempValues[SLOT_FROM_DISPLAY] = '"'+strDisplayName+'"'
+
+        tempValues[SLOT_EXTRA_HEADERS] = extraHeaders
+        return tempValues
+
+
+    def __createVoicebirdTag(self):
+        """
+        [Function]
+        Create voicebird format (From) Tag
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        return voicebird format tag
+        """
+
+        tempTag = VOICEBIRD_TAG_PREFIX
+        tempTag += 'F' + str(self.channelIndex).zfill(LEN_OF_VOICEBIRD_TAG_UNIT)
+        tempTag += 'C' + str(self.caseIndex).zfill(LEN_OF_VOICEBIRD_TAG_UNIT)
+        tempTag += 'D' + str(self.dialogIndex).zfill(LEN_OF_VOICEBIRD_TAG_UNIT)
+        tempTag += 'A' + str(int(time.time()*1000))
+        return tempTag
+
+
+    def __receive100(self, message):
+        """
+        [Function]
+        Receive 100, and then only print information
+
+        [Argument]
+        message: ReceivedSipMessage of the SIP response 100
+
+        [Return]
+        If this message is for this dialog, return True. Otherwise return False
+        """
+
+        if message.fromTag==self.fromTag and message.callId==self.callId:
+            self.__drawCallFlow(RIGHT_TO_LEFT, '100 Trying')
+            if message.data.find(IVR_8250_SIGN)>-1:
+                self.is8250 = True
+            return True
+        else:
+            LOG.w("The 100 can not match. Waiting From tag '%s', Call-ID '%s', but received From tag '%s', Call-ID '%s'" % (self.fromTag, self.callId, message.fromTag, message.callId))
+
+        #print data
+        #print '-'*70
+        return False
+
+
+    def __receive180(self, message):
+        """
+        [Function]
+        Receive 180, and then only print information
+
+        [Argument]
+        message: ReceivedSipMessage of the SIP response 180
+
+        [Return]
+        If this message is for this dialog, return True. Otherwise return False
+        """
+
+        if message.fromTag==self.fromTag and message.callId==self.callId:
+            self.__drawCallFlow(RIGHT_TO_LEFT, '180 Ring')
+            return True
+        else:
+            LOG.w("The 180 can not match. Waiting From tag '%s', Call-ID '%s', but received From tag '%s', Call-ID '%s'" % (self.fromTag, self.callId, message.fromTag, message.callId))
+
+        #print data
+        #print '-'*70
+        return False
+
+
+    def __receive183(self, message):
+        """
+        [Function]
+        Receive 183
+
+        [Argument]
+        message: ReceivedSipMessage of the SIP response 183
+
+        [Return]
+        If this message is for this dialog, return True. Otherwise return False
+        """
+
+        if message.fromTag==self.fromTag and message.callId==self.callId:
+            self.__drawCallFlow(RIGHT_TO_LEFT, '183 Session Progress')
+            return True
+        else:
+            LOG.w("The 183 can not match. Waiting From tag '%s', Call-ID '%s', but received From tag '%s', Call-ID '%s'" % (self.fromTag, self.callId, message.fromTag, message.callId))
+            return False
+
+
+    def __receiveErrorResponse(self, message):
+        """
+        [Function]
+        Receive error response, i.e. a response not handled by the others, then finish the dialog
+
+        [Argument]
+        message: ReceivedSipMessage of the SIP response
+
+        [Return]
+        True
+        """
+
+        if message.fromTag==self.fromTag and message.callId==self.callId:
+            self.toTag = message.toTag
+            self.__drawCallFlow(RIGHT_TO_LEFT, str(message.responseCode))
+
+            self.__sendAck()
+            self.sipState = SIP_STATE_BYED
+            self.__cancelTimer()
+
+            self.passed &= False
+            self.__drawCallFlowSummary(RESULT_VALUE_SIP_ERROR)
+            self.__startDialog(self.caseIndex, self.dialogIndex+1)
+        else:
+            tempLogStr = """
+-- This error response cannot match its dialog --
++Channel Information:
+ From Tag: %s
+ To Tag: %s
+ Call-ID: %s
++Error Response Message:
+%s
+""" % (self.fromTag, self.toTag, self.callId, message.data)
+            LOG.w(tempLogStr)
+        return True
+
+
+    def __receive200(self, message):
+        """
+        [Function]
+        Receive 200, then send ACK for INVITE or begin the next dialog for BYE
+
+        [Argument]
+        message: ReceivedSipMessage of the SIP response 200
+
+        [Return]
+        If this message is for this dialog, return True. Otherwise return False
+        """
+
+        #print '200 OK data:'
+        #print data
+
+        if self.sipState==SIP_STATE_BYEING:
+            if message.fromTag==self.fromTag and message.callId==self.callId:
+                #self.__drawCallFlow(RIGHT_TO_LEFT, '200 OK')
+                self.sipState = SIP_STATE_BYED
+
+                self.__restBeforeNextDialog(TIME_ONE_WINK*3, self.caseIndex, self.dialogIndex+1)
+                return True
+            else:
+                LOG.w("The 200 can not match. Waiting From tag '%s', Call-ID '%s', but received From tag '%s', Call-ID '%s'" % (self.fromTag, self.callId, message.fromTag, message.callId))
+                return False
+        else:
+            try:
+                # PARAMETER -w: Wait time, how long to wait after 183/200 then send RTP
+                tempWaitTimeThenRtp = int(sys.argv[sys.argv.index('-w')+1])
+                self.baseTimeForRtp = MediaClock.getTime() + tempWaitTimeThenRtp
+            except:
+                self.baseTimeForRtp = MediaClock.getTime()
+
+            if message.fromTag==self.fromTag and message.callId==self.callId:
+                self.__drawCallFlow(RIGHT_TO_LEFT, '200 OK')
+                self.toTag = message.toTag
+                self.sessionDestinationPort = getSdpMediaPort(message.data)
+                self.telephoneEventPt = getTelephoneEventPtFromSdp(message.data)
+                LOG.startADialog()
+
+                if self.sipState==SIP_STATE_WAITING_200:
+                    self.__cancelTimer()
+                    self.__sendAck()
+                    self.mediaClock = MediaClock(self.baseTimeForRtp, self.answerDelttime)
+                    self.sipState = SIP_STATE_AFTER_ACK
+                    #print 'state: after ack'
+                else:
+                    LOG.i('receive 200 OK in invalid SIP status %d'  % (self.sipState))
+                return True
+            else:
+                LOG.w("The 200 can not match. Waiting From tag '%s', Call-ID '%s', but received From tag '%s', Call-ID '%s'" % (self.fromTag, self.callId, message.fromTag, message.callId))
+                return False
+
+
+    def __receiveBye(self, message):
+        """
+        [Function]
+        Receive Bye, then response it and begin the next dialog
+
+        [Argument]
+        message: ReceivedSipMessage of the SIP request BYE
+
+        [Return]
+        True
+        """
+
+        if message.fromTag==self.toTag and message.toTag==self.fromTag and message.callId==self.callId:
+            tempByeResponse = 'SIP/2.0 200 OK\r\n'
+            tempByeResponse += '\r\n'.join(message.viasList) + '\r\n'
+            tempByeResponse += message.toStr + '\r\n'
+            tempByeResponse += message.fromStr + '\r\n'
+            tempByeResponse += message.callIdStr + '\r\n'
+            tempByeResponse += message.cseqStr + '\r\n'
+            tempByeResponse += 'Content-Length:0\r\n\r\n'
+            #print 'Bye ACK:'
+            #print tempByeResponse
+
+            self.__drawCallFlow(RIGHT_TO_LEFT, 'BYE')
+            LOG.writeLog('Receive BYE whose from tag is %s, to tag is %s' % (message.fromTag, message.toTag))
+
+            self.__sendByeResponse(tempByeResponse)
+            self.sipState = SIP_STATE_BYED
+
+            if self.__gotoNextIvrEvent():
+                tempPacket = self.dialogPackets[self.packetIndex]
+                if tempPacket.udpType==UDP_TYPE_SIP and tempPacket.sipType==SIP_TYPE_BYE:
+                    #self.passed &= True
+                    self.__drawCallFlowSummary()
+                else:
+                    if self.passed:
+                        self.__drawCallFlowSummary(RESULT_VALUE_PASS_BUT_UNCOMPLETED)
+                    else:
+                        self.passed &= False
+                        self.__drawCallFlowSummary()
+            else:
+                if self.passed:
+                    tempResultValue = RESULT_VALUE_PASS_BUT_DEFECTIVE_CASE
+                else:
+                    tempResultValue = RESULT_VALUE_FAIL
+                self.__drawCallFlowSummary(tempResultValue)
+            self.__restBeforeNextDialog(TIME_ONE_WINK, self.caseIndex, self.dialogIndex+1)
+        else:
+            tempLogStr = """
+-- This BYE cannot match its dialog --
++Received
+ From Tag: %s
+ To Tag: %s
+ Call-ID: %s
++Channel's
+ To Tag: %s
+ From Tag: %s
+ Call-ID: %s
+""" % (message.fromTag, message.toTag, message.callId, self.toTag, self.fromTag, self.callId)
+            LOG.w(tempLogStr)
+        return True
+
+
+    def __receiveNoResponse(self):
+        """
+        [Function]
+        The final response of INVITE or BYE doesn't come in TIME_TO_WAIT_SIP_RESPONSE, then begin the next dialog
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        (N/A)
+        """
+
+        if self.sipState==SIP_STATE_WAITING_200:
+            self.__drawCallFlow(RIGHT_TO_LEFT, '(no response in %d seconds)' % (TIME_TO_WAIT_SIP_RESPONSE))
+            self.sipState = SIP_STATE_BYED
+
+            self.passed &= False
+            self.__drawCallFlowSummary(RESULT_VALUE_SIP_ERROR)
+            self.__startDialog(self.caseIndex, self.dialogIndex+1)
+        elif self.sipState==SIP_STATE_BYEING:
+            # Note: the result of the dialog has been written when sending BYE
+            LOG.w('Channel %d gets no response of BYE in %d seconds' % (self.channelIndex, TIME_TO_WAIT_SIP_RESPONSE))
+            self.sipState = SIP_STATE_BYED
+
+            self.__restBeforeNextDialog(TIME_ONE_WINK*3, self.caseIndex, self.dialogIndex+1)
+
+
+    def __sendSip(self, data):
+        """
+        [Function]
+        Send SIP message
+
+        [Argument]
+        data: message data
+
+        [Return]
+        (N/A)
+        """
+        self.sipTransport.send(data)
+
+
+    def __sendAck(self):
+        """
+        [Function]
+        Send Ack after receiveing 200
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        (N/A)
+        """
+
+        if self.ack is None:
+            LOG.a('ACK is not ready, please check your test case')
+            return
+
+        self.__sendSip(self.ack.render(self.__getSipSlotValues(self.reason)))
+        self.__drawCallFlow(LEFT_TO_RIGHT, 'ACK')
+
+
+    def __sendByeByPacket(self, sipTemplate):
+        """
+        [Function]
+        Send BYE according to the packet data
+
+        [Argument]
+        sipTemplate: SipTemplate of the BYE packet
+
+        [Return]
+        (N/A)
+        """
+
+        self.__sendSip(sipTemplate.render(self.__getSipSlotValues(callParameters.reason)))
+        LOG.writeLog('Send BYE whose from tag is '+self.fromTag)
+        self.__drawCallFlow(LEFT_TO_RIGHT, 'BYE')
+        self.__drawCallFlowSummary()
+        self.__setTimer(TIME_TO_WAIT_SIP_RESPONSE, TIMER_TYPE_SIP_RESPONSE)
+
+
+    def __sayGoodBye(self):
+        """
+        [Function]
+        Send BYE according to the template
+        Note: this function only used when exit
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        (N/A)
+        """
+
+        templateBye = SipTemplate(compileSipTemplate(TEMPLATE_BYE, False))
+        self.__sendSip(templateBye.render(self.__getSipSlotValues(self.reason)))
+        self.__drawCallFlow(LEFT_TO_RIGHT, 'BYE')
+        self.__drawCallFlowSummary(RESULT_VALUE_INTERRUPTED)
+
+
+    def __sendByeResponse(self, byeResponse):
+        """
+        [Function]
+        Response the Bye when called side hands up
+
+        [Argument]
+        byeResponse: the ACK data for response Bye
+
+        [Return]
+        (N/A)
+        """
+
+        self.__sendSip(byeResponse)
+        self.__drawCallFlow(LEFT_TO_RIGHT, '200 OK')
+
+
+    def __receiveSip(self, data):
+        """
+        [Function]
+        used to receive SIP message and manage the SIP state
+
+        [Argument]
+        data: the data received
+
+        [Return]
+        return True if it is a SIP message (then stop to dealing with the behind packets in list), otherwise return False
+        """
+
+        #print data
+        #print '-'*70
+
+        tempMessage = ReceivedSipMessage(data)
+
+        # a request is dispatched by its method, a response by its code
+        if tempMessage.responseCode>0:
+            tempHandler = self.sipHandlers.get(tempMessage.responseCode)
+            if tempHandler is not None and tempHandler(tempMessage):
+                return True
+            # the other responses, or the response cannot match the dialog
+            return self.__receiveErrorResponse(tempMessage)
+        else:
+            tempHandler = self.sipHandlers.get(tempMessage.method)
+            if tempHandler is not None:
+                return tempHandler(tempMessage)
+            return False
+
+
+class Parameters:
+    """
+    [Class]
+    This is a struct used to dump the parameters to a file
+    """
+
+    destination = ''
+    calledPrefix = ''
+    calledCount = 1
+    called = ''
+    source = ''
+    calling = ''
+    redirectCount = 0
+    redirect = ''
+    reason = ''
+    isStressTest = False
+    channelCount = 1
+
+    def __str__(self):
+        tempStr = ''
+        tempStr += ' destination: ' + self.destination + '\n'
+        tempStr += ' calledPrefix: ' + self.calledPrefix + '\n'
+        tempStr += ' calledCount: ' + str(self.calledCount) + '\n'
+        tempStr += ' called: ' + self.called + '\n'
+        tempStr += ' source: ' + self.source + '\n'
+        tempStr += ' calling: ' + self.calling + '\n'
+        tempStr += ' redirectCount: ' + str(self.redirectCount) + '\n'
+        tempStr += ' redirect: ' + self.redirect + '\n'
+        tempStr += ' reason: ' + self.reason + '\n'
+        tempStr += ' isStressTest: ' + str(self.isStressTest) + '\n'
+        tempStr += ' channelCount: ' + str(self.channelCount)
+        return tempStr
+
+
+class CaseConfig:
+    """
+    [Class]
+    This is a struct used to save Case Configuration
+    """
+
+    calledPrefix = ''
+    called = ''
+    calling = ''
+    redirect = ''
+    reason = ''
+
+    def __str__(self):
+        tempStr = ''
+        tempStr += ' calledPrefix: ' + self.calledPrefix + '\n'
+        tempStr += ' called: ' + self.called + '\n'
+        tempStr += ' calling: ' + self.calling + '\n'
+        tempStr += ' redirect: ' + self.redirect + '\n'
+        tempStr += ' reason: ' + self.reason
+        return tempStr
+
+
+class SocketPoller:
+    """
+    [Class]
+    Wait for the readable sockets by epoll, poll or select, the best one of the platform.
+    Note: select can only wait for the sockets whose fd is less than FD_SETSIZE (1024 on Linux),
+    so thousands of channels need epoll or poll
+    """
+
+    def __init__(self):
+        """
+        [Function]
+        new a SocketPoller object
+
+        [Argument]
+        (N/A)
+        """
+
+        self.socketsByFd = {}   # key: fd, value: socket
+
+        if hasattr(select, 'epoll'):
+            self.pollerName = 'epoll'
+            self.poller = select.epoll()
+        elif hasattr(select, 'poll'):
+            self.pollerName = 'poll'
+            self.poller = select.poll()
+        else:
+            self.pollerName = 'select'
+            self.poller = None
+
+
+    def register(self, sock):
+        """
+        [Function]
+        Wait for the socket to be readable
+
+        [Argument]
+        sock: socket
+
+        [Return]
+        (N/A)
+        """
+
+        tempFd = sock.fileno()
+        self.socketsByFd[tempFd] = sock
+        if self.pollerName=='epoll':
+            self.poller.register(tempFd, select.EPOLLIN)
+        elif self.pollerName=='poll':
+            self.poller.register(tempFd, select.POLLIN)
+
+
+    def poll(self, timeout):
+        """
+        [Function]
+        Wait until some sockets are readable or the timeout
+
+        [Argument]
+        timeout: seconds to wait at most
+
+        [Return]
+        list of the readable sockets
+        """
+
+        if self.pollerName=='select':
+            return select.select(self.socketsByFd.values(), [], [], timeout)[0]
+        #else:
+
+        # Note: round the timeout up to milliseconds, otherwise the wait less than 1 ms does not wait
+        tempMilliseconds = int(timeout*1000+0.999)
+        if self.pollerName=='epoll':
+            tempEvents = self.poller.poll(tempMilliseconds/1000.0)
+        else:
+            tempEvents = self.poller.poll(tempMilliseconds)
+
+        return [self.socketsByFd[fd] for fd,event in tempEvents]
+
+
+class ReactorQueue:
+    """
+    [Class]
+    The queue of a ChannelWorker on the event loop of -ev, it takes the place of Queue.Queue. The items put
+    are handled one by one by handleItem() of the owner in the event loop, so no lock is needed.
+    Note: ResourceController puts the items from its own thread, appending to a deque is atomic,
+    and it wakes up the event loop by ReactorWaker
+    """
+
+    def __init__(self, readyItems, owner=None):
+        """
+        [Function]
+        new a ReactorQueue object
+
+        [Argument]
+        readyItems: deque of (owner, item) to be handled by the event loop
+        owner: ChannelWorker which handles the items
+        """
+
+        self.readyItems = readyItems
+        self.owner = owner
+
+
+    def put(self, item):
+        self.readyItems.append((self.owner, item))
+
+
+class ReactorWaker:
+    """
+    [Class]
+    Wake up the event loop of -ev from another thread: a byte is sent to a socket registered to SocketPoller,
+    so the poll returns at once and the items put to ReactorQueue by the thread are handled without waiting
+    for the timeout of the poll
+    """
+
+    def __init__(self):
+        """
+        [Function]
+        new a ReactorWaker object
+
+        [Argument]
+        (N/A)
+        """
+
+        if hasattr(socket, 'socketpair'):
+            self.readSocket,self.writeSocket = socket.socketpair()
+        else:
+            # Note: there is no socketpair in python 2 on Windows, a UDP socket sends to itself
+            self.readSocket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.readSocket.bind(('127.0.0.1', 0))
+            self.readSocket.connect(self.readSocket.getsockname())
+            self.writeSocket = self.readSocket
+
+        self.readSocket.setblocking(False)
+        self.writeSocket.setblocking(False)
+
+
+    def wakeUp(self):
+        """
+        [Function]
+        Wake up the event loop, it is called by another thread
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        (N/A)
+        """
+
+        try:
+            self.writeSocket.send('\x00')
+        except socket.error:
+            # the buffer is full of the bytes which have not been read, the event loop will be woken up by them
+            pass
+
+
+    def clear(self):
+        """
+        [Function]
+        Read all bytes sent by wakeUp(), it is called by the event loop before handling the items
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        (N/A)
+        """
+
+        try:
+            while self.readSocket.recv(PIPE_READ_SIZE):
+                pass
+        except socket.error:
+            pass
+
+
+class Distributor:
+    """
+    [Class]
+    Used to receive SIP/RTP messages and then distributor messages to ChannelWorker
+    """
+
+    channelQueueList = []           # value: ChannelQueue
+    channelQueueDictByIndex = {}    # key: channel index, value: ChannelQueue
+    channelQueueDictByUdpPort = {}  # key: UDP port, value: ChannelQueue
+                                    # channelQueueDictByUdpPort is used to match the received RTP message to the channel according to the RTP message's IP port
+    resourceQueue = None
+    channelWorkerList = []          # value: ChannelWorker
+    useReactor = False
+    reactorWaker = None             # ReactorWaker with -ev, ResourceController wakes up the event loop by it
+    shardIndex = None
+
+    def __init__(self, caseList, shardIndex=None, shardCount=1):
+        """
+        [Function]
+        new a Distributor object
+
+        [Argument]
+        caseList: list of CaseData
+        shardIndex: index of the worker process of -mp, None if all channels run in this process
+        shardCount: count of the worker processes of -mp, the channels whose index % shardCount==shardIndex
+                    run in this process
+        """
+
+        self.shardIndex = shardIndex
+        self.caseList = caseList
+        try:
+            callParameters.destination = socket.gethostbyname(callParameters.destination)
+        except:
+            LOG.a('The destination host address is invalid, please try to setup the call parameter again')
+            sys.exit(1)
+            return
+
+        if callParameters.calling=='':
+            callParameters.calling = DEFAULT_PARAMETER_PHONE
+
+        if callParameters.redirect=='':
+            callParameters.redirect = callParameters.called
+
+        if callParameters.reason=='':
+            callParameters.reason = DEFAULT_PARAMETER_REASON
+
+        self.sipTransport = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            self.sipTransport.bind(('', localSipPort))
+        except:
+            print 'The SIP port %d has been used by another program, please confirm and try again later.' % (localSipPort)
+            sys.exit(1)
+            return
+
+        # it's very important to setsockopt
+        self.sipTransport.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sipTransport.connect((callParameters.destination, DEFAULT_SIP_PORT))
+
+        self.poller = SocketPoller()
+        self.poller.register(self.sipTransport)
+
+        # PARAMETER -ev: run all channels on one Event loop in this thread, rather than a thread for each channel
+        self.useReactor = ('-ev' in sys.argv)
+
+        self.channelWorkerList = []
+        if self.useReactor:
+            # Note: the responses to all channels arrive at once when they start dialogs together,
+            #       and the event loop doesn't read the SIP socket while it runs the channels
+            try:
+                self.sipTransport.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SIP_RECEIVE_BUFFER_SIZE)
+            except:
+                LOG.w('Cannot enlarge the receive buffer of the SIP socket')
+
+            self.readyItems = collections.deque()   # (owner, item) put to ReactorQueue, to be handled by the event loop
+            self.wakeUpHeap = []                    # (time, channelIndex) to call process() of the channel
+            self.wakeUpTimes = {}                   # key: channelIndex, value: the latest time returned by its process()
+            self.channelWorkerDictByIndex = {}      # key: channelIndex, value: ChannelWorker
+            self.killedChannels = set()
+
+            self.reactorWaker = ReactorWaker()
+            self.poller.register(self.reactorWaker.readSocket)
+        else:
+            self.reactorWaker = None
+
+        # Note: ResourceController is a thread for both engines, reading the cache blocks it
+        self.resourceQueue = Queue.Queue()
+        tempResourceController = ResourceController(self.resourceQueue, self.reactorWaker)
+        tempResourceController.setDaemon(True)
+        tempResourceController.start()
+
+        # the timers of all channels, it is advanced by the event loop with -ev
+        self.timerWheel = TimerWheel(TIME_ONE_TICK)
+        if not self.useReactor:
+            self.timerWheel.setDaemon(True)
+            self.timerWheel.start()
+
+        if self.shardIndex is None:
+            tempChannelIndexes = range(callParameters.channelCount)
+        else:
+            # Note: the channels are dealt to the worker processes in turn, so the processes share the load
+            #       while the channels start one after another by ONE_UNIT_TIME_WAIT_TO_WORK
+            tempChannelIndexes = range(self.shardIndex, callParameters.channelCount, shardCount)
+
+        for channelIndex in tempChannelIndexes:
+            # create Queue object
+            if self.useReactor:
+                tempChannelQueue = ReactorQueue(self.readyItems)
+            else:
+                tempChannelQueue = Queue.Queue()
+
+            # create ChannelWorker object, which is a thread without -ev
+            tempChannelWorker = ChannelWorker(channelIndex, self.caseList, self.sipTransport, tempChannelQueue, self.resourceQueue, self.timerWheel)
+            tempRtpTransport = tempChannelWorker.getLocalRtpTransport()
+
+            # add to the calls list
+            self.channelQueueList.append(tempChannelQueue)
+            self.channelQueueDictByIndex[channelIndex] = tempChannelQueue
+            self.channelWorkerList.append(tempChannelWorker)
+
+            self.poller.register(tempRtpTransport)
+            self.channelQueueDictByUdpPort[tempRtpTransport.getsockname()[1]] = tempChannelQueue
+
+            if self.useReactor:
+                tempChannelQueue.owner = tempChannelWorker
+                self.channelWorkerDictByIndex[channelIndex] = tempChannelWorker
+            else:
+                # start ChannelWorker
+                tempChannelWorker.setDaemon(True)
+                tempChannelWorker.start()
+
+        if self.useReactor:
+            LOG.i('%d channels run on one event loop by %s' % (len(self.channelWorkerList), self.poller.pollerName))
+
+
+    def __del__(self):
+        """
+        [Function]
+        Kill all threads in this function
+
+        [Argument]
+        (N/A)
+        """
+
+        # Bye all
+        for tempChannelQueue in self.channelQueueList:
+            # Stop ChannelWorker thread
+            tempChannelQueue.put(QueueItem(ITEM_TYPE_SIGN_TO_KILL_THREAD))
+
+        if self.resourceQueue:
+            self.resourceQueue.put(QueueItem(ITEM_TYPE_SIGN_TO_KILL_THREAD))
+
+        # Note: the main process of -mp prints it for all worker processes
+        if self.shardIndex is None:
+            print
+            print 'Wait a minute to exit ...'
+
+        # the channels say BYE and wait for the responses, at most TIME_GRACE_TO_EXIT by their timers
+        if self.channelWorkerList:
+            tempTimeToExit = MediaClock.getTime() + MAX_TIME_TO_EXIT
+            while self.__hasAliveChannel() and MediaClock.getTime()<tempTimeToExit:
+                if self.useReactor:
+                    self.__runEventLoopOnce()
+                else:
+                    for readable in self.poller.poll(TIME_ONE_TICK):
+                        self.__receive(readable)
+
+        deleteLogObj()
+        time.sleep(TIME_ONE_WINK*3)
+
+
+    def __hasAliveChannel(self):
+        """
+        [Function]
+        Check whether any channel has not exited
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        True if some channel is alive, otherwise False
+        """
+
+        if self.useReactor:
+            return len(self.killedChannels)<len(self.channelWorkerList)
+        #else:
+
+        for channelWorker in self.channelWorkerList:
+            if channelWorker.isAlive():
+                return True
+        return False
+
+
+    def doSelect(self):
+        """
+        [Function]
+        distribute messages to ChannelWorker, with -ev run the channels on the event loop too
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        (N/A)
+        """
+
+        if (callParameters.isStressTest or 'nf' in sys.argv) and self.shardIndex is None:
+            # Note: the line count of this information is used by __printStatisticInScreen
+            print 'Wait to start ...'
+            print
+
+        for channelQueue in self.channelQueueList:
+            # give a sign to ChannelWorker to start dialog
+            channelQueue.put(QueueItem(ITEM_TYPE_START_WORK))
+
+        if self.useReactor:
+            self.__runEventLoop()
+            return
+        #else:
+
+        while True:
+            for readable in self.poller.poll(TIME_ONE_WINK):
+                self.__receive(readable)
+
+
+    def __receive(self, readable):
+        """
+        [Function]
+        Receive a message from the readable socket and distribute it to ChannelWorker
+
+        [Argument]
+        readable: the readable socket
+
+        [Return]
+        (N/A)
+        """
+
+        if self.reactorWaker and readable is self.reactorWaker.readSocket:
+            # the items put by ResourceController are handled by the event loop after receiving
+            self.reactorWaker.clear()
+            return
+        #else:
+
+        if readable!=self.sipTransport:
+            # 1. deal with RTP message before SIP
+            try:
+                tempData = readable.recv(MIN_UDP_LEN)
+            except KeyboardInterrupt:
+                raise KeyboardInterrupt
+            except:
+                LOG.w('Cannot receive the RTP data')
+            else:
+                #if tempData.startswith('BYE'):
+                #    print 'receive BYE:\n%s' % (tempData)
+
+                #print 'receive RTP'
+                tempPayloadType = quicklyGetPt(tempData)
+
+                if tempPayloadType not in (PAYLOAD_TYPE_IVR_RECORD_FILE, PAYLOAD_TYPE_IVR_PROMPT):
+                    #LOG.i('A RTP package with pt %d is ignored' % (tempPayloadType))
+                    return
+                #else:
+
+                tempPort = readable.getsockname()[1]
+                tempChannelQueue = self.channelQueueDictByUdpPort[tempPort]
+                if not tempChannelQueue:
+                    LOG.w('Cannot find the rtp queue according to the UDP port %d' % (tempPort))
+                else:
+                    tempChannelQueue.put(QueueItem(ITEM_TYPE_RTP_DATA, tempData))
+        else:
+            # 2. deal with SIP message
+            try:
+                tempData = self.sipTransport.recv(MIN_UDP_LEN*2)
+            except KeyboardInterrupt:
+                raise KeyboardInterrupt
+            except:
+                LOG.w('Cannot receive the SIP data')
+            else:
+                #print 'receive SIP:\n', tempData
+                self.__distributeSipMsg(tempData)
+
+
+    def __runEventLoop(self):
+        """
+        [Function]
+        Run all channels on one event loop of -ev
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        (N/A)
+        """
+
+        while True:
+            self.__runEventLoopOnce()
+
+
+    def __runEventLoopOnce(self):
+        """
+        [Function]
+        Run a round of the event loop of -ev: wait for the sockets until the earliest time a channel asks
+        to be processed or the next tick of TimerWheel, then handle the received messages, the expired
+        timers and the due channels
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        (N/A)
+        """
+
+        self.__runReadyItems()
+
+        tempTimeout = TIME_ONE_WINK
+        if self.wakeUpHeap:
+            tempTimeout = min(max(self.wakeUpHeap[0][0]-MediaClock.getTime(), 0.0), TIME_ONE_WINK)
+        if self.timerWheel.timerCount>0:
+            tempTimeout = min(tempTimeout, self.timerWheel.tick)
+
+        # Note: read the sockets until nothing is left before the channels are processed,
+        #       or the receive buffer of the SIP socket overflows under load
+        tempReadableList = self.poller.poll(tempTimeout)
+        tempPollCount = 1
+        while tempReadableList:
+            for readable in tempReadableList:
+                self.__receive(readable)
+            if tempPollCount>=MAX_POLLS_TO_DRAIN:
+                break
+            #else:
+            tempReadableList = self.poller.poll(0)
+            tempPollCount += 1
+
+        self.timerWheel.advance(MediaClock.getTime())
+        self.__runReadyItems()
+
+        tempNow = MediaClock.getTime()
+        while self.wakeUpHeap and self.wakeUpHeap[0][0]<=tempNow:
+            tempWakeUpTime,tempChannelIndex = heapq.heappop(self.wakeUpHeap)
+            # Note: the time is out of date if the channel has been processed again
+            if self.wakeUpTimes.get(tempChannelIndex)==tempWakeUpTime:
+                self.__processChannel(self.channelWorkerDictByIndex[tempChannelIndex])
+
+
+    def __runReadyItems(self):
+        """
+        [Function]
+        Handle the items put to ReactorQueue in order, then process the channels which got items
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        (N/A)
+        """
+
+        while self.readyItems:
+            tempTouchedChannels = {}    # key: channelIndex, value: ChannelWorker
+            while self.readyItems:
+                tempOwner,tempItem = self.readyItems.popleft()
+                if tempOwner.channelIndex in self.killedChannels:
+                    continue
+
+                try:
+                    tempIsAlive = tempOwner.handleItem(tempItem)
+                except KeyboardInterrupt:
+                    raise KeyboardInterrupt
+                except:
+                    self.__killChannel(tempOwner, sys.exc_info()[1])
+                    continue
+
+                if tempIsAlive:
+                    tempTouchedChannels[tempOwner.channelIndex] = tempOwner
+                else:
+                    self.__killChannel(tempOwner)
+
+            for channelWorker in tempTouchedChannels.itervalues():
+                self.__processChannel(channelWorker)
+
+
+    def __processChannel(self, channelWorker):
+        """
+        [Function]
+        Call process() of the channel, and keep the time it asks to be processed again
+
+        [Argument]
+        channelWorker: ChannelWorker
+
+        [Return]
+        (N/A)
+        """
+
+        if channelWorker.channelIndex in self.killedChannels:
+            return
+
+        try:
+            tempWakeUpTime = channelWorker.process()
+        except KeyboardInterrupt:
+            raise KeyboardInterrupt
+        except:
+            self.__killChannel(channelWorker, sys.exc_info()[1])
+            return
+
+        self.wakeUpTimes[channelWorker.channelIndex] = tempWakeUpTime
+        if tempWakeUpTime is not None:
+            heapq.heappush(self.wakeUpHeap, (tempWakeUpTime, channelWorker.channelIndex))
+
+
+    def __killChannel(self, channelWorker, error=None):
+        """
+        [Function]
+        Stop the channel on the event loop, as the thread of it exits without -ev
+
+        [Argument]
+        channelWorker: ChannelWorker
+        error: the exception which stops the channel, None if it is killed
+
+        [Return]
+        (N/A)
+        """
+
+        self.killedChannels.add(channelWorker.channelIndex)
+        self.wakeUpTimes.pop(channelWorker.channelIndex, None)
+        if error is not None:
+            LOG.e('The channel %d is stopped by %r' % (channelWorker.channelIndex, error))
+
+
+    def __distributeSipMsg(self, data):
+        """
+        [Function]
+        Distribute SIP message to ChannelWorker
+
+        [Argument]
+        data: the received data
+
+        [Return]
+        return True if it is distributed successfully, otherwise return False
+        """
+
+        try:
+            tempVoicebirdTagPrefixPos = data.index(VOICEBIRD_TAG_PREFIX)
+            tempChannelIndex = int(data[tempVoicebirdTagPrefixPos+LEN_OF_VOICEBIRD_TAG_PREFIX+1 : tempVoicebirdTagPrefixPos+LEN_OF_VOICEBIRD_TAG_PREFIX+1+LEN_OF_VOICEBIRD_TAG_UNIT])
+        except KeyboardInterrupt:
+            raise KeyboardInterrupt
+        except:
+            return False
+
+        tempChannelQueue = self.channelQueueDictByIndex.get(tempChannelIndex)
+        if tempChannelQueue is None:
+            return False
+        #else:
+
+        tempChannelQueue.put(QueueItem(ITEM_TYPE_SIP_DATA, data))
+        return True
+
+
+class ShardController:
+    """
+    [Class]
+    Run the stress test by the worker processes of -mp, each process is a Distributor of a shard of the channels
+    with its own SIP port (DEFAULT_SIP_PORT + shard index) and RTP sockets. The log items of the worker processes
+    come to this process by pipes, so InfoCollector of this process prints the statistic of all channels and
+    writes the result and log files
+    """
+
+    def __init__(self, caseList, shardCount):
+        """
+        [Function]
+        new a ShardController object, fork the worker processes
+
+        [Argument]
+        caseList: list of CaseData
+        shardCount: count of the worker processes
+        """
+
+        self.pidList = []
+        self.bufferDictByFd = {}    # key: the read end of the pipe from a worker process, value: the received data of a part of a frame
+
+        for shardIndex in range(shardCount):
+            tempReadFd,tempWriteFd = os.pipe()
+            tempPid = os.fork()
+            if tempPid==0:
+                os.close(tempReadFd)
+                for fd in self.bufferDictByFd:
+                    os.close(fd)
+                self.__runShard(caseList, shardIndex, shardCount, tempWriteFd)
+            #else:
+
+            os.close(tempWriteFd)
+            self.pidList.append(tempPid)
+            self.bufferDictByFd[tempReadFd] = ''
+
+        LOG.i('%d channels run in %d worker processes' % (callParameters.channelCount, shardCount))
+
+
+    def __del__(self):
+        """
+        [Function]
+        Stop the worker processes, they say BYE before exit. Then kill InfoCollector
+
+        [Argument]
+        (N/A)
+        """
+
+        for pid in self.pidList:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                # it has exited
+                pass
+
+        print
+        print 'Wait a minute to exit ...'
+
+        # the worker processes exit at most MAX_TIME_TO_EXIT later, then their pipes are closed
+        tempTimeToExit = time.time() + MAX_TIME_TO_EXIT + TIME_GRACE_TO_EXIT
+        while self.bufferDictByFd and time.time()<tempTimeToExit:
+            self.__receive(TIME_ONE_WINK)
+
+        for pid in self.pidList:
+            if self.bufferDictByFd:
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except OSError:
+                    pass
+
+            tempStatus = os.waitpid(pid, 0)[1]
+            if tempStatus!=0:
+                LOG.w('The worker process %d exits with the status %d' % (pid, tempStatus))
+
+        deleteLogObj()
+        time.sleep(TIME_ONE_WINK*3)
+
+
+    def __runShard(self, caseList, shardIndex, shardCount, writeFd):
+        """
+        [Function]
+        Run a shard of the channels in the worker process, and then exit the process.
+        The worker process is stopped by SIGTERM from the main process rather than Ctrl+C
+
+        [Argument]
+        caseList: list of CaseData
+        shardIndex: index of the worker process
+        shardCount: count of the worker processes
+        writeFd: the write end of the pipe to the main process
+
+        [Return]
+        (N/A), it never returns
+        """
+
+        global LOG_QUEUE
+        global localSipPort
+
+        tempExitCode = 0
+        try:
+            try:
+                signal.signal(signal.SIGINT, signal.SIG_IGN)
+                signal.signal(signal.SIGTERM, raiseKeyboardInterrupt)
+
+                # Note: InfoCollector is not in the forked process, and the queue may be locked by it when forking
+                LOG_QUEUE = Queue.Queue()
+                tempLogForwarder = LogForwarder(LOG_QUEUE, writeFd)
+                tempLogForwarder.setDaemon(True)
+                tempLogForwarder.start()
+
+                # PARAMETER -pin: PIN each worker process of -mp to a CPU
+                if '-pin' in sys.argv:
+                    setCpuAffinity(shardIndex)
+
+                localSipPort = DEFAULT_SIP_PORT + shardIndex
+                self.__runDistributor(caseList, shardIndex, shardCount)
+            except SystemExit:
+                if sys.exc_info()[1].code:
+                    tempExitCode = 1
+            except KeyboardInterrupt:
+                pass
+            except:
+                LOG.e('The worker process %d is stopped by %r' % (shardIndex, sys.exc_info()[1]))
+                tempExitCode = 1
+
+            deleteLogObj()
+            tempLogForwarder.join()
+        finally:
+            os._exit(tempExitCode)
+
+
+    def __runDistributor(self, caseList, shardIndex, shardCount):
+        """
+        [Function]
+        Run the Distributor of the shard until SIGTERM
+
+        [Argument]
+        caseList: list of CaseData
+        shardIndex: index of the worker process
+        shardCount: count of the worker processes
+
+        [Return]
+        (N/A)
+        """
+
+        distributor = Distributor(caseList, shardIndex, shardCount)
+        try:
+            distributor.doSelect()
+        except KeyboardInterrupt:
+            # Note: the Distributor says BYE by __del__ after this function returns
+            pass
+
+
+    def doSelect(self):
+        """
+        [Function]
+        Receive the log items from the worker processes and put them to InfoCollector, until all of them exit
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        (N/A)
+        """
+
+        # Note: the line count of this information is used by __printStatisticInScreen
+        print 'Wait to start ...'
+        print
+
+        while self.bufferDictByFd:
+            self.__receive(TIME_ONE_WINK)
+
+
+    def __receive(self, timeout):
+        """
+        [Function]
+        Wait for the pipes and receive the frames of log items
+
+        [Argument]
+        timeout: seconds to wait at most
+
+        [Return]
+        (N/A)
+        """
+
+        global LOG_QUEUE
+
+        for readFd in select.select(self.bufferDictByFd.keys(), [], [], timeout)[0]:
+            tempData = os.read(readFd, PIPE_READ_SIZE)
+            if not tempData:
+                # the worker process has exited
+                os.close(readFd)
+                self.bufferDictByFd.pop(readFd)
+                continue
+            #else:
+
+            tempData = self.bufferDictByFd[readFd] + tempData
+            while len(tempData)>=4:
+                tempFrameLength = struct.unpack('<I', tempData[:4])[0]
+                if len(tempData)<4+tempFrameLength:
+                    break
+                #else:
+
+                for item in pickle.loads(tempData[4:4+tempFrameLength]):
+                    LOG_QUEUE.put(item)
+                tempData = tempData[4+tempFrameLength:]
+
+            self.bufferDictByFd[readFd] = tempData
+
+
+class ScanningDialog:
+    """
+    [Class]
+    This is a struct used to save the context of a dialog when SnoopParser is scanning the packets
+    """
+
+    dialogIndex = -1
+    sipState = SIP_STATE_IDLE
+    fromTag = ''
+    toTag = ''
+    callId = ''
+    sessionSourcePort = 0
+    sessionDestinationPort = 0
+    baseTimeTo183 = ''
+    baseTimeTo200 = ''
+    telephoneEventPtInSdp = -1
+    # for checking the duplicated IVR event
+    cachedRtpTimestamp = -1
+    cachedIvrEventStr = ''
+    ignoredIvrEventCount = 0
+
+    def __init__(self, dialogIndex, fromTag, callId, sessionSourcePort):
+        self.dialogIndex = dialogIndex
+        self.fromTag = fromTag
+        self.callId = callId
+        self.sessionSourcePort = sessionSourcePort
+        self.packetsList = []   # the useful packets of the dialog
+
+
+class SipMessage:
+    """
+    [Class]
+    A SIP message split into the start line, the header lines and the body (SDP) in one pass,
+    the templating changes the lines in place then joins them back by getData()
+    """
+
+    lineEnd = '\r\n'
+    startLine = ''
+    headerNames = []    # name of each header line in lower case, '' if the line has no name
+    headerLines = []
+    hasBody = False     # whether there is the empty line after the headers
+    body = ''
+
+    def __init__(self, data):
+        if '\r\n' in data:
+            self.lineEnd = '\r\n'
+        else:
+            self.lineEnd = '\n'
+
+        tempBodyStart = data.find(self.lineEnd+self.lineEnd)
+        if tempBodyStart<0:
+            tempHead = data
+            self.hasBody = False
+            self.body = ''
+        else:
+            tempHead = data[:tempBodyStart]
+            self.hasBody = True
+            self.body = data[tempBodyStart+2*len(self.lineEnd):]
+
+        tempLines = tempHead.split(self.lineEnd)
+        self.startLine = tempLines[0]
+        self.headerLines = tempLines[1:]
+        self.headerNames = []
+        for line in self.headerLines:
+            tempColonPos = line.find(':')
+            if tempColonPos>0:
+                self.headerNames.append(line[:tempColonPos].strip().lower())
+            else:
+                self.headerNames.append('')
+
+
+    def findHeader(self, name):
+        """
+        [Function]
+        Find the first header of the name
+
+        [Argument]
+        name: header name in lower case, e.g. 'call-id'
+
+        [Return]
+        index of the header line, -1 if not found
+        """
+
+        try:
+            return self.headerNames.index(name)
+        except ValueError:
+            return -1
+
+
+    def findHeaders(self, name):
+        """
+        [Function]
+        Find all headers of the name
+
+        [Argument]
+        name: header name in lower case, e.g. 'via'
+
+        [Return]
+        list of the index of the header lines
+        """
+
+        tempIndexes = []
+        for i in range(len(self.headerNames)):
+            if self.headerNames[i]==name:
+                tempIndexes.append(i)
+        return tempIndexes
+
+
+    def deleteHeader(self, index):
+        """
+        [Function]
+        Delete a header line
+
+        [Argument]
+        index: index of the header line
+
+        [Return]
+        (N/A)
+        """
+
+        del self.headerNames[index]
+        del self.headerLines[index]
+
+
+    def deleteHeaders(self, name):
+        """
+        [Function]
+        Delete all headers of the name
+
+        [Argument]
+        name: header name in lower case, e.g. 'route'
+
+        [Return]
+        (N/A)
+        """
+
+        while name in self.headerNames:
+            self.deleteHeader(self.headerNames.index(name))
+
+
+    def getData(self):
+        """
+        [Function]
+        Join the lines back to the message
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        the message string
+        """
+
+        tempData = self.lineEnd.join([self.startLine] + self.headerLines)
+        if self.hasBody:
+            tempData += self.lineEnd + self.lineEnd + self.body
+        return tempData
+
+
+class ReceivedSipMessage:
+    """
+    [Class]
+    A SIP message received by ChannelWorker. The start line and the headers of the dialog are parsed once,
+    then ChannelWorker dispatches it by the method or the response code, instead of trying the regex of
+    each message type one by one
+    """
+
+    data = ''
+    method = ''         # method of a request, e.g. 'BYE', '' for a response
+    responseCode = 0    # code of a response, e.g. 200, 0 for a request
+    fromStr = ''        # the whole header line without the line end, e.g. 'From: <sip:8000@1.2.3.4>;tag=abc'
+    toStr = ''          # Note: To is not for the provisional responses
+    callIdStr = ''
+    cseqStr = ''        # Note: CSeq and Via are only for a request, to response it
+    viasList = []
+    fromTag = ''
+    toTag = ''
+    callId = ''         # Call-ID without the host part, the same as getCallId()
+
+    def __init__(self, data):
+        self.data = data
+
+        # start line: 'SIP/2.0 200 OK' or 'BYE sip:1234@1.2.3.4:5060 SIP/2.0'
+        reStartLine = RE_SIP_START_LINE.match(data)
+        if reStartLine:
+            if reStartLine.lastindex==1:
+                self.responseCode = int(reStartLine.group(1))
+            else:
+                self.method = reStartLine.group(2)
+
+        # Note: searching the headers by the regex is faster than splitting the lines in python
+        reHeader = RE_SIP_FROM.search(data)
+        if reHeader:
+            self.fromStr = reHeader.group().strip()
+            self.fromTag = getTagFromHeader(self.fromStr)
+        reHeader = RE_SIP_CALL_ID.search(data)
+        if reHeader:
+            self.callIdStr = reHeader.group().strip()
+            self.callId = getCallIdFromHeader(self.callIdStr)
+        # the provisional responses don't use To
+        if self.method or self.responseCode>=200:
+            reHeader = RE_SIP_TO.search(data)
+            if reHeader:
+                self.toStr = reHeader.group().strip()
+                self.toTag = getTagFromHeader(self.toStr)
+
+        if self.method:
+            reHeader = RE_SIP_CSEQ.search(data)
+            if reHeader:
+                self.cseqStr = reHeader.group().strip()
+            self.viasList = []
+            for line in RE_SIP_VIA.findall(data):
+                self.viasList.append(line.strip())
+
+
+class SnoopParser:
+    """
+    [Class]
+    Read snoop file(s) then create the packet list for later usage
+    """
+
+    # global in the object
+    caseList = []
+    dialogPacketsList = []
+    dialogIndex = -1        # Note: init it to be -1 not 0
+    fileIndex = 0
+
+    # global in every file, it is very useful to match to Ethreal's packet no.
+    packetIndex = 0
+
+    dialogNumbers = []
+    firstDialogCallingNumber = ''
+
+    # key: (sourcePort, destinationPort) of the RTP which the header peek should keep, value: ScanningDialog
+    # Note: it is a dict of each object, set by __init__()
+    mediaPortPairs = None
+    keptFramesCount = 0
+    droppedFramesCount = 0
+
+    # key: stage in COMPILE_STAGES, value: seconds, only counted by the compile command
+    stageTimes = {}
+    parsedCasesCount = 0
+    cachedCasesCount = 0
+    failedCasesCount = 0
+
+    def __init__(self, files=None):
+        """
+        [Function]
+        New a object of SnoopParser
+
+        [Argument]
+        files: a list parameter to carry snoop files, None means only to new a parser for compileFile()
+        """
+
+        # PARAMETER -vf: View the File, means to print the snoop file's content
+        self.viewFile = ('-vf' in sys.argv)
+
+        self.willTimeStages = isCompileCommand()
+        self.stageTimes = {}
+        self.mediaPortPairs = {}
+        tempCompilingStartTime = time.time()
+
+        if files is None:
+            return
+
+        if len(files)<1:
+            LOG.a('No snoop file')
+            raise
+
+        #print files
+
+        self.caseList = []
+
+        # manifests of the cache dirs, and the dirs whose manifest need to be saved
+        self.manifests = {}
+        self.changedManifestDirs = set()
+
+        # 1. find out the cases which need to be parsed
+        tempParsingTasks = []
+        tempIsCachedList = []
+        fileName = ''
+        for fileIndex in range(len(files)):
+            fileName = files[fileIndex]
+            if self.__isCaseUnchanged(fileName):
+                tempIsCachedList.append(True)
+            else:
+                tempIsCachedList.append(False)
+                tempParsingTasks.append((fileIndex, fileName))
+
+        # 2. parse them, maybe in parallel
+        tempParsingResults = self.__compileFiles(tempParsingTasks)
+        self.parsedCasesCount = len(tempParsingTasks)
+        self.cachedCasesCount = len(files)-len(tempParsingTasks)
+
+        # 3. add the cases to the list in the original order
+        tempResultIndex = 0
+        for fileIndex in range(len(files)):
+            fileName = files[fileIndex]
+            tempCacheName = caseNameToCacheName(fileName)
+            if tempIsCachedList[fileIndex]:
+                tempEntry = self.__getManifestEntry(tempCacheName)
+                tempIsNewEntry = False
+            else:
+                tempEntry,tempErrorStr = tempParsingResults[tempResultIndex]
+                tempResultIndex += 1
+                self.__setManifestEntry(tempCacheName, tempEntry)
+                if not tempEntry:
+                    LOG.e("Failed to parse the case '%s': %s" % (fileName, tempErrorStr))
+                    self.failedCasesCount += 1
+                    continue
+                tempIsNewEntry = True
+
+            tempCaseData = CaseData()
+            tempCaseData.snoopFileName = fileName
+            tempCaseData.cacheName = tempCacheName
+            tempStartTime = time.time()
+            tempCaseData.caseConfig = self.__getCaseConfigByManifest(fileName, tempCacheName, tempEntry, tempIsNewEntry)
+            self.__addStageTime('config', time.time()-tempStartTime)
+            self.caseList.append(tempCaseData)
+
+            # PARAMETER -vp: View the Packet list, means to print the packet list's information
+            if '-vp' in sys.argv:
+                tempDialogPacketsList = loadDialogPacketsListFromCache(tempCaseData.cacheName)
+                self.__printDialogPacketsList(len(self.caseList)-1, fileName, tempDialogPacketsList)
+
+        for cacheDirName in self.changedManifestDirs:
+            saveCacheManifest(cacheDirName, self.manifests[cacheDirName])
+
+        # the chunks of the cases before parsing them again are not used any more, they are swept only by
+        # the compile command, so a run never walks the whole cache before its first call
+        if self.parsedCasesCount>0 and isCompileCommand():
+            sweepChunks(tempCompilingStartTime)
+
+        if len(self.caseList)<1:
+            LOG.a('No case is available, please check the log')
+            raise
+
+
+    def __getManifestEntry(self, cacheName):
+        """
+        [Function]
+        Get the case's entry in the manifest of its cache dir, the manifest is loaded at the first time
+
+        [Argument]
+        cacheName: cache name of the case
+
+        [Return]
+        CaseManifestEntry, or None if the case is not in the manifest
+        """
+
+        cacheDirName,entryName = os.path.split(cacheName)
+        if cacheDirName not in self.manifests:
+            self.manifests[cacheDirName] = loadCacheManifest(cacheDirName)
+
+        return self.manifests[cacheDirName].get(entryName)
+
+
+    def __setManifestEntry(self, cacheName, entry):
+        """
+        [Function]
+        Set (or remove) the case's entry in the manifest of its cache dir
+
+        [Argument]
+        cacheName: cache name of the case
+        entry: CaseManifestEntry, None means to remove the entry
+
+        [Return]
+        (N/A)
+        """
+
+        cacheDirName,entryName = os.path.split(cacheName)
+        if cacheDirName not in self.manifests:
+            self.manifests[cacheDirName] = loadCacheManifest(cacheDirName)
+
+        if entry:
+            self.manifests[cacheDirName][entryName] = entry
+        elif entryName in self.manifests[cacheDirName]:
+            del self.manifests[cacheDirName][entryName]
+        else:
+            return
+
+        self.changedManifestDirs.add(cacheDirName)
+
+
+    def __isCaseUnchanged(self, fileName):
+        """
+        [Function]
+        Check whether the case's cache can be used by the manifest of its cache dir.
+        The size and modify time are compared first, the content hash is compared only when
+        the modify time is changed, e.g. the file is touched by rsync or checkout
+
+        [Argument]
+        fileName: snoop file name
+
+        [Return]
+        return True if the cache can be used, otherwise return False
+        """
+
+        # PARAMETER -fp: Force to Parser snoop file
+        if '-fp' in sys.argv:
+            LOG.writeLog("Force to parse the case '%s'" % (fileName))
+            return False
+
+        # the cache is parsed again to be verified
+        if isVerifyingCache():
+            return False
+
+        tempCacheName = caseNameToCacheName(fileName)
+        tempEntry = self.__getManifestEntry(tempCacheName)
+        if not tempEntry:
+            LOG.writeLog("New case '%s'" % (fileName))
+            return False
+
+        if tempEntry.cifVersion!=CIF_VERSION:
+            LOG.writeLog("The case '%s' cache CIF version is %d" % (fileName, tempEntry.cifVersion))
+            return False
+
+        tempDplFileName = tempCacheName+DIALOG_PACKETS_LIST_FILE_EXT
+        if not os.path.exists(tempDplFileName):
+            LOG.writeLog("Find that the cache file '%s' has been removed by somebody" % (tempDplFileName))
+            return False
+
+        tempFileStatus = os.stat(fileName)
+        if tempFileStatus.st_size!=tempEntry.snoopFileSize:
+            LOG.writeLog("The case '%s' is changed" % (fileName))
+            return False
+
+        if tempFileStatus.st_mtime!=tempEntry.snoopFileModifyTime:
+            if getFileHash(fileName)!=tempEntry.snoopFileHash:
+                LOG.writeLog("The case '%s' is changed" % (fileName))
+                return False
+
+            LOG.writeLog("The case '%s' is touched but its content is unchanged" % (fileName))
+            tempEntry.snoopFileModifyTime = tempFileStatus.st_mtime
+            self.__setManifestEntry(tempCacheName, tempEntry)
+        else:
+            LOG.writeLog("The case '%s' is unchanged" % (fileName))
+
+        return True
+
+
+    def __getCaseConfigByManifest(self, fileName, cacheName, entry, forced):
+        """
+        [Function]
+        Get the case config saved in the manifest entry, the .xml is parsed only when it is changed.
+        When its size or modify time is changed, its content hash is compared before parsing, e.g. it is
+        only touched or copied
+
+        [Argument]
+        fileName: snoop file name
+        cacheName: cache name of the case
+        entry: CaseManifestEntry of the case
+        forced: whether to parse the .xml anyway
+
+        [Return]
+        CaseConfig, or None if there is no .xml
+        """
+
+        xmlFileName = os.path.splitext(fileName)[0]+'.xml'
+        try:
+            tempXmlFileStatus = os.stat(xmlFileName)
+            tempXmlFileStamp = (tempXmlFileStatus.st_size, tempXmlFileStatus.st_mtime)
+        except OSError:
+            tempXmlFileStamp = None
+
+        if not forced and tempXmlFileStamp==entry.xmlFileStamp:
+            return entry.caseConfig
+        #else:
+
+        tempXmlFileHash = ''
+        if tempXmlFileStamp:
+            tempXmlFileHash = getFileHash(xmlFileName)
+
+        if forced or not tempXmlFileHash or tempXmlFileHash!=entry.xmlFileHash:
+            entry.caseConfig = self.__getCaseConfig(fileName)
+        else:
+            LOG.writeLog("The case config '%s' is unchanged" % (xmlFileName))
+        entry.xmlFileStamp = tempXmlFileStamp
+        entry.xmlFileHash = tempXmlFileHash
+        self.__setManifestEntry(cacheName, entry)
+
+        return entry.caseConfig
+
+
+    def __getJobsCount(self, tasksCount):
+        """
+        [Function]
+        Get how many worker processes to parse the snoop files
+
+        [Argument]
+        tasksCount: count of the snoop files to be parsed
+
+        [Return]
+        count of worker processes, 1 means to parse them one by one in this process
+        """
+
+        if not multiprocessing or self.viewFile or tasksCount<2:
+            return 1
+
+        try:
+            # PARAMETER -j: Jobs, how many worker processes to parse the snoop files
+            tempJobsCount = int(sys.argv[sys.argv.index('-j')+1])
+        except:
+            try:
+                tempJobsCount = multiprocessing.cpu_count()
+            except NotImplementedError:
+                tempJobsCount = 1
+
+        return max(1, min(tempJobsCount, tasksCount))
+
+
+    def __compileFiles(self, tasks):
+        """
+        [Function]
+        Parse the snoop files and dump them to cache, by a pool of worker processes if there are many
+
+        [Argument]
+        tasks: list of (fileIndex, fileName)
+
+        [Return]
+        list of (caseManifestEntry, errorStr) in the order of tasks, caseManifestEntry is None if failed
+        """
+
+        tempJobsCount = self.__getJobsCount(len(tasks))
+        if tempJobsCount<=1:
+            tempResults = []
+            for fileIndex,fileName in tasks:
+                tempResults.append(self.compileFile(fileIndex, fileName))
+            return tempResults
+
+        LOG.i('Parse %d snoop files by %d worker processes' % (len(tasks), tempJobsCount))
+
+        tempPool = multiprocessing.Pool(tempJobsCount)
+        try:
+            # Note: get() with a timeout, or Ctrl+C can not break the waiting
+            tempWorkerResults = tempPool.map_async(compileSnoopFileInWorker, tasks, 1).get(0x7FFFFFFF)
+            tempPool.close()
+        except:
+            tempPool.terminate()
+            tempPool.join()
+            raise
+        tempPool.join()
+
+        tempResults = []
+        for entry,errorStr,logContents,stageTimes in tempWorkerResults:
+            for content in logContents:
+                LOG.writeLog(content)
+            for stage,seconds in stageTimes.items():
+                self.__addStageTime(stage, seconds)
+            tempResults.append((entry, errorStr))
+        return tempResults
+
+
+    def compileFile(self, fileIndex, fileName):
+        """
+        [Function]
+        Parse the snoop file and dump it to cache, the failure is returned rather than raised,
+        so one bad case will not break the others
+
+        [Argument]
+        fileIndex: index of the file in all snoop files
+        fileName: snoop file name
+
+        [Return]
+        (caseManifestEntry, errorStr), caseManifestEntry is None if failed
+        """
+
+        tempAssertCount = LOG.assertCount
+        try:
+            return (self.__compileFile(fileIndex, fileName), '')
+        except Exception:
+            tempErrorType,tempError,tempTraceback = sys.exc_info()
+            # Note: the failure reported by LOG.a() is followed by a bare raise, the reason has been written to log
+            if LOG.assertCount!=tempAssertCount:
+                return (None, 'see the log above')
+            #else:
+
+            LOG.e(''.join(traceback.format_exception(tempErrorType, tempError, tempTraceback)).rstrip())
+            return (None, repr(tempError))
+
+
+    def __compileFile(self, fileIndex, fileName):
+        """
+        [Function]
+        Parse the snoop file and dump it to cache
+
+        [Argument]
+        fileIndex: index of the file in all snoop files
+        fileName: snoop file name
+
+        [Return]
+        CaseManifestEntry of the case, raise if failed
+        """
+
+        fileobj = file(fileName, 'rb')
+        snoopMap = None
+        try:
+            snoopMap = self.__mapSnoopFile(fileobj)
+
+            if not snoopMap or not self.__checkFileHeader(snoopMap):
+                LOG.a("'%s' is NOT a snoop, pcap or pcapng file, you may 'Save As' it to a snoop file by Ethreal (Wireshark)" % (fileName))
+                raise
+
+            if self.viewFile:
+                print '-- file (%d) -- %s' % (fileIndex, fileName)
+
+            self.packetIndex = 0    # init packet index to 0, for it's global in each file
+            self.__readPackets(fileName, snoopMap)
+
+            # Note: take the stamp of the opened file, the same content as parsed
+            tempFileStatus = os.fstat(fileobj.fileno())
+            entry = CaseManifestEntry()
+            entry.cifVersion = CIF_VERSION
+            entry.snoopFileSize = tempFileStatus.st_size
+            entry.snoopFileModifyTime = tempFileStatus.st_mtime
+            tempStartTime = time.time()
+            entry.snoopFileHash = hashlib.md5(snoopMap).hexdigest()
+            self.__addStageTime('hash', time.time()-tempStartTime)
+            return entry
+        finally:
+            if snoopMap:
+                snoopMap.close()
+            fileobj.close()
+
+
+    def getCaseList(self):
+        """
+        [Function]
+        Get all test case data list
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        Return a list of CaseData
+        """
+        return self.caseList
+
+
+    def getStageTimes(self):
+        """
+        [Function]
+        Get the time spent in each stage to compile the cases, it is only counted by the compile command.
+        The stages in the worker processes are added up, so the sum may be more than the elapsed time
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        a dict, key: stage in COMPILE_STAGES, value: seconds
+        """
+        return self.stageTimes
+
+
+    def __addStageTime(self, stage, seconds):
+        """
+        [Function]
+        Add the time spent in a compiling stage
+
+        [Argument]
+        stage: stage in COMPILE_STAGES
+        seconds: the spent time
+
+        [Return]
+        (N/A)
+        """
+
+        if self.willTimeStages:
+            self.stageTimes[stage] = self.stageTimes.get(stage, 0.0) + seconds
+
+
+    def __timeStage(self, items, stage, stageTimes):
+        """
+        [Function]
+        Pass the items of a pipeline stage through, and count the time spent to get each item.
+        Note: the time includes the stages before it, because they run when this one asks for an item
+
+        [Argument]
+        items: iterable given out by the stage
+        stage: stage name
+        stageTimes: dict to add the time to, key: stage name, value: seconds
+
+        [Return]
+        generator of the items
+        """
+
+        tempClock = time.time
+        tempIterator = iter(items)
+        stageTimes[stage] = 0.0
+        while True:
+            tempStartTime = tempClock()
+            try:
+                item = tempIterator.next()
+            except StopIteration:
+                stageTimes[stage] += tempClock()-tempStartTime
+                return
+            stageTimes[stage] += tempClock()-tempStartTime
+            yield item
+
+
+    def __printDialogPacketsList(self, caseIndex, snoopFileName, dialogPacketsList):
+        """
+        [Function]
+        Print the DialogPacketsList
+
+        [Argument]
+        caseIndex: case index
+        snoopFileName: snoop file name
+        dialogPacketsList: dialog packets list
+
+        [Return]
+        (N/A)
+        """
+
+        dialogCount = len(dialogPacketsList)
+        print '-- CASE %d, Snoop File: %s --' % (caseIndex, snoopFileName)
+        print 'There is/are', dialogCount, 'dialog(s)'
+        print
+
+        for dialogIndex in range(dialogCount):
+            packetIndex = 0
+            for packet in dialogPacketsList[dialogIndex]:
+                print '-'*50, 'CASE', caseIndex, '- dialog', dialogIndex, ', packet', packetIndex, '--'
+                print str(packet)
+                print
+                packetIndex += 1
+
+
+    def __mapSnoopFile(self, fileobj):
+        """
+        [Function]
+        Map the whole snoop file into memory (read only)
+
+        [Argument]
+        fileobj: file object of snoop file
+
+        [Return]
+        the mmap object, or None if the file is too short to be a snoop file
+        """
+
+        if os.fstat(fileobj.fileno()).st_size<SNOOP_FILE_HEADER_LEN:
+            return None
+
+        return mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+    def __checkFileHeader(self, snoopMap):
+        """
+        [Function]
+        Check whether it is a snoop, pcap or pcapng file by its magic number, and remember its format
+
+        [Argument]
+        snoopMap: mapped capture file
+
+        [Return]
+        If it is a supported capture file, return True. Otherwise return False
+        """
+
+        tempMagic = snoopMap[0:4]
+        if tempMagic==struct.pack('>I', PCAPNG_BLOCK_TYPE_SECTION_HEADER):
+            self.captureFormat = CAPTURE_FORMAT_PCAPNG
+            return self.__checkPcapngFileHeader(snoopMap)
+
+        for byteOrder in ('<', '>'):
+            if tempMagic==struct.pack(byteOrder+'I', PCAP_MAGIC_NUMBER):
+                self.captureFormat = CAPTURE_FORMAT_PCAP
+                self.timestampFormat = '%d.%06d'
+                return self.__checkPcapFileHeader(snoopMap, byteOrder)
+            if tempMagic==struct.pack(byteOrder+'I', PCAP_MAGIC_NUMBER_NANOSECOND):
+                self.captureFormat = CAPTURE_FORMAT_PCAP
+                self.timestampFormat = '%d.%09d'
+                return self.__checkPcapFileHeader(snoopMap, byteOrder)
+
+        self.captureFormat = CAPTURE_FORMAT_SNOOP
+        return self.__checkSnoopFileHeader(snoopMap)
+
+
+    def __checkSnoopFileHeader(self, snoopMap):
+        """
+        [Function]
+        Check whether it is a snoop file
+
+        [Argument]
+        snoopMap: mapped snoop file
+
+        [Return]
+        If it is a snoop file, return True. Otherwise return False
+
+        [See Also]
+        ########################################################
+        # RFC 1761
+        # http://www.faqs.org/rfcs/rfc1761.html
+        ########################################################
+        """
+
+        # 1. Identification Pattern: 8 octet
+        # 2. Version Number: 4 octet
+        # 3. Datalink Type: 4 octet
+        identificationPattern,versionNumber,datalinkType = STRUCT_SNOOP_FILE_HEADER.unpack_from(snoopMap, 0)
+
+        identificationPattern = tuple([ord(c) for c in identificationPattern])
+        if identificationPattern != SNOOP_IDENTIFICATION_PATTERN_SNOOP:
+            return False
+        if self.viewFile:
+            print 'Identification Pattern:', tuple2Hex(identificationPattern)
+
+        if versionNumber != SNOOP_VERSION_NUMBER:
+            return False
+        if self.viewFile:
+            print 'Version Number:', versionNumber
+
+        if datalinkType != SNOOP_DATALINK_TYPE_ETHERNET:
+            return False
+        if self.viewFile:
+            print 'Datalink Type:', datalinkType
+
+        return True
+
+
+    def __checkPcapFileHeader(self, snoopMap, byteOrder):
+        """
+        [Function]
+        Check the pcap file header
+
+        [Argument]
+        snoopMap: mapped pcap file
+        byteOrder: '<' or '>', got from the magic number
+
+        [Return]
+        If its link type is supported, return True. Otherwise return False
+
+        [See Also]
+        ########################################################
+        # http://wiki.wireshark.org/Development/LibpcapFileFormat
+        ########################################################
+        """
+
+        if len(snoopMap)<PCAP_FILE_HEADER_LEN:
+            return False
+
+        # 1. Magic Number: 4 octet
+        # 2. Major Version: 2 octet
+        # 3. Minor Version: 2 octet
+        # 4. GMT to Local Correction: 4 octet
+        # 5. Accuracy of Timestamps: 4 octet
+        # 6. Snapshot Length: 4 octet
+        # 7. Data Link Type: 4 octet
+        magicNumber,majorVersion,minorVersion,thiszone,sigfigs,snaplen,network = \
+                STRUCTS_PCAP_FILE_HEADER[byteOrder].unpack_from(snoopMap, 0)
+        if self.viewFile:
+            print 'Magic Number: 0x%08x' % (magicNumber)
+            print 'Version Number: %d.%d' % (majorVersion, minorVersion)
+            print 'Snapshot Length:', snaplen
+            print 'Data Link Type:', network
+
+        if network not in (LINKTYPE_ETHERNET, LINKTYPE_LINUX_SLL):
+            LOG.e('Unsupported data link type %d of pcap file' % (network))
+            return False
+
+        self.byteOrder = byteOrder
+        self.linkType = network
+        return True
+
+
+    def __checkPcapngFileHeader(self, snoopMap):
+        """
+        [Function]
+        Check the first Section Header Block of the pcapng file
+
+        [Argument]
+        snoopMap: mapped pcapng file
+
+        [Return]
+        If it is a pcapng file, return True. Otherwise return False
+
+        [See Also]
+        ########################################################
+        # http://www.winpcap.org/ntar/draft/PCAP-DumpFileFormat.html
+        ########################################################
+        """
+
+        tempByteOrder = self.__getPcapngByteOrder(snoopMap, 0)
+        if not tempByteOrder:
+            return False
+
+        if self.viewFile:
+            print 'Byte Order Magic: 0x%08x' % (PCAPNG_BYTE_ORDER_MAGIC)
+            print 'Byte Order:', tempByteOrder
+
+        return True
+
+
+    def __getPcapngByteOrder(self, snoopMap, offset):
+        """
+        [Function]
+        Get the byte order of the pcapng section by its Byte Order Magic
+
+        [Argument]
+        snoopMap: mapped pcapng file
+        offset: offset of the Section Header Block
+
+        [Return]
+        '<' or '>', or None if it is not a valid Section Header Block
+        """
+
+        if offset+PCAPNG_SECTION_HEADER_LEN>len(snoopMap):
+            return None
+
+        tempMagic = snoopMap[offset+PCAPNG_BLOCK_HEADER_LEN:offset+PCAPNG_BLOCK_HEADER_LEN+4]
+        for byteOrder in ('<', '>'):
+            if tempMagic==struct.pack(byteOrder+'I', PCAPNG_BYTE_ORDER_MAGIC):
+                return byteOrder
+
+        return None
+
+
+    def __readPacketRecords(self, snoopMap):
+        """
+        [Function]
+        Read every packet record in the mapped file until EOF,
+        it is the first stage of the pipeline (record reader -> protocol decoder -> dialog scanner -> dialog sink)
+
+        [Argument]
+        snoopMap: mapped capture file
+
+        [Return]
+        a generator of (packetIndex, linkType, packetDataStart, packetDataEnd, timestampFormat, timestampSeconds, timestampFraction)
+        """
+
+        if self.captureFormat==CAPTURE_FORMAT_PCAP:
+            return self.__readPcapPacketRecords(snoopMap)
+        elif self.captureFormat==CAPTURE_FORMAT_PCAPNG:
+            return self.__readPcapngBlocks(snoopMap)
+        else:
+            return self.__readSnoopPacketRecords(snoopMap)
+
+
+    def __readSnoopPacketRecords(self, snoopMap):
+        """
+        [Function]
+        Read every packet record in the mapped snoop file until EOF
+
+        [Argument]
+        snoopMap: mapped snoop file
+
+        [Return]
+        a generator of (packetIndex, linkType, packetDataStart, packetDataEnd, timestampFormat, timestampSeconds, timestampFraction)
+
+        [See Also]
+        ########################################################
+        # RFC 1761
+        # http://www.faqs.org/rfcs/rfc1761.html
+        ########################################################
+        """
+
+        offset = SNOOP_FILE_HEADER_LEN
+        while True:
+            # Packet Record format: as six 32-bit (4-octet) integer values
+            if offset+SNOOP_PACKET_RECORD_HEADER_LEN>len(snoopMap):
+                if self.viewFile:
+                    print 'EOF in __readPacketRecords'
+                return
+
+            originalLength,includedLength,packetRecordLength,cumulativeDrops,timestampSeconds,timestampMicroseconds = \
+                    STRUCT_SNOOP_PACKET_RECORD_HEADER.unpack_from(snoopMap, offset)
+
+            self.packetIndex += 1
+            if self.viewFile:
+                print '-vf --', self.packetIndex, '-'*70
+                print 'Original Length:', originalLength
+                print 'Included Length:', includedLength
+                print 'Packet Record Length:', packetRecordLength
+                print 'Cumulative Drops:', cumulativeDrops
+                print 'Timestamp Seconds:', timestampSeconds
+                print 'Timestamp Microseconds:', timestampMicroseconds
+
+            if packetRecordLength<SNOOP_PACKET_RECORD_HEADER_LEN:
+                LOG.e('Invalid packet record length %d of packet %d' % (packetRecordLength, self.packetIndex))
+                return
+
+            # 7. Packet Data
+            yield (self.packetIndex, LINKTYPE_ETHERNET, offset+SNOOP_PACKET_RECORD_HEADER_LEN, min(offset+packetRecordLength, len(snoopMap)), \
+                   '%d.%06d', timestampSeconds, timestampMicroseconds)
+
+            offset += packetRecordLength
+
+
+    def __readPcapPacketRecords(self, snoopMap):
+        """
+        [Function]
+        Read every packet record in the mapped pcap file until EOF
+
+        [Argument]
+        snoopMap: mapped pcap file
+
+        [Return]
+        a generator of (packetIndex, linkType, packetDataStart, packetDataEnd, timestampFormat, timestampSeconds, timestampFraction)
+
+        [See Also]
+        ########################################################
+        # http://wiki.wireshark.org/Development/LibpcapFileFormat
+        ########################################################
+        """
+
+        tempRecordHeaderStruct = STRUCTS_PCAP_PACKET_RECORD_HEADER[self.byteOrder]
+        offset = PCAP_FILE_HEADER_LEN
+        while True:
+            if offset+PCAP_PACKET_RECORD_HEADER_LEN>len(snoopMap):
+                if self.viewFile:
+                    print 'EOF in __readPacketRecords'
+                return
+
+            # 1. Timestamp Seconds: 4 octet
+            # 2. Timestamp Microseconds (or Nanoseconds): 4 octet
+            # 3. Included Length: 4 octet
+            # 4. Original Length: 4 octet
+            timestampSeconds,timestampFraction,includedLength,originalLength = tempRecordHeaderStruct.unpack_from(snoopMap, offset)
+
+            self.packetIndex += 1
+            if self.viewFile:
+                print '-vf --', self.packetIndex, '-'*70
+                print 'Original Length:', originalLength
+                print 'Included Length:', includedLength
+                print 'Timestamp Seconds:', timestampSeconds
+                print 'Timestamp Fraction:', timestampFraction
+
+            offset += PCAP_PACKET_RECORD_HEADER_LEN
+
+            # 5. Packet Data
+            yield (self.packetIndex, self.linkType, offset, min(offset+includedLength, len(snoopMap)), \
+                   self.timestampFormat, timestampSeconds, timestampFraction)
+
+            offset += includedLength
+
+
+    def __readPcapngBlocks(self, snoopMap):
+        """
+        [Function]
+        Read every block in the mapped pcapng file until EOF, the packets in
+        Enhanced Packet Block, Simple Packet Block and Packet Block are given out
+
+        [Argument]
+        snoopMap: mapped pcapng file
+
+        [Return]
+        a generator of (packetIndex, linkType, packetDataStart, packetDataEnd, timestampFormat, timestampSeconds, timestampFraction)
+
+        [See Also]
+        ########################################################
+        # http://www.winpcap.org/ntar/draft/PCAP-DumpFileFormat.html
+        ########################################################
+        """
+
+        byteOrder = '<'
+        interfaces = []     # (linkType, tsresol, timestampFormat) of each interface in the current section
+        offset = 0
+        while True:
+            if offset+PCAPNG_BLOCK_HEADER_LEN>len(snoopMap):
+                if self.viewFile:
+                    print 'EOF in __readPacketRecords'
+                return
+
+            # every section has its own byte order and interfaces
+            if snoopMap[offset:offset+4]==struct.pack('>I', PCAPNG_BLOCK_TYPE_SECTION_HEADER):
+                byteOrder = self.__getPcapngByteOrder(snoopMap, offset)
+                if not byteOrder:
+                    LOG.e('Invalid Section Header Block at offset %d' % (offset))
+                    return
+                interfaces = []
+
+            blockType,blockTotalLength = STRUCTS_PCAPNG_BLOCK_HEADER[byteOrder].unpack_from(snoopMap, offset)
+            if blockTotalLength<PCAPNG_BLOCK_HEADER_LEN+4 or offset+blockTotalLength>len(snoopMap):
+                LOG.e('Invalid block total length %d at offset %d' % (blockTotalLength, offset))
+                return
+
+            bodyStart = offset+PCAPNG_BLOCK_HEADER_LEN
+            bodyEnd = offset+blockTotalLength-4
+
+            # Note: the fixed fields of the block body must be in the block, or a corrupt block is read over its end
+            tempFixedStruct = PCAPNG_BLOCK_FIXED_STRUCTS.get(blockType)
+            if tempFixedStruct and bodyEnd-bodyStart<tempFixedStruct[byteOrder].size:
+                LOG.e('Block type %d at offset %d is too short: %d' % (blockType, offset, blockTotalLength))
+                return
+
+            offset += blockTotalLength
+
+            if blockType==PCAPNG_BLOCK_TYPE_INTERFACE_DESCRIPTION:
+                interfaces.append(self.__readPcapngInterfaceDescription(snoopMap, bodyStart, bodyEnd, byteOrder))
+                continue
+
+            if blockType==PCAPNG_BLOCK_TYPE_ENHANCED_PACKET:
+                interfaceId,timestampHigh,timestampLow,capturedLength,originalLength = \
+                        STRUCTS_PCAPNG_ENHANCED_PACKET[byteOrder].unpack_from(snoopMap, bodyStart)
+                packetDataStart = bodyStart+STRUCTS_PCAPNG_ENHANCED_PACKET[byteOrder].size
+            elif blockType==PCAPNG_BLOCK_TYPE_PACKET:
+                interfaceId,dropsCount,timestampHigh,timestampLow,capturedLength,originalLength = \
+                        STRUCTS_PCAPNG_PACKET[byteOrder].unpack_from(snoopMap, bodyStart)
+                packetDataStart = bodyStart+STRUCTS_PCAPNG_PACKET[byteOrder].size
+            elif blockType==PCAPNG_BLOCK_TYPE_SIMPLE_PACKET:
+                # Note: Simple Packet Block has no timestamp, and it is always captured from the first interface
+                originalLength = STRUCTS_PCAPNG_SIMPLE_PACKET[byteOrder].unpack_from(snoopMap, bodyStart)[0]
+                interfaceId,timestampHigh,timestampLow = (0, 0, 0)
+                packetDataStart = bodyStart+STRUCTS_PCAPNG_SIMPLE_PACKET[byteOrder].size
+                capturedLength = min(originalLength, bodyEnd-packetDataStart)
+            else:
+                continue
+
+            self.packetIndex += 1
+            if interfaceId>=len(interfaces):
+                LOG.e('Invalid interface id %d of packet %d' % (interfaceId, self.packetIndex))
+                continue
+
+            linkType,tsresol,timestampFormat = interfaces[interfaceId]
+            if self.viewFile:
+                print '-vf --', self.packetIndex, '-'*70
+                print 'Block Type:', blockType
+                print 'Interface ID:', interfaceId
+                print 'Original Length:', originalLength
+                print 'Captured Length:', capturedLength
+                print 'Timestamp (High):', timestampHigh
+                print 'Timestamp (Low):', timestampLow
+
+            if linkType not in (LINKTYPE_ETHERNET, LINKTYPE_LINUX_SLL):
+                if self.viewFile:
+                    print 'Unsupported data link type', linkType
+                continue
+
+            timestampSeconds,timestampFraction = self.__splitPcapngTimestamp((timestampHigh << 32) | timestampLow, tsresol)
+            yield (self.packetIndex, linkType, packetDataStart, min(packetDataStart+capturedLength, bodyEnd), \
+                   timestampFormat, timestampSeconds, timestampFraction)
+
+
+    def __readPcapngInterfaceDescription(self, snoopMap, start, end, byteOrder):
+        """
+        [Function]
+        Read the Interface Description Block of pcapng
+
+        [Argument]
+        snoopMap: mapped pcapng file
+        start: offset of the block body
+        end: end offset of the block body
+        byteOrder: '<' or '>' of the current section
+
+        [Return]
+        (linkType, tsresol, timestampFormat)
+        """
+
+        linkType,reserved,snaplen = STRUCTS_PCAPNG_INTERFACE_DESCRIPTION[byteOrder].unpack_from(snoopMap, start)
+        tsresol = PCAPNG_DEFAULT_TSRESOL
+
+        # Options: code (2 octet), length (2 octet), value padded to 32 bits
+        offset = start+STRUCTS_PCAPNG_INTERFACE_DESCRIPTION[byteOrder].size
+        while offset+4<=end:
+            optionCode,optionLength = STRUCTS_PCAPNG_OPTION_HEADER[byteOrder].unpack_from(snoopMap, offset)
+            if optionCode==PCAPNG_OPTION_END:
+                break
+            if offset+4+optionLength>end:
+                LOG.e('Invalid option length %d of Interface Description Block at offset %d' % (optionLength, offset))
+                break
+            if optionCode==PCAPNG_OPTION_IF_TSRESOL and optionLength>=1:
+                tsresol = ord(snoopMap[offset+4])
+            offset += 4 + (optionLength+3)/4*4
+
+        if self.viewFile:
+            print '-- Interface Description --'
+            print 'Link Type:', linkType
+            print 'Snapshot Length:', snaplen
+            print 'Timestamp Resolution:', tsresol
+
+        if tsresol & 0x80:
+            return (linkType, tsresol, '%d.%09d')
+        else:
+            return (linkType, tsresol, '%%d.%%0%dd' % (tsresol))
+
+
+    def __splitPcapngTimestamp(self, timestamp, tsresol):
+        """
+        [Function]
+        Split the 64 bits timestamp of pcapng to seconds and the fraction of second
+
+        [Argument]
+        timestamp: timestamp in the units of tsresol
+        tsresol: if_tsresol option of the interface, the MSB tells it is a power of 10 (0) or 2 (1)
+
+        [Return]
+        (timestampSeconds, timestampFraction), the fraction is in nanoseconds for a power of 2 tsresol,
+        otherwise in the units of tsresol
+        """
+
+        if tsresol & 0x80:
+            tempShift = tsresol & 0x7F
+            return (timestamp >> tempShift, ((timestamp & ((1 << tempShift) - 1)) * 1000000000) >> tempShift)
+
+        tempUnitsPerSecond = 10 ** tsresol
+        return (timestamp / tempUnitsPerSecond, timestamp % tempUnitsPerSecond)
+
+
+    def __decodePackets(self, snoopMap, packetRecords):
+        """
+        [Function]
+        Decode the packet records to UDP packets,
+        it is the second stage of the pipeline
+
+        [Argument]
+        snoopMap: mapped snoop file
+        packetRecords: iterable of packet records given by __readPacketRecords
+
+        [Return]
+        a generator of DialogPacket
+        """
+
+        # Note: all frames are decoded when view the file
+        tempUsePrefilter = not self.viewFile
+
+        for packetIndex,linkType,packetDataStart,packetDataEnd,timestampFormat,timestampSeconds,timestampFraction in packetRecords:
+            if tempUsePrefilter and not self.__peekPacket(snoopMap, linkType, packetDataStart, packetDataEnd):
+                self.droppedFramesCount += 1
+                continue
+            self.keptFramesCount += 1
+
+            # prepare UDP Packet
+            self.dialogPacket = DialogPacket()
+            self.dialogPacket.originalPacketIndex = packetIndex
+            self.dialogPacket.timestamp = timestampFormat % (timestampSeconds, timestampFraction)
+
+            if linkType==LINKTYPE_LINUX_SLL:
+                tempIsUdp = self.__readLinuxSll(snoopMap, packetDataStart, packetDataEnd)
+            else:
+                tempIsUdp = self.__readEthernetII(snoopMap, packetDataStart, packetDataEnd)
+
+            if self.viewFile:
+                print
+
+            if tempIsUdp:
+                yield self.dialogPacket
+
+
+    def __peekPacket(self, snoopMap, linkType, start, end):
+        """
+        [Function]
+        Peek the ethertype, IP protocol and UDP ports in the raw packet data, to tell whether
+        the frame may be SIP or the negotiated RTP before any object is allocated for it
+
+        [Argument]
+        snoopMap: mapped capture file
+        linkType: link type of the packet
+        start: offset of the packet data
+        end: end offset of the packet data
+
+        [Return]
+        return True if the frame should be decoded, otherwise return False
+        """
+
+        if linkType==LINKTYPE_LINUX_SLL:
+            ipStart = start+LINUX_SLL_HEADER_LEN
+        else:
+            ipStart = start+ETHERNET_HEADER_LEN
+
+        if ipStart+IP_FIXED_HEADER_LEN>end:
+            return False
+
+        # the type is the last 2 octets of both EthernetII and Linux cooked capture head
+        packetType,vhl,protocol = STRUCT_IP_PEEK.unpack_from(snoopMap, ipStart-2)
+        if packetType!=ETHERNET_TYPE_IP or protocol!=IP_PROTOCOL_UDP:
+            return False
+
+        udpStart = ipStart+(vhl & 0xf)*4
+        if udpStart+UDP_HEADER_LEN>end:
+            return False
+
+        ports = STRUCT_UDP_PORTS.unpack_from(snoopMap, udpStart)
+        if ports[0] in SIP_PORTS or ports[1] in SIP_PORTS:
+            return True
+
+        return ports in self.mediaPortPairs
+
+
+    def __readEthernetII(self, snoopMap, start, end):
+        """
+        [Function]
+        Read packet's EthernetII head
+
+        [Argument]
+        snoopMap: mapped snoop file
+        start: offset of the EthernetII data
+        end: end offset of the packet data
+
+        [Return]
+        return True if it is a UDP packet, otherwise return False
+
+        [See Also]
+        ########################################################
+        # http://www.firewall.cx/ethernet-frames-ethernet-ii.php
+        ########################################################
+        """
+
+        if self.viewFile:
+            print '-- EthernetII --'
+
+        if start+ETHERNET_HEADER_LEN>end:
+            if self.viewFile:
+                print 'Truncated EthernetII'
+            return False
+
+        # 1. Destination: 6 octet
+        # 2. Source: 6 octet
+        # 3. Type: 2 octet
+        destination,source,packetType = STRUCT_ETHERNET_HEADER.unpack_from(snoopMap, start)
+        if self.viewFile:
+            print 'Destination:', tuple2Hex(tuple([ord(c) for c in destination]))
+            print 'Source:', tuple2Hex(tuple([ord(c) for c in source]))
+            print 'Type: 0x%04x' % (packetType)
+
+        if packetType==ETHERNET_TYPE_IP:
+            return self.__readIp(snoopMap, start+ETHERNET_HEADER_LEN, end)
+        else:
+            if self.viewFile:
+                print 'NOT IP'
+            return False
+
+
+    def __readLinuxSll(self, snoopMap, start, end):
+        """
+        [Function]
+        Read packet's Linux cooked capture head, e.g. the packets captured by 'tcpdump -i any'
+
+        [Argument]
+        snoopMap: mapped capture file
+        start: offset of the Linux cooked capture data
+        end: end offset of the packet data
+
+        [Return]
+        return True if it is a UDP packet, otherwise return False
+
+        [See Also]
+        ########################################################
+        # http://www.tcpdump.org/linktypes/LINKTYPE_LINUX_SLL.html
+        ########################################################
+        """
+
+        if self.viewFile:
+            print '-- Linux cooked capture --'
+
+        if start+LINUX_SLL_HEADER_LEN>end:
+            if self.viewFile:
+                print 'Truncated Linux cooked capture'
+            return False
+
+        # 1. Packet Type: 2 octet
+        # 2. ARPHRD Type: 2 octet
+        # 3. Address Length: 2 octet
+        # 4. Address: 8 octet
+        # 5. Protocol Type: 2 octet
+        packetType,arphrdType,addressLength,address,protocolType = STRUCT_LINUX_SLL_HEADER.unpack_from(snoopMap, start)
+        if self.viewFile:
+            print 'Packet Type:', packetType
+            print 'ARPHRD Type:', arphrdType
+            print 'Address:', tuple2Hex(tuple([ord(c) for c in address[:min(addressLength, 8)]]))
+            print 'Protocol Type: 0x%04x' % (protocolType)
+
+        if protocolType==ETHERNET_TYPE_IP:
+            return self.__readIp(snoopMap, start+LINUX_SLL_HEADER_LEN, end)
+        else:
+            if self.viewFile:
+                print 'NOT IP'
+            return False
+
+
+    def __readIp(self, snoopMap, start, end):
+        """
+        [Function]
+        Read packet's IP head
+
+        [Argument]
+        snoopMap: mapped snoop file
+        start: offset of the IP packet data
+        end: end offset of the packet data
+
+        [Return]
+        return True if it is a UDP packet, otherwise return False
+
+        [See Also]
+        ########################################################
+        # http://www.networksorcery.com/enp/protocol/ip.htm
+        ########################################################
+        """
+
+        if self.viewFile:
+            print '-- IP (Internet Protocol) --'
+
+        if start+IP_FIXED_HEADER_LEN>end:
+            if self.viewFile:
+                print 'Truncated IP'
+            return False
+
+        # 1. Version: 4 bits
+        # 2. Header Length: 4 bits
+        # 3. Type of Service: 1 octet
+        # 4. Total length: 2 octet
+        # 5. Identification: 2 octet
+        # 6. Flags: 3 bits
+        # 7. Fragment Offset: 13 bits
+        # 8. Time to Live: 1 octet
+        # 8. Protocol: 1 octet
+        # 9. Header checksum: 2 octet
+        # 10. Source IP address: 4 octet
+        # 11. Destination IP address: 4 octet
+        vhl,typeOfService,totalLength,identification,ffo,ttl,protocol,headerChecksum,sourceIpAddress,destinationIpAddress = \
+                STRUCT_IP_HEADER.unpack_from(snoopMap, start)
+
+        version = vhl >> 4
+        headerLength = vhl & 0xf
+        if self.viewFile:
+            print 'Version:', version
+            print 'Header Length:', headerLength
+            print 'Type of Service:', typeOfService
+            print 'Total length:', totalLength
+            print 'Identification:', identification
+            print 'Flags:', ffo >> 13
+            print 'Fragment Offset:', ffo & 0x1fff
+            print 'Time to Live:', ttl
+            print 'Protocol:', protocol
+            print 'Header checksum: 0x%x' % (headerChecksum)
+            print 'Source IP address:', tuple([ord(c) for c in sourceIpAddress])
+            print 'Destination IP address:', tuple([ord(c) for c in destinationIpAddress])
+
+        # 12. Options
+        iOptionsLen = int(headerLength)*4 - IP_FIXED_HEADER_LEN
+        if self.viewFile:
+            print 'Options Len:', iOptionsLen
+            if iOptionsLen>0:
+                print 'Options:', struct.unpack_from('B'*iOptionsLen, snoopMap, start+IP_FIXED_HEADER_LEN)
+
+        if protocol!=IP_PROTOCOL_UDP:
+            if self.viewFile:
+                print 'NOT UDP'
+            return False
+        else:
+            # prepare UDP Packet
+            self.dialogPacket.sourceIp = socket.inet_ntoa(sourceIpAddress)
+            self.dialogPacket.destinationIp = socket.inet_ntoa(destinationIpAddress)
+            return self.__readUdp(snoopMap, start+int(headerLength)*4, end)
+
+
+    def __readUdp(self, snoopMap, start, end):
+        """
+        [Function]
+        Read packet's UDP head, only the encapsulated data of the UDP packet is copied out of the mapped file
+
+        [Argument]
+        snoopMap: mapped snoop file
+        start: offset of the UDP packet data
+        end: end offset of the packet data
+
+        [Return]
+        return True if the UDP packet is complete, otherwise return False
+
+        [See Also]
+        ########################################################
+        # http://www.networksorcery.com/enp/protocol/udp.htm
+        ########################################################
+        """
+
+        if self.viewFile:
+            print '-- UDP (User Datagram Protocol) --'
+
+        if start+UDP_HEADER_LEN>end:
+            if self.viewFile:
+                print 'Truncated UDP'
+            return False
+
+        # 1. Source Port: 2 octet
+        # 2. Destination Port: 2 octet
+        # 3. Length: 2 octet
+        # 4. Checksum: 2 octet
+        sourcePort,destinationPort,length,checksum = STRUCT_UDP_HEADER.unpack_from(snoopMap, start)
+        if self.viewFile:
+            print 'Source Port:', sourcePort
+            print 'Destination Port:', destinationPort
+            print 'Length:', length
+            print 'Checksum: 0x%x' % (checksum)
+
+        # prepare UDP Packet
+        self.dialogPacket.sourcePort = sourcePort
+        self.dialogPacket.destinationPort = destinationPort
+
+        # 5. Encapsulated Data
+        iStart = start+UDP_HEADER_LEN
+        iEnd = min(start+length, end)
+
+        # prepare UDP Packet
+        self.dialogPacket.data = snoopMap[iStart:iEnd]
+
+        if sourcePort in SIP_PORTS or destinationPort in SIP_PORTS:
+            # prepare UDP Packet
+            self.dialogPacket.udpType = UDP_TYPE_SIP
+            self.__readSip(self.dialogPacket.data)
+        else:
+            # prepare UDP Packet
+            self.dialogPacket.udpType = UDP_TYPE_UNKNOW
+
+        return True
+
+
+    def __readSip(self, sip):
+        """
+        [Function]
+        Read SIP content
+        Note: this function only print the content of SIP packet
+
+        [Argument]
+        sip: the SIP packet data
+
+        [Return]
+        (N/A)
+
+        [See Also]
+        ########################################################
+        # RFC 3261
+        ########################################################
+        """
+
+        if self.viewFile:
+            print '-- SIP (Session Initiation Protocol) --'
+            print sip
+
+
+    def __readPackets(self, fileName, snoopMap):
+        """
+        [Function]
+        Read every packets in the file until EOF, the packets flow through the pipeline
+        record reader -> protocol decoder -> dialog scanner -> dialog sink,
+        so only the packets of the dialog being scanned are held in memory
+
+        [Argument]
+        fileName: snoop file name
+        snoopMap: mapped snoop file
+
+        [Return]
+        cache name of the case
+        """
+
+        self.keptFramesCount = 0
+        self.droppedFramesCount = 0
+
+        if not self.willTimeStages:
+            tempPacketRecords = self.__readPacketRecords(snoopMap)
+            tempPackets = self.__decodePackets(snoopMap, tempPacketRecords)
+            tempDialogs = self.__scanDialogs(fileName, tempPackets)
+
+            cacheName = self.__dumpCaseToCache(fileName, tempDialogs)
+        else:
+            # Note: the stages run interleaved, each one's own time is the difference from the one before it
+            tempTimes = {}
+            tempPacketRecords = self.__timeStage(self.__readPacketRecords(snoopMap), 'read', tempTimes)
+            tempPackets = self.__timeStage(self.__decodePackets(snoopMap, tempPacketRecords), 'decode', tempTimes)
+            tempDialogs = self.__timeStage(self.__scanDialogs(fileName, tempPackets), 'scan', tempTimes)
+
+            tempStartTime = time.time()
+            cacheName = self.__dumpCaseToCache(fileName, tempDialogs)
+            tempTimes['write'] = time.time()-tempStartTime
+
+            self.__addStageTime('read', tempTimes['read'])
+            self.__addStageTime('decode', tempTimes['decode']-tempTimes['read'])
+            self.__addStageTime('scan', tempTimes['scan']-tempTimes['decode'])
+            self.__addStageTime('write', tempTimes['write']-tempTimes['scan'])
+
+        LOG.i("'%s' has %d frames, %d are kept and %d are dropped by the header peek" \
+                % (fileName, self.keptFramesCount+self.droppedFramesCount, self.keptFramesCount, self.droppedFramesCount))
+
+        return cacheName
+
+
+    def __getCaseConfig(self, snoopFileName):
+        """
+        [Function]
+        Get Case Config from SnoopFile's xml, e.g. the Snoop File Name is abc.snoop, then the Case Config File will be abc.xml
+
+        [Argument]
+        snoopFileName: snoop file name
+
+        [Return]
+        If has .xml file return CaseConfig, otherwise return None
+        """
+
+        xmlFileName = os.path.splitext(snoopFileName)[0]+'.xml'
+        if not os.path.exists(xmlFileName):
+            LOG.writeLog("There is no '%s'" % (xmlFileName))
+            return None
+
+        # Note: minidom is imported only when a .xml is parsed, most runs take the case config from the manifest
+        from xml.dom import minidom
+
+        tempDom = minidom.parse(xmlFileName)
+        tempRoot = tempDom.documentElement
+        caseConfig = CaseConfig()
+
+        tempCalledPrefix = tempRoot.getElementsByTagName('calledPrefix')
+        if len(tempCalledPrefix)>0 and tempCalledPrefix[0].firstChild:
+            caseConfig.calledPrefix = tempCalledPrefix[0].firstChild.data.strip()
+
+        tempCalled = tempRoot.getElementsByTagName('called')
+        if len(tempCalled)>0 and tempCalled[0].firstChild:
+            caseConfig.called = tempCalled[0].firstChild.data.strip()
+
+        tempCalling = tempRoot.getElementsByTagName('calling')
+        if len(tempCalling)>0 and tempCalling[0].firstChild:
+            caseConfig.calling = tempCalling[0].firstChild.data.strip()
+
+        tempRedirect = tempRoot.getElementsByTagName('redirect')
+        if len(tempRedirect)>0 and tempRedirect[0].firstChild:
+            caseConfig.redirect = tempRedirect[0].firstChild.data.strip()
+
+        tempReason = tempRoot.getElementsByTagName('reason')
+        if len(tempReason)>0 and tempReason[0].firstChild:
+            caseConfig.reason = tempReason[0].firstChild.data.strip()
+
+        LOG.writeLog("-- The content of '%s' is as below --\n%s" % (xmlFileName, str(caseConfig)))
+        return caseConfig
+
+
+    def __dumpCaseToCache(self, snoopFileName, dialogs):
+        """
+        [Function]
+        Dump all packets of the case in the snoop file to a .dpl file (dialogPacketsList),
+        it is the last stage of the pipeline, every dialog is written as soon as it is given out
+
+        [Argument]
+        snoopFileName: snoop file name
+        dialogs: iterable of (dialog index, packets list) of each dialog, not in the order of the index
+
+        [Return]
+        return cacheName
+        """
+
+        cacheName = caseNameToCacheName(snoopFileName)
+        cifFileName = cacheName + CASE_INFORMATION_FILE_EXT
+        dplFileName = cacheName + DIALOG_PACKETS_LIST_FILE_EXT
+
+        cacheDirName = os.path.split(cifFileName)[0]
+        if not os.path.exists(cacheDirName):
+            os.makedirs(cacheDirName)
+
+        dplWriter = DplWriter(dplFileName)
+        try:
+            for dialogIndex,dialog in dialogs:
+                dplWriter.writeDialog(dialogIndex, dialog)
+            dplWriter.close()
+        except:
+            # Note: a failed scan leaves no .dpl file with a header of only some dialogs, abort() may handle
+            # an error of its own, so the one of the scan is kept to be raised again
+            tempErrorType,tempError,tempTraceback = sys.exc_info()
+            dplWriter.abort()
+            raise tempErrorType, tempError, tempTraceback
+
+        caseInformation = CaseInformation()
+        caseInformation.cifVersion = CIF_VERSION
+        caseInformation.snoopFileName = snoopFileName
+        tempFileStatus = os.stat(snoopFileName)
+        caseInformation.snoopFileCreateTime = tempFileStatus.st_ctime
+        caseInformation.snoopFileSize = tempFileStatus.st_size
+
+        caseInformation.dialogNumbers = self.dialogNumbers
+
+        cifFile = file(cifFileName, 'wb')
+        pickle.dump(caseInformation, cifFile)
+        cifFile.close()
+
+        return cacheName
+
+
+    def __isDuplicatedIvrEvent(self, dialog, currentRtpTimestamp, currentIvrEventStr):
+        """
+        [Function]
+        check whether this IVR event is duplicated
+
+        [Argument]
+        dialog: ScanningDialog which the IVR event belongs to
+        currentRtpTimestamp: current RTP's timestamp
+        currentIvrEventStr: current IVR Event's content
+
+        [Return]
+        return True if duplicated, otherwise return False
+        """
+
+        if currentRtpTimestamp!=0:
+            # 1. only need checking duplication when autotest=2
+            # 2.1. the ivr event == the cached
+            # 2.2. the timestamp <= the cached
+            # 2.3. don't ignore the event whose timestamp is the same as the previous one
+            if currentIvrEventStr==dialog.cachedIvrEventStr \
+                    and currentRtpTimestamp<=dialog.cachedRtpTimestamp \
+                        and dialog.ignoredIvrEventCount<IVR_EVENT_DUP_TIMES:
+                dialog.ignoredIvrEventCount += 1
+                return True
+            else:
+                dialog.cachedRtpTimestamp = currentRtpTimestamp
+                dialog.cachedIvrEventStr = currentIvrEventStr
+                dialog.ignoredIvrEventCount = 0
+                return False
+        else:
+            return False
+
+
+    def __scanDialogs(self, fileName, packets):
+        """
+        [Function]
+        Scan the packets to filter the useful ones (SIP & RTP) of every dialog,
+        it is the third stage of the pipeline. It goes through the packets only once, the dialogs may be
+        overlapped in the capture: a SIP packet is put to its dialog by Call-ID, and a RTP packet by the
+        port pair in SDP. The useful packets are appended to packetsList of their dialog at once,
+        the others are dropped. Each dialog is given out as soon as it is BYEd, so a dialog without BYE
+        does not hold the ones after it in memory, the dialogs not BYEd are given out at the end.
+        The sink puts them in the order of their INVITE by the dialog index
+
+        [Argument]
+        fileName: name of this case's snoop file
+        packets: iterable of DialogPacket in the capture order
+
+        [Return]
+        a generator of (dialog index, packets list) of each dialog
+        """
+
+        # clear up something before scan the new case
+        del self.dialogNumbers[:]
+        self.dialogIndex = -1
+        self.mediaPortPairs.clear()
+
+        tempScanningDialogs = {}    # key: Call-ID, value: ScanningDialog not BYEd
+
+        for packet in packets:
+            if packet.udpType==UDP_TYPE_SIP:
+                try:
+                    tempCallId = getCallId(packet.data)
+                except AttributeError:
+                    # there is no Call-ID, it is not a SIP message of any dialog
+                    continue
+
+                dialog = tempScanningDialogs.get(tempCallId)
+                if not dialog:
+                    # the packets out of dialog are dropped at once
+                    reInvite = RE_SIP_INVITE.search(packet.data)
+                    if reInvite:
+                        tempScanningDialogs[tempCallId] = self.__beginDialog(packet, reInvite, tempCallId)
+                    continue
+
+                if not self.__scanSip(dialog, packet):
+                    continue
+
+                # the dialog is BYEd, the RTP of it is useless now
+                del tempScanningDialogs[tempCallId]
+                self.__forgetMediaPortPairs(dialog)
+                yield (dialog.dialogIndex, dialog.packetsList)
+            elif packet.udpType==UDP_TYPE_UNKNOW:
+                dialog = self.mediaPortPairs.get((packet.sourcePort, packet.destinationPort))
+                if dialog:
+                    self.__scanRtp(dialog, packet)
+
+        # the last dialogs may be not BYEd in the snoop file
+        for dialog in sorted(tempScanningDialogs.itervalues(), key=lambda dialog: dialog.dialogIndex):
+            yield (dialog.dialogIndex, dialog.packetsList)
+
+        if self.dialogIndex < 0:
+            LOG.a("There is no dialog found in '%s'" % (fileName))
+            raise
+
+
+    def __beginDialog(self, packet, reInvite, callId):
+        """
+        [Function]
+        Begin a new dialog by its INVITE, the INVITE is templated and becomes the first packet of the dialog
+
+        [Argument]
+        packet: DialogPacket of the INVITE
+        reInvite: match object of the INVITE start line
+        callId: Call-ID of the INVITE
+
+        [Return]
+        ScanningDialog of the new dialog
+        """
+
+        tempData = packet.data
+
+        # Note: INVITE will begin a new dialog
+        self.dialogIndex += 1
+        dialog = ScanningDialog(self.dialogIndex, getFromTag(tempData), callId, getSdpMediaPort(tempData))
+
+        self.dialogNumbers.append(DialogNumber(getCalledNumberFromRequestHead(reInvite), getCallingNumberFromContact(tempData)))
+
+        tempMessage = SipMessage(tempData)
+        self.__templateInvite(tempMessage)
+        self.__templateVia(tempMessage)
+        self.__templateFrom(tempMessage)
+        self.__templateTo(tempMessage)
+        self.__templateCallId(tempMessage)
+        self.__templateContact(tempMessage)
+        self.__templateCseqForInvite(tempMessage)
+        # needn't Record-Route
+        self.__deleteRecordRoute(tempMessage)
+        self.__templateContentLength(tempMessage)
+        self.__templateSdpM(tempMessage)
+        self.__templateSdpSourceIpAddress(tempMessage)
+
+        packet.dialogIndex = dialog.dialogIndex
+        packet.sipType = SIP_TYPE_INVITE
+        packet.data = compileSipTemplate(tempMessage.getData(), True)
+        dialog.packetsList.append(packet)
+
+        dialog.sipState = SIP_STATE_WAITING_183
+        return dialog
+
+
+    def __forgetMediaPortPairs(self, dialog):
+        """
+        [Function]
+        Let the header peek and the scanner not keep the RTP of the dialog any more
+
+        [Argument]
+        dialog: ScanningDialog
+
+        [Return]
+        (N/A)
+        """
+
+        for portPair in ((dialog.sessionSourcePort, dialog.sessionDestinationPort), (dialog.sessionDestinationPort, dialog.sessionSourcePort)):
+            # Note: a later dialog may use the same ports
+            if self.mediaPortPairs.get(portPair) is dialog:
+                del self.mediaPortPairs[portPair]
+
+
+    def __scanSip(self, dialog, packet):
+        """
+        [Function]
+        Go on the SIP state of the dialog by a SIP packet of it
+
+        [Argument]
+        dialog: ScanningDialog which the packet belongs to by Call-ID
+        packet: DialogPacket of SIP
+
+        [Return]
+        return True if the dialog is BYEd, otherwise return False
+        """
+
+        tempData = packet.data
+
+        if dialog.sipState==SIP_STATE_WAITING_183:
+            reResponse = RE_SIP_183.search(tempData)
+            if reResponse:
+                tempFromTag = getFromTag(tempData)
+                if tempFromTag==dialog.fromTag:
+                    dialog.toTag = getToTag(tempData)
+                else:
+                    LOG.w("There is a 183 whose From tag (%s) does not equals INVITE's (%s)" %(tempFromTag, dialog.fromTag))
+                    return False
+
+                dialog.sessionDestinationPort = getSdpMediaPort(tempData)
+                # let the header peek and the scanner keep the RTP of this dialog from now on
+                self.mediaPortPairs[(dialog.sessionSourcePort, dialog.sessionDestinationPort)] = dialog
+                self.mediaPortPairs[(dialog.sessionDestinationPort, dialog.sessionSourcePort)] = dialog
+                dialog.baseTimeTo183 = packet.timestamp
+                dialog.telephoneEventPtInSdp = getTelephoneEventPtFromSdp(tempData)
+                dialog.sipState = SIP_STATE_WAITING_200
+
+            return False
+
+        if dialog.sipState==SIP_STATE_WAITING_200:
+            reResponse = RE_SIP_200.search(tempData)
+            if reResponse:
+                tempFromTag = getFromTag(tempData)
+                tempToTag = getToTag(tempData)
+
+                if tempFromTag==dialog.fromTag and tempToTag==dialog.toTag:
+                    dialog.baseTimeTo200 = packet.timestamp
+                    dialog.sipState = SIP_STATE_BEFORE_ACK
+
+            return False
+
+        if dialog.sipState==SIP_STATE_BEFORE_ACK:
+            reAck = RE_SIP_ACK.search(tempData)
+            if reAck:
+                tempFromTag = getFromTag(tempData)
+                tempToTag = getToTag(tempData)
+
+                if tempFromTag==dialog.fromTag and tempToTag==dialog.toTag:
+                    tempMessage = SipMessage(tempData)
+                    self.__templateAck(tempMessage)
+                    self.__templateVia(tempMessage)
+                    self.__templateFrom(tempMessage)
+                    self.__templateTo(tempMessage)
+                    self.__templateCallId(tempMessage)
+                    self.__templateContact(tempMessage)
+                    self.__templateCseqForAck(tempMessage)
+
+                    packet.dialogIndex = dialog.dialogIndex
+                    # Note: the ACK takes the time of the 200, the media clock of ChannelWorker starts from it
+                    packet.delttime = float(dialog.baseTimeTo200) - float(dialog.baseTimeTo183)
+                    packet.sipType = SIP_TYPE_ACK
+                    packet.data = compileSipTemplate(tempMessage.getData(), False)
+                    dialog.packetsList.append(packet)
+
+                    dialog.sipState = SIP_STATE_AFTER_ACK
+
+            return False
+
+        if dialog.sipState==SIP_STATE_AFTER_ACK:
+            reBye = RE_SIP_BYE.search(tempData)
+            if reBye:
+                tempFromTag = getFromTag(tempData)
+                tempToTag = getToTag(tempData)
+
+                if tempFromTag==dialog.fromTag and tempToTag==dialog.toTag:
+                    # source says BYE
+                    tempMessage = SipMessage(tempData)
+                    self.__templateBye(tempMessage)
+                    self.__templateVia(tempMessage)
+                    self.__templateFrom(tempMessage)
+                    self.__templateTo(tempMessage)
+                    self.__templateCallId(tempMessage)
+                    self.__templateCseqForBye(tempMessage)
+                    # needn't Route field
+                    self.__deleteRoute(tempMessage)
+                    # delete Diversion filed, and add later if need
+                    self.__deleteDiversion(tempMessage)
+
+                    packet.received = False
+                    packet.dialogIndex = dialog.dialogIndex
+                    packet.delttime = float(packet.timestamp) - float(dialog.baseTimeTo183)
+                    packet.sipType = SIP_TYPE_BYE
+                    packet.data = compileSipTemplate(tempMessage.getData(), False)
+                    dialog.packetsList.append(packet)
+
+                    dialog.sipState = SIP_STATE_BYED
+                    return True
+                elif tempFromTag==dialog.toTag and tempToTag==dialog.fromTag:
+                    # destination says BYE
+                    packet.received = True
+                    packet.dialogIndex = dialog.dialogIndex
+                    packet.sipType = SIP_TYPE_BYE
+                    # clear the data of received packet
+                    packet.data = ''
+                    dialog.packetsList.append(packet)
+
+                    dialog.sipState = SIP_STATE_BYED
+                    return True
+
+            return False
+
+        return False
+
+
+    def __scanRtp(self, dialog, packet):
+        """
+        [Function]
+        Put a RTP packet to its dialog, the RTP sent by source is kept, only the IVR events received from
+        destination are kept
+
+        [Argument]
+        dialog: ScanningDialog which the packet belongs to by the port pair
+        packet: DialogPacket of RTP
+
+        [Return]
+        (N/A)
+        """
+
+        if packet.sourcePort==dialog.sessionSourcePort and packet.destinationPort==dialog.sessionDestinationPort:
+            packet.dialogIndex = dialog.dialogIndex
+            packet.received = False
+            packet.delttime = float(packet.timestamp) - float(dialog.baseTimeTo183)
+            dialog.packetsList.append(packet)
+
+            tempPayloadType = 0
+            try:
+                tempPayloadType,tempRtpTimestamp,tempExtendedData = self.__decodeRtp(packet, dialog)
+            except:
+                return
+
+            packet.rtpTimestamp = tempRtpTimestamp
+            if tempPayloadType==dialog.telephoneEventPtInSdp:
+                packet.udpType = UDP_TYPE_RTP_EVENT
+                packet.dtmf = tempExtendedData
+            else:
+                packet.udpType = UDP_TYPE_RTP
+            return
+
+        # else: the packet is from destination to source
+        tempPayloadType = 0
+        try:
+            tempPayloadType,tempRtpTimestamp,tempExtendedData = self.__decodeRtp(packet, dialog)
+        except:
+            return
+
+        packet.rtpTimestamp = tempRtpTimestamp
+
+        # only IVR Event type RTP need to save the following fields
+        if tempPayloadType==PAYLOAD_TYPE_IVR_RECORD_FILE:
+            tempIvrEventStr = tempExtendedData
+            if self.__isDuplicatedIvrEvent(dialog, tempRtpTimestamp, tempIvrEventStr):
+                return
+
+            packet.dialogIndex = dialog.dialogIndex
+            packet.received = True
+            packet.delttime = float(packet.timestamp) - float(dialog.baseTimeTo183)
+            packet.udpType = UDP_TYPE_RTP_IVR_RECORD_FILE
+            packet.ivrEventStr = tempIvrEventStr
+            # clear the data of received packet
+            packet.data = ''
+            dialog.packetsList.append(packet)
+        elif tempPayloadType==PAYLOAD_TYPE_IVR_PROMPT:
+            tempIvrEventStr = str(tempExtendedData)
+            if self.__isDuplicatedIvrEvent(dialog, tempRtpTimestamp, tempIvrEventStr):
+                return
+
+            # The packet carries one or more prompts, every prompt is a new packet in packetsList
+            packet.dialogIndex = dialog.dialogIndex
+            packet.received = True
+            packet.delttime = float(packet.timestamp) - float(dialog.baseTimeTo183)
+            # clear the data of received packet
+            packet.data = ''
+            if len(tempExtendedData)>1:
+                packet.isTwin = True
+
+            tempLastPromptIndex = len(tempExtendedData)-1
+            for tempPromptIndex in xrange(len(tempExtendedData)):
+                # Note: the last prompt takes the original packet, needn't copy it
+                if tempPromptIndex<tempLastPromptIndex:
+                    tempNewPrompt = copy.copy(packet)
+                else:
+                    tempNewPrompt = packet
+
+                tempNewPrompt.udpType = tempExtendedData[tempPromptIndex][0] + UDP_TYPE_RTP_IVR_PROMPT
+                tempNewPrompt.ivrEventStr = tempExtendedData[tempPromptIndex][1]
+
+                dialog.packetsList.append(tempNewPrompt)
+
+
+    def __decodeRtp(self, packet, dialog):
+        """
+        [Function]
+        Decode a RTP packet, with the parameter -vf the fields are printed too
+
+        [Argument]
+        packet: DialogPacket of RTP
+        dialog: ScanningDialog which the packet belongs to
+
+        [Return]
+        the same as decodeRtp()
+        """
+
+        if self.viewFile:
+            return printRtp(packet.data, dialog.telephoneEventPtInSdp, packet.originalPacketIndex)
+        return decodeRtp(packet.data, dialog.telephoneEventPtInSdp)
+
+
+    def __printDialogPacksList(self):
+        """
+        [Function]
+        Print packet list for debug
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        (N/A)
+        """
+
+        print 'There are', len(self.dialogPacketsList), 'dialogs in this list'
+
+        tempDialogIndex = 0
+        tempPacketIndex = 0
+        for dialog in self.dialogPacketsList:
+            print '-'*70, '-vp -- dialog:', str(tempDialogIndex), '--'
+
+            for packet in dialog:
+                print '-'*70, '-vp --', i, '--'
+                print str(packet)
+                print
+                tempPacketIndex += 1
+
+            tempDialogIndex += 1
+
+
+    def __templateInvite(self, message):
+        temp = RE_SIP_URI.sub(MAGIC_SIP_URI, message.startLine)
+        message.startLine = RE_EMAIL.sub('[CALLED]@[DESTINATION]', temp)
+
+
+    def __templateAck(self, message):
+        temp = RE_IP_AND_PORT.sub(MAGIC_IP_AND_PORT, message.startLine)
+        message.startLine = RE_IP.sub('[DESTINATION]', temp)
+
+
+    def __templateBye(self, message):
+        temp = RE_IP_AND_PORT.sub(MAGIC_IP_AND_PORT, message.startLine)
+        message.startLine = RE_IP.sub('[DESTINATION]', temp)
+
+
+    def __templateFromDisplay(self, fromStr):
+        if RE_SIP_FROM_DISPLAY.search(fromStr):
+            return RE_SIP_FROM_DISPLAY.sub('[FROM_DISPLAY]', fromStr)
+        else:
+            return fromStr
+
+
+    def __templateFrom(self, message):
+        tempIndex = message.findHeader('from')
+        if tempIndex<0:
+            LOG.e('__templateFrom no From:\n%s' % (message.getData()))
+            return
+
+        strFrom = message.headerLines[tempIndex]
+        # Note: subn() tells whether it matched, needn't search before
+        temp,tempCount = RE_EMAIL.subn('[FROM_CALLING]@[SOURCE]', strFrom)
+        if tempCount==0:
+            temp,tempCount = RE_IP.subn('[FROM_CALLING]@[SOURCE]', strFrom)
+            if tempCount==0:
+                LOG.e('cannot parse From with RE_EMAIL and RE_IP: %s' % (strFrom))
+                return
+
+        message.headerLines[tempIndex] = self.__templateFromDisplay(RE_SIP_TAG.sub('tag=[FROM_TAG]', temp))
+
+
+    def __templateVia(self, message):
+        # only the Vias of UDP are templated, the first one is left and the others are removed
+        tempIndexes = []
+        for i in message.findHeaders('via'):
+            if 'SIP/2.0/UDP' in message.headerLines[i]:
+                tempIndexes.append(i)
+
+        if not tempIndexes:
+            LOG.e('__templateVia no Via of UDP:\n%s' % (message.getData()))
+            return
+
+        temp = RE_IP_AND_PORT.sub(MAGIC_IP_AND_PORT, message.headerLines[tempIndexes[0]])
+        message.headerLines[tempIndexes[0]] = RE_IP.sub('[SOURCE]', temp)
+
+        tempIndexes.reverse()
+        for i in tempIndexes[:-1]:
+            message.deleteHeader(i)
+
+
+    def __templateContact(self, message):
+        tempIndex = message.findHeader('contact')
+        if tempIndex<0:
+            LOG.e('__templateContact no Contact:\n%s' % (message.getData()))
+            return
+
+        # Note: the SIP URI is an email with port, so the email is matched before and after it is replaced
+        temp = RE_SIP_URI.sub(MAGIC_SIP_URI, message.headerLines[tempIndex])
+        temp,tempCount = RE_EMAIL.subn('[CALLING]@[SOURCE]', temp)
+        if tempCount==0:
+            temp,tempCount = RE_IP.subn('[CALLING]@[SOURCE]', temp)
+            if tempCount==0:
+                LOG.e('cannot parse Contact with RE_EMAIL and RE_IP: %s' % (temp))
+                return
+
+        message.headerLines[tempIndex] = temp
+
+
+    def __templateCseq(self, message, cseqStr):
+        tempIndex = message.findHeader('cseq')
+        if tempIndex<0:
+            LOG.e('__templateCseq no CSeq:\n%s' % (message.getData()))
+            return
+
+        message.headerLines[tempIndex] = 'CSeq: ' + cseqStr
+
+
+    def __templateCseqForInvite(self, message):
+        self.__templateCseq(message, '1 INVITE')
+
+
+    def __templateCseqForAck(self, message):
+        self.__templateCseq(message, '1 ACK')
+
+
+    def __templateCseqForBye(self, message):
+        self.__templateCseq(message, '2 BYE')
+
+
+    def __templateTo(self, message):
+        tempIndex = message.findHeader('to')
+        if tempIndex<0:
+            LOG.e('__templateTo no To:\n%s' % (message.getData()))
+            return
+
+        temp = RE_SIP_URI.sub(MAGIC_SIP_URI, message.headerLines[tempIndex])
+        temp,tempCount = RE_EMAIL.subn('[CALLED]@[DESTINATION]', temp)
+        if tempCount==0:
+            temp,tempCount = RE_IP.subn('[CALLED]@[DESTINATION]', temp)
+            if tempCount==0:
+                return
+
+        message.headerLines[tempIndex] = RE_SIP_TAG.sub('tag=[TO_TAG]', temp)
+
+
+    def __templateCallId(self, message):
+        tempIndex = message.findHeader('call-id')
+        if tempIndex<0:
+            LOG.e('__templateCallId no Call-ID:\n%s' % (message.getData()))
+            return
+
+        temp,tempCount = RE_EMAIL.subn('[FROM_TAG]@[SOURCE]', message.headerLines[tempIndex])
+        if tempCount==0:
+            temp = 'Call-ID: [FROM_TAG]@[SOURCE]'
+
+        message.headerLines[tempIndex] = temp
+
+
+    def __templateContentLength(self, message):
+        tempIndex = message.findHeader('content-length')
+        if tempIndex<0:
+            LOG.e('__templateContentLength no Content-Length:\n%s' % (message.getData()))
+            return
+
+        message.headerLines[tempIndex] = 'Content-Length: [LENGTH]'
+
+
+    def __deleteRoute(self, message):
+        message.deleteHeaders('route')
+
+
+    def __deleteDiversion(self, message):
+        message.deleteHeaders('diversion')
+
+
+    def __deleteRecordRoute(self, message):
+        message.deleteHeaders('record-route')
+
+
+    def __templateSdpSourceIpAddress(self, message):
+        reV = RE_SDP_V.search(message.body)
+        if not reV:
+            return
+
+        message.body = message.body[0:reV.start()] + RE_IP.sub('[SOURCE]', message.body[reV.start():])
+
+
+    def __templateSdpM(self, message):
+        reM = RE_SDP_M.search(message.body)
+        if not reM:
+            LOG.e('__templateSdpM no m=:\n%s' % (message.getData()))
+            return
+
+        message.body = message.body[0:reM.start()] + RE_SDP_M_AUDIO.sub('audio [AUDIO_PORT]', reM.group()) + message.body[reM.end():]
+
+
+def compileSnoopFileInWorker(task):
+    """
+    [Function]
+    Parse a snoop file and dump it to cache in the worker process of SnoopParser
+
+    [Argument]
+    task: (fileIndex, fileName)
+
+    [Return]
+    (caseManifestEntry, errorStr, logContents, stageTimes), caseManifestEntry is None if failed
+    """
+
+    # Note: the log thread of the main process is not in this process, so keep the log in memory
+    tempLog = LogBuffer()
+    setGlobalLogObj(tempLog)
+
+    fileIndex,fileName = task
+    tempSnoopParser = SnoopParser()
+    entry,errorStr = tempSnoopParser.compileFile(fileIndex, fileName)
+
+    return (entry, errorStr, tempLog.contents, tempSnoopParser.getStageTimes())
+
+
+def washIvrPromptStr(ivrPromptStr, udpType=UDP_TYPE_RTP_IVR_SPEAK_PROMPT, completely=True):
+    """
+    [Function]
+    wash IVR prompt string to make it only file name
+
+    [Argument]
+    ivrPromptStr: IVR prompt string
+    udpType: the udp type of this packet, default is UDP_TYPE_RTP_IVR_SPEAK_PROMPT
+    completely: need transfer the prompt string to lower? default is True
+
+    [Return]
+    (udpType, the-washed-IVR-prompt-string)
+    """
+
+    tempIvrPromptStr = ivrPromptStr.replace('\\', '/')
+    try:
+        tempIvrPromptStr = tempIvrPromptStr[tempIvrPromptStr.rindex('/')+1:]
+    except ValueError:
+        LOG.w("There is no '\\' or '/' in IVR prompt string")
+
+    if completely:
+        tempIvrPromptStr = tempIvrPromptStr.lower()
+
+    if udpType!=UDP_TYPE_RTP_IVR_SPEAK_PROMPT:
+        return (udpType, tempIvrPromptStr)
+    #else:
+
+    # There is a bug in IVR autotest !!!
+    if len(tempIvrPromptStr)>8 and (tempIvrPromptStr.find('!')>=0 \
+            or tempIvrPromptStr.find('@')>=0 \
+            or tempIvrPromptStr.find('#')>=0 \
+            or tempIvrPromptStr.find('$')>=0 \
+            or tempIvrPromptStr.find('%')>=0 \
+            or tempIvrPromptStr.find('^')>=0 \
+            or tempIvrPromptStr.find('&')>=0 \
+            or tempIvrPromptStr.find('*')>=0 \
+            or tempIvrPromptStr.find('(')>=0 \
+            or tempIvrPromptStr.find(')')>=0 \
+            or tempIvrPromptStr.find('-')>=0 \
+            or tempIvrPromptStr.find('+')>=0 \
+            or tempIvrPromptStr.find('=')>=0):
+        LOG.w("This string '%s' seems a record file" % (tempIvrPromptStr))
+        return (UDP_TYPE_RTP_IVR_RECORD_FILE, tempIvrPromptStr)
+    if len(tempIvrPromptStr)>5 and tempIvrPromptStr[1].isdigit():
+        tempIvrPromptStr = tempIvrPromptStr[2:]
+    else:
+        LOG.w("This string '%s' seems not a prompt" % (tempIvrPromptStr))
+
+    return (UDP_TYPE_RTP_IVR_SPEAK_PROMPT, tempIvrPromptStr)
+
+
+def getResponseCode(data):
+    reResponse = RE_SIP_RESPONSE.search(data)
+    strResponse = reResponse.group()
+    reResponseCode = RE_SIP_RESPONSE_CODE.search(strResponse)
+    strResponseCode = reResponseCode.group()
+    return strResponseCode
+
+
+def getToTag(data):
+    reTo = RE_SIP_TO.search(data)
+    strTo = reTo.group()
+    return getTagFromHeader(strTo)
+
+
+def getTagFromHeader(headerStr):
+    reTag = RE_SIP_TAG.search(headerStr)
+    if reTag:
+        strTag = reTag.group()
+        return strTag[strTag.index('=')+1:].strip()
+    return ''
+
+
+def getSdpMediaPort(data):
+    strM = RE_SDP_M.search(data).group()
+    strAudio = RE_SDP_M_AUDIO.search(strM).group()
+    return int(RE_INT.search(strAudio).group())
+
+
+def getTelephoneEventStr(data):
+    return RE_SDP_TELEPHONE_EVENT.search(data).group()
+
+
+def getTelephoneEventPtFromSdp(data):
+    strTelephoneEvent = RE_SDP_TELEPHONE_EVENT.search(data).group()
+    strRtpmap = RE_SDP_RTPMAP.search(strTelephoneEvent).group()
+    return int(RE_INT.search(strRtpmap).group())
+
+
+def getFmtpForTelephoneEvent(data, telephoneEventPt):
+    re_fmtp_telephone_event = re.compile(r'a=fmtp:%d.*' % (telephoneEventPt))
+    return re_fmtp_telephone_event.search(data).group()
+
+
+def getFromTag(data):
+    reFrom = RE_SIP_FROM.search(data)
+    strFrom = reFrom.group()
+    reTag = RE_SIP_TAG.search(strFrom)
+    strTag = reTag.group()
+
+    return strTag[strTag.index('=')+1:].strip()
+
+
+def getCallId(data):
+    reCallId = RE_SIP_CALL_ID.search(data)
+    strCallId = reCallId.group()
+    return getCallIdFromHeader(strCallId)
+
+
+def getCallIdFromHeader(callIdStr):
+    try:
+        tempAtPos = callIdStr.index('@')
+        return callIdStr[callIdStr.index(':')+1:tempAtPos].strip()
+    except ValueError:
+        return callIdStr[callIdStr.index(':')+1:].strip()
+
+
+def getCallIdStr(data):
+    return RE_SIP_CALL_ID.search(data).group()
+
+
+def getCSeqStr(data):
+    return RE_SIP_CSEQ.search(data).group()
+
+
+def getFromStr(data):
+    return RE_SIP_FROM.search(data).group()
+
+
+def getToStr(data):
+    return RE_SIP_TO.search(data).group()
+
+
+def compileSipTemplate(data, hasSdp):
+    """
+    [Function]
+    Turn a templated SIP message to the form to be sent, with the slots for SipTemplate:
+    the line end is \\r\\n, the slot SLOT_EXTRA_HEADERS is at the end of the headers, then the empty line and SDP
+
+    [Argument]
+    data: the SIP message templated by SnoopParser, e.g. 'INVITE sip:[CALLED]@[DESTINATION]:5060 SIP/2.0\\r\\n...'
+    hasSdp: whether the SDP of the message is sent, only True for INVITE
+
+    [Return]
+    the SIP template string
+    """
+
+    tempData = data.replace('\r\n', '\n').replace('\n', '\r\n')
+    tempExtraHeaders = SIP_TEMPLATE_SLOT_MARK + chr(SIP_TEMPLATE_SLOT_BASE+SLOT_EXTRA_HEADERS)
+    if hasSdp:
+        tempSIP,tempSDP = getSipSdp(tempData)
+        tempData = tempSIP.strip() + tempExtraHeaders + '\r\n\r\n' + tempSDP.strip() + '\r\n'
+    else:
+        tempData = tempData.strip() + tempExtraHeaders + '\r\n\r\n'
+
+    for slot in range(len(SIP_TEMPLATE_SLOTS)):
+        if slot!=SLOT_EXTRA_HEADERS:
+            tempData = tempData.replace(SIP_TEMPLATE_SLOTS[slot], SIP_TEMPLATE_SLOT_MARK + chr(SIP_TEMPLATE_SLOT_BASE+slot))
+
+    return tempData
+
+
+def sipTemplateToText(data):
+    """
+    [Function]
+    Show the slots in the SIP template string by their names, e.g. '[CALLED]', the slot SLOT_EXTRA_HEADERS is not shown
+
+    [Argument]
+    data: the SIP template string
+
+    [Return]
+    the text to be printed
+    """
+
+    tempParts = data.split(SIP_TEMPLATE_SLOT_MARK)
+    tempTexts = [tempParts[0]]
+    for part in tempParts[1:]:
+        tempSlot = ord(part[0]) - SIP_TEMPLATE_SLOT_BASE
+        if tempSlot!=SLOT_EXTRA_HEADERS:
+            tempTexts.append(SIP_TEMPLATE_SLOTS[tempSlot])
+        tempTexts.append(part[1:])
+    return ''.join(tempTexts)
+
+
+def getSipSdp(data):
+    reV = RE_SDP_V.search(data)
+    try:
+        return data[0:reV.start()].strip(), data[reV.start():].strip()
+    except:
+        return data, ''
+
+
+def getViasList(data):
+    return RE_SIP_VIA.findall(data)
+
+
+def getCalledNumberFromRequestHead(reInvite):
+    reSipUri = RE_EMAIL.search(reInvite.group())
+    strSipUri = reSipUri.group()
+
+    try:
+        tempAtPos = strSipUri.index('@')
+        return strSipUri[:tempAtPos].strip()
+    except ValueError:
+        return strSipUri.strip()
+
+
+def getCalledNumberFromRequestHead2(data):
+    reInvite = RE_SIP_INVITE.search(data)
+    reSipUri = RE_EMAIL.search(reInvite.group())
+    strSipUri = reSipUri.group()
+
+    try:
+        tempAtPos = strSipUri.index('@')
+        return strSipUri[:tempAtPos].strip()
+    except ValueError:
+        return strSipUri.strip()
+
+
+def getCallingNumberFromContactOrFrom(data):
+    strNumber = getCallingNumberFromContact(data)
+    if strNumber=='':
+        return getCallingNumberFromFrom(data)
+    else:
+        return strNumber
+
+
+def getCallingNumberFromContact(data):
+    reContact = RE_SIP_CONTACT.search(data)
+    reSipUri = RE_EMAIL.search(reContact.group())
+    strSipUri = ''
+    try:
+        strSipUri = reSipUri.group()
+    except AttributeError:
+        return ''
+
+    try:
+        tempAtPos = strSipUri.index('@')
+        return strSipUri[:tempAtPos].strip()
+    except ValueError:
+        return strSipUri.strip()
+
+
+def getCallingNumberFromFrom(data):
+    reFrom = RE_SIP_FROM.search(data)
+    reSipUri = RE_EMAIL.search(reFrom.group())
+    strSipUri = ''
+    try:
+        strSipUri = reSipUri.group()
+    except AttributeError:
+        return ''
+
+    try:
+        tempAtPos = strSipUri.index('@')
+        return strSipUri[:tempAtPos].strip()
+    except ValueError:
+        return strSipUri.strip()
+
+
+def getIpAddressFromRequestHead(data):
+    reInvite = RE_SIP_INVITE.search(data)
+
+    try:
+        reIpAddress = RE_IP.search(reInvite.group())
+        return reIpAddress.group().strip()
+    except ValueError:
+        reSipUri = RE_EMAIL.search(reInvite.group())
+        strSipUri = reSipUri.group()
+        tempAtPos = strSipUri.index('@')
+        return strSipUri[tempAtPos+1:].strip()
+
+
+def getContactStr(data):
+    return RE_SIP_CONTACT.search(data).group()
+
+
+def setTelephoneEventPt(data, pt):
+    mp = data[1]
+    tempMp = chr(ord(mp)&0x80 + pt)
+    return data[0]+tempMp+data[2:]
+
+
+def quicklyGetPt(rtp):
+    """
+    please refer to decodeRtp
+    """
+
+    try:
+        return ord(rtp[1]) & 0x7f
+    except IndexError:
+        return -1
+
+
+def getRtpPayloadOffset(rtp):
+    """
+    [Function]
+    Get where the payload begins in the RTP packet, after the CSRC list and the header extension
+
+    [Argument]
+    rtp: data of the RTP packet
+
+    [Return]
+    offset of the payload, it is not more than the length of the data
+    """
+
+    if len(rtp)<RTP_HEADER_LEN:
+        return len(rtp)
+    #else:
+
+    tempVpec = ord(rtp[0])
+    tempOffset = RTP_HEADER_LEN + (tempVpec & 0xf)*4
+    if tempVpec & 0x10 and tempOffset+STRUCT_RTP_EXTENSION_HEADER.size<=len(rtp):
+        tempOffset += STRUCT_RTP_EXTENSION_HEADER.size + STRUCT_RTP_EXTENSION_HEADER.unpack_from(rtp, tempOffset)[1]*4
+
+    return min(tempOffset, len(rtp))
+
+
+def quicklyGetTimestamp(rtp):
+    """
+    please refer to decodeRtp
+    """
+
+    try:
+        timestamp = struct.unpack('!I', rtp[4:8])[0]
+        return int(timestamp)
+    except:
+        return -1
+
+
+def decodeRtp(rtp, telephoneEventPtInSdp=None):
+    """
+    [Function]
+    Decode RTP content, only get the fields used by Voicebird. It is used by both the snoop parser and
+    ChannelWorker, to print the fields please use printRtp()
+
+    [Argument]
+    rtp: the RTP packet data
+    telephoneEventPtInSdp: 2833's payload type in SDP
+
+    [Return]
+    payloadType, rtpTimestamp, extendedData
+    Note:
+    1. if payload is 2833, extendedData will be event
+    2. if payload is IVR private record file event, extendedData will be Record File
+    3. if payload is IVR private prompt, extendedData will be a list of tuple (promptType, prompt)
+    4. otherwise extendedData will be None
+
+    [See Also]
+    ########################################################
+    # RFC 3550
+    # http://www.rfc-editor.org/rfc/rfc3550.txt
+    ########################################################
+    """
+
+    vpec,mp,sequenceNumber,timestamp,ssrc = STRUCT_RTP_HEADER.unpack_from(rtp)
+    pt = mp & 0x7f
+
+    # skip CSRC list, 32 bits each
+    iStart = RTP_HEADER_LEN + (vpec & 0xf)*4
+
+    # skip RTP Header Extension
+    if vpec & 0x10:
+        dbp,length = STRUCT_RTP_EXTENSION_HEADER.unpack_from(rtp, iStart)
+        iStart += STRUCT_RTP_EXTENSION_HEADER.size + length*4
+
+    payload = rtp[iStart:]
+
+    if pt==telephoneEventPtInSdp:
+        return (pt, timestamp, STRUCT_2833_EVENT.unpack_from(payload)[0])
+    elif pt==PAYLOAD_TYPE_G711:
+        return (pt, timestamp, None)
+    elif pt==PAYLOAD_TYPE_IVR_RECORD_FILE:
+        return (pt, timestamp, decodeRecordFileEvent(payload))
+    elif pt==PAYLOAD_TYPE_IVR_PROMPT:
+        return (pt, timestamp, decodePromptEvent(payload))
+    elif pt==PAYLOAD_TYPE_COMFORT_NOISE:
+        return (pt, timestamp, None)
+    else:
+        LOG.i('Unknow payloadtype %d' % (pt))
+        return (pt, timestamp, None)
+
+
+def decodeRecordFileEvent(payload):
+    """
+    [Function]
+    Decode IVR's private Record File Event
+
+    [Argument]
+    payload: the payload content data
+
+    [Return]
+    Record File
+    """
+
+    tempRecordFile = str(payload[1:])
+    tempEndPos = tempRecordFile.find('\0')
+    return tempRecordFile[0:tempEndPos]
+
+
+def decodePromptEvent(payload):
+    """
+    [Function]
+    Decode IVR's private Prompt Event
+
+    [Argument]
+    payload: the payload content data
+
+    [Return]
+    a list of tuple (promptType, prompt)
+    """
+
+    tempPromptCount = ord(payload[0])
+
+    # the prompts are split by '\0', without the empty ones
+    tempPayloadList = [prompt for prompt in payload[1:].strip().split('\0') if prompt]
+    if len(tempPayloadList)<tempPromptCount:
+        LOG.a('Lack prompt(s) in the payload')
+        raise
+
+    tempList = []
+    for tempPrompt in tempPayloadList[:tempPromptCount]:
+        if tempPrompt.find('speak.vox')>-1:
+            tempList.append((PROMPT_TYPE_SPEAK, tempPrompt))
+        elif tempPrompt.find('system32.vox')>-1:
+            tempList.append((PROMPT_TYPE_SYSTEM, tempPrompt))
+        elif tempPrompt.find('rectone')>-1:
+            tempList.append((PROMPT_TYPE_RECORD_TONE, tempPrompt))
+        else:
+            LOG.e('Unknow Prompt Type: %s' % (tempPrompt))
+
+    return tempList
+
+
+def printRtp(rtp, telephoneEventPtInSdp=None, packetIndex=None):
+    """
+    [Function]
+    Print all fields of RTP content in the screen, it is only for the parameter -vf
+
+    [Argument]
+    rtp: the RTP packet data
+    telephoneEventPtInSdp: 2833's payload type in SDP
+    packetIndex: packet index, used for debug to print the packet index
+
+    [Return]
+    the same as decodeRtp()
+
+    [See Also]
+    decodeRtp
+    """
+
+    print
+    print '-'*50, ' RTP --',
+    if packetIndex:
+        print str(packetIndex), '--'
+
+    # 1. version (V): 2 bits
+    # 2. padding (P): 1 bit
+    # 3. extension (X): 1 bit
+    # 4. CSRC count (CC): 4 bits
+    # = 1 octet
+    # 5. marker (M): 1 bit
+    # 6. payload type (PT): 7 bits
+    # = 1 octet
+    # 7. sequence number: 16 bits (2 octet)
+    # 8. timestamp: 32 bits (4 octet)
+    # 9. SSRC: 32 bits (4 octet)
+    vpec,mp,sequenceNumber,timestamp,ssrc = STRUCT_RTP_HEADER.unpack_from(rtp)
+    print 'version:', vpec >> 6
+    print 'padding:', (vpec >> 5) & 0x1
+    print 'extension:', (vpec >> 4) & 0x1
+    print 'CSRC count:', vpec & 0xf
+    print 'marker:', mp >> 7
+    pt = mp & 0x7f
+    print 'payload type (PT):', pt
+    print 'sequence number:', sequenceNumber
+    print 'timestamp:', timestamp
+    print 'SSRC:', ssrc
+    iStart = RTP_HEADER_LEN
+
+    # 10. CSRC list: 0 to 15 items, 32 bits each
+    for csrcIndex in range(vpec & 0xf):
+        print 'CSRC - ', csrcIndex, ':', struct.unpack('!I', rtp[iStart:iStart+4])[0]
+        iStart += 4
+
+    # 11. RTP Header Extension
+    if (vpec >> 4) & 0x1:
+        print 'RTP Header Extension -'
+
+        # 11.1. defined by profile: 2 octet
+        print 'defined by profile:', struct.unpack('B'*2, rtp[iStart:iStart+2])
+        # 11.2. length: 2 octet
+        length = struct.unpack('!H', rtp[iStart+2:iStart+4])[0]
+        print 'length:', length
+        iStart += 4
+
+        for extensionIndex in range(length):
+            print 'extension -', extensionIndex, ':', struct.unpack('B'*4, rtp[iStart:iStart+4])
+            iStart += 4
+
+    # 12. payload
+    payload = rtp[iStart:]
+    tempDecoded = decodeRtp(rtp, telephoneEventPtInSdp)
+
+    if pt==telephoneEventPtInSdp:
+        print2833Event(payload)
+    elif pt==PAYLOAD_TYPE_G711:
+        print 'G.711 payload:'
+        print tuple2Hex(struct.unpack('B'*len(payload), payload))
+    elif pt==PAYLOAD_TYPE_IVR_RECORD_FILE:
+        print 'Record File:', tempDecoded[2]
+    elif pt==PAYLOAD_TYPE_IVR_PROMPT:
+        for promptType,prompt in tempDecoded[2]:
+            print 'Prompt:', prompt
+
+    return tempDecoded
+
+
+def print2833Event(payload):
+    """
+    [Function]
+    Print 2833 RTP event's content in the screen
+
+    [Argument]
+    payload: the payload content data
+
+    [Return]
+    (N/A)
+
+    [See Also]
+    ########################################################
+    # RFC 2833
+    # http://www.faqs.org/rfcs/rfc2833.html
+    ########################################################
+    """
+
+    print '-- RFC2833 --'
+
+    # 1. event: 1 octet
+    # 2. End of Event: 1 bit
+    # 3. Reserved: 1 bit
+    # 4. Volume: 6 bits
+    # = 1 octet
+    # 5. duration: 2 octet
+    event,erv,duration = STRUCT_2833_EVENT.unpack_from(payload)
+    print 'event:', event
+    print 'End of Event:', erv >> 7
+    print 'Reserved:', (erv >> 6) & 0x1
+    print 'Volume:', erv & 0x3f
+    print 'duration:', duration
+
+
+def caseNameToCacheName(fileName):
+    """
+    [Function]
+    Change case name to cache name, e.g. /home/anthony/simulators/sip/voicebird/case/auto.snoop => /home/anthony/simulators/sip/voicebird/cache/auto
+
+    [Argument]
+    fileName: the file name which in the dir case
+
+    [Return]
+    return cache name in the dir cache
+    """
+
+    absPathOfDirCase = os.path.abspath(DIR_CASE)
+    absPathOfDirCache = os.path.abspath(DIR_CACHE)
+
+    #print 'absPathOfDirCase:', absPathOfDirCase
+    #print 'absPathOfDirCache:', absPathOfDirCache
+    #print 'fileName:', fileName
+
+    cacheName = os.path.splitext(absPathOfDirCache + fileName.replace(absPathOfDirCase, ''))[0]
+
+    #print 'cacheName:', cacheName
+
+    return cacheName
+
+
+def cacheNameToCaseName(fileName):
+    """
+    [Function]
+    Change cache name to case name, e.g. /home/anthony/simulators/sip/voicebird/cache/auto.sfi => /home/anthony/simulators/sip/voicebird/case/auto
+
+    [Argument]
+    fileName: the file name which in the dir cache
+
+    [Return]
+    return case name in the dir cache
+    """
+
+    absPathOfDirCase = os.path.abspath(DIR_CASE)
+    absPathOfDirCache = os.path.abspath(DIR_CACHE)
+
+    caseName = os.path.splitext(absPathOfDirCase + fileName.replace(absPathOfDirCache, ''))[0]
+    return caseName
+
+
+def loadCaseInfoFromCase(snoopFileName):
+    return loadCaseInfoFromCache(caseNameToCacheName(snoopFileName))
+
+
+def loadCaseInfoFromCache(cacheName):
+    """
+    [Function]
+    Load CaseInformation from cache
+
+    [Argument]
+    cacheName: cache name, e.g. /home/anthony/simulators/sip/voicebird/cache/auto
+
+    [Return]
+    return CaseInformation if exist, otherwise return None
+    """
+
+    cifFileName = cacheName+CASE_INFORMATION_FILE_EXT
+
+    if os.path.exists(cifFileName):
+        cifFile = file(cifFileName, 'rb')
+        sfi = pickle.load(cifFile)
+        cifFile.close()
+        return sfi
+    else:
+        return None
+
+
+def loadCacheManifest(cacheDirName):
+    """
+    [Function]
+    Load the manifest of the cache dir
+
+    [Argument]
+    cacheDirName: cache dir name, e.g. /home/anthony/simulators/sip/voicebird/cache
+
+    [Return]
+    return a dict of CaseManifestEntry whose key is the cache name exclude the dir, e.g. auto.
+    Return an empty dict if there is no manifest or it is broken
+    """
+
+    manifestFileName = os.path.join(cacheDirName, CACHE_MANIFEST_FILE_NAME)
+    if not os.path.exists(manifestFileName):
+        return {}
+
+    manifestFile = file(manifestFileName, 'rb')
+    try:
+        try:
+            return pickle.load(manifestFile)
+        except Exception:
+            LOG.w("The manifest '%s' is broken, all cases in the dir will be parsed again" % (manifestFileName))
+            return {}
+    finally:
+        manifestFile.close()
+
+
+def saveCacheManifest(cacheDirName, manifest):
+    """
+    [Function]
+    Save the manifest of the cache dir
+
+    [Argument]
+    cacheDirName: cache dir name, e.g. /home/anthony/simulators/sip/voicebird/cache
+    manifest: a dict of CaseManifestEntry
+
+    [Return]
+    (N/A)
+    """
+
+    if not os.path.exists(cacheDirName):
+        os.makedirs(cacheDirName)
+
+    # Note: the manifest is written to a temporary file then renamed as a chunk is, so a crash or another
+    # process never sees a truncated manifest, which would make all cases in the dir parsed again
+    manifestFileName = os.path.join(cacheDirName, CACHE_MANIFEST_FILE_NAME)
+    tempTemporaryFileName = '%s.%d.tmp' % (manifestFileName, os.getpid())
+    manifestFile = file(tempTemporaryFileName, 'wb')
+    try:
+        try:
+            pickle.dump(manifest, manifestFile, 2)
+        finally:
+            manifestFile.close()
+    except:
+        os.remove(tempTemporaryFileName)
+        raise
+
+    try:
+        os.rename(tempTemporaryFileName, manifestFileName)
+    except OSError:
+        # in Windows the file can not be replaced, remove it then rename again
+        try:
+            os.remove(manifestFileName)
+        except OSError:
+            pass
+        os.rename(tempTemporaryFileName, manifestFileName)
+
+
+def getFileHash(fileName):
+    """
+    [Function]
+    Get the content hash of the file
+
+    [Argument]
+    fileName: the file name
+
+    [Return]
+    return the hex string of the MD5 digest
+    """
+
+    tempHash = hashlib.md5()
+    fileobj = file(fileName, 'rb')
+    try:
+        while True:
+            tempData = fileobj.read(FILE_HASH_BLOCK_SIZE)
+            if not tempData:
+                break
+            tempHash.update(tempData)
+    finally:
+        fileobj.close()
+
+    return tempHash.hexdigest()
+
+
+def getDialogNumbersFromCache(cacheName):
+    cif = loadCaseInfoFromCache(cacheName)
+
+    return cif.dialogNumbers
+
+
+class DplWriter:
+    """
+    [Class]
+    Write the dialog packets list to a binary .dpl file dialog by dialog. Each dialog is put into the chunk store
+    as a dialog chunk and each run of the sent RTP packets as a run chunk compressed by the codec of -z, the .dpl
+    file only keeps the digests of the dialog chunks. The dialogs may be written in any order, the dialog table
+    is written in the order of the dialog index at the end, then the header is patched at the beginning
+    """
+
+    def __init__(self, dplFileName):
+        self.dplFileName = dplFileName
+        self.dplFile = file(dplFileName, 'wb')
+        # Note: the header is zero until close(), so an incomplete file can not be loaded
+        self.dplFile.write('\x00'*STRUCT_DPL_HEADER.size)
+        self.dialogRows = {}    # key: dialog index, value: row of the dialog table
+        self.codec,self.level = getChunkCodec()
+
+
+    def writeDialog(self, dialogIndex, dialog):
+        """
+        [Function]
+        Write the packets of a dialog
+
+        [Argument]
+        dialogIndex: index of the dialog in the case
+        dialog: list of DialogPacket of the dialog
+
+        [Return]
+        (N/A)
+        """
+
+        tempRunDigests = []     # the index is the run index in the packet rows
+        tempRunData = []        # data of the packets in the current run
+        tempPacketRows = []
+        tempBlob = []
+        tempBlobLength = 0
+
+        for packet in dialog:
+            if packet.udpType==UDP_TYPE_RTP and packet.data:
+                tempRunIndex = len(tempRunDigests)
+                tempIndexInRun = len(tempRunData)
+                # Note: only the payload is in the run, so the same audio of different calls is shared
+                tempPayloadOffset = getRtpPayloadOffset(packet.data)
+                tempRunData.append(packet.data[tempPayloadOffset:])
+                tempStrings = (packet.timestamp, packet.ivrEventStr, packet.data[:tempPayloadOffset])
+            else:
+                # the run is ended by any other packet, e.g. a DTMF digit or a SIP message
+                if tempRunData:
+                    tempRunDigests.append(putChunk(makeRunChunk(tempRunData), self.codec, self.level))
+                    tempRunData = []
+                tempRunIndex = -1
+                tempIndexInRun = 0
+                tempStrings = (packet.timestamp, packet.ivrEventStr, packet.data)
+
+            tempPacketRows.append(STRUCT_DPL_PACKET.pack(packet.originalPacketIndex, packet.dialogIndex, \
+                    packet.udpType, packet.sipType, packet.received, packet.isTwin, packet.delttime, packet.rtpTimestamp, packet.dtmf, \
+                    packet.sourcePort, packet.destinationPort, ipAddressToBytes(packet.sourceIp), ipAddressToBytes(packet.destinationIp), \
+                    tempBlobLength, len(packet.timestamp), len(packet.ivrEventStr), len(tempStrings[-1]), tempRunIndex, tempIndexInRun))
+
+            tempBlob.extend(tempStrings)
+            for string in tempStrings:
+                tempBlobLength += len(string)
+
+        if tempRunData:
+            tempRunDigests.append(putChunk(makeRunChunk(tempRunData), self.codec, self.level))
+
+        tempChunk = STRUCT_CHUNK_HEADER.pack(CHUNK_MAGIC_DIALOG, DPL_VERSION, 0, len(tempPacketRows), len(tempRunDigests)) \
+                + ''.join(tempRunDigests) + ''.join(tempPacketRows) + ''.join(tempBlob)
+        self.dialogRows[dialogIndex] = STRUCT_DPL_DIALOG.pack(putChunk(tempChunk), len(tempPacketRows), len(tempChunk))
+
+
+    def close(self):
+        """
+        [Function]
+        Write the dialog table and the header, then close the file. It is called only after all dialogs
+        are written, otherwise abort() is called
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        (N/A)
+        """
+
+        # Note: the dialogs are given out in any order, but every index from 0 must be there
+        if sorted(self.dialogRows.keys())!=range(len(self.dialogRows)):
+            LOG.a("The dialog indexes written to '%s' are not from 0 to %d" % (self.dplFileName, len(self.dialogRows)-1))
+            raise
+        #else:
+
+        try:
+            self.dplFile.write(''.join([self.dialogRows[dialogIndex] for dialogIndex in range(len(self.dialogRows))]))
+
+            self.dplFile.seek(0)
+            self.dplFile.write(STRUCT_DPL_HEADER.pack(DPL_MAGIC, DPL_VERSION, 0, len(self.dialogRows)))
+        finally:
+            self.dplFile.close()
+
+
+    def abort(self):
+        """
+        [Function]
+        Close the file without the header and remove it, e.g. when the scan fails, so neither a file of only
+        some dialogs nor a zero header file is left in the cache. The chunks written are swept later
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        (N/A)
+        """
+
+        self.dplFile.close()
+        try:
+            os.remove(self.dplFileName)
+        except OSError:
+            LOG.w("Failed to remove the incomplete '%s'" % (self.dplFileName))
+
+
+def makeRunChunk(runData):
+    """
+    [Function]
+    Make the content of a run chunk
+
+    [Argument]
+    runData: list of the payloads of the RTP packets in the run
+
+    [Return]
+    the content of the run chunk
+    """
+
+    tempLengths = [len(data) for data in runData]
+
+    return STRUCT_CHUNK_HEADER.pack(CHUNK_MAGIC_RUN, DPL_VERSION, 0, len(runData), 0) \
+            + struct.pack('<%dI' % (len(tempLengths)), *tempLengths) + ''.join(runData)
+
+
+def getChunkFileName(digest):
+    """
+    [Function]
+    Get the file name of the chunk in the dir DIR_CHUNKS, the chunks are spread into the sub dirs by the first byte of the digest
+
+    [Argument]
+    digest: SHA-1 digest of the chunk
+
+    [Return]
+    chunk file name, e.g. /home/anthony/simulators/sip/voicebird/cache/chunks/3f/3f786850e387550fdab836ed7e6dc881de23001b.chk
+    """
+
+    tempHexDigest = digest.encode('hex')
+
+    return os.path.join(os.path.abspath(DIR_CHUNKS), tempHexDigest[:2], tempHexDigest+CHUNK_FILE_EXT)
+
+
+def getChunkCodec():
+    """
+    [Function]
+    Get the codec to compress the run chunks by the parameter -z, e.g. '-z zlib' or '-z lzma:9'
+
+    [Argument]
+    (N/A)
+
+    [Return]
+    (codec, level), (CHUNK_CODEC_NONE, 0) without -z
+    """
+
+    # PARAMETER -z: compress the run chunks by the codec with the level, e.g. '-z zlib:6'
+    if '-z' not in sys.argv:
+        return (CHUNK_CODEC_NONE, 0)
+    #else:
+
+    tempCodecIndex = sys.argv.index('-z')+1
+    if tempCodecIndex>=len(sys.argv):
+        LOG.a("-z needs a codec, it should be one of %s with an optional level, e.g. zlib:6" \
+                % ('/'.join(sorted(CHUNK_CODEC_NAMES.keys()))))
+        raise
+    #else:
+
+    tempCodecStr = sys.argv[tempCodecIndex]
+
+    tempFields = tempCodecStr.lower().split(':')
+    if tempFields[0] not in CHUNK_CODEC_NAMES or len(tempFields)>2:
+        LOG.a("Unknown codec '%s' of -z, it should be one of %s with an optional level, e.g. zlib:6" \
+                % (tempCodecStr, '/'.join(sorted(CHUNK_CODEC_NAMES.keys()))))
+        raise
+
+    codec = CHUNK_CODEC_NAMES[tempFields[0]]
+    if codec==CHUNK_CODEC_LZMA and not lzma:
+        LOG.a("The codec lzma of -z needs python 3 or backports.lzma")
+        raise
+
+    if len(tempFields)<2:
+        return (codec, CHUNK_CODEC_DEFAULT_LEVELS[codec])
+    #else:
+
+    try:
+        level = int(tempFields[1])
+    except ValueError:
+        level = -1
+    if level<0 or level>CHUNK_CODEC_MAX_LEVEL:
+        LOG.a("The level of -z '%s' should be 0 to %d" % (tempCodecStr, CHUNK_CODEC_MAX_LEVEL))
+        raise
+
+    return (codec, level)
+
+
+def compressChunkContent(content, codec, level):
+    """
+    [Function]
+    Compress the content of the chunk after the header
+
+    [Argument]
+    content: the content of the chunk
+    codec: CHUNK_CODEC_XXX
+    level: compression level, 0 to 9
+
+    [Return]
+    the chunk to be written to the file, whose header tells the codec
+    """
+
+    if codec==CHUNK_CODEC_NONE:
+        return content
+    #else:
+
+    magic,version,reserved,packetsCount,runsCount = STRUCT_CHUNK_HEADER.unpack_from(content, 0)
+    tempBody = content[STRUCT_CHUNK_HEADER.size:]
+    if codec==CHUNK_CODEC_ZLIB:
+        tempBody = zlib.compress(tempBody, level)
+    elif codec==CHUNK_CODEC_BZ2:
+        # Note: bz2 has no level 0
+        tempBody = bz2.compress(tempBody, max(1, level))
+    else:
+        tempBody = lzma.compress(tempBody, preset=level)
+
+    return STRUCT_CHUNK_HEADER.pack(magic, version, codec, packetsCount, runsCount) + tempBody
+
+
+def decompressChunkContent(chunkFileName, content):
+    """
+    [Function]
+    Decompress the content of the chunk after the header
+
+    [Argument]
+    chunkFileName: chunk file name, only for log
+    content: the chunk read from the file
+
+    [Return]
+    the content of the chunk as it is put by putChunk()
+    """
+
+    magic,version,codec,packetsCount,runsCount = STRUCT_CHUNK_HEADER.unpack_from(content, 0)
+    if codec==CHUNK_CODEC_NONE:
+        return content
+    #else:
+
+    tempBody = content[STRUCT_CHUNK_HEADER.size:]
+    if codec==CHUNK_CODEC_ZLIB:
+        tempBody = zlib.decompress(tempBody)
+    elif codec==CHUNK_CODEC_BZ2:
+        tempBody = bz2.decompress(tempBody)
+    elif codec==CHUNK_CODEC_LZMA and lzma:
+        tempBody = lzma.decompress(tempBody)
+    else:
+        LOG.a("The chunk '%s' is compressed by the codec %d which is not available" % (chunkFileName, codec))
+        raise
+
+    return STRUCT_CHUNK_HEADER.pack(magic, version, CHUNK_CODEC_NONE, packetsCount, runsCount) + tempBody
+
+
+def writeChunkFile(chunkFileName, chunk):
+    """
+    [Function]
+    Write the chunk file, the dir is made if there is not
+
+    [Argument]
+    chunkFileName: chunk file name
+    chunk: the chunk to be written, compressed or not
+
+    [Return]
+    (N/A)
+    """
+
+    tempChunkDirName = os.path.dirname(chunkFileName)
+    if not os.path.exists(tempChunkDirName):
+        try:
+            os.makedirs(tempChunkDirName)
+        except OSError:
+            # made by another process of SnoopParser at the same time
+            if not os.path.isdir(tempChunkDirName):
+                raise
+
+    # Note: the chunk is written to a temporary file then renamed, so the other processes never read a half chunk
+    tempTemporaryFileName = '%s.%d.tmp' % (chunkFileName, os.getpid())
+    chunkFile = file(tempTemporaryFileName, 'wb')
+    try:
+        chunkFile.write(chunk)
+    finally:
+        chunkFile.close()
+
+    try:
+        os.rename(tempTemporaryFileName, chunkFileName)
+    except OSError:
+        # in Windows the file can not be replaced, remove it then rename again
+        try:
+            os.remove(chunkFileName)
+        except OSError:
+            pass
+        os.rename(tempTemporaryFileName, chunkFileName)
+
+
+def putChunk(content, codec=CHUNK_CODEC_NONE, level=0):
+    """
+    [Function]
+    Put a chunk into the chunk store, it is written only if there is not the same chunk
+    with the same codec, so the cache is compressed again by '-fp -z ...'. The chunk is trusted
+    by its digest, the header of a chunk file is only read at the first time in this process
+
+    [Argument]
+    content: the content of the chunk
+    codec: CHUNK_CODEC_XXX to compress the content after the header
+    level: compression level, 0 to 9
+
+    [Return]
+    SHA-1 digest of the content
+    """
+
+    tempDigest = hashlib.sha1(content).digest()
+    if knownChunkCodecs.get(tempDigest)==codec:
+        return tempDigest
+    #else:
+
+    tempChunkFileName = getChunkFileName(tempDigest)
+    if tempDigest not in knownChunkCodecs and os.path.exists(tempChunkFileName):
+        chunkFile = file(tempChunkFileName, 'rb')
+        try:
+            tempHeader = chunkFile.read(STRUCT_CHUNK_HEADER.size)
+        finally:
+            chunkFile.close()
+
+        if len(tempHeader)==STRUCT_CHUNK_HEADER.size and STRUCT_CHUNK_HEADER.unpack_from(tempHeader, 0)[2]==codec:
+            # Note: it is touched, so it is not removed by sweepChunks() of another process which starts before it
+            try:
+                os.utime(tempChunkFileName, None)
+            except OSError:
+                pass
+            knownChunkCodecs[tempDigest] = codec
+            return tempDigest
+    #else:
+
+    writeChunkFile(tempChunkFileName, compressChunkContent(content, codec, level))
+    knownChunkCodecs[tempDigest] = codec
+
+    return tempDigest
+
+
+def ipAddressToBytes(ipAddress):
+    """
+    [Function]
+    Change the dotted IP address to 4 bytes, the empty address is changed to 0.0.0.0
+
+    [Argument]
+    ipAddress: e.g. '10.0.0.1'
+
+    [Return]
+    4 bytes string
+    """
+
+    if ipAddress:
+        return socket.inet_aton(ipAddress)
+    else:
+        return '\x00'*4
+
+
+def readDplDialogTable(dplFileName):
+    """
+    [Function]
+    Read the dialog table of the binary .dpl file
+
+    [Argument]
+    dplFileName: .dpl file name
+
+    [Return]
+    list of (digest of the dialog chunk, packets count, length of the dialog chunk) for each dialog
+    """
+
+    dplFile = file(dplFileName, 'rb')
+    try:
+        dplContent = dplFile.read()
+    finally:
+        dplFile.close()
+
+    if len(dplContent)<STRUCT_DPL_HEADER.size:
+        LOG.a("'%s' is NOT a dialog packets list file" % (dplFileName))
+        raise
+
+    magic,version,reserved,dialogsCount = STRUCT_DPL_HEADER.unpack_from(dplContent, 0)
+    if magic!=DPL_MAGIC or version!=DPL_VERSION:
+        LOG.a("'%s' is NOT a dialog packets list file of version %d" % (dplFileName, DPL_VERSION))
+        raise
+
+    dialogTable = []
+    offset = STRUCT_DPL_HEADER.size
+    for i in xrange(dialogsCount):
+        dialogTable.append(STRUCT_DPL_DIALOG.unpack_from(dplContent, offset))
+        offset += STRUCT_DPL_DIALOG.size
+
+    return dialogTable
+
+
+def readChunk(digest, magic):
+    """
+    [Function]
+    Read a chunk from the chunk store
+
+    [Argument]
+    digest: SHA-1 digest of the chunk
+    magic: CHUNK_MAGIC_DIALOG or CHUNK_MAGIC_RUN
+
+    [Return]
+    (content, packetsCount, runsCount), the content is decompressed
+    """
+
+    return readChunkFile(getChunkFileName(digest), magic)
+
+
+def readChunkFile(chunkFileName, magic):
+    """
+    [Function]
+    Read a chunk file
+
+    [Argument]
+    chunkFileName: chunk file name
+    magic: CHUNK_MAGIC_DIALOG or CHUNK_MAGIC_RUN
+
+    [Return]
+    (content, packetsCount, runsCount), the content is decompressed
+    """
+
+    if not os.path.exists(chunkFileName):
+        LOG.a("The chunk '%s' has been removed by somebody, please compile the cases again" % (chunkFileName))
+        raise
+
+    chunkFile = file(chunkFileName, 'rb')
+    try:
+        content = chunkFile.read()
+    finally:
+        chunkFile.close()
+
+    if len(content)<STRUCT_CHUNK_HEADER.size:
+        LOG.a("'%s' is NOT a chunk" % (chunkFileName))
+        raise
+
+    chunkMagic,version,codec,packetsCount,runsCount = STRUCT_CHUNK_HEADER.unpack_from(content, 0)
+    if chunkMagic!=magic or version!=DPL_VERSION:
+        LOG.a("'%s' is NOT a chunk of version %d" % (chunkFileName, DPL_VERSION))
+        raise
+
+    return (decompressChunkContent(chunkFileName, content), packetsCount, runsCount)
+
+
+def readRunChunk(digest):
+    """
+    [Function]
+    Read a run chunk from the chunk store
+
+    [Argument]
+    digest: SHA-1 digest of the run chunk
+
+    [Return]
+    tuple of the data of the RTP packets in the run
+    """
+
+    content,packetsCount,runsCount = readChunk(digest, CHUNK_MAGIC_RUN)
+
+    return decodeRunChunk(content, packetsCount)
+
+
+def decodeRunChunk(content, packetsCount):
+    """
+    [Function]
+    Split the content of a run chunk to the data of the packets
+
+    [Argument]
+    content, packetsCount: given by readChunk()
+
+    [Return]
+    tuple of the data of the RTP packets in the run
+    """
+
+    tempLengths = struct.unpack_from('<%dI' % (packetsCount), content, STRUCT_CHUNK_HEADER.size)
+
+    runData = []
+    tempEnd = STRUCT_CHUNK_HEADER.size + packetsCount*4
+    for length in tempLengths:
+        tempStart = tempEnd
+        tempEnd = tempStart + length
+        runData.append(content[tempStart:tempEnd])
+
+    return tuple(runData)
+
+
+def readDialogChunk(digest):
+    """
+    [Function]
+    Read a dialog chunk from the chunk store, its packets are decoded by decodeDialogChunk()
+
+    [Argument]
+    digest: SHA-1 digest of the dialog chunk
+
+    [Return]
+    (content, packetsCount, digests of the run chunks used by the dialog)
+    """
+
+    content,packetsCount,runsCount = readChunk(digest, CHUNK_MAGIC_DIALOG)
+
+    runDigests = []
+    offset = STRUCT_CHUNK_HEADER.size
+    for i in xrange(runsCount):
+        runDigests.append(content[offset:offset+CHUNK_DIGEST_SIZE])
+        offset += CHUNK_DIGEST_SIZE
+
+    return (content, packetsCount, runDigests)
+
+
+def decodeDialogChunk(content, packetsCount, runDigests, runs):
+    """
+    [Function]
+    Decode the packets of a dialog chunk
+
+    [Argument]
+    content, packetsCount, runDigests: given by readDialogChunk()
+    runs: dict, key: digest of the run chunk, value: tuple of the data in the run.
+          The run chunks not in it are read from the chunk store and added into it
+
+    [Return]
+    list of CachedDialogPacket
+    """
+
+    tempRuns = []
+    for runDigest in runDigests:
+        if runDigest not in runs:
+            runs[runDigest] = readRunChunk(runDigest)
+        tempRuns.append(runs[runDigest])
+
+    tempRowsOffset = STRUCT_CHUNK_HEADER.size + len(runDigests)*CHUNK_DIGEST_SIZE
+    tempBlobOffset = tempRowsOffset + packetsCount*STRUCT_DPL_PACKET.size
+
+    return decodeDplPackets(content, tempRowsOffset, packetsCount, content, tempBlobOffset, tempRuns)
+
+
+def decodeDplPackets(rows, rowsOffset, packetsCount, blob, blobBase, runs):
+    """
+    [Function]
+    Decode the rows of the packet table in the dialog chunk to CachedDialogPacket
+
+    [Argument]
+    rows: the content including the packet table rows
+    rowsOffset: offset of the first row in rows
+    packetsCount: how many rows to decode
+    blob: the content including the strings of the packets
+    blobBase: offset in blob where the blob offset of the rows is counted from
+    runs: list of tuple of the data in each run used by the rows
+
+    [Return]
+    list of CachedDialogPacket
+    """
+
+    # the same IP addresses and IVR event strings are shared by the packets
+    ipAddresses = {}
+    strings = {}
+
+    packets = []
+    unpackPacket = STRUCT_DPL_PACKET.unpack_from
+    rowSize = STRUCT_DPL_PACKET.size
+    offset = rowsOffset
+    for i in xrange(packetsCount):
+        originalPacketIndex,dialogIndex,udpType,sipType,received,isTwin,delttime,rtpTimestamp,dtmf, \
+                sourcePort,destinationPort,sourceIp,destinationIp,stringsOffset,timestampLen,ivrEventStrLen,dataLen, \
+                runIndex,indexInRun = unpackPacket(rows, offset)
+        offset += rowSize
+
+        packet = CachedDialogPacket()
+        packet.originalPacketIndex = originalPacketIndex
+        packet.dialogIndex = dialogIndex
+        packet.received = bool(received)
+        packet.delttime = delttime
+        packet.sourcePort = sourcePort
+        packet.destinationPort = destinationPort
+        packet.udpType = udpType
+        packet.sipType = sipType
+        packet.rtpTimestamp = rtpTimestamp
+        packet.dtmf = dtmf
+        packet.isTwin = bool(isTwin)
+
+        if sourceIp not in ipAddresses:
+            ipAddresses[sourceIp] = socket.inet_ntoa(sourceIp)
+        packet.sourceIp = ipAddresses[sourceIp]
+        if destinationIp not in ipAddresses:
+            ipAddresses[destinationIp] = socket.inet_ntoa(destinationIp)
+        packet.destinationIp = ipAddresses[destinationIp]
+
+        tempStart = blobBase + stringsOffset
+        tempEnd = tempStart + timestampLen
+        packet.timestamp = blob[tempStart:tempEnd]
+
+        tempStart = tempEnd
+        tempEnd = tempStart + ivrEventStrLen
+        tempStr = blob[tempStart:tempEnd]
+        packet.ivrEventStr = strings.setdefault(tempStr, tempStr)
+
+        tempStart = tempEnd
+        tempEnd = tempStart + dataLen
+        if runIndex<0:
+            packet.data = blob[tempStart:tempEnd]
+        else:
+            # the RTP header of this call is in the blob, the payload is shared by all dialogs using the run
+            packet.data = blob[tempStart:tempEnd] + runs[runIndex][indexInRun]
+
+        if udpType==UDP_TYPE_SIP and packet.data:
+            packet.sipTemplate = SipTemplate(packet.data)
+        else:
+            packet.sipTemplate = None
+
+        packets.append(packet)
+
+    return packets
+
+
+def loadDialogPacketsListFromCache(cacheName):
+    """
+    [Function]
+    Load the whole DialogPacketsList from cache, all dialog chunks of the binary .dpl file are read at one time
+
+    [Argument]
+    cacheName: cache name, e.g. /home/anthony/simulators/sip/voicebird/cache/auto
+
+    [Return]
+    return DialogPacketsList, a list of CachedDialogPacket list for each dialog
+
+    [See Also]
+    LazyDialogPacketsList, which loads a dialog only when it is used
+    """
+
+    dplFileName = cacheName+DIALOG_PACKETS_LIST_FILE_EXT
+
+    runs = {}
+    dpl = []
+    for digest,packetsCount,chunkLength in readDplDialogTable(dplFileName):
+        content,packetsCount,runDigests = readDialogChunk(digest)
+        dpl.append(decodeDialogChunk(content, packetsCount, runDigests, runs))
+
+    LOG.i("'%s' has %d dialogs" % (dplFileName, len(dpl)))
+
+    return dpl
+
+
+def getChunksUsedByDpl(dplFileName):
+    """
+    [Function]
+    Get the chunks used by the binary .dpl file
+
+    [Argument]
+    dplFileName: .dpl file name
+
+    [Return]
+    (dialogChunks, runChunks), dicts of the chunks, key: digest, value: [file size of the chunk, how many times it is used]
+    """
+
+    dialogChunks = {}
+    runChunks = {}
+    for digest,packetsCount,chunkLength in readDplDialogTable(dplFileName):
+        dialogChunks.setdefault(digest, [chunkLength, 0])[1] += 1
+
+        content,packetsCount,runDigests = readDialogChunk(digest)
+        for runDigest in runDigests:
+            if runDigest not in runChunks:
+                runChunks[runDigest] = [os.path.getsize(getChunkFileName(runDigest)), 0]
+            runChunks[runDigest][1] += 1
+
+    return (dialogChunks, runChunks)
+
+
+def sweepChunks(startTime):
+    """
+    [Function]
+    Remove the chunks which are not used by any .dpl file in the dir DIR_CACHE, they are left by compiling
+    the cases again. Nothing is removed if a .dpl file is being written or can not be read, and the chunks
+    written or used after startTime are kept, since another process may be compiling the cases at the same time
+
+    [Argument]
+    startTime: time when the compiling starts
+
+    [Return]
+    count of the removed chunks, -1 means the sweeping is given up
+    """
+
+    tempChunksDirName = os.path.abspath(DIR_CHUNKS)
+
+    # 1. find out the dialog chunks used by the .dpl files
+    tempDialogDigests = set()
+    for dirName,subDirNames,fileNames in os.walk(os.path.abspath(DIR_CACHE)):
+        if os.path.abspath(dirName)==tempChunksDirName:
+            del subDirNames[:]
+            continue
+
+        for fileName in fileNames:
+            if os.path.splitext(fileName)[1]!=DIALOG_PACKETS_LIST_FILE_EXT:
+                continue
+
+            tempDplFileName = os.path.join(dirName, fileName)
+            try:
+                dplFile = file(tempDplFileName, 'rb')
+                try:
+                    tempHeader = dplFile.read(STRUCT_DPL_HEADER.size)
+                finally:
+                    dplFile.close()
+            except IOError:
+                LOG.w("Failed to read '%s', the chunks are not swept" % (tempDplFileName))
+                return -1
+
+            if len(tempHeader)<STRUCT_DPL_HEADER.size or tempHeader=='\x00'*STRUCT_DPL_HEADER.size:
+                LOG.i("'%s' is being written, the chunks are not swept" % (tempDplFileName))
+                return -1
+            #else:
+
+            magic,version,reserved,dialogsCount = STRUCT_DPL_HEADER.unpack_from(tempHeader, 0)
+            if magic!=DPL_MAGIC or version!=DPL_VERSION:
+                # the chunks of an old version can not be used, the case will be parsed again
+                continue
+
+            for digest,packetsCount,chunkLength in readDplDialogTable(tempDplFileName):
+                tempDialogDigests.add(digest)
+
+    # 2. and the run chunks used by the dialog chunks
+    tempUsedFileNames = set()
+    for digest in tempDialogDigests:
+        tempChunkFileName = getChunkFileName(digest)
+        if not os.path.exists(tempChunkFileName):
+            continue
+
+        tempUsedFileNames.add(tempChunkFileName)
+        content,packetsCount,runDigests = readDialogChunk(digest)
+        for runDigest in runDigests:
+            tempUsedFileNames.add(getChunkFileName(runDigest))
+
+    # 3. remove the others, and the temporary files left by the killed processes
+    tempRemovedCount = 0
+    for dirName,subDirNames,fileNames in os.walk(tempChunksDirName):
+        if os.path.abspath(dirName)==tempChunksDirName:
+            # only the sub dirs made by getChunkFileName(), e.g. not the one of -bzc
+            subDirNames[:] = [subDirName for subDirName in subDirNames if len(subDirName)==2]
+            continue
+
+        for fileName in fileNames:
+            if not fileName.endswith(CHUNK_FILE_EXT) and not fileName.endswith('.tmp'):
+                continue
+
+            tempChunkFileName = os.path.join(dirName, fileName)
+            if tempChunkFileName in tempUsedFileNames:
+                continue
+
+            try:
+                # Note: the mtime may be in seconds in some file systems
+                if os.path.getmtime(tempChunkFileName)>=startTime-2:
+                    continue
+                os.remove(tempChunkFileName)
+                tempRemovedCount += 1
+            except OSError:
+                # removed by another process
+                pass
+
+    if tempRemovedCount>0:
+        LOG.i('%d chunks which are not used by any case are removed' % (tempRemovedCount))
+        # the removed ones have to be written again if they are put later
+        knownChunkCodecs.clear()
+
+    return tempRemovedCount
+
+
+class ChunkStore:
+    """
+    [Class]
+    The loaded chunks of the chunk store, shared by all LazyDialogPacketsList. A dialog chunk is loaded once
+    however many cases use it, so are the run chunks used by the dialogs, and they are dropped when nobody uses them
+    """
+
+    lock = threading.Lock()
+    loadedDialogs = {}      # key: digest of the dialog chunk, value: [packets list, link count, digests of the run chunks]
+    loadedRuns = {}         # key: digest of the run chunk, value: [tuple of the data, link count]
+
+    def __loadDialog(self, digest):
+        """
+        [Function]
+        Read the dialog chunk, the run chunks which have been loaded are not read again
+
+        [Argument]
+        digest: digest of the dialog chunk
+
+        [Return]
+        (packets list, digests of the run chunks, dict of the run chunks)
+        """
+
+        content,packetsCount,runDigests = readDialogChunk(digest)
+
+        tempRuns = {}
+        self.lock.acquire()
+        try:
+            for runDigest in runDigests:
+                if runDigest in self.loadedRuns:
+                    tempRuns[runDigest] = self.loadedRuns[runDigest][0]
+        finally:
+            self.lock.release()
+
+        return (decodeDialogChunk(content, packetsCount, runDigests, tempRuns), runDigests, tempRuns)
+
+
+    def __keepDialog(self, digest, packets, runDigests, runs):
+        """
+        [Function]
+        Keep the loaded dialog with the link count 0 and link its run chunks, the lock must be held.
+        If the dialog has been kept by another thread at the same time, the kept one is used
+
+        [Argument]
+        digest: digest of the dialog chunk
+        packets, runDigests, runs: given by __loadDialog()
+
+        [Return]
+        [packets list, link count, digests of the run chunks] of the dialog
+        """
+
+        if digest in self.loadedDialogs:
+            return self.loadedDialogs[digest]
+        #else:
+
+        for runDigest in runDigests:
+            self.loadedRuns.setdefault(runDigest, [runs[runDigest], 0])[1] += 1
+
+        tempLoadedDialog = [packets, 0, runDigests]
+        self.loadedDialogs[digest] = tempLoadedDialog
+
+        return tempLoadedDialog
+
+
+    def __dropDialog(self, digest):
+        """
+        [Function]
+        Drop the loaded dialog and unlink its run chunks, the lock must be held
+
+        [Argument]
+        digest: digest of the dialog chunk
+
+        [Return]
+        (N/A)
+        """
+
+        tempLoadedDialog = self.loadedDialogs.pop(digest)
+        for runDigest in tempLoadedDialog[2]:
+            tempLoadedRun = self.loadedRuns[runDigest]
+            tempLoadedRun[1] -= 1
+            if tempLoadedRun[1]<=0:
+                del self.loadedRuns[runDigest]
+
+
+    def getDialog(self, digest):
+        """
+        [Function]
+        Get the packets list of the dialog chunk and keep it until releaseDialog()
+
+        [Argument]
+        digest: digest of the dialog chunk
+
+        [Return]
+        list of CachedDialogPacket
+        """
+
+        self.lock.acquire()
+        try:
+            if digest in self.loadedDialogs:
+                tempLoadedDialog = self.loadedDialogs[digest]
+                tempLoadedDialog[1] += 1
+                return tempLoadedDialog[0]
+        finally:
+            self.lock.release()
+
+        # Note: load it without the lock, the other channels needn't wait for the reading
+        tempPackets,tempRunDigests,tempRuns = self.__loadDialog(digest)
+
+        self.lock.acquire()
+        try:
+            tempLoadedDialog = self.__keepDialog(digest, tempPackets, tempRunDigests, tempRuns)
+            tempLoadedDialog[1] += 1
+            return tempLoadedDialog[0]
+        finally:
+            self.lock.release()
+
+
+    def releaseDialog(self, digest):
+        """
+        [Function]
+        Tell that a user of the dialog chunk does not need it any more, the dialog is dropped if nobody uses it
+
+        [Argument]
+        digest: digest of the dialog chunk
+
+        [Return]
+        (N/A)
+        """
+
+        self.lock.acquire()
+        try:
+            tempLoadedDialog = self.loadedDialogs.get(digest)
+            if not tempLoadedDialog:
+                return
+
+            tempLoadedDialog[1] -= 1
+            if tempLoadedDialog[1]<=0:
+                self.__dropDialog(digest)
+        finally:
+            self.lock.release()
+
+
+    def prefetchDialog(self, digest):
+        """
+        [Function]
+        Load the dialog chunk before it is used, it is kept without user until getDialog().
+        Only one dialog is prefetched at the same time, the former one without user is dropped
+
+        [Argument]
+        digest: digest of the dialog chunk
+
+        [Return]
+        (N/A)
+        """
+
+        self.lock.acquire()
+        try:
+            if digest in self.loadedDialogs:
+                return
+        finally:
+            self.lock.release()
+
+        tempPackets,tempRunDigests,tempRuns = self.__loadDialog(digest)
+
+        self.lock.acquire()
+        try:
+            for loadedDigest in self.loadedDialogs.keys():
+                if self.loadedDialogs[loadedDigest][1]<=0:
+                    self.__dropDialog(loadedDigest)
+            self.__keepDialog(digest, tempPackets, tempRunDigests, tempRuns)
+        finally:
+            self.lock.release()
+
+
+class LazyDialogPacketsList:
+    """
+    [Class]
+    A DialogPacketsList whose dialogs are loaded from the chunk store only when they are used.
+    Only the dialog table of the binary .dpl file is read when it is created, a dialog is read by getDialog()
+    and dropped when all of its users call releaseDialog(), so the memory scales with the dialogs in use.
+    The loaded dialogs are kept by ChunkStore, so a dialog used by several cases is loaded once
+    """
+
+    def __init__(self, cacheName):
+        self.dplFileName = cacheName+DIALOG_PACKETS_LIST_FILE_EXT
+        self.chunkStore = ChunkStore()
+
+        # (digest of the dialog chunk, packets count, length of the dialog chunk) of each dialog
+        self.dialogTable = readDplDialogTable(self.dplFileName)
+
+        LOG.i("'%s' has %d dialogs" % (self.dplFileName, len(self.dialogTable)))
+
+
+    def __len__(self):
+        return len(self.dialogTable)
+
+
+    def __getitem__(self, dialogIndex):
+        """
+        [Function]
+        Get the packets list of the dialog, it is loaded but not kept if nobody is using it
+
+        [Argument]
+        dialogIndex: index of the dialog
+
+        [Return]
+        list of CachedDialogPacket
+        """
+
+        tempDigest = self.dialogTable[dialogIndex][0]
+        tempPackets = self.chunkStore.getDialog(tempDigest)
+        self.chunkStore.releaseDialog(tempDigest)
+
+        return tempPackets
+
+
+    def getDialog(self, dialogIndex):
+        """
+        [Function]
+        Get the packets list of the dialog and keep it until releaseDialog()
+
+        [Argument]
+        dialogIndex: index of the dialog
+
+        [Return]
+        list of CachedDialogPacket
+        """
+
+        return self.chunkStore.getDialog(self.dialogTable[dialogIndex][0])
+
+
+    def releaseDialog(self, dialogIndex):
+        """
+        [Function]
+        Tell that a user of the dialog does not need it any more, the dialog is dropped if nobody uses it
+
+        [Argument]
+        dialogIndex: index of the dialog
+
+        [Return]
+        (N/A)
+        """
+
+        self.chunkStore.releaseDialog(self.dialogTable[dialogIndex][0])
+
+
+    def prefetchDialog(self, dialogIndex):
+        """
+        [Function]
+        Load the dialog before it is used, it is kept without user until getDialog()
+
+        [Argument]
+        dialogIndex: index of the dialog
+
+        [Return]
+        (N/A)
+        """
+
+        if dialogIndex<0 or dialogIndex>=len(self.dialogTable):
+            return
+
+        self.chunkStore.prefetchDialog(self.dialogTable[dialogIndex][0])
+
+
+def getResidentMemorySize():
+    """
+    [Function]
+    Get the resident memory size of this process
+
+    [Argument]
+    (N/A)
+
+    [Return]
+    resident memory size in bytes, or -1 if it is unknown (e.g. there is no /proc)
+    """
+
+    try:
+        statmFile = file('/proc/self/statm', 'r')
+        try:
+            return int(statmFile.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        finally:
+            statmFile.close()
+    except Exception:
+        return -1
+
+
+def measureLoading(loadingFunction, fileName):
+    """
+    [Function]
+    Measure the time and the growth of resident memory to load a file, in a child process if it can fork,
+    so the memory already held by this process does not hide the growth
+
+    [Argument]
+    loadingFunction: the function to load the file
+    fileName: the argument of loadingFunction
+
+    [Return]
+    (seconds, bytes), bytes is -1 if it is unknown
+    """
+
+    if not hasattr(os, 'fork'):
+        tempRss = getResidentMemorySize()
+        tempTime = time.time()
+        tempObj = loadingFunction(fileName)
+        tempTime = time.time() - tempTime
+        if tempRss<0:
+            return (tempTime, -1)
+        return (tempTime, getResidentMemorySize() - tempRss)
+
+    readFd,writeFd = os.pipe()
+    pid = os.fork()
+    if pid==0:
+        try:
+            os.close(readFd)
+            setGlobalLogObj(LogBuffer())
+            tempRss = getResidentMemorySize()
+            tempTime = time.time()
+            tempObj = loadingFunction(fileName)
+            tempTime = time.time() - tempTime
+            if tempRss<0:
+                tempGrowth = -1
+            else:
+                tempGrowth = getResidentMemorySize() - tempRss
+            os.write(writeFd, '%f %d' % (tempTime, tempGrowth))
+        finally:
+            os._exit(0)
+
+    os.close(writeFd)
+    tempResult = os.read(readFd, 1024)
+    os.close(readFd)
+    os.waitpid(pid, 0)
+
+    tempTime,tempGrowth = tempResult.split()
+    return (float(tempTime), int(tempGrowth))
+
+
+def loadPickledDialogPacketsList(fileName):
+    """
+    [Function]
+    Load the dialog packets list saved in the former .dpl format, i.e. a sequence of pickles (protocol 2)
+    of DialogPacket list, one for each dialog. It is only for the benchmark
+
+    [Argument]
+    fileName: the pickle file name
+
+    [Return]
+    return DialogPacketsList
+    """
+
+    dpl = []
+    pickleFile = file(fileName, 'rb')
+    try:
+        while True:
+            try:
+                dpl.append(pickle.load(pickleFile))
+            except EOFError:
+                break
+    finally:
+        pickleFile.close()
+
+    return dpl
+
+
+def benchmarkDplFormats(caseList):
+    """
+    [Function]
+    Compare the time and the resident memory to load each case by the binary .dpl file and
+    by the former pickle (protocol 2) file, the result is printed in the screen
+
+    [Argument]
+    caseList: list of CaseData
+
+    [Return]
+    (N/A)
+    """
+
+    print '%-32s %8s %11s %11s %11s %11s %11s %11s' % ('case', 'packets', 'binary(ms)', 'pickle(ms)', \
+            'binary(KB)', 'pickle(KB)', 'binary file', 'pickle file')
+
+    for caseData in caseList:
+        tempDplFileName = caseData.cacheName+DIALOG_PACKETS_LIST_FILE_EXT
+        tempPickleFileName = caseData.cacheName+'.benchmark'
+
+        # write the same packets by pickle
+        tempDpl = loadDialogPacketsListFromCache(caseData.cacheName)
+        tempPacketsCount = 0
+        pickleFile = file(tempPickleFileName, 'wb')
+        try:
+            for dialog in tempDpl:
+                tempDialog = []
+                for packet in dialog:
+                    tempPacket = DialogPacket()
+                    for name in CachedDialogPacket.__slots__:
+                        setattr(tempPacket, name, getattr(packet, name))
+                    tempDialog.append(tempPacket)
+                pickle.dump(tempDialog, pickleFile, 2)
+                tempPacketsCount += len(tempDialog)
+        finally:
+            pickleFile.close()
+        del tempDpl
+
+        try:
+            tempBinaryTime,tempBinaryMemory = measureLoading(loadDialogPacketsListFromCache, caseData.cacheName)
+            tempPickleTime,tempPickleMemory = measureLoading(loadPickledDialogPacketsList, tempPickleFileName)
+            tempPickleFileSize = os.path.getsize(tempPickleFileName)
+        finally:
+            os.remove(tempPickleFileName)
+
+        # the binary file size is the .dpl file with all the chunks it uses
+        tempBinaryFileSize = os.path.getsize(tempDplFileName)
+        for chunks in getChunksUsedByDpl(tempDplFileName):
+            for chunkSize,usedCount in chunks.itervalues():
+                tempBinaryFileSize += chunkSize
+
+        # Note: the memory is the growth of resident memory in KB, and the file size is in KB too
+        print '%-32s %8d %11.1f %11.1f %11d %11d %11d %11d' % (os.path.basename(caseData.snoopFileName)[-32:], tempPacketsCount, \
+                tempBinaryTime*1000, tempPickleTime*1000, tempBinaryMemory/1024, tempPickleMemory/1024, \
+                tempBinaryFileSize/1024, tempPickleFileSize/1024)
+
+
+def dropPageCache(fileNames):
+    """
+    [Function]
+    Write the files to the disk and drop their pages from the page cache by posix_fadvise(POSIX_FADV_DONTNEED),
+    so the files are read from the disk again. Only the pages of these files are dropped, the other files
+    cached by the system are not touched
+
+    [Argument]
+    fileNames: list of the files written just now
+
+    [Return]
+    True if the pages are dropped, False if they can not, e.g. there is no posix_fadvise
+    """
+
+    if hasattr(os, 'posix_fadvise'):
+        fadvise = os.posix_fadvise
+    else:
+        try:
+            import ctypes
+            import ctypes.util
+
+            tempLibc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6')
+            tempLibcFadvise = tempLibc.posix_fadvise
+        except Exception:
+            return False
+
+        # Note: it returns the error number instead of setting errno
+        def fadvise(fd, offset, length, advice):
+            tempError = tempLibcFadvise(fd, ctypes.c_long(offset), ctypes.c_long(length), advice)
+            if tempError!=0:
+                raise OSError(tempError, os.strerror(tempError))
+
+    try:
+        for fileName in fileNames:
+            fd = os.open(fileName, os.O_RDONLY)
+            try:
+                # the dirty pages are not dropped, so they are written at first
+                os.fsync(fd)
+                # Note: the length 0 means to the end of the file
+                fadvise(fd, 0, 0, POSIX_FADV_DONTNEED)
+            finally:
+                os.close(fd)
+    except (IOError, OSError):
+        return False
+
+    return True
+
+
+def measureRunChunksLoading(chunkFileNames):
+    """
+    [Function]
+    Measure the time to read and split the run chunk files
+
+    [Argument]
+    chunkFileNames: list of the run chunk files
+
+    [Return]
+    seconds
+    """
+
+    tempStartTime = time.time()
+    for chunkFileName in chunkFileNames:
+        content,packetsCount,runsCount = readChunkFile(chunkFileName, CHUNK_MAGIC_RUN)
+        decodeRunChunk(content, packetsCount)
+
+    return time.time() - tempStartTime
+
+
+def benchmarkChunkCodecs(caseList):
+    """
+    [Function]
+    Write the run chunks used by the cases by each codec of -z, then print the size on the disk, the time to write,
+    the time to load when they are not in the page cache (cold) and the time to load again (warm), so the codec
+    for a host is chosen by the cost of its disk and its CPU
+
+    [Argument]
+    caseList: list of CaseData
+
+    [Return]
+    (N/A)
+    """
+
+    # the content of the run chunks without compressing, key: digest
+    tempRunChunks = {}
+    for caseData in caseList:
+        tempDialogChunks,tempCaseRunChunks = getChunksUsedByDpl(caseData.cacheName+DIALOG_PACKETS_LIST_FILE_EXT)
+        for digest in tempCaseRunChunks:
+            if digest not in tempRunChunks:
+                tempRunChunks[digest] = readChunk(digest, CHUNK_MAGIC_RUN)[0]
+
+    tempRawSize = 0
+    for content in tempRunChunks.itervalues():
+        tempRawSize += len(content)
+    if tempRawSize==0:
+        print 'No run chunk is used by the cases'
+        return
+    #else:
+
+    tempCodecNames = {}
+    for name,codec in CHUNK_CODEC_NAMES.iteritems():
+        tempCodecNames[codec] = name
+
+    print '%d run chunks, %d KB without compressing' % (len(tempRunChunks), tempRawSize/1024)
+    print '%-6s %5s %11s %7s %11s %11s %11s' % ('codec', 'level', 'size(KB)', 'ratio', 'write(ms)', 'cold(ms)', 'warm(ms)')
+
+    tempBenchmarkDirName = os.path.join(os.path.abspath(DIR_CHUNKS), 'benchmark')
+    tempIsColdMeasured = True
+    try:
+        for codec,level in CHUNK_CODEC_BENCHMARKS:
+            if codec==CHUNK_CODEC_LZMA and not lzma:
+                print '%-6s %5d %11s' % (tempCodecNames[codec], level, '(needs python 3 or backports.lzma)')
+                continue
+
+            tempChunkFileNames = []
+            tempSize = 0
+            tempStartTime = time.time()
+            for digest,content in tempRunChunks.iteritems():
+                tempChunk = compressChunkContent(content, codec, level)
+                tempChunkFileName = os.path.join(tempBenchmarkDirName, digest.encode('hex')+CHUNK_FILE_EXT)
+                writeChunkFile(tempChunkFileName, tempChunk)
+                tempChunkFileNames.append(tempChunkFileName)
+                tempSize += len(tempChunk)
+            tempWriteTime = time.time() - tempStartTime
+
+            if dropPageCache(tempChunkFileNames):
+                tempColdStr = '%11.1f' % (measureRunChunksLoading(tempChunkFileNames)*1000)
+            else:
+                tempColdStr = '%11s' % ('-')
+                tempIsColdMeasured = False
+            tempWarmTime = measureRunChunksLoading(tempChunkFileNames)
+
+            print '%-6s %5d %11d %7.2f %11.1f %s %11.1f' % (tempCodecNames[codec], level, tempSize/1024, float(tempRawSize)/tempSize, \
+                    tempWriteTime*1000, tempColdStr, tempWarmTime*1000)
+
+            for chunkFileName in tempChunkFileNames:
+                os.remove(chunkFileName)
+    finally:
+        if os.path.exists(tempBenchmarkDirName):
+            shutil.rmtree(tempBenchmarkDirName)
+
+    if not tempIsColdMeasured:
+        print 'Note: the files can not be dropped from the page cache (posix_fadvise is needed), so cold is not measured'
+
+
+def classifyReceivedSipByRegex(data):
+    """
+    [Function]
+    Classify a received SIP message as ChannelWorker did before ReceivedSipMessage: get the From tag and the Call-ID,
+    then try BYE, 100, 180, 183, 200 and the other responses one by one, each by a regex search over the whole message.
+    It is only for the benchmark
+
+    [Argument]
+    data: SIP message data
+
+    [Return]
+    (key, fromTag, callId), key is the same as ChannelWorker.sipHandlers, None for the other requests
+    Note: the To tag and the other headers are got only for the message types which used them
+    """
+
+    tempFromTag = getFromTag(data)
+    tempCallId = getCallId(data)
+    if RE_SIP_BYE.search(data):
+        getToTag(data)
+        getViasList(data)
+        getCallIdStr(data)
+        getCSeqStr(data)
+        getFromStr(data)
+        getToStr(data)
+        return ('BYE', tempFromTag, tempCallId)
+    for code,reResponse in ((100, RE_SIP_100), (180, RE_SIP_180), (183, RE_SIP_183)):
+        if reResponse.search(data):
+            return (code, tempFromTag, tempCallId)
+    if RE_SIP_200.search(data):
+        getToTag(data)
+        return (200, tempFromTag, tempCallId)
+    if RE_SIP_RESPONSE.search(data):
+        getToTag(data)
+        return (int(getResponseCode(data)), tempFromTag, tempCallId)
+    return (None, tempFromTag, tempCallId)
+
+
+def classifyReceivedSip(data):
+    """
+    [Function]
+    Classify a received SIP message by ReceivedSipMessage. It is only for the benchmark
+
+    [Argument]
+    data: SIP message data
+
+    [Return]
+    (key, fromTag, callId), the same as classifyReceivedSipByRegex()
+    """
+
+    tempMessage = ReceivedSipMessage(data)
+    if tempMessage.responseCode>0:
+        tempKey = tempMessage.responseCode
+    elif tempMessage.method:
+        tempKey = tempMessage.method
+    else:
+        tempKey = None
+    return (tempKey, tempMessage.fromTag, tempMessage.callId)
+
+
+def benchmarkSipReceiving():
+    """
+    [Function]
+    Compare how many received SIP messages per second are classified by the regex searches one by one
+    and by ReceivedSipMessage, the result is printed in the screen
+
+    [Argument]
+    (N/A)
+
+    [Return]
+    (N/A)
+    """
+
+    tempSdp = 'v=0\r\no=- 1 1 IN IP4 10.0.0.2\r\ns=-\r\nc=IN IP4 10.0.0.2\r\nt=0 0\r\n' \
+              'm=audio 30000 RTP/AVP 0 101\r\na=rtpmap:0 PCMU/8000\r\na=rtpmap:101 telephone-event/8000\r\n' \
+              'a=fmtp:101 0-15\r\n'
+    tempHead = '%s\r\n' \
+               'Via: SIP/2.0/UDP 10.0.0.1:5060;branch=z9hG4bKac1580b4;rport\r\n' \
+               'Record-Route: <sip:10.0.0.2;lr>\r\n' \
+               'From: "1234" <sip:1234@10.0.0.1>;tag=%s\r\n' \
+               'To: <sip:8000@10.0.0.2>%s\r\n' \
+               'Call-ID: vb20100101120000c0@10.0.0.1\r\n' \
+               'CSeq: %s\r\n' \
+               'Contact: <sip:8000@10.0.0.2:5060>\r\n' \
+               'Allow: INVITE, ACK, CANCEL, BYE, OPTIONS, INFO, UPDATE, PRACK\r\n' \
+               'Supported: timer, 100rel, replaces\r\n' \
+               'Server: IVR/1.0\r\n' \
+               'Content-Type: application/sdp\r\n' \
+               'Content-Length: %d\r\n\r\n%s'
+    tempMessages = [('100', tempHead % ('SIP/2.0 100 Trying', 'vb20100101120000c0', '', '1 INVITE', 0, '')),
+                    ('180', tempHead % ('SIP/2.0 180 Ringing', 'vb20100101120000c0', ';tag=as12', '1 INVITE', 0, '')),
+                    ('183', tempHead % ('SIP/2.0 183 Session Progress', 'vb20100101120000c0', ';tag=as12', '1 INVITE', len(tempSdp), tempSdp)),
+                    ('200', tempHead % ('SIP/2.0 200 OK', 'vb20100101120000c0', ';tag=as12', '1 INVITE', len(tempSdp), tempSdp)),
+                    ('486', tempHead % ('SIP/2.0 486 Busy Here', 'vb20100101120000c0', ';tag=as12', '1 INVITE', 0, '')),
+                    ('BYE', tempHead % ('BYE sip:1234@10.0.0.1:5060 SIP/2.0', 'as12', ';tag=vb20100101120000c0', '2 BYE', 0, ''))]
+    tempRounds = 20000
+
+    print '%-8s %16s %16s %8s' % ('message', 'regex (msg/s)', 'one pass (msg/s)', 'speedup')
+    tempTotalTimes = [0.0, 0.0]
+    for name,data in tempMessages:
+        if classifyReceivedSipByRegex(data)!=classifyReceivedSip(data):
+            LOG.a("The SIP message '%s' is classified differently" % (name))
+            raise
+        #else
+
+        tempTimes = []
+        for classify in (classifyReceivedSipByRegex, classifyReceivedSip):
+            tempBestTime = None
+            for i in range(3):
+                tempStartTime = time.time()
+                for j in xrange(tempRounds):
+                    classify(data)
+                tempTime = time.time() - tempStartTime
+                if tempBestTime is None or tempTime<tempBestTime:
+                    tempBestTime = tempTime
+            tempTimes.append(tempBestTime)
+        tempTotalTimes[0] += tempTimes[0]
+        tempTotalTimes[1] += tempTimes[1]
+
+        print '%-8s %16d %16d %7.2fx' % (name, tempRounds/tempTimes[0], tempRounds/tempTimes[1], tempTimes[0]/tempTimes[1])
+
+    tempCount = tempRounds*len(tempMessages)
+    print '%-8s %16d %16d %7.2fx' % ('all', tempCount/tempTotalTimes[0], tempCount/tempTotalTimes[1], tempTotalTimes[0]/tempTotalTimes[1])
+
+
+def benchmarkRtpDecoding():
+    """
+    [Function]
+    Measure how many RTP packets per second are decoded by decodeRtp(), for each kind of RTP packet which
+    the snoop parser and ChannelWorker receive, the result is printed in the screen
+
+    [Argument]
+    (N/A)
+
+    [Return]
+    (N/A)
+    """
+
+    tempHeader = STRUCT_RTP_HEADER.pack(0x80, PAYLOAD_TYPE_G711, 1, 160, 0x1234)
+    tempExtendedHeader = STRUCT_RTP_HEADER.pack(0x90, PAYLOAD_TYPE_G711, 1, 160, 0x1234) + STRUCT_RTP_EXTENSION_HEADER.pack(0xbede, 1) + '\0'*4
+    tempPackets = [('G.711', tempHeader + '\xff'*160),
+                   ('G.711 ext', tempExtendedHeader + '\xff'*160),
+                   ('2833', STRUCT_RTP_HEADER.pack(0x80, 101, 1, 160, 0x1234) + STRUCT_2833_EVENT.pack(5, 0x8a, 400)),
+                   ('record', STRUCT_RTP_HEADER.pack(0x80, PAYLOAD_TYPE_IVR_RECORD_FILE, 100, 8000, 0x1234) + '\x01rec001.wav\0'),
+                   ('prompt', STRUCT_RTP_HEADER.pack(0x80, PAYLOAD_TYPE_IVR_PROMPT, 100, 8000, 0x1234) + \
+                            '\x03speak.vox/e1ja349\0system32.vox/s1\0rectone\0')]
+    tempRounds = 50000
+
+    print '%-10s %14s' % ('packet', 'packets/s')
+    for name,data in tempPackets:
+        tempBestTime = None
+        for i in range(3):
+            tempStartTime = time.time()
+            for j in xrange(tempRounds):
+                decodeRtp(data, 101)
+            tempTime = time.time() - tempStartTime
+            if tempBestTime is None or tempTime<tempBestTime:
+                tempBestTime = tempTime
+        print '%-10s %14d' % (name, tempRounds/tempBestTime)
+
+
+fuzzyPromptsDict = {}
+def getFuzzyPrompts():
+    """
+    [Function]
+    get fuzzy prompts from fuzzy prompts config file
+
+    [Argument]
+    (N/A)
+
+    [Return]
+    (N/A)
+    """
+
+    if not os.path.exists(FUZZY_PROMPTS_FILE):
+        LOG.i("There is no '%s'" % (FUZZY_PROMPTS_FILE))
+        return
+
+    fileobj = file(FUZZY_PROMPTS_FILE, 'r')
+
+    try:
+        while True:
+            tempPair = fileobj.readline()
+            # EOF
+            if not tempPair:
+                break
+            # else:
+
+            tempPair = tempPair.strip().lower()
+            if tempPair.startswith(ANNOTATION_CHAR) or len(tempPair)==0:
+                continue
+
+            tempElements = tempPair.split(':')
+            for element in tempElements:
+                fuzzyPromptsDict[element] = tempElements
+
+        if len(fuzzyPromptsDict)>0:
+            LOG.writeLog('-- Fuzzy Prompts Dict --\n' + str(fuzzyPromptsDict))
+        else:
+            LOG.i('There is no fuzzy prompts defined')
+    finally:
+        fileobj.close()
+
+
+callParameters = None
+def getParameters():
+    """
+    [Function]
+    Get parameters from command input
+
+    [Argument]
+    (N/A)
+
+    [Return]
+    (N/A)
+    """
+
+    global callParameters
+
+    useDefault = False
+    # PARAMETER -y: Yes, means all to say yes for the questions
+    gotYes = ('-y' in sys.argv) and os.path.exists(CALL_PARAMETERS_CONFIG_FILE)
+
+    try:
+        parameterFile = file(CALL_PARAMETERS_CONFIG_FILE, 'rb')
+        parameters = pickle.load(parameterFile)
+
+        while not gotYes:
+            yesOrNo = raw_input('Do you want to use the old Call Parameters? [Y/N, default N]: ').strip().upper()
+            if yesOrNo=='':
+                yesOrNo = 'N'
+
+            if yesOrNo=='Y':
+                useDefault = True
+                break
+            elif yesOrNo=='N':
+                useDefault = False
+                break
+        else:
+            useDefault = True
+
+        parameterFile.close()
+    except KeyboardInterrupt:
+        raise KeyboardInterrupt
+    except:
+        # there is no config file found
+        parameters = Parameters()
+        print 'Please setup the following Call Parameters.'
+
+    if useDefault:
+        callParameters = parameters
+        return
+    #else:
+
+    while True:
+        tempDestination = raw_input('[ Mandatory ] The DESTINATION machine IP address or machine name [%s]: ' % (parameters.destination))
+        if tempDestination=='':
+            tempDestination = parameters.destination
+
+        tempDestination = tempDestination.strip()
+        try:
+            if tempDestination=='':
+                raise 'Empty destination'
+            socket.gethostbyname(tempDestination)
+        except KeyboardInterrupt:
+            raise KeyboardInterrupt
+        except:
+            print 'DESTINATION is invalid, please try again'
+        else:
+            break
+
+    tempCalledPrefix = raw_input("[ Optional  ] The called/redirect's PREFIX [%s]: " % (parameters.calledPrefix))
+    if tempCalledPrefix=='':
+        tempCalledPrefix = parameters.calledPrefix
+    tempCalledPrefix = tempCalledPrefix.strip()
+
+    while True:
+        tempCalledCount = raw_input('[ Mandatory ] How many called number? [%d]: ' % (parameters.calledCount))
+        if tempCalledCount=='':
+            tempCalledCount = str(parameters.calledCount)
+
+        tempCalledCount = tempCalledCount.strip()
+        if tempCalledCount.isdigit():
+            tempCalledCount = int(tempCalledCount)
+            if tempCalledCount<1:
+                print 'The min count is 1, please try again'
+                continue
+            else:
+                break
+        else:
+            print 'The COUNT must be a digit, please try again'
+            continue
+
+    while True:
+        tempCalled = raw_input('[ Mandatory ] The CALLED phone number [%s]: ' % (parameters.called))
+        if tempCalled=='':
+            tempCalled = parameters.called
+
+        tempCalled = tempCalled.strip()
+
+        if tempCalledCount<=1:
+            if tempCalled=='':
+                print 'CALLED is invalid, please try again'
+                contiue
+            else:
+                break
+        else:
+            if not tempCalled.isdigit():
+                print 'The called count is bigger than 1, so please make sure the begin called number is a digit'
+                continue
+            else:
+                break
+
+    while True:
+        tempSource = raw_input('[ Mandatory ] The SOURCE machine IP address [%s]: ' % (parameters.source))
+        if tempSource=='':
+            tempSource = parameters.source
+
+        tempSource = tempSource.strip()
+        try:
+            if RE_IP.search(tempSource).group()!=tempSource:
+                raise 'Invalid source'
+
+            socket.gethostbyname(tempSource)
+        except KeyboardInterrupt:
+            raise KeyboardInterrupt
+        except:
+            print 'SOURCE is invalid, please try again'
+        else:
+            break
+
+    tempCalling = raw_input('[ Optional  ] The CALLING phone number [%s]: ' % (parameters.calling))
+    if tempCalling=='':
+        tempCalling = parameters.calling
+    tempCalling = tempCalling.strip()
+
+    while True:
+        tempRedirectCount = raw_input('[ Mandatory ] How many redirect number? [%d]: ' % (parameters.redirectCount))
+        if tempRedirectCount=='':
+            tempRedirectCount = str(parameters.redirectCount)
+
+        tempRedirectCount = tempRedirectCount.strip()
+        if tempRedirectCount.isdigit():
+            tempRedirectCount = int(tempRedirectCount)
+            if tempRedirectCount<0:
+                print 'The min count is 0, please try again'
+                continue
+            else:
+                break
+        else:
+            print 'The COUNT must be a digit, please try again'
+            continue
+
+    if tempRedirectCount>0:
+        while True:
+            tempRedirect = raw_input('[ Mandatory ] The REDIRECT number [%s]: ' % (parameters.redirect))
+            if tempRedirect=='':
+                tempRedirect = parameters.redirect
+            tempRedirect = tempRedirect.strip()
+
+            if tempRedirectCount==1:
+                break
+            else:
+                if not tempRedirect.isdigit():
+                    print 'The redirect count is bigger than 1, so please make sure the begin redirect number is a digit'
+                    continue
+
+        if parameters.reason.strip()!='':
+            tempReason = raw_input('[ Mandatory ] The redirect REASON [unknown, user-busy, no-answer, unavailable, unconditional, out-of-service. DEFAULT: %s]: ' % (parameters.reason))
+        else:
+            tempReason = raw_input('[ Mandatory ] The redirect REASON [unknown, user-busy, no-answer, unavailable, unconditional, out-of-service]: ')
+        if tempReason=='':
+            tempReason = parameters.reason
+        tempReason = tempReason.strip()
+
+    while True:
+        if parameters.isStressTest:
+            defaultIsStressTest = 'Y'
+        else:
+            defaultIsStressTest = 'N'
+        tempIsStressTest = raw_input('[ Mandatory ] Do you want to do stress test? [%s]: ' % (defaultIsStressTest))
+        if tempIsStressTest=='':
+            tempIsStressTest = defaultIsStressTest
+
+        tempIsStressTest = tempIsStressTest.strip().upper()
+        if tempIsStressTest=='Y':
+            tempIsStressTest = True
+            break
+        elif tempIsStressTest=='N':
+            tempIsStressTest = False
+            break
+
+    tempChannelCount = 1
+    while tempIsStressTest:
+        tempChannelCount = raw_input('[ Mandatory ] How many channels? [%d]: ' % (parameters.channelCount))
+        if tempChannelCount=='':
+            tempChannelCount = str(parameters.channelCount)
+
+        tempChannelCount = tempChannelCount.strip()
+        if tempChannelCount.isdigit():
+            tempChannelCount = int(tempChannelCount)
+            if tempChannelCount<1:
+                print 'The min Channel Count is 1, please try again'
+                continue
+            else:
+                break
+        else:
+            print 'The Channel Count must be a digit, please try again'
+            continue
+
+    parameters.destination = tempDestination
+    parameters.calledPrefix = tempCalledPrefix
+    parameters.calledCount = tempCalledCount
+    parameters.called = tempCalled
+    parameters.source = tempSource
+    parameters.calling = tempCalling
+
+    parameters.redirectCount = tempRedirectCount
+    if tempRedirectCount>0:
+        parameters.redirect = tempRedirect
+        parameters.reason = tempReason
+
+    parameters.isStressTest = tempIsStressTest
+    parameters.channelCount = tempChannelCount
+
+    if not os.path.exists(DIR_CONFIG):
+        os.makedirs(DIR_CONFIG)
+    parameterFile = file(CALL_PARAMETERS_CONFIG_FILE, 'wb')
+    pickle.dump(parameters, parameterFile)
+    parameterFile.close()
+
+    callParameters = parameters
+
+
+class CaseFinder:
+    """
+    [Class]
+    Find the case files in the dirs and the case list files. A dir is listed once by scandir if there is,
+    the file type is known from the listing without stat for each file. The cases are filtered by the glob
+    patterns of -in and -ex, and a case reached by several case list files is found once.
+    With -lc the listing of each dir is cached with the modify time of the dir, so the dirs which are not
+    changed are not listed again by the next run
+    """
+
+    def __init__(self):
+        self.caseDirName = os.path.abspath(DIR_CASE)
+        # PARAMETER -in: INclude, only the cases matching the glob pattern, e.g. -in 'ivr*/*.snoop'
+        self.includes = getParameterValues('-in')
+        # PARAMETER -ex: EXclude the cases and the dirs matching the glob pattern
+        self.excludes = getParameterValues('-ex')
+
+        self.files = []
+        self.foundFiles = set()
+        self.visitedLists = set()
+        self.listedDirsCount = 0
+        self.cachedDirsCount = 0
+
+        # PARAMETER -lc: Listing Cache, reuse the listing of the dirs which are not changed
+        self.isListingCached = '-lc' in sys.argv
+        self.listings = {}      # key: dir name, value: (modify time, names of the case files, names of the sub-dirs)
+        self.isListingsChanged = False
+        if self.isListingCached:
+            self.__loadListings()
+
+
+    def __loadListings(self):
+        """
+        [Function]
+        Load the listing cache, it is ignored if it is broken
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        (N/A)
+        """
+
+        if not os.path.exists(LISTING_CACHE_FILE):
+            return
+
+        listingFile = file(LISTING_CACHE_FILE, 'rb')
+        try:
+            try:
+                self.listings = pickle.load(listingFile)
+            except Exception:
+                LOG.w("The listing cache '%s' is broken, all dirs will be listed again" % (LISTING_CACHE_FILE))
+                self.listings = {}
+        finally:
+            listingFile.close()
+
+
+    def saveListings(self):
+        """
+        [Function]
+        Save the listing cache if it is changed
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        (N/A)
+        """
+
+        if not self.isListingCached or not self.isListingsChanged:
+            return
+
+        tempCacheDirName = os.path.dirname(os.path.abspath(LISTING_CACHE_FILE))
+        if not os.path.exists(tempCacheDirName):
+            os.makedirs(tempCacheDirName)
+
+        listingFile = file(LISTING_CACHE_FILE, 'wb')
+        try:
+            pickle.dump(self.listings, listingFile, 2)
+        finally:
+            listingFile.close()
+        self.isListingsChanged = False
+
+
+    def getFiles(self):
+        """
+        [Function]
+        Get the case files found, in the order they are found
+
+        [Argument]
+        (N/A)
+
+        [Return]
+        list of the absolute file names
+        """
+
+        return self.files
+
+
+    def __isExcluded(self, name):
+        """
+        [Function]
+        Check whether the case file or the dir matches a pattern of -ex
+
+        [Argument]
+        name: absolute file name or dir name
+
+        [Return]
+        True or False
+        """
+
+        tempRelativeName = self.__getRelativeName(name)
+        tempBaseName = os.path.basename(name)
+        for pattern in self.excludes:
+            if fnmatch.fnmatch(tempRelativeName, pattern) or fnmatch.fnmatch(tempBaseName, pattern):
+                return True
+
+        return False
+
+
+    def __isIncluded(self, name):
+        """
+        [Function]
+        Check whether the case file matches a pattern of -in
+
+        [Argument]
+        name: absolute file name
+
+        [Return]
+        True or False
+        """
+
+        tempRelativeName = self.__getRelativeName(name)
+        tempBaseName = os.path.basename(name)
+        for pattern in self.includes:
+            if fnmatch.fnmatch(tempRelativeName, pattern) or fnmatch.fnmatch(tempBaseName, pattern):
+                return True
+
+        return False
+
+
+    def __getRelativeName(self, name):
+        """
+        [Function]
+        Get the name relative to the case dir with '/', the patterns are matched with it
+
+        [Argument]
+        name: absolute file name or dir name
+
+        [Return]
+        e.g. 'ivr/auto.snoop', or the name itself if it is not in the case dir
+        """
+
+        if name.startswith(self.caseDirName+os.sep):
+            name = name[len(self.caseDirName)+1:]
+
+        return name.replace(os.sep, '/')
+
+
+    def __addFile(self, fileName):
+        """
+        [Function]
+        Add a case file if it is not found before and not filtered
+
+        [Argument]
+        fileName: absolute file name
+
+        [Return]
+        (N/A)
+        """
+
+        if fileName in self.foundFiles:
+            return
+        self.foundFiles.add(fileName)
+
+        if self.includes and not self.__isIncluded(fileName):
+            return
+        if self.excludes and self.__isExcluded(fileName):
+            return
+
+        self.files.append(fileName)
+
+
+    def __listDir(self, dirName):
+        """
+        [Function]
+        List the case files and the sub-dirs of a dir, from the listing cache if the dir is not changed
+
+        [Argument]
+        dirName: absolute dir name
+
+        [Return]
+        (names of the case files, names of the sub-dirs)
+        """
+
+        if self.isListingCached:
+            tempModifyTime = os.stat(dirName).st_mtime
+            tempListing = self.listings.get(dirName)
+            if tempListing and tempListing[0]==tempModifyTime:
+                self.cachedDirsCount += 1
+                return tempListing[1:]
+
+        self.listedDirsCount += 1
+        tempFileNames = []
+        tempSubDirNames = []
+        if scandir:
+            for entry in scandir(dirName):
+                # Note: the type is from the listing (d_type), stat is called only if the file system does not give it
+                if entry.is_dir():
+                    tempSubDirNames.append(entry.name)
+                elif os.path.splitext(entry.name)[1].lower() in CAPTURE_FILE_EXTS and entry.is_file():
+                    tempFileNames.append(entry.name)
+        else:
+            # Note: one stat for each entry, instead of isfile() then isdir()
+            tempPrefix = dirName + os.sep
+            for name in os.listdir(dirName):
+                try:
+                    tempMode = os.stat(tempPrefix+name).st_mode
+                except OSError:
+                    # e.g. a broken link
+                    continue
+
+                if stat.S_ISDIR(tempMode):
+                    tempSubDirNames.append(name)
+                elif stat.S_ISREG(tempMode) and os.path.splitext(name)[1].lower() in CAPTURE_FILE_EXTS:
+                    tempFileNames.append(name)
+
+        # Note: the modify time of a dir changed in the same second may not change again, such a dir is not cached
+        if self.isListingCached and time.time()-tempModifyTime>LISTING_CACHE_MIN_AGE:
+            self.listings[dirName] = (tempModifyTime, tempFileNames, tempSubDirNames)
+            self.isListingsChanged = True
+
+        return (tempFileNames, tempSubDirNames)
+
+
+    def findInDir(self, dirName):
+        """
+        [Function]
+        Find all case files in a dir and its sub-dir (sub...sub-dir) with special ext
+
+        [Argument]
+        dirName: the directory
+
+        [Return]
+        (N/A)
+        """
+
+        dirName = os.path.abspath(dirName)
+        if self.excludes and self.__isExcluded(dirName):
+            return
+
+        tempFileNames,tempSubDirNames = self.__listDir(dirName)
+        tempPrefix = dirName + os.sep
+        for name in tempFileNames:
+            self.__addFile(tempPrefix+name)
+        for name in tempSubDirNames:
+            self.findInDir(tempPrefix+name)
+
+
+    def findInList(self, testCaseListFile):
+        """
+        [Function]
+        Find all case files according to the test case list file, a list file included again is ignored
+
+        [Argument]
+        testCaseListFile: the test case list file with special ext
+
+        [Return]
+        (N/A)
+        """
+
+        testCaseListFile = os.path.abspath(testCaseListFile)
+        if testCaseListFile in self.visitedLists:
+            return
+        self.visitedLists.add(testCaseListFile)
+
+        dir = os.path.dirname(testCaseListFile)
+
+        fileobj = file(testCaseListFile, 'r')
+        try:
+            while True:
+                tempName = fileobj.readline()
+                # EOF
+                if not tempName:
+                    break
+                # else:
+
+                tempName = tempName.strip()
+
+                if tempName.startswith(ANNOTATION_CHAR) or len(tempName)==0:
+                    continue
+
+                tempName = os.path.abspath(dir+'/'+tempName)
+                try:
+                    tempMode = os.stat(tempName).st_mode
+                except OSError:
+                    print "'%s' doesn't exist" % (tempName)
+                    continue
+
+                if stat.S_ISREG(tempMode):
+                    tempExtName = os.path.splitext(tempName)[1].lower()
+                    if tempExtName in CAPTURE_FILE_EXTS:
+                        self.__addFile(tempName)
+                    elif tempExtName==CASE_LIST_FILE_EXT:
+                        self.findInList(tempName)
+                elif stat.S_ISDIR(tempMode):
+                    self.findInDir(tempName)
+        finally:
+            fileobj.close()
+
+
+def getParameterValues(name):
+    """
+    [Function]
+    Get the values of a parameter which can be given several times, e.g. -ex '*.cap' -ex 'old/*'
+
+    [Argument]
+    name: the parameter, e.g. '-ex'
+
+    [Return]
+    list of the values in the order they are given
+    """
+
+    values = []
+    for i in xrange(len(sys.argv)-1):
+        if sys.argv[i]==name:
+            values.append(sys.argv[i+1])
+
+    return values
+
+
+promptBookDict = None
+def loadPromptBookDict():
+    global promptBookDict
+
+    if not os.path.exists(BOOK_DB_FILE):
+        return None
+    #else:
+
+    bookDbFile = file(BOOK_DB_FILE, 'rb')
+    promptBookDict = pickle.load(bookDbFile)
+    bookDbFile.close()
+
+
+def getPromptContentById(promptId):
+    global promptBookDict
+
+    if not promptBookDict:
+        return ''
+    #else:
+
+    tempPromptId = promptId.lower()
+    if promptBookDict.has_key(tempPromptId):
+        return promptBookDict[tempPromptId]
+    else:
+        return ''
+
+
+def isCompileCommand():
+    """
+    [Function]
+    Check whether Voicebird is run by the compile command, e.g. 'python voicebird.pyc compile -f case/'
+
+    [Argument]
+    (N/A)
+
+    [Return]
+    True or False
+    """
+
+    return len(sys.argv)>1 and sys.argv[1]==COMMAND_COMPILE
+
+
+def isVerifyingCache():
+    """
+    [Function]
+    Check whether the compile command is run to verify the cache, e.g. 'python voicebird.pyc compile -f case/ -vc'
+
+    [Argument]
+    (N/A)
+
+    [Return]
+    True or False
+    """
+
+    # PARAMETER -vc: Verify the Cache, with the compile command
+    return isCompileCommand() and '-vc' in sys.argv
+
+
+def getProcessesCount():
+    """
+    [Function]
+    Get how many worker processes of -mp run the stress test
+
+    [Argument]
+    (N/A)
+
+    [Return]
+    count of worker processes, 1 means to run all channels in this process
+    """
+
+    # PARAMETER -mp: Multi-Process, run the channels of the stress test by so many worker processes
+    if '-mp' not in sys.argv:
+        return 1
+    #else:
+
+    if not callParameters.isStressTest:
+        print '-mp is ignored as it is not a stress test'
+        return 1
+
+    if not hasattr(os, 'fork'):
+        print '-mp is ignored as there is no fork() on this platform'
+        return 1
+
+    try:
+        tempProcessesCount = int(sys.argv[sys.argv.index('-mp')+1])
+    except:
+        try:
+            tempProcessesCount = multiprocessing.cpu_count()
+        except (AttributeError, NotImplementedError):
+            tempProcessesCount = 1
+
+    return max(1, min(tempProcessesCount, callParameters.channelCount))
+
+
+def compileCases(files):
+    """
+    [Function]
+    The compile command, parse the cases and write them to cache without running the test, then print
+    the time of each stage. The cache dir can be copied to the other machines with the same case dir,
+    so they start to run without parsing
+
+    [Argument]
+    files: list of the snoop files
+
+    [Return]
+    (N/A)
+    """
+
+    # the hash of the .dpl files before compiling, to be compared with the new ones
+    tempOldDplHashes = {}
+    if isVerifyingCache():
+        for fileName in files:
+            tempDplFileName = caseNameToCacheName(fileName)+DIALOG_PACKETS_LIST_FILE_EXT
+            if os.path.exists(tempDplFileName):
+                tempOldDplHashes[tempDplFileName] = getFileHash(tempDplFileName)
+
+    tempStartTime = time.time()
+    snoopParser = SnoopParser(files)
+    tempElapsedTime = time.time()-tempStartTime
+
+    tempStageTimes = snoopParser.getStageTimes()
+    tempReport = 'Compiled %d cases in %.3f seconds: %d parsed, %d cached, %d failed\n' \
+            % (len(files), tempElapsedTime, snoopParser.parsedCasesCount, snoopParser.cachedCasesCount, snoopParser.failedCasesCount)
+    for stage in COMPILE_STAGES:
+        tempReport += '    %-8s %9.3f seconds\n' % (stage, tempStageTimes.get(stage, 0.0))
+
+    tempReport += reportChunks(files)
+
+    if isVerifyingCache():
+        tempReport += verifyDplHashes(files, tempOldDplHashes)
+
+    LOG.i(tempReport)
+    print tempReport
+
+
+def reportChunks(files):
+    """
+    [Function]
+    Count the chunks used by the cases, it tells how much the content-addressed chunk store saves
+
+    [Argument]
+    files: list of the snoop files
+
+    [Return]
+    the report of the chunks
+    """
+
+    tempDialogChunks = {}
+    tempRunChunks = {}
+    for fileName in files:
+        tempDplFileName = caseNameToCacheName(fileName)+DIALOG_PACKETS_LIST_FILE_EXT
+        if not os.path.exists(tempDplFileName):
+            # failed to parse, it has been reported
+            continue
+
+        tempCaseDialogChunks,tempCaseRunChunks = getChunksUsedByDpl(tempDplFileName)
+        for allChunks,chunks in ((tempDialogChunks, tempCaseDialogChunks), (tempRunChunks, tempCaseRunChunks)):
+            for digest,(chunkSize,usedCount) in chunks.iteritems():
+                allChunks.setdefault(digest, [chunkSize, 0])[1] += usedCount
+
+    tempUsedDialogsCount = 0
+    tempUsedRunsCount = 0
+    tempStoredSize = 0
+    tempUsedSize = 0
+    for chunkSize,usedCount in tempDialogChunks.itervalues():
+        tempUsedDialogsCount += usedCount
+        tempStoredSize += chunkSize
+        tempUsedSize += chunkSize*usedCount
+    for chunkSize,usedCount in tempRunChunks.itervalues():
+        tempUsedRunsCount += usedCount
+        tempStoredSize += chunkSize
+        tempUsedSize += chunkSize*usedCount
+
+    return 'Chunks: %d of %d dialogs and %d of %d runs are stored, %d KB for %d KB used by the cases\n' \
+            % (len(tempDialogChunks), tempUsedDialogsCount, len(tempRunChunks), tempUsedRunsCount, tempStoredSize/1024, tempUsedSize/1024)
+
+
+def verifyDplHashes(files, oldDplHashes):
+    """
+    [Function]
+    Compare the .dpl files with the ones before compiling, it tells whether a new version of Voicebird
+    still gives out the same cache for the cases
+
+    [Argument]
+    files: list of the snoop files
+    oldDplHashes: dict, key: .dpl file name, value: hash of the .dpl file before compiling
+
+    [Return]
+    the report of the comparing
+    """
+
+    tempSameCount = 0
+    tempDifferentFiles = []
+    tempNewCount = 0
+    for fileName in files:
+        tempDplFileName = caseNameToCacheName(fileName)+DIALOG_PACKETS_LIST_FILE_EXT
+        if not os.path.exists(tempDplFileName):
+            # failed to parse, it has been reported
+            continue
+
+        if tempDplFileName not in oldDplHashes:
+            tempNewCount += 1
+        elif getFileHash(tempDplFileName)==oldDplHashes[tempDplFileName]:
+            tempSameCount += 1
+        else:
+            tempDifferentFiles.append(fileName)
+
+    tempReport = 'Verified the cache: %d same, %d different, %d without the one before compiling\n' \
+            % (tempSameCount, len(tempDifferentFiles), tempNewCount)
+    for fileName in tempDifferentFiles:
+        tempReport += '    different: %s\n' % (fileName)
+    return tempReport
+
+
+def getSnoopFiles():
+    gotFileDir = True
+    caseFinder = None
+    try:
+        # PARAMETER -f: File, means to enter file or dir
+        tempName = sys.argv[sys.argv.index('-f')+1]
+    except ValueError:
+        tempName = DIR_CASE
+
+    while True:
+        if not gotFileDir:
+            # the compile command does not ask
+            if isCompileCommand():
+                sys.exit(1)
+            tempName = raw_input('Enter the snoop-file/directory/case-list-file(.cl): ').strip()
+
+        if not os.path.exists(tempName):
+            print "'"+tempName+"' is a invalid file or dir, please try again"
+            gotFileDir = False
+            continue
+
+        tempName = os.path.abspath(tempName)
+        tempAbspathOfDirCase = os.path.abspath(DIR_CASE)
+        if not tempName.startswith(tempAbspathOfDirCase):
+            print "The file or dir must in '%s', please take another one" % (tempAbspathOfDirCase)
+            gotFileDir = False
+            continue
+
+        if os.path.isfile(tempName):
+            tempExtName = os.path.splitext(tempName)[1].lower()
+            # 1. it's a normal snoop (or pcap, pcapng) file
+            if tempExtName in CAPTURE_FILE_EXTS:
+                tempFiles = [tempName]
+                break
+            elif tempExtName==CASE_LIST_FILE_EXT:
+            # 2. it's a test case list file
+                caseFinder = CaseFinder()
+                caseFinder.findInList(tempName)
+                tempFiles = caseFinder.getFiles()
+                if len(tempFiles)<1:
+                    print 'There is no snoop file found according to the case list file', tempName
+                    gotFileDir = False
+                    continue
+                else:
+                    break
+        elif os.path.isdir(tempName):
+            # 3. it's a directory
+            caseFinder = CaseFinder()
+            caseFinder.findInDir(tempName)
+            tempFiles = caseFinder.getFiles()
+            if len(tempFiles)<1:
+                print 'There is no snoop file in', tempName
+                print "Please make sure the snoop file with the ext '%s'" % ("' or '".join(CAPTURE_FILE_EXTS))
+                gotFileDir = False
+                continue
+            else:
+                break
+
+        # else:
+        print 'Please make sure your enter is snoop file or dir includes snoop file(s) or case list file with ext', CASE_LIST_FILE_EXT
+        gotFileDir = False
+        continue
+
+    if caseFinder:
+        caseFinder.saveListings()
+        LOG.i('Found %d cases: %d dirs are listed, %d dirs are from the listing cache' \
+                % (len(tempFiles), caseFinder.listedDirsCount, caseFinder.cachedDirsCount))
+
+    return tempFiles
+
+
+def raiseKeyboardInterrupt(signalNumber, frame):
+    """
+    [Function]
+    The signal handler to stop the worker process of -mp as by Ctrl+C
+
+    [Argument]
+    signalNumber: the signal
+    frame: the interrupted stack frame
+
+    [Return]
+    (N/A)
+    """
+
+    raise KeyboardInterrupt
+
+
+def setCpuAffinity(cpuIndex):
+    """
+    [Function]
+    Pin this process to a CPU, by os.sched_setaffinity of python 3 or sched_setaffinity by ctypes on Linux.
+    The CPU index is wrapped by the count of CPUs
+
+    [Argument]
+    cpuIndex: index of the CPU
+
+    [Return]
+    True if it is pinned, otherwise False
+    """
+
+    try:
+        tempCpuCount = multiprocessing.cpu_count()
+    except (AttributeError, NotImplementedError):
+        tempCpuCount = 1
+    cpuIndex = cpuIndex % tempCpuCount
+
+    if hasattr(os, 'sched_setaffinity'):
+        try:
+            os.sched_setaffinity(0, [cpuIndex])
+            return True
+        except OSError:
+            LOG.w('Cannot pin the process %d to the CPU %d' % (os.getpid(), cpuIndex))
+            return False
+    #else:
+
+    try:
+        import ctypes
+        import ctypes.util
+
+        tempLibc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6')
+        tempBitsOfMaskUnit = ctypes.sizeof(ctypes.c_ulong)*8
+        tempMask = (ctypes.c_ulong * (cpuIndex/tempBitsOfMaskUnit+1))()
+        tempMask[cpuIndex/tempBitsOfMaskUnit] = 1 << (cpuIndex%tempBitsOfMaskUnit)
+        if tempLibc.sched_setaffinity(0, ctypes.sizeof(tempMask), ctypes.byref(tempMask))!=0:
+            raise OSError('sched_setaffinity failed')
+        return True
+    except Exception:
+        LOG.w('Cannot pin the process %d to the CPU %d' % (os.getpid(), cpuIndex))
+        return False
+
+
+def getMonotonicClock():
+    """
+    [Function]
+    Get the function of a clock which never goes back, for the deadlines to send the packets.
+    It is time.monotonic of python 3, time.clock on Windows and CLOCK_MONOTONIC by ctypes on Linux,
+    otherwise time.time which is held not to go back
+
+    [Argument]
+    (N/A)
+
+    [Return]
+    the function which returns the time in seconds
+    """
+
+    if hasattr(time, 'monotonic'):
+        return time.monotonic
+
+    if sys.platform=='win32':
+        return time.clock
+
+    try:
+        import ctypes
+        import ctypes.util
+
+        class Timespec(ctypes.Structure):
+            _fields_ = [('tv_sec', ctypes.c_long), ('tv_nsec', ctypes.c_long)]
+
+        tempLibrt = ctypes.CDLL(ctypes.util.find_library('rt') or 'librt.so.1')
+        tempClockGettime = tempLibrt.clock_gettime
+        tempClockGettime.argtypes = [ctypes.c_int, ctypes.POINTER(Timespec)]
+
+        def getClockMonotonic():
+            tempTimespec = Timespec()
+            if tempClockGettime(CLOCK_MONOTONIC, ctypes.byref(tempTimespec))!=0:
+                raise OSError('clock_gettime failed')
+            return tempTimespec.tv_sec + tempTimespec.tv_nsec*1e-9
+
+        getClockMonotonic()
+        return getClockMonotonic
+    except Exception:
+        LOG.w('There is no monotonic clock, the RTP is sent by the system time')
+
+    # the last time given out, key: 'time'
+    tempLastTime = {'time': 0.0}
+    tempLock = threading.Lock()
+    def getTimeNotBack():
+        tempLock.acquire()
+        try:
+            tempLastTime['time'] = max(time.time(), tempLastTime['time'])
+            return tempLastTime['time']
+        finally:
+            tempLock.release()
+
+    return getTimeNotBack
+
+
+def checkPythonVersion():
+    if sys.version[:3] not in SUPPORT_PYTHON_VERSIONS:
+        print """ERROR!
+  The python's version of this machine is %d.%d
+  But this tool can only run in python version %s
+""" % (sys.version_info[0], sys.version_info[1], ' or '.join(SUPPORT_PYTHON_VERSIONS))
+        return False
+    else:
+        return True
+
+
+def main():
+    print 'Voicebird: version %.2f. Author: Anthony Xu (cabernet1976@163.com)' % (VOICEBIRD_VERSION)
+    print
+
+    if not checkPythonVersion():
+        return
+
+    # PARAMETER -h: Help
+    if '-h' in sys.argv:
+        print \
+"""OPTIONAL PARAMETERS:
+    -h
+        get help information
+
+    -f [SNOOP_FILE or DIR or CASE_LIST_FILE]
+        tell Voicebird to read which snoop file, dir or case list file (.cl). Voicebird will read
+        all cases in sub-dir case/ by default without this parameter. The case file can be snoop,
+        pcap (microseconds or nanoseconds) or pcapng, with the ext .snoop, .pcap, .pcapng or .cap
+
+    -in [GLOB] -ex [GLOB]
+        only find the cases matching the glob pattern of -in, and not the cases or the dirs matching
+        the pattern of -ex, both can be given several times. A pattern is matched with the name
+        relative to the case dir and with the base name, e.g. -in 'ivr/*' -ex '*.cap' -ex 'old'
+
+    -lc
+        cache the listing of the case dirs, a dir is not listed again by the next run if its modify
+        time is not changed. It saves the time to find the cases in a big or remote case dir
+
+    -y
+        with this parameter, Voicebird will bypass asking to set up the Call Parameter and use the
+        saved Call Parameters in config file
+
+    -nf
+        no call flow will be drawed in the screen when function testing. Note: Voicebird will not
+        draw call flow when stress testing
+
+    -nd
+        no debug information will be write to log file. Voicebird will write log file by default
+        without this parameter
+
+    -vf -vp
+        print snoop file's content in the screen, please use like that
+        'python voicebird.pyc -f case/1.snoop -vf -vp > content.txt'
+
+    -fp
+        Force to Parse every case snoop file, without this parameter (default) system will first
+        choice to use the cached
+
+    -j [JOBS]
+        parse the snoop files by so many worker processes, it is the count of CPUs by default.
+        '-j 1' means to parse them one by one. Note: needs python 2.6 or later
+
+    -bdpl
+        benchmark to load the cases' binary .dpl files and the same packets saved by pickle
+        (protocol 2), print the time and the growth of resident memory, then exit
+
+    -bzc
+        benchmark the codecs of -z by the run chunks used by the cases, print the size on the disk,
+        the time to write, the time to load from the disk (cold, needs posix_fadvise to drop the
+        written files from the page cache) and the time to load again (warm), then exit
+
+    -bsip
+        benchmark to classify the received SIP messages by the regex searches one by one and by
+        one pass over the start line and the headers, print the messages per second, then exit
+
+    -brtp
+        benchmark to decode each kind of RTP packet, print the packets per second, then exit
+
+    compile
+        the command as the first argument, e.g. 'python voicebird.pyc compile -f case/ -j 4',
+        Voicebird only parses the cases to cache and prints the time of each stage, without asking
+        anything. Then copy the cache dir with the case dir to other machines to run without parsing.
+        With -fp all cases are parsed again. The chunks no case uses any more are removed by it only
+
+    -vc
+        Verify the Cache, with the compile command all cases are parsed again and their .dpl files
+        are compared with the ones in the cache, e.g. to check a new version of Voicebird gives out
+        the same cache as the old one. Note: the cache is replaced by the new one
+
+    -z CODEC[:LEVEL]
+        compress the RTP payload in the cache by the codec zlib, bz2 or lzma (python 3 or
+        backports.lzma) with the level 0 to 9, e.g. '-z zlib:1'. The cached cases are kept as they
+        are, compile with -fp to compress all of them. Without -z the payload is not compressed
+
+    -pf
+        PreFetch, a channel loads the dialogs of its case one by one from the cache, with this
+        parameter the next dialog is loaded in background when a dialog begins
+
+    -ev
+        run all channels on one event loop (epoll, poll or select) in the main thread, rather than
+        a thread for each channel. It is for the stress test of thousands of channels, raise the
+        limit of the open files (e.g. 'ulimit -n 20000') as each channel has its own RTP socket
+
+    -mp [PROCESSES]
+        run the channels of the stress test by so many worker processes, it is the count of CPUs by
+        default. Each process has its own SIP port (5060, 5061, ...) and RTP sockets, this process
+        prints the statistic of all and writes the result and log files. Needs fork(), e.g. Linux
+
+    -pin
+        pin each worker process of -mp to a CPU
+
+    -pai
+        P-Asserted-Identity
+
+    -fdn [FROM_DISPLAY_NAME]
+        set From's display name of INVITE message
+
+    -cfdn
+        Clear From's display name of INVITE message
+
+CALL PARAMETERS:
+    1.  If there is no command line parameter -y, Voicebird will display a Command Line UI to ask
+        setting the Call Parameters
+
+    2.  The case can use its own call parameters with a xml file
+
+TIPS:
+    Exit by Ctrl+C at anytime"""
+        return
+
+    try:
+        # 1.
+        createLogObj()
+
+        # PARAMETER -bsip: Benchmark the receiving of SIP messages, compare the regex searches with one pass
+        if '-bsip' in sys.argv:
+            benchmarkSipReceiving()
+            return
+
+        # PARAMETER -brtp: Benchmark the decoding of RTP packets
+        if '-brtp' in sys.argv:
+            benchmarkRtpDecoding()
+            return
+
+        # check the codec of -z before parsing, otherwise every case fails by it
+        getChunkCodec()
+
+        # 2.
+        tempFiles = getSnoopFiles()
+
+        # COMMAND compile: only parse the cases to cache
+        if isCompileCommand():
+            compileCases(tempFiles)
+            return
+
+        snoopParser = SnoopParser(tempFiles)
+        caseList = snoopParser.getCaseList()
+
+        if '-vf' in sys.argv or '-vp' in sys.argv:
+            return
+        #else
+
+        # PARAMETER -bdpl: Benchmark the DialogPacketsList file, compare the binary .dpl with pickle
+        if '-bdpl' in sys.argv:
+            benchmarkDplFormats(caseList)
+            return
+
+        # PARAMETER -bzc: Benchmark the codecs of -z to compress the run chunks
+        if '-bzc' in sys.argv:
+            benchmarkChunkCodecs(caseList)
+            return
+
+        # 3.
+        getParameters()
+        getFuzzyPrompts()
+        loadPromptBookDict()
+
+        LOG.writeLog('-- Call Parameters are as below --\n' + str(callParameters))
+
+        if '-y' not in sys.argv:
+            yesOrNo = raw_input('All data is ready, run? [Y/N, default Y]: ').strip().upper()
+            if yesOrNo=='':
+                yesOrNo = 'Y'
+
+            if yesOrNo=='N':
+                return
+
+            while yesOrNo!='Y':
+                yesOrNo = raw_input('Run? [Y/N, default Y]: ').strip().upper()
+                if yesOrNo=='':
+                    yesOrNo = 'Y'
+
+                if yesOrNo=='N':
+                    return
+
+        # 4.
+        tempProcessesCount = getProcessesCount()
+        if tempProcessesCount>1:
+            shardController = ShardController(caseList, tempProcessesCount)
+            shardController.doSelect()
+        else:
+            distributor = Distributor(caseList)
+            distributor.doSelect()
+    except KeyboardInterrupt:
+        sys.exit(0)
+
+
+if __name__=='__main__':
+    main()